@@ -0,0 +1,366 @@
+"""NavySimulator simulates a CacheLib hybrid cache of a DRAM LRU cache (T1) and a Navy block cache on
+NVM (T2) to estimate the T2 hit ratio and the write traffic of the NVM device without a replay.
+
+The NVM is divided into regions of navyRegionSizeMB. A block evicted from DRAM is admitted to NVM with
+probability navyAdmissionProbability and appended to the region being filled. A full region is written
+to the device and navyCleanRegions regions are kept free, so once the other regions hold data the oldest
+region is evicted with all of its blocks in FIFO order. A read that misses DRAM and finds a valid copy
+on NVM is a T2 hit and the block is inserted into DRAM while its copy stays on NVM, so it is not written
+again when it is evicted from DRAM. A write invalidates the copy of its block on NVM. If
+navyMaxDeviceWriteRateMB is set, admission is refused once the bytes admitted in the current window of
+trace time reach the bytes the device can write in the window at that rate.
+
+Time is the timestamp of the block request of an access in microseconds divided by the replay rate.
+
+Usage:
+    navy_simulator = NavySimulator(t1_size_mb=100, t2_size_mb=1000, admission_probability=0.5)
+    navy_simulator.track_cache_trace(CacheTraceReader(cache_trace_path))
+    stat_dict = navy_simulator.get_stat_dict()
+    write_rate_df = navy_simulator.get_write_rate_df()
+"""
+
+import numpy as np
+import pandas as pd
+
+from cydonia.cachelib.TierPredictor import DEFAULT_ALLOC_SIZE_LIST, ITEM_OVERHEAD_BYTE, MB_BYTE, get_fit_alloc_size
+from cydonia.profiler.CacheSimulator import BlockIdMap
+from cydonia.profiler.Reader import Reader
+
+
+class NavySimulator:
+    def __init__(
+            self,
+            t1_size_mb: int,
+            t2_size_mb: int,
+            region_size_mb: int = 16,
+            clean_region_count: int = 1,
+            admission_probability: float = 1.0,
+            max_device_write_rate_mb: float = None,
+            alloc_size_list: list = DEFAULT_ALLOC_SIZE_LIST,
+            block_size_byte: int = 4096,
+            replay_rate: float = 1.0,
+            window_sec: float = 1.0,
+            seed: int = 42
+    ) -> None:
+        """ This class simulates a DRAM LRU cache in front of a region-based FIFO NVM cache.
+
+        Args:
+            t1_size_mb: Size of DRAM in MB.
+            t2_size_mb: Size of NVM in MB.
+            region_size_mb: Size of a NVM region in MB as navyRegionSizeMB. (Default: 16)
+            clean_region_count: Number of free regions kept as navyCleanRegions. (Default: 1)
+            admission_probability: Probability of admitting a block evicted from DRAM as navyAdmissionProbability. (Default: 1.0)
+            max_device_write_rate_mb: Maximum rate of writes to NVM in MB per second as navyMaxDeviceWriteRateMB.
+                                        If None, the rate is not limited. (Default: None)
+            alloc_size_list: List of DRAM alloc sizes in bytes. (Default: DEFAULT_ALLOC_SIZE_LIST)
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            replay_rate: Rate at which the trace is replayed, trace time is divided by it. (Default: 1.0)
+            window_sec: Length of a window of time in which device writes are counted and limited. (Default: 1.0)
+            seed: Random seed of admission. (Default: 42)
+
+        Attributes:
+            t1_block_count: Number of blocks in DRAM.
+            region_block_count: Number of blocks in a NVM region.
+            region_count: Number of NVM regions that can hold data.
+            access_count: Number of accesses simulated.
+            read_count: Number of read accesses simulated.
+
+        Raises:
+            ValueError: If no alloc size fits a cache block and its item header.
+        """
+        assert t1_size_mb > 0, "DRAM size {} not greater than 0.".format(t1_size_mb)
+        assert 0.0 <= admission_probability <= 1.0, "Admission probability {} not in [0, 1].".format(admission_probability)
+        self.t1_block_count = int(t1_size_mb * MB_BYTE) // get_fit_alloc_size(alloc_size_list, block_size_byte)
+        self.item_size_byte = block_size_byte + ITEM_OVERHEAD_BYTE
+        self.region_size_byte = int(region_size_mb * MB_BYTE)
+        self.region_block_count = self.region_size_byte // self.item_size_byte
+        self.region_count = max(int(t2_size_mb // region_size_mb) - clean_region_count, 0) if self.region_block_count else 0
+        self.admission_probability = admission_probability
+        self.max_device_write_rate_mb = max_device_write_rate_mb
+        self.replay_rate = replay_rate
+        self.window_us = int(window_sec * 1e6)
+        self.access_count = 0
+        self.read_count = 0
+        self._rng = np.random.default_rng(seed)
+        self._window_admit_budget_byte = int(max_device_write_rate_mb * MB_BYTE * window_sec) if max_device_write_rate_mb is not None else None
+
+        # counts of T1 read hits, T1 write hits, T2 read hits, admissions, rejections and region evictions
+        self._count_arr = np.zeros(6, dtype=np.int64)
+        # bytes written to the device in each window
+        self._device_write_byte_arr = np.zeros(0, dtype=np.int64)
+        self._cur_ts = 0
+        self._window = 0
+        self._window_admit_byte = 0
+
+        # DRAM LRU as a doubly linked list indexed by block id with the sentinel at 0
+        self._prev_list = [0]
+        self._next_list = [0]
+        self._dram_flag_list = [0]
+        self._dram_count = 0
+
+        # sequence number of the region of the valid NVM copy of each block, -1 if there is none
+        self._region_seq_list = [-1]
+        # blocks of the region being filled and of each full region in order of writing
+        self._active_region_list = []
+        self._active_region_seq = 0
+        self._region_queue = []
+        self._region_queue_start = 0
+
+        self._block_id_map = BlockIdMap()
+
+
+    def _get_id_list(self, addr_arr: np.ndarray) -> list:
+        """Get the list of dense block ids of an array of block addresses and grow the state lists for new blocks."""
+        id_list = self._block_id_map.get_id_arr(addr_arr).tolist()
+        extend_count = len(self._block_id_map) + 1 - len(self._dram_flag_list)
+        for state_list, val in [(self._prev_list, 0), (self._next_list, 0), (self._dram_flag_list, 0), (self._region_seq_list, -1)]:
+            state_list.extend([val] * extend_count)
+        return id_list
+
+
+    def track_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray,
+            ts_arr: np.ndarray
+    ) -> None:
+        """Simulate an array of block accesses.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+            ts_arr: Array of timestamp in microseconds of each access.
+        """
+        op_arr = np.asarray(op_arr)
+        write_flag_arr = op_arr == 'w'
+        if not (write_flag_arr | (op_arr == 'r')).all():
+            raise ValueError("Unindentified value for operation: {}".format(op_arr[~(write_flag_arr | (op_arr == 'r'))][0]))
+        if not len(op_arr):
+            return
+        self.access_count += len(op_arr)
+        self.read_count += int((~write_flag_arr).sum())
+
+        id_list = self._get_id_list(addr_arr)
+        window_arr = (np.asarray(ts_arr, dtype=float)/self.replay_rate).astype(np.int64)//self.window_us
+        max_window = int(window_arr[-1])
+        if max_window >= len(self._device_write_byte_arr):
+            self._device_write_byte_arr = np.concatenate((self._device_write_byte_arr, np.zeros(max_window + 1 - len(self._device_write_byte_arr), dtype=np.int64)))
+        # one uniform draw per access decides the admission of the block it evicts from DRAM
+        admit_flag_list = (self._rng.random(len(id_list)) < self.admission_probability).tolist()
+
+        prev_list, next_list, dram_flag_list, region_seq_list = self._prev_list, self._next_list, self._dram_flag_list, self._region_seq_list
+        device_write_byte_arr, region_queue = self._device_write_byte_arr, self._region_queue
+        active_region_list, active_region_seq = self._active_region_list, self._active_region_seq
+        dram_count, dram_size = self._dram_count, self.t1_block_count
+        region_block_count, region_count, region_size_byte, item_size_byte = self.region_block_count, self.region_count, self.region_size_byte, self.item_size_byte
+        window, window_admit_byte, window_admit_budget_byte = self._window, self._window_admit_byte, self._window_admit_budget_byte
+        t1_read_hit_count = t1_write_hit_count = t2_read_hit_count = admit_count = reject_count = region_evict_count = 0
+
+        for block_id, write_flag, access_window, admit_flag in zip(id_list, write_flag_arr.tolist(), window_arr.tolist(), admit_flag_list):
+            if access_window != window:
+                window, window_admit_byte = access_window, 0
+
+            if dram_flag_list[block_id]:
+                if write_flag:
+                    t1_write_hit_count += 1
+                    region_seq_list[block_id] = -1
+                else:
+                    t1_read_hit_count += 1
+                prev_id = prev_list[block_id]
+                if prev_id == 0:
+                    continue
+                next_id = next_list[block_id]
+                next_list[prev_id] = next_id
+                prev_list[next_id] = prev_id
+            else:
+                if write_flag:
+                    region_seq_list[block_id] = -1
+                elif region_seq_list[block_id] >= 0:
+                    t2_read_hit_count += 1
+
+                if dram_count < dram_size:
+                    dram_count += 1
+                else:
+                    evict_id = prev_list[0]
+                    evict_prev_id = prev_list[evict_id]
+                    next_list[evict_prev_id] = 0
+                    prev_list[0] = evict_prev_id
+                    dram_flag_list[evict_id] = 0
+                    # a block evicted from DRAM is written to NVM unless it has a valid copy there
+                    if region_count and region_seq_list[evict_id] < 0:
+                        if not admit_flag or (window_admit_budget_byte is not None and window_admit_byte + item_size_byte > window_admit_budget_byte):
+                            reject_count += 1
+                        else:
+                            admit_count += 1
+                            window_admit_byte += item_size_byte
+                            active_region_list.append(evict_id)
+                            region_seq_list[evict_id] = active_region_seq
+                            if len(active_region_list) == region_block_count:
+                                device_write_byte_arr[access_window] += region_size_byte
+                                region_queue.append((active_region_seq, active_region_list))
+                                active_region_seq += 1
+                                active_region_list = []
+                                # the region being filled is also counted against the regions that hold data
+                                if len(region_queue) - self._region_queue_start >= region_count:
+                                    evict_region_seq, evict_region_list = region_queue[self._region_queue_start]
+                                    region_queue[self._region_queue_start] = None
+                                    self._region_queue_start += 1
+                                    region_evict_count += 1
+                                    for region_block_id in evict_region_list:
+                                        if region_seq_list[region_block_id] == evict_region_seq:
+                                            region_seq_list[region_block_id] = -1
+                dram_flag_list[block_id] = 1
+
+            # the block becomes the most recently used in DRAM
+            head_id = next_list[0]
+            next_list[block_id] = head_id
+            prev_list[head_id] = block_id
+            prev_list[block_id] = 0
+            next_list[0] = block_id
+
+        if self._region_queue_start > len(region_queue)//2:
+            del region_queue[:self._region_queue_start]
+            self._region_queue_start = 0
+        self._active_region_list, self._active_region_seq = active_region_list, active_region_seq
+        self._dram_count = dram_count
+        self._window, self._window_admit_byte = window, window_admit_byte
+        self._count_arr += [t1_read_hit_count, t1_write_hit_count, t2_read_hit_count, admit_count, reject_count, region_evict_count]
+
+
+    @staticmethod
+    def get_ts_arr(
+            cache_req_arr: np.ndarray,
+            prev_ts: int = 0
+    ) -> np.ndarray:
+        """Get the timestamp of each cache request from the interarrival time of its block request. The
+        cache requests of a block request are adjacent and share its interarrival time.
+
+        Args:
+            cache_req_arr: Structured array of dtype CACHE_REQ_DTYPE.
+            prev_ts: Timestamp of the block request before the array. (Default: 0)
+
+        Returns:
+            ts_arr: Array of timestamp of each cache request.
+        """
+        if not len(cache_req_arr):
+            return np.zeros(0, dtype=np.int64)
+        req_index_arr = cache_req_arr["i"]
+        group_start_flag_arr = np.ones(len(req_index_arr), dtype=bool)
+        group_start_flag_arr[1:] = req_index_arr[1:] != req_index_arr[:-1]
+        group_ts_arr = prev_ts + np.cumsum(cache_req_arr["iat"][group_start_flag_arr])
+        return group_ts_arr[np.cumsum(group_start_flag_arr) - 1]
+
+
+    def get_stat_dict(self) -> dict:
+        """Get a dictionary of hit ratios and NVM write statistics.
+
+        Returns:
+            stat_dict: Dictionary of statistics where hit ratios are fractions of all accesses.
+        """
+        t1_read_hit_count, t1_write_hit_count, t2_read_hit_count, admit_count, reject_count, region_evict_count = self._count_arr.tolist()
+        device_write_byte = int(self._device_write_byte_arr.sum())
+        window_count = len(self._device_write_byte_arr)
+        window_sec = self.window_us/1e6
+        return {
+            "access_count": self.access_count,
+            "read_count": self.read_count,
+            "t1_hit_ratio": (t1_read_hit_count + t1_write_hit_count)/self.access_count if self.access_count else 0.0,
+            "t1_read_hit_ratio": t1_read_hit_count/self.read_count if self.read_count else 0.0,
+            "t2_hit_ratio": t2_read_hit_count/self.access_count if self.access_count else 0.0,
+            "t2_read_hit_ratio": t2_read_hit_count/self.read_count if self.read_count else 0.0,
+            "admit_count": admit_count,
+            "reject_count": reject_count,
+            "region_evict_count": region_evict_count,
+            "device_write_byte": device_write_byte,
+            "mean_device_write_rate_mb": device_write_byte/MB_BYTE/(window_count * window_sec) if window_count else 0.0,
+            "max_device_write_rate_mb": float(self._device_write_byte_arr.max())/MB_BYTE/window_sec if window_count else 0.0
+        }
+
+
+    def get_write_rate_df(self) -> pd.DataFrame:
+        """Get a DataFrame of the bytes written to the device and the write rate in each window of time.
+
+        Returns:
+            write_rate_df: DataFrame with a row per window.
+        """
+        window_sec = self.window_us/1e6
+        return pd.DataFrame({
+            "start_sec": np.arange(len(self._device_write_byte_arr)) * window_sec,
+            "device_write_byte": self._device_write_byte_arr,
+            "device_write_rate_mb": self._device_write_byte_arr/MB_BYTE/window_sec
+        })
+
+
+    def track_cache_trace(
+            self,
+            cache_trace_reader,
+            batch_size: int = 1000000
+    ) -> dict:
+        """Simulate every cache request of a cache trace.
+
+        Args:
+            cache_trace_reader: CacheTraceReader of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+
+        Returns:
+            stat_dict: Dictionary of hit ratios and NVM write statistics.
+        """
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            ts_arr = self.get_ts_arr(cache_req_arr, self._cur_ts)
+            if len(ts_arr):
+                self._cur_ts = int(ts_arr[-1])
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"], ts_arr)
+        return self.get_stat_dict()
+
+
+    def track_block_trace(
+            self,
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> dict:
+        """Simulate the cache requests generated by each block request of a block trace.
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+
+        Returns:
+            stat_dict: Dictionary of hit ratios and NVM write statistics.
+        """
+        prev_ts = None
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            cache_req_arr = Reader.get_cache_req_arr(batch_arr, prev_ts=prev_ts)
+            ts_arr = self.get_ts_arr(cache_req_arr, self._cur_ts)
+            if len(ts_arr):
+                self._cur_ts, prev_ts = int(ts_arr[-1]), int(batch_arr["ts"][-1])
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"], ts_arr)
+        return self.get_stat_dict()
+
+
+def get_navy_simulator(
+        cache_config: dict,
+        replay_rate: float = 1.0,
+        **kwargs
+) -> NavySimulator:
+    """Get a NavySimulator of the cache configuration of a ReplayConfig.
+
+    Args:
+        cache_config: Dictionary of cache configuration as ReplayConfig.cache_config.
+        replay_rate: Rate at which the trace is replayed. (Default: 1.0)
+        kwargs: Other arguments of NavySimulator.
+
+    Returns:
+        navy_simulator: NavySimulator of the cache configuration.
+    """
+    return NavySimulator(cache_config["cacheSizeMB"],
+                            cache_config.get("nvmCacheSizeMB", 0),
+                            region_size_mb=cache_config.get("navyRegionSizeMB", 16),
+                            clean_region_count=cache_config.get("navyCleanRegions", 1),
+                            admission_probability=cache_config.get("navyAdmissionProbability", 1.0),
+                            max_device_write_rate_mb=cache_config.get("navyMaxDeviceWriteRateMB", None),
+                            alloc_size_list=cache_config.get("allocSizes", DEFAULT_ALLOC_SIZE_LIST),
+                            replay_rate=replay_rate,
+                            **kwargs)
@@ -9,9 +9,9 @@ class ReplayConfig:
     def __init__(self, traces, backingFiles, t1_size_mb, **kwargs):
         # setup cache configuration 
         self.cache_config = {}
-        self.cache_config["lruUpdateOnWrite"] = True 
+        self.cache_config["lruUpdateOnWrite"] = kwargs.get("lruUpdateOnWrite", True)
         self.cache_config["cacheSizeMB"] = t1_size_mb
-        self.cache_config["allocSizes"] = [4136]
+        self.cache_config["allocSizes"] = kwargs.get("allocSizes", [4136])
 
         if "nvmCacheSizeMB" in kwargs:
             self.cache_config["nvmCacheSizeMB"] = kwargs["nvmCacheSizeMB"]
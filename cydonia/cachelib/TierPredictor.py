@@ -0,0 +1,282 @@
+"""TierPredictor estimates the hit ratio of each tier of a two-tier (DRAM + NVM) cache from a
+reuse distance histogram or a hit rate curve, so that a grid of replay configurations can be
+evaluated before anything is replayed.
+
+The size of a tier in MB is converted to the number of cache blocks it can store. A block is stored
+in DRAM in the smallest alloc size that fits the block and its item header. The NVM stores the item
+truncated to its original size as configured in ReplayConfig. The tiers are stacked as LRU caches:
+  - exclusive: T2 holds the blocks evicted from T1 so an access with reuse distance rd hits T1 if
+                rd < C1 and hits T2 if C1 <= rd < C1 + C2.
+  - inclusive: T2 holds every block in T1 so an access hits T2 if C1 <= rd < C2.
+If lruUpdateOnWrite is False, writes do not promote blocks so write hits are not counted.
+
+Usage:
+    tier_predictor = TierPredictor(rd_hist=rd_hist)
+    hit_ratio_arr = tier_predictor.predict_arr(t1_size_mb_arr, t2_size_mb_arr)
+    kept_config_list, pruned_config_list = tier_predictor.prune_config_list(config_list)
+"""
+
+import json
+import numpy as np
+
+from cydonia.profiler.RDHistogram import RDHistogram
+
+
+DEFAULT_ALLOC_SIZE_LIST = [4136]
+ITEM_OVERHEAD_BYTE = 40
+MB_BYTE = 1024**2
+
+# column of T1 and T2 hit ratios in the predicted array
+T1_COL = 0
+T2_COL = 1
+
+
+def get_item_count_arr(
+        size_mb_arr: np.ndarray,
+        item_size_byte: int
+) -> np.ndarray:
+    """Get the number of items of a given size that fit in caches of each size.
+
+    Args:
+        size_mb_arr: Array of cache sizes in MB.
+        item_size_byte: Size of an item in bytes, 0 if the item cannot be stored.
+
+    Returns:
+        item_count_arr: Array of number of items stored in each cache.
+    """
+    size_mb_arr = np.asarray(size_mb_arr, dtype=np.int64)
+    if item_size_byte <= 0:
+        return np.zeros(len(size_mb_arr), dtype=np.int64)
+    return (size_mb_arr * MB_BYTE) // item_size_byte
+
+
+def get_alloc_size(
+        alloc_size_list: list,
+        block_size_byte: int = 4096
+) -> int:
+    """Get the smallest alloc size that fits a cache block and its item header.
+
+    Args:
+        alloc_size_list: List of alloc sizes in bytes.
+        block_size_byte: Size of a cache block in bytes. (Default: 4096)
+
+    Returns:
+        alloc_size: Alloc size used to store a block in DRAM, 0 if no alloc size fits it.
+    """
+    fit_size_list = [alloc_size for alloc_size in alloc_size_list if alloc_size >= block_size_byte + ITEM_OVERHEAD_BYTE]
+    return min(fit_size_list) if fit_size_list else 0
+
+
+def get_fit_alloc_size(
+        alloc_size_list: list,
+        block_size_byte: int = 4096
+) -> int:
+    """Get the smallest alloc size that fits a cache block and its item header, which CacheLib needs to
+    store the block in DRAM.
+
+    Args:
+        alloc_size_list: List of alloc sizes in bytes.
+        block_size_byte: Size of a cache block in bytes. (Default: 4096)
+
+    Returns:
+        alloc_size: Alloc size used to store a block in DRAM.
+
+    Raises:
+        ValueError: If no alloc size fits a cache block and its item header.
+    """
+    alloc_size = get_alloc_size(alloc_size_list, block_size_byte)
+    if alloc_size == 0:
+        raise ValueError("No alloc size in {} fits a block of {} bytes and its item header of {} bytes.".format(
+                            alloc_size_list, block_size_byte, ITEM_OVERHEAD_BYTE))
+    return alloc_size
+
+
+class TierPredictor:
+    def __init__(
+            self,
+            rd_hist: RDHistogram = None,
+            hit_rate_arr: np.ndarray = None,
+            block_size_byte: int = 4096,
+            inclusive: bool = False
+    ) -> None:
+        """ This class predicts the hit ratio of the tiers of a two-tier cache from reuse distances.
+
+        Args:
+            rd_hist: RDHistogram of the cache trace. (Default: None)
+            hit_rate_arr: Array of hit rates (overall, read, write) at each reuse distance as returned by
+                            RDHistogram.get_hit_rate_arr, used if there is no RDHistogram. (Default: None)
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            inclusive: If True, T2 also holds the blocks in T1, else the tiers are exclusive. (Default: False)
+
+        Raises:
+            ValueError: If not exactly one of rd_hist and hit_rate_arr is specified.
+        """
+        if (rd_hist is None) == (hit_rate_arr is None):
+            raise ValueError("Exactly one of RD histogram and hit rate array should be specified.")
+        if rd_hist is not None:
+            hit_rate_arr = rd_hist.get_hit_rate_arr()
+        hit_rate_arr = np.asarray(hit_rate_arr, dtype=float).reshape(-1, 3)
+
+        self.block_size_byte = block_size_byte
+        self.inclusive = inclusive
+        # row s is the read and write hit rate of a cache of s blocks
+        self._cum_hit_rate_arr = np.concatenate((np.zeros((1, 2), dtype=float), hit_rate_arr[:, 1:]))
+
+
+    def _get_hit_rate_arr(
+            self,
+            size_arr: np.ndarray,
+            write_flag_arr: np.ndarray
+    ) -> np.ndarray:
+        """Get the hit rate of LRU caches of each size in blocks.
+
+        Args:
+            size_arr: Array of cache sizes in blocks.
+            write_flag_arr: Array of flags that are True if write hits are counted.
+
+        Returns:
+            hit_rate_arr: Array of hit rate of each cache.
+        """
+        row_arr = np.clip(size_arr, 0, len(self._cum_hit_rate_arr) - 1)
+        return self._cum_hit_rate_arr[row_arr, 0] + np.where(write_flag_arr, self._cum_hit_rate_arr[row_arr, 1], 0.0)
+
+
+    def get_hit_ratio_arr(
+            self,
+            t1_block_arr: np.ndarray,
+            t2_block_arr: np.ndarray,
+            lru_update_on_write_arr: np.ndarray = True
+    ) -> np.ndarray:
+        """Get the predicted T1 and T2 hit ratio of each pair of tier sizes in blocks.
+
+        Args:
+            t1_block_arr: Array of T1 sizes in blocks.
+            t2_block_arr: Array of T2 sizes in blocks.
+            lru_update_on_write_arr: Array of lruUpdateOnWrite of each pair or a single value. (Default: True)
+
+        Returns:
+            hit_ratio_arr: Array where row i is the T1 and T2 hit ratio of pair i.
+        """
+        t1_block_arr = np.asarray(t1_block_arr, dtype=np.int64)
+        t2_block_arr = np.asarray(t2_block_arr, dtype=np.int64)
+        assert t1_block_arr.shape == t2_block_arr.shape, \
+                "Shape of T1 sizes {} not equal to shape of T2 sizes {}.".format(t1_block_arr.shape, t2_block_arr.shape)
+        write_flag_arr = np.broadcast_to(np.asarray(lru_update_on_write_arr, dtype=bool), t1_block_arr.shape)
+
+        if self.inclusive:
+            total_block_arr = np.maximum(t1_block_arr, t2_block_arr)
+        else:
+            total_block_arr = t1_block_arr + t2_block_arr
+
+        hit_ratio_arr = np.zeros((len(t1_block_arr), 2), dtype=float)
+        hit_ratio_arr[:, T1_COL] = self._get_hit_rate_arr(t1_block_arr, write_flag_arr)
+        hit_ratio_arr[:, T2_COL] = self._get_hit_rate_arr(total_block_arr, write_flag_arr) - hit_ratio_arr[:, T1_COL]
+        return hit_ratio_arr
+
+
+    def predict_arr(
+            self,
+            t1_size_mb_arr: np.ndarray,
+            t2_size_mb_arr: np.ndarray,
+            alloc_size_list: list = DEFAULT_ALLOC_SIZE_LIST,
+            lru_update_on_write: bool = True
+    ) -> np.ndarray:
+        """Get the predicted T1 and T2 hit ratio of each pair of tier sizes in MB.
+
+        Args:
+            t1_size_mb_arr: Array of T1 (DRAM) sizes in MB.
+            t2_size_mb_arr: Array of T2 (NVM) sizes in MB.
+            alloc_size_list: List of DRAM alloc sizes in bytes. (Default: DEFAULT_ALLOC_SIZE_LIST)
+            lru_update_on_write: If False, writes do not promote blocks. (Default: True)
+
+        Returns:
+            hit_ratio_arr: Array where row i is the T1 and T2 hit ratio of pair i.
+
+        Raises:
+            ValueError: If no alloc size fits a cache block and its item header.
+        """
+        t1_block_arr = get_item_count_arr(t1_size_mb_arr, get_fit_alloc_size(alloc_size_list, self.block_size_byte))
+        t2_block_arr = get_item_count_arr(t2_size_mb_arr, self.block_size_byte + ITEM_OVERHEAD_BYTE)
+        return self.get_hit_ratio_arr(t1_block_arr, t2_block_arr, lru_update_on_write)
+
+
+    def predict(
+            self,
+            t1_size_mb: int,
+            t2_size_mb: int = 0,
+            alloc_size_list: list = DEFAULT_ALLOC_SIZE_LIST,
+            lru_update_on_write: bool = True
+    ) -> tuple:
+        """Get the predicted T1 and T2 hit ratio of a tier configuration.
+
+        Args:
+            t1_size_mb: Size of T1 (DRAM) in MB.
+            t2_size_mb: Size of T2 (NVM) in MB. (Default: 0)
+            alloc_size_list: List of DRAM alloc sizes in bytes. (Default: DEFAULT_ALLOC_SIZE_LIST)
+            lru_update_on_write: If False, writes do not promote blocks. (Default: True)
+
+        Returns:
+            t1_hit_ratio, t2_hit_ratio: Predicted hit ratio of T1 and T2.
+        """
+        hit_ratio_arr = self.predict_arr([t1_size_mb], [t2_size_mb], alloc_size_list, lru_update_on_write)
+        return float(hit_ratio_arr[0, T1_COL]), float(hit_ratio_arr[0, T2_COL])
+
+
+    def predict_config_list(self, config_list: list) -> np.ndarray:
+        """Get the predicted T1 and T2 hit ratio of each experiment configuration. The alloc sizes and
+        lruUpdateOnWrite are read from the kwargs of a configuration with the defaults of ReplayConfig.
+
+        Args:
+            config_list: List of experiment configurations with key "t1_size_mb" and "kwargs".
+
+        Returns:
+            hit_ratio_arr: Array where row i is the T1 and T2 hit ratio of configuration i.
+
+        Raises:
+            ValueError: If no alloc size of a configuration fits a cache block and its item header.
+        """
+        t1_block_arr = np.zeros(len(config_list), dtype=np.int64)
+        t2_block_arr = np.zeros(len(config_list), dtype=np.int64)
+        lru_update_on_write_arr = np.ones(len(config_list), dtype=bool)
+        for index, config in enumerate(config_list):
+            kwargs = config.get("kwargs", {})
+            alloc_size = get_fit_alloc_size(kwargs.get("allocSizes", DEFAULT_ALLOC_SIZE_LIST), self.block_size_byte)
+            t1_block_arr[index] = get_item_count_arr([config["t1_size_mb"]], alloc_size)[0]
+            t2_block_arr[index] = get_item_count_arr([kwargs.get("nvmCacheSizeMB", 0)], self.block_size_byte + ITEM_OVERHEAD_BYTE)[0]
+            lru_update_on_write_arr[index] = kwargs.get("lruUpdateOnWrite", True)
+        return self.get_hit_ratio_arr(t1_block_arr, t2_block_arr, lru_update_on_write_arr)
+
+
+    def prune_config_list(
+            self,
+            config_list: list,
+            min_hit_ratio_diff: float = 0.01
+    ) -> tuple:
+        """Prune experiment configurations whose predicted hit ratios are close to those of a configuration
+        kept before it. Configurations are only compared with those that differ in nothing but the tier sizes.
+
+        Args:
+            config_list: List of experiment configurations with key "t1_size_mb" and "kwargs".
+            min_hit_ratio_diff: A configuration is pruned if the difference in predicted T1 and T2 hit ratio
+                                    from a kept configuration are both below this value. (Default: 0.01)
+
+        Returns:
+            kept_config_list, pruned_config_list: List of configurations kept and pruned in order.
+        """
+        hit_ratio_arr = self.predict_config_list(config_list)
+        kept_config_list, pruned_config_list = [], []
+        kept_index_list_dict = {}
+        for index, config in enumerate(config_list):
+            group_config = {key: val for key, val in config.items() if key != "t1_size_mb"}
+            group_config["kwargs"] = {key: val for key, val in config.get("kwargs", {}).items() if key != "nvmCacheSizeMB"}
+            group_key = json.dumps(group_config, sort_keys=True)
+
+            kept_index_list = kept_index_list_dict.setdefault(group_key, [])
+            if kept_index_list:
+                diff_arr = np.abs(hit_ratio_arr[kept_index_list] - hit_ratio_arr[index])
+                if (diff_arr < min_hit_ratio_diff).all(axis=1).any():
+                    pruned_config_list.append(config)
+                    continue
+            kept_index_list.append(index)
+            kept_config_list.append(config)
+        return kept_config_list, pruned_config_list
@@ -0,0 +1,266 @@
+"""AETTracker approximates the reuse distance histogram of a trace from reuse times with the
+Average Eviction Time (AET) model (Hu et al., USENIX ATC 2016).
+
+The reuse time of an access is the number of accesses since the previous access to the same block.
+Reuse times need only the time of the last access of each block, which is kept in a sorted array of
+block addresses and an array of last access times, and an array lookup per access. There is no
+stack or tree so a batch of accesses is tracked with a few vectorized passes.
+
+Let P(x) be the fraction of accesses with a reuse time greater than x, where the first access to a
+block has an infinite reuse time. The expected number of distinct blocks accessed in a window of k
+accesses is fp(k) = P(0) + P(1) + ... + P(k-1). A cache of size c evicts a block AET(c) accesses after
+its last access where fp(AET(c)) = c, so an access with reuse time t hits if fp(t-1) < c. The reuse
+time t is therefore counted at reuse distance floor(fp(t-1)) in an RDHistogram.
+
+Reuse times can be as long as the trace so they are counted in logarithmic bins as in the AET paper.
+Reuse times below 2**(precision_bits+1) have a bin each and every later power of two is split into
+2**precision_bits bins of equal width, so the histogram has a few thousand bins for any trace and the
+relative width of a bin is at most 2**-precision_bits. Reuse times are assumed to be spread uniformly
+within a bin to compute fp at the bin boundaries and fp is interpolated between the boundaries.
+
+Usage:
+    aet_tracker = AETTracker()
+    aet_tracker.track_cache_trace(CacheTraceReader(cache_trace_path))
+    rd_hist = aet_tracker.get_rd_hist()
+"""
+
+import numpy as np
+
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.RDHistogram import RDHistogram, READ_COL, WRITE_COL
+
+
+DEFAULT_PRECISION_BITS = 7
+
+
+def get_rt_bin_start_arr(precision_bits: int) -> np.ndarray:
+    """Get the smallest reuse time of each logarithmic reuse time bin.
+
+    Args:
+        precision_bits: Each power of two from 2**(precision_bits+1) is split into 2**precision_bits bins.
+
+    Returns:
+        bin_start_arr: Sorted array of the smallest reuse time of each bin, starting at 0.
+    """
+    bin_start_arr_list = [np.arange(1 << (precision_bits+1), dtype=np.int64)]
+    for exponent in range(precision_bits+1, 63):
+        bin_start_arr_list.append((1 << exponent) + (np.arange(1 << precision_bits, dtype=np.int64) << (exponent - precision_bits)))
+    return np.concatenate(bin_start_arr_list)
+
+
+class AETTracker:
+    def __init__(
+            self,
+            infinite_rd_val: int = -1,
+            precision_bits: int = DEFAULT_PRECISION_BITS
+    ) -> None:
+        """ This class tracks the reuse time of cache block accesses to approximate their reuse distance.
+
+        Args:
+            infinite_rd_val: The value used to represent infinite reuse distance. (Default: -1)
+            precision_bits: Reuse times below 2**(precision_bits+1) are counted exactly and each later power
+                                of two is split into 2**precision_bits bins. (Default: 7)
+
+        Attributes:
+            access_count: Number of accesses tracked.
+        """
+        self.access_count = 0
+        self._infinite_rd_val = infinite_rd_val
+
+        # sorted array of the address of each block tracked and the time of its last access
+        self._addr_arr = np.zeros(0, dtype=np.int64)
+        self._last_time_arr = np.zeros(0, dtype=np.int64)
+
+        # count of reads and writes in each reuse time bin and with infinite reuse time
+        self._bin_start_arr = get_rt_bin_start_arr(precision_bits)
+        self._rt_count_arr = np.zeros((len(self._bin_start_arr), 2), dtype=np.int64)
+        self._infinite_count_arr = np.zeros(2, dtype=np.int64)
+        self._max_bin_index = 0
+
+
+    def __len__(self) -> int:
+        """Number of distinct blocks accessed."""
+        return len(self._addr_arr)
+
+
+    def get_rt_arr(self, addr_arr: np.ndarray) -> np.ndarray:
+        """Get the reuse time of each access in an array of block accesses and track the accesses.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+
+        Returns:
+            rt_arr: Array of reuse time of each access, 0 if it is the first access to the block.
+        """
+        addr_arr = np.asarray(addr_arr, dtype=np.int64)
+        time_arr = np.arange(self.access_count, self.access_count + len(addr_arr), dtype=np.int64)
+        self.access_count += len(addr_arr)
+        if not len(addr_arr):
+            return np.zeros(0, dtype=np.int64)
+
+        # accesses to the same block are adjacent and in order of time after a stable sort
+        order_arr = np.argsort(addr_arr, kind="stable")
+        sorted_addr_arr, sorted_time_arr = addr_arr[order_arr], time_arr[order_arr]
+        group_start_flag_arr = np.ones(len(addr_arr), dtype=bool)
+        group_start_flag_arr[1:] = sorted_addr_arr[1:] != sorted_addr_arr[:-1]
+        group_end_flag_arr = np.roll(group_start_flag_arr, -1)
+
+        sorted_rt_arr = np.zeros(len(addr_arr), dtype=np.int64)
+        sorted_rt_arr[1:] = sorted_time_arr[1:] - sorted_time_arr[:-1]
+
+        # the first access of each block in the batch is compared to its last access before the batch
+        group_addr_arr = sorted_addr_arr[group_start_flag_arr]
+        state_index_arr = np.searchsorted(self._addr_arr, group_addr_arr)
+        found_flag_arr = state_index_arr < len(self._addr_arr)
+        found_flag_arr[found_flag_arr] = self._addr_arr[state_index_arr[found_flag_arr]] == group_addr_arr[found_flag_arr]
+        group_rt_arr = np.zeros(len(group_addr_arr), dtype=np.int64)
+        group_rt_arr[found_flag_arr] = sorted_time_arr[group_start_flag_arr][found_flag_arr] - self._last_time_arr[state_index_arr[found_flag_arr]]
+        sorted_rt_arr[group_start_flag_arr] = group_rt_arr
+
+        group_last_time_arr = sorted_time_arr[group_end_flag_arr]
+        self._last_time_arr[state_index_arr[found_flag_arr]] = group_last_time_arr[found_flag_arr]
+        self._addr_arr = np.insert(self._addr_arr, state_index_arr[~found_flag_arr], group_addr_arr[~found_flag_arr])
+        self._last_time_arr = np.insert(self._last_time_arr, state_index_arr[~found_flag_arr], group_last_time_arr[~found_flag_arr])
+
+        rt_arr = np.empty(len(addr_arr), dtype=np.int64)
+        rt_arr[order_arr] = sorted_rt_arr
+        return rt_arr
+
+
+    def track_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray
+    ) -> np.ndarray:
+        """Track an array of block accesses and count their reuse times.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+
+        Returns:
+            rt_arr: Array of reuse time of each access, 0 if it is the first access to the block.
+        """
+        rt_arr = self.get_rt_arr(addr_arr)
+        op_arr = np.asarray(op_arr)
+        read_flag_arr, write_flag_arr = op_arr == 'r', op_arr == 'w'
+        if not (read_flag_arr | write_flag_arr).all():
+            raise ValueError("Unindentified value for operation: {}".format(op_arr[~(read_flag_arr | write_flag_arr)][0]))
+
+        bin_index_arr = np.searchsorted(self._bin_start_arr, rt_arr, side="right") - 1
+        for col, flag_arr in [(READ_COL, read_flag_arr), (WRITE_COL, write_flag_arr)]:
+            op_rt_arr, op_bin_index_arr = rt_arr[flag_arr], bin_index_arr[flag_arr]
+            self._infinite_count_arr[col] += int((op_rt_arr == 0).sum())
+            bin_count_arr = np.bincount(op_bin_index_arr[op_rt_arr > 0])
+            self._rt_count_arr[:len(bin_count_arr), col] += bin_count_arr
+        if len(rt_arr):
+            self._max_bin_index = max(self._max_bin_index, int(bin_index_arr.max()))
+        return rt_arr
+
+
+    def get_rt_bin_start_arr(self) -> np.ndarray:
+        """Get the smallest reuse time of each reuse time bin up to the last bin with a reuse.
+
+        Returns:
+            bin_start_arr: Array of the smallest reuse time of each bin.
+        """
+        return self._bin_start_arr[:self._max_bin_index+1].copy()
+
+
+    def get_rt_count_arr(self) -> np.ndarray:
+        """Get the array of read/write counts of each reuse time bin.
+
+        Returns:
+            rt_count_arr: Array of read/write count where index i represents the reuse times from
+                            bin_start_arr[i] to the start of the next bin.
+        """
+        return self._rt_count_arr[:self._max_bin_index+1].copy()
+
+
+    def get_fp_arr(self, window_arr: np.ndarray) -> np.ndarray:
+        """Get the expected number of distinct blocks accessed in windows of the given lengths.
+
+        Args:
+            window_arr: Array of window lengths in number of accesses.
+
+        Returns:
+            fp_arr: Array of the expected number of distinct blocks in each window.
+        """
+        window_arr = np.asarray(window_arr)
+        if self.access_count == 0:
+            return np.zeros(window_arr.shape, dtype=float)
+
+        # the sum of P(x) over the reuse times x of a bin with reuse times spread uniformly in the bin
+        boundary_arr = self._bin_start_arr[:self._max_bin_index+2]
+        width_arr = np.diff(boundary_arr)
+        count_arr = self._rt_count_arr[:len(width_arr)].sum(axis=1)
+        prev_count_arr = np.cumsum(count_arr) - count_arr
+        bin_fp_arr = (width_arr * (self.access_count - prev_count_arr) - count_arr * (width_arr + 1)/2)/self.access_count
+        boundary_fp_arr = np.concatenate(([0.0], np.cumsum(bin_fp_arr)))
+
+        # P(x) is 0 after the longest reuse time so fp stays the same
+        return np.interp(window_arr, boundary_arr, boundary_fp_arr)
+
+
+    def get_rd_hist(self) -> RDHistogram:
+        """Get the RDHistogram approximated from the reuse times with the AET model.
+
+        Returns:
+            rd_hist: Approximate RDHistogram.
+        """
+        rd_hist = RDHistogram(self._infinite_rd_val)
+        bin_start_arr = self._bin_start_arr[1:self._max_bin_index+2]
+        rt_count_arr = self._rt_count_arr[1:self._max_bin_index+1]
+        if not len(rt_count_arr):
+            rd_hist.update_count_arr(np.zeros((0, 2), dtype=int), self._infinite_count_arr)
+            return rd_hist
+
+        # an access with reuse time t has a reuse distance of floor(fp(t-1)) where t is the middle of its bin
+        mid_rt_arr = (bin_start_arr[:-1] + bin_start_arr[1:] - 1)/2
+        rd_arr = np.floor(self.get_fp_arr(mid_rt_arr - 1)).astype(int)
+        rd_count_arr = np.zeros((rd_arr[-1] + 1, 2), dtype=int)
+        np.add.at(rd_count_arr, rd_arr, rt_count_arr)
+        rd_hist.update_count_arr(rd_count_arr, self._infinite_count_arr)
+        return rd_hist
+
+
+    def track_cache_trace(
+            self,
+            cache_trace_reader,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track every cache request of a cache trace.
+
+        Args:
+            cache_trace_reader: CacheTraceReader of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: Approximate RDHistogram of the cache trace.
+        """
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.get_rd_hist()
+
+
+    def track_block_trace(
+            self,
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track the cache requests generated by each block request of a block trace.
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: Approximate RDHistogram of the block trace.
+        """
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            cache_req_arr = Reader.get_cache_req_arr(batch_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.get_rd_hist()
@@ -4,11 +4,16 @@ from pathlib import Path
 from time import perf_counter_ns
 from dataclasses import dataclass
 from json import loads, dumps
-from pandas import DataFrame, read_csv, concat, set_option
-from numpy import zeros, ndarray, mean, array, multiply
-from time import perf_counter_ns
+from heapq import heapify, heappop, heappush
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from pandas import DataFrame, read_csv, set_option
+from numpy import zeros, ndarray, mean, array, multiply, flatnonzero, errstate, divide, isnan, where, inf, argsort, \
+                    dtype, int64, float64, fromfile, savez, load, asarray, arange, unique, searchsorted, insert, \
+                    repeat, cumsum, diff, concatenate, add, ones
 
 from cydonia.profiler.CacheTrace import CacheTraceReader, ReaderConfig
+from cydonia.profiler.Reader import Reader
 from cydonia.profiler.WorkloadStats import WorkloadStats, BlockStats, MisalignStats, BlockRequest, NpEncoder
 
 
@@ -45,46 +50,188 @@ ACCESS_FILE_HEADER = ["r_misalign", "w_misalign",
                         "right_r_misalign_byte", "right_w_misalign_byte",
                         "mid_r", "mid_w", "mid_r_iat", "mid_w_iat"]
 
+# names of the workload features and error metrics in the order of the columns of an error matrix 
+WORKLOAD_FEATURE_LIST = list(WorkloadStats().get_workload_feature_dict().keys())
+ERROR_METRIC_LIST = ["mean", "max", "wmean"]
+
+
+# a record of the removal log with the address removed, the errors after removing it, the number of blocks 
+# and sampling rate of the sample after removing it and the time taken to remove it in nanoseconds 
+REMOVAL_RECORD_DTYPE = dtype([("addr", int64)] 
+                                + [(name, float64) for name in WORKLOAD_FEATURE_LIST + ERROR_METRIC_LIST] 
+                                + [("block_count", int64), ("rate", float64), ("runtime", int64)])
+
 
 class BAFMOutput:
     def __init__(self, path: Path):
-        self._path = path 
-        self._header = list(WorkloadStats().get_workload_feature_dict().keys()).extend(["mean", "max", "wmean"])
-        self._df = read_csv(self._path, names=self._header, float_precision='round_trip') if self._path.exists() else None 
+        """ This class is an append-only binary log of the blocks removed from a BAFM with a record of 
+        REMOVAL_RECORD_DTYPE per block. A partial record at the end of the log left by a process that 
+        stopped while writing it is removed. 
+
+        Args:
+            path: Path of the log. 
+        """
+        self._path = Path(path)
+        self._record_count = 0 
+        if self._path.exists():
+            self._record_count = self._path.stat().st_size//REMOVAL_RECORD_DTYPE.itemsize
+            if self._path.stat().st_size > self._record_count * REMOVAL_RECORD_DTYPE.itemsize:
+                with self._path.open("r+b") as handle:
+                    handle.truncate(self._record_count * REMOVAL_RECORD_DTYPE.itemsize)
     
 
     def add(self, err_dict: dict):
-        if self._df is None:
-            self._df = DataFrame([err_dict])
-        else:
-            assert err_dict["addr"] not in self._df, "Address {} already exists.".format(err_dict["addr"])
-            self._df = concat([self._df, DataFrame([err_dict])], ignore_index=True)
-        self._df.to_csv(self._path, index=False)
+        """ Append the record of a block removed to the log, a field missing from the dictionary is 0. 
 
+        Args:
+            err_dict: Dictionary of error values with the address removed. 
+        """
+        record_arr = zeros(1, dtype=REMOVAL_RECORD_DTYPE)
+        for field_name in REMOVAL_RECORD_DTYPE.names:
+            if field_name in err_dict:
+                record_arr[field_name] = err_dict[field_name]
+        with self._path.open("ab") as handle:
+            handle.write(record_arr.tobytes())
+        self._record_count += 1 
+
+
+    def get_record_arr(self, start_index: int = 0) -> ndarray:
+        """ Get the array of records in the log. 
+
+        Args:
+            start_index: Index of the first record to read. (Default: 0)
+        
+        Returns:
+            record_arr: Array of records of REMOVAL_RECORD_DTYPE. 
+        """
+        if not self._record_count:
+            return zeros(0, dtype=REMOVAL_RECORD_DTYPE)
+        return fromfile(self._path, dtype=REMOVAL_RECORD_DTYPE, count=self._record_count - start_index, 
+                            offset=start_index * REMOVAL_RECORD_DTYPE.itemsize)
 
-    def get_addr_removed(self):
-        return self._df["addr"].to_list()
 
+    def get_df(self) -> DataFrame:
+        """ Get the DataFrame of records in the log. """
+        return DataFrame(self.get_record_arr())
 
-    def get_last_err_dict(self):
-        return loads(self._df.iloc[-1].to_json())
+
+    def get_addr_removed(self, start_index: int = 0) -> list:
+        return self.get_record_arr(start_index)["addr"].tolist()
+
+
+    def get_last_err_dict(self) -> dict:
+        record_arr = self.get_record_arr(self._record_count - 1)
+        return {field_name: record_arr[field_name][0].item() for field_name in REMOVAL_RECORD_DTYPE.names}
     
 
     def num_blocks_removed(self) -> int:
-        return len(self._df)
+        return self._record_count
+
+
+# feature matrix and live mask in shared memory and the block size of the BAFM of the worker processes of a pool 
+_worker_state = None
+
+
+def init_worker(
+        feature_shm_name: str,
+        live_shm_name: str,
+        capacity: int,
+        block_size_byte: int
+) -> None:
+    """ Attach the feature matrix and live mask of a BAFM in shared memory in a worker process. 
+
+    Args:
+        feature_shm_name: Name of the shared memory of the feature matrix. 
+        live_shm_name: Name of the shared memory of the live mask. 
+        capacity: Number of rows of the feature matrix. 
+        block_size_byte: Size of a block in bytes. 
+    """
+    global _worker_state
+    feature_shm, live_shm = SharedMemory(name=feature_shm_name), SharedMemory(name=live_shm_name)
+    feature_mat = ndarray((capacity, MetadataIndex.LEN.value), dtype=int, buffer=feature_shm.buf)
+    live_arr = ndarray(capacity, dtype=bool, buffer=live_shm.buf)
+    _worker_state = (feature_shm, live_shm, feature_mat, live_arr, block_size_byte)
+
+
+def find_best_row(task: tuple) -> tuple:
+    """ Find the best row to remove in a range of rows of the feature matrix of the worker. 
+
+    Args:
+        task: Tuple of the start and end row, the array of workload features of the full workload, the 
+                workload stats of the sample and the name of the metric to optimize.
+    
+    Returns:
+        best_tuple: Tuple of the metric, row and list of error values of the best row, None if no row in the range is live. 
+    """
+    row_start, row_end, full_feature_arr, sample_workload_stat, metric_name = task
+    _, _, feature_mat, live_arr, block_size_byte = _worker_state
+    row_arr = flatnonzero(live_arr[row_start:row_end]) + row_start
+    if not len(row_arr):
+        return None 
+
+    removal_feature_mat = BAFM.get_removal_feature_mat(sample_workload_stat, feature_mat[row_arr], block_size_byte)
+    err_mat = BAFM.get_error_mat(full_feature_arr, removal_feature_mat)
+    best_index = BAFM.get_best_index(err_mat, metric_name)
+    metric = err_mat[best_index, len(WORKLOAD_FEATURE_LIST) + ERROR_METRIC_LIST.index(metric_name)]
+    return (inf if isnan(metric) else float(metric), int(row_arr[best_index]), err_mat[best_index].tolist())
+
+
+def get_row_metric_arr(task: tuple) -> ndarray:
+    """ Get the metric after removing each live row in a range of rows of the feature matrix of the worker. 
+
+    Args:
+        task: Tuple of the start and end row, the array of workload features of the full workload, the 
+                workload stats of the sample and the name of the metric.
+    
+    Returns:
+        metric_arr: Array of the metric after removing each live row in the range in order. 
+    """
+    row_start, row_end, full_feature_arr, sample_workload_stat, metric_name = task
+    _, _, feature_mat, live_arr, block_size_byte = _worker_state
+    row_arr = flatnonzero(live_arr[row_start:row_end]) + row_start
+    removal_feature_mat = BAFM.get_removal_feature_mat(sample_workload_stat, feature_mat[row_arr], block_size_byte)
+    err_mat = BAFM.get_error_mat(full_feature_arr, removal_feature_mat)
+    return err_mat[:, len(WORKLOAD_FEATURE_LIST) + ERROR_METRIC_LIST.index(metric_name)]
 
 
 class BAFM:
     def __init__(
             self, 
-            lower_addr_bits_ignored: int 
+            lower_addr_bits_ignored: int,
+            worker_count: int = 1
     ) -> None:
-        # the map with address as key and array of access features as values 
-        self._map = {}
+        """ This class maps each block address to an array of its access features. 
+
+        Args:
+            lower_addr_bits_ignored: Number of lower order address bits ignored to get a block address. 
+            worker_count: Number of worker processes that evaluate every block in the map when finding the
+                            blocks to remove, the blocks are evaluated in this process if 1. The workers are 
+                            stopped when target_sampling_rate and remove_n_blocks return. (Default: 1)
+        """
+        # the matrix with a row of access features of each block address ever added, the row of a 
+        # deleted address is not reused but marked dead in the live mask so rows stay in order of insertion
+        self._feature_mat = zeros((1024, MetadataIndex.LEN.value), dtype=int)
+        self._live_arr = zeros(1024, dtype=bool)
+        self._addr_arr = zeros(1024, dtype=int)
+        # the number of rows used in the matrix 
+        self._row_count = 0 
+        # the map with address as key and row of its access features as value 
+        self._row_dict = {}
         # the number of blocks in the map 
         self._block_count = 0 
         self._lower_addr_bits_ignored = lower_addr_bits_ignored
         self._workload_stat = None 
+        # the timestamp of the last block request tracked 
+        self._prev_ts = None 
+        # the block addresses in the map sorted with their rows to find the rows of arrays of addresses,
+        # it is built again when needed after an address is added or deleted outside of get_row_arr 
+        self._sorted_index = None 
+
+        assert worker_count > 0, "Worker count {} not greater than 0.".format(worker_count)
+        self.worker_count = worker_count
+        # the pool and the shared memory of the feature matrix and live mask when workers are running 
+        self._pool = None 
+        self._shm_list = []
 
 
     def delete(
@@ -99,70 +246,183 @@ class BAFM:
         Raises:
             ValueError: If the block address to be deleted is not in the map.
         """
-        if block_addr not in self._map:
-            raise ValueError("Block addr {} not in feature map of size {}.".format(block_addr, len(self._map.keys())))
+        if block_addr not in self._row_dict:
+            raise ValueError("Block addr {} not in feature map of size {}.".format(block_addr, self._block_count))
         
-        if block_addr - 1 in self._map:
+        if block_addr - 1 in self._row_dict:
+            feature_arr = self._feature_mat[self._row_dict[block_addr - 1]]
             # all the request where block "block_addr - 1" was mid can no longer exist since block_addr is no longer in the sample
             # so all request count and IAT sum of when "block_addr -1" was mid now is the rightmost 
             # for instance, Block 5,6,7,8,9,10 are sampled. We removed 8 now all requests where 6,7 and 8 were accessed together
             # where 7 used to be the middle block now have 7 as the right most block.
-            self._map[block_addr-1][MetadataIndex.RIGHT_I.value] += self._map[block_addr-1][MetadataIndex.MID_I.value]
-            self._map[block_addr-1][MetadataIndex.RIGHT_I.value + 2] += self._map[block_addr-1][MetadataIndex.MID_I.value + 2]
-
-            self._map[block_addr-1][MetadataIndex.RIGHT_I.value + 1] += self._map[block_addr-1][MetadataIndex.MID_I.value + 1]
-            self._map[block_addr-1][MetadataIndex.RIGHT_I.value + 3] += self._map[block_addr-1][MetadataIndex.MID_I.value + 3]
+            feature_arr[MetadataIndex.RIGHT_I.value:MetadataIndex.RIGHT_I.value + MetadataIndex.MID_LEN.value] += \
+                feature_arr[MetadataIndex.MID_I.value:MetadataIndex.MID_I.value + MetadataIndex.MID_LEN.value]
 
             # all the request where block "block_addr - 1" was left most can no longer exist since block_addr is no longer in the sample
             # so all request count and IAT sum of when "block_addr -1" was left most now is solo requests 
             # for instance, Block 5,6,7,8,9,10 are sampled. We removed 8 now all requests where 7,8 and 9 were accessed together
             # where 7 used to be the left most block now is a separate block request where 7 is a solo block accessed.
-            self._map[block_addr-1][MetadataIndex.SOLO_I.value] += self._map[block_addr-1][MetadataIndex.LEFT_I.value]
-            self._map[block_addr-1][MetadataIndex.SOLO_I.value + 2] += self._map[block_addr-1][MetadataIndex.LEFT_I.value + 2]
-            self._map[block_addr-1][MetadataIndex.SOLO_I.value + 4] += self._map[block_addr-1][MetadataIndex.LEFT_I.value + 4]
+            feature_arr[MetadataIndex.SOLO_I.value:MetadataIndex.SOLO_I.value + MetadataIndex.SOLO_LEN.value] += \
+                feature_arr[MetadataIndex.LEFT_I.value:MetadataIndex.LEFT_I.value + MetadataIndex.LEFT_LEN.value]
 
-            self._map[block_addr-1][MetadataIndex.SOLO_I.value + 1] += self._map[block_addr-1][MetadataIndex.LEFT_I.value + 1]
-            self._map[block_addr-1][MetadataIndex.SOLO_I.value + 3] += self._map[block_addr-1][MetadataIndex.LEFT_I.value + 3]
-            self._map[block_addr-1][MetadataIndex.SOLO_I.value + 5] += self._map[block_addr-1][MetadataIndex.LEFT_I.value + 5]
-
-            for i in range(MetadataIndex.LEFT_LEN.value):
-                self._map[block_addr-1][MetadataIndex.LEFT_I.value + i] = 0
-            
-            for i in range(MetadataIndex.MID_LEN.value):
-                self._map[block_addr-1][MetadataIndex.MID_I.value + i] = 0
+            feature_arr[MetadataIndex.LEFT_I.value:MetadataIndex.LEFT_I.value + MetadataIndex.LEFT_LEN.value] = 0
+            feature_arr[MetadataIndex.MID_I.value:MetadataIndex.MID_I.value + MetadataIndex.MID_LEN.value] = 0
 
-        if block_addr + 1 in self._map:
+        if block_addr + 1 in self._row_dict:
+            feature_arr = self._feature_mat[self._row_dict[block_addr + 1]]
             # all the request where block "block_addr + 1" was mid can no longer exist since block_addr is no longer in the sample
             # so all request count and IAT sum of when "block_addr + 1" was mid now is the leftmost 
             # for instance, Block 5,6,7,8,9,10 are sampled. We removed 8 now all requests where 8,9 and 10 were accessed together
             # where 9 used to be the middle block now have 9 is the left most block.
-            self._map[block_addr+1][MetadataIndex.LEFT_I.value] += self._map[block_addr+1][MetadataIndex.MID_I.value]
-            self._map[block_addr+1][MetadataIndex.LEFT_I.value + 2] += self._map[block_addr+1][MetadataIndex.MID_I.value + 2]
-
-            self._map[block_addr+1][MetadataIndex.LEFT_I.value + 1] += self._map[block_addr+1][MetadataIndex.MID_I.value + 1]
-            self._map[block_addr+1][MetadataIndex.LEFT_I.value + 3] += self._map[block_addr+1][MetadataIndex.MID_I.value + 3]
+            feature_arr[MetadataIndex.LEFT_I.value:MetadataIndex.LEFT_I.value + MetadataIndex.MID_LEN.value] += \
+                feature_arr[MetadataIndex.MID_I.value:MetadataIndex.MID_I.value + MetadataIndex.MID_LEN.value]
 
             # all the request where block "block_addr + 1" was right most can no longer exist since block_addr is no longer in the sample
             # so all request count and IAT sum of when "block_addr + 1" was right most now is solo requests 
             # for instance, Block 5,6,7,8,9,10 are sampled. We removed 8 now all requests where 7,8 and 9 were accessed together
             # where 9 used to be the right most block now is a separate block request where 9 is a solo block accessed.
-            self._map[block_addr+1][MetadataIndex.SOLO_I.value] += self._map[block_addr+1][MetadataIndex.RIGHT_I.value]
-            self._map[block_addr+1][MetadataIndex.SOLO_I.value + 2] += self._map[block_addr+1][MetadataIndex.RIGHT_I.value + 2]
-            self._map[block_addr+1][MetadataIndex.SOLO_I.value + 4] += self._map[block_addr+1][MetadataIndex.RIGHT_I.value + 4]
-
-            self._map[block_addr+1][MetadataIndex.SOLO_I.value + 1] += self._map[block_addr+1][MetadataIndex.RIGHT_I.value + 1]
-            self._map[block_addr+1][MetadataIndex.SOLO_I.value + 3] += self._map[block_addr+1][MetadataIndex.RIGHT_I.value + 3]
-            self._map[block_addr+1][MetadataIndex.SOLO_I.value + 5] += self._map[block_addr+1][MetadataIndex.RIGHT_I.value + 5]
+            feature_arr[MetadataIndex.SOLO_I.value:MetadataIndex.SOLO_I.value + MetadataIndex.SOLO_LEN.value] += \
+                feature_arr[MetadataIndex.RIGHT_I.value:MetadataIndex.RIGHT_I.value + MetadataIndex.RIGHT_LEN.value]
 
-            for i in range(MetadataIndex.RIGHT_LEN.value):
-                self._map[block_addr+1][MetadataIndex.RIGHT_I.value + i] = 0
-            
-            for i in range(MetadataIndex.MID_LEN.value):
-                self._map[block_addr+1][MetadataIndex.MID_I.value + i] = 0
+            feature_arr[MetadataIndex.RIGHT_I.value:MetadataIndex.RIGHT_I.value + MetadataIndex.RIGHT_LEN.value] = 0
+            feature_arr[MetadataIndex.MID_I.value:MetadataIndex.MID_I.value + MetadataIndex.MID_LEN.value] = 0
 
-        # delete the address 
-        del self._map[block_addr]
+        # delete the address by marking its row dead 
+        self._live_arr[self._row_dict.pop(block_addr)] = False
         self._block_count -= 1
+        self._sorted_index = None 
+
+
+    def reserve(self, row_count: int) -> None:
+        """ Double the capacity of the matrix until it has the given number of rows. Workers are stopped and 
+        started again with the new matrix when needed. 
+
+        Args:
+            row_count: Number of rows needed. 
+        """
+        capacity = len(self._feature_mat)
+        if row_count <= capacity:
+            return 
+
+        self.stop_workers()
+        while capacity < row_count:
+            capacity *= 2
+        feature_mat, live_arr, addr_arr = zeros((capacity, MetadataIndex.LEN.value), dtype=int), zeros(capacity, dtype=bool), zeros(capacity, dtype=int)
+        feature_mat[:self._row_count], live_arr[:self._row_count], addr_arr[:self._row_count] = \
+            self._feature_mat[:self._row_count], self._live_arr[:self._row_count], self._addr_arr[:self._row_count]
+        self._feature_mat, self._live_arr, self._addr_arr = feature_mat, live_arr, addr_arr
+
+
+    def add_row(self, block_addr: int) -> int:
+        """ Add a row of zero access features for a new block address to the matrix.
+
+        Args:
+            block_addr: The block address to be added.
+        
+        Returns:
+            row: The row of the block address in the matrix. 
+        """
+        self.reserve(self._row_count + 1)
+        row = self._row_count
+        self._row_count += 1
+        self._live_arr[row], self._addr_arr[row] = True, block_addr
+        self._row_dict[block_addr] = row
+        self._block_count += 1
+        self._sorted_index = None 
+        return row
+
+
+    def get_row_arr(self, block_addr_arr: ndarray) -> ndarray:
+        """ Get the row of each block address in an array and add rows for new addresses in the order they
+        first appear in the array. 
+
+        Args:
+            block_addr_arr: Array of block addresses. 
+        
+        Returns:
+            row_arr: Array of the row of each block address. 
+        """
+        if self._sorted_index is None:
+            live_row_arr = self.get_live_row_arr()
+            order_arr = argsort(self._addr_arr[live_row_arr], kind="stable")
+            self._sorted_index = (self._addr_arr[live_row_arr][order_arr], live_row_arr[order_arr])
+
+        unique_addr_arr, first_index_arr, inverse_arr = unique(block_addr_arr, return_index=True, return_inverse=True)
+        sorted_addr_arr, sorted_row_arr = self._sorted_index
+        pos_arr = searchsorted(sorted_addr_arr, unique_addr_arr)
+        found_flag_arr = pos_arr < len(sorted_addr_arr)
+        found_flag_arr[found_flag_arr] = sorted_addr_arr[pos_arr[found_flag_arr]] == unique_addr_arr[found_flag_arr]
+
+        unique_row_arr = zeros(len(unique_addr_arr), dtype=int)
+        unique_row_arr[found_flag_arr] = sorted_row_arr[pos_arr[found_flag_arr]]
+        new_index_arr = flatnonzero(~found_flag_arr)
+        if len(new_index_arr):
+            # new rows are added in the order the addresses first appear 
+            new_index_arr = new_index_arr[argsort(first_index_arr[new_index_arr], kind="stable")]
+            new_addr_arr, new_row_arr = unique_addr_arr[new_index_arr], arange(self._row_count, self._row_count + len(new_index_arr))
+            self.reserve(self._row_count + len(new_index_arr))
+            self._live_arr[new_row_arr], self._addr_arr[new_row_arr] = True, new_addr_arr
+            self._row_dict.update(zip(new_addr_arr.tolist(), new_row_arr.tolist()))
+            self._row_count += len(new_index_arr)
+            self._block_count += len(new_index_arr)
+            unique_row_arr[new_index_arr] = new_row_arr
+
+            # the new addresses are inserted in the sorted index with their rows 
+            order_arr = argsort(new_addr_arr, kind="stable")
+            insert_pos_arr = searchsorted(sorted_addr_arr, new_addr_arr[order_arr])
+            self._sorted_index = (insert(sorted_addr_arr, insert_pos_arr, new_addr_arr[order_arr]), 
+                                    insert(sorted_row_arr, insert_pos_arr, new_row_arr[order_arr]))
+        return unique_row_arr[inverse_arr.reshape(-1)]
+
+
+    def get_feature_arr(self, block_addr: int) -> ndarray:
+        """ Get the array of access features of a block address. 
+
+        Args:
+            block_addr: The block address. 
+        
+        Returns:
+            feature_arr: Array of access features of the block address which is a view of its row in the matrix. 
+        """
+        return self._feature_mat[self._row_dict[block_addr]]
+
+
+    def get_live_row_arr(self) -> ndarray:
+        """ Get the array of rows of the matrix of block addresses in the map in order of insertion. """
+        return flatnonzero(self._live_arr[:self._row_count])
+
+
+    def start_workers(self) -> None:
+        """ Move the feature matrix and live mask to shared memory and start the worker processes if they are not running. """
+        if self._pool is not None:
+            return 
+
+        feature_shm = SharedMemory(create=True, size=self._feature_mat.nbytes)
+        live_shm = SharedMemory(create=True, size=self._live_arr.nbytes)
+        feature_mat = ndarray(self._feature_mat.shape, dtype=int, buffer=feature_shm.buf)
+        live_arr = ndarray(self._live_arr.shape, dtype=bool, buffer=live_shm.buf)
+        feature_mat[:], live_arr[:] = self._feature_mat, self._live_arr
+        self._feature_mat, self._live_arr = feature_mat, live_arr
+        self._shm_list = [feature_shm, live_shm]
+
+        block_size_byte = self.get_block_size_from_lower_bits_ignored(self._lower_addr_bits_ignored, 4096)
+        self._pool = get_context().Pool(self.worker_count, initializer=init_worker, 
+                                        initargs=(feature_shm.name, live_shm.name, len(feature_mat), block_size_byte))
+
+
+    def stop_workers(self) -> None:
+        """ Stop the worker processes and move the feature matrix and live mask out of shared memory. """
+        if self._pool is None:
+            return 
+
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None 
+        self._feature_mat, self._live_arr = self._feature_mat.copy(), self._live_arr.copy()
+        for shm in self._shm_list:
+            shm.close()
+            shm.unlink()
+        self._shm_list = []
 
     
     def update(self, record: Record) -> None:
@@ -171,15 +431,15 @@ class BAFM:
         Args:
             record: Record object to be updated. 
         """
-        if record.addr not in self._map:
+        if record.addr not in self._row_dict:
             # new address found! 
-            self._map[record.addr] = zeros(MetadataIndex.LEN.value, dtype=int)
-            self._block_count += 1
+            self.add_row(record.addr)
         
+        feature_arr = self._feature_mat[self._row_dict[record.addr]]
         if record.write_flag:
-            self._map[record.addr][MetadataIndex.WMISALIGNMENT_I.value] += record.misalign_count
-            self._map[record.addr][record.index+1] += 1 
-            self._map[record.addr][record.index+3] += record.iat
+            feature_arr[MetadataIndex.WMISALIGNMENT_I.value] += record.misalign_count
+            feature_arr[record.index+1] += 1 
+            feature_arr[record.index+3] += record.iat
 
             """ The middle block of a multi-block request is accessed in its entirety and cannot
             have any misalignment. For rest of the request, index+4 and index+5 hold the misalignment
@@ -189,18 +449,18 @@ class BAFM:
             sure that the index was MetadataIndex.MID_I. I think this reduces the number of comparison
             and work to be done. """
             try:
-                self._map[record.addr][record.index+5] += record.misalign_byte
+                feature_arr[record.index+5] += record.misalign_byte
             except IndexError:
                 assert record.index == MetadataIndex.MID_I.value
 
         else:
-            self._map[record.addr][MetadataIndex.RMISALIGNMENT_I.value] += record.misalign_count
-            self._map[record.addr][record.index] += 1 
-            self._map[record.addr][record.index+2] += record.iat
+            feature_arr[MetadataIndex.RMISALIGNMENT_I.value] += record.misalign_count
+            feature_arr[record.index] += 1 
+            feature_arr[record.index+2] += record.iat
 
             # Same comment as in the "if" block above.
             try:
-                self._map[record.addr][record.index+4] += record.misalign_byte
+                feature_arr[record.index+4] += record.misalign_byte
             except IndexError:
                 assert record.index == MetadataIndex.MID_I.value
 
@@ -213,77 +473,249 @@ class BAFM:
             ignore_addr_set: Set of addresses to remove from the AccessFeatureMap.
         """
         df = read_csv(access_file_path)
-        for _, row in df.iterrows():
-            self._map[row["addr"]] = zeros(MetadataIndex.LEN.value, dtype=int)
-            for index, header in enumerate(ACCESS_FILE_HEADER):
-                self._map[row["addr"]][index] = row[header]
-        self._block_count = len(df)
+        for block_addr, feature_arr in zip(df["addr"].tolist(), df[ACCESS_FILE_HEADER].to_numpy(dtype=int)):
+            if block_addr not in self._row_dict:
+                self.add_row(block_addr)
+            self._feature_mat[self._row_dict[block_addr]] = feature_arr
 
     
     def update_state(
             self, 
             output_file_path: Path, 
-            sample_workload_stats: WorkloadStats
+            sample_workload_stats: WorkloadStats,
+            checkpoint_path: Path = None,
+            sample_block_addr_set: set = None
     ) -> WorkloadStats:
-        """ Update the algorithm to some state. 
+        """ Update the algorithm to some state. The state is loaded from the checkpoint if it exists and only the 
+        blocks removed after the checkpoint are removed again, else this BAFM has to be in the state before any 
+        block was removed and every block in the output file is removed again. 
         
         Args:
             output_file_path: Path to output file to load the state from.  
             sample_workload_stats: Workload stats at the begining of computation. 
+            checkpoint_path: Path of the checkpoint written by write_checkpoint. (Default: None)
+            sample_block_addr_set: Set of unscaled block addresses in the sample at the begining of computation, 
+                                    updated in place with the addresses that remain. (Default: None)
         
         Return:
             workload_stats: WorkloadStats 
         """
         bafm_output_file = BAFMOutput(output_file_path)
-        ignore_addr_list = bafm_output_file.get_addr_removed()
-        cur_workload_stats = deepcopy(sample_workload_stats)
+        cur_workload_stats, removal_count = deepcopy(sample_workload_stats), 0 
+        if checkpoint_path is not None and Path(checkpoint_path).exists():
+            cur_workload_stats, checkpoint_block_addr_set, removal_count = self.load_checkpoint(checkpoint_path)
+            if sample_block_addr_set is not None:
+                sample_block_addr_set.clear()
+                sample_block_addr_set.update(checkpoint_block_addr_set)
+            assert removal_count <= bafm_output_file.num_blocks_removed(), \
+                "Checkpoint after {} blocks removed but output file has {}.".format(removal_count, bafm_output_file.num_blocks_removed())
+        ignore_addr_list = bafm_output_file.get_addr_removed(removal_count)
 
         # remove the blocks that should be ignored 
         for ignore_addr in ignore_addr_list:
-            cur_workload_stats = self.get_new_workload_stat(cur_workload_stats, self._map[ignore_addr])
+            cur_workload_stats = self.get_new_workload_stat(cur_workload_stats, self.get_feature_arr(ignore_addr))
             self.delete(ignore_addr)
+            if sample_block_addr_set is not None:
+                sample_block_addr_set.difference_update(CacheTraceReader.get_blk_addr_arr(ignore_addr, self._lower_addr_bits_ignored).tolist())
         
-        cur_err_dict = self.get_error_dict(sample_workload_stats.get_workload_feature_dict(), 
-                                            cur_workload_stats.get_workload_feature_dict())
-        last_err_dict = bafm_output_file.get_last_err_dict()
-
-        #assert cur_err_dict == last_err_dict, "The dicts are not the same."
-        for feature_name in cur_err_dict.keys():
-            cur_val = cur_err_dict[feature_name]
-            last_val = last_err_dict[feature_name]
-            assert abs(cur_val - last_val) < 1e6, "Feature {} did not match {} vs {}.".format(feature_name, cur_val, last_val)
+        if bafm_output_file.num_blocks_removed():
+            cur_err_dict = self.get_error_dict(sample_workload_stats.get_workload_feature_dict(), 
+                                                cur_workload_stats.get_workload_feature_dict())
+            last_err_dict = bafm_output_file.get_last_err_dict()
+
+            #assert cur_err_dict == last_err_dict, "The dicts are not the same."
+            for feature_name in cur_err_dict.keys():
+                cur_val = cur_err_dict[feature_name]
+                last_val = last_err_dict[feature_name]
+                assert abs(cur_val - last_val) < 1e6, "Feature {} did not match {} vs {}.".format(feature_name, cur_val, last_val)
         
         return cur_workload_stats
 
 
+    def write_checkpoint(
+            self, 
+            checkpoint_path: Path, 
+            workload_stat: WorkloadStats, 
+            sample_block_addr_set: set,
+            removal_count: int
+    ) -> None:
+        """ Write the state of block removal to a checkpoint. The checkpoint is written to a temporary 
+        file that replaces the checkpoint so a process that stops while writing it leaves the last one. 
+
+        Args:
+            checkpoint_path: Path of the checkpoint. 
+            workload_stat: Workload stats of the sample after removing blocks. 
+            sample_block_addr_set: Set of unscaled block addresses in the sample after removing blocks. 
+            removal_count: Number of blocks removed which is the number of records in the output file. 
+        """
+        checkpoint_path = Path(checkpoint_path)
+        temp_checkpoint_path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+        with temp_checkpoint_path.open("wb") as handle:
+            savez(handle, 
+                    feature_mat=self._feature_mat[:self._row_count], 
+                    live_arr=self._live_arr[:self._row_count], 
+                    addr_arr=self._addr_arr[:self._row_count],
+                    lower_addr_bits_ignored=self._lower_addr_bits_ignored, 
+                    workload_stat=dumps(workload_stat.get_dict(), cls=NpEncoder),
+                    sample_block_addr_arr=array(sorted(sample_block_addr_set), dtype=int64),
+                    removal_count=removal_count)
+        temp_checkpoint_path.replace(checkpoint_path)
+
+
+    def load_checkpoint(self, checkpoint_path: Path) -> tuple:
+        """ Load the state of block removal from a checkpoint to this BAFM. 
+
+        Args:
+            checkpoint_path: Path of the checkpoint written by write_checkpoint. 
+        
+        Returns:
+            workload_stat, sample_block_addr_set, removal_count: Workload stats of the sample, set of unscaled block addresses
+                                                                    in the sample and number of blocks removed at the checkpoint. 
+        """
+        with load(checkpoint_path) as checkpoint:
+            assert int(checkpoint["lower_addr_bits_ignored"]) == self._lower_addr_bits_ignored, \
+                "Checkpoint has {} lower address bits ignored not {}.".format(int(checkpoint["lower_addr_bits_ignored"]), self._lower_addr_bits_ignored)
+            self.stop_workers()
+            self._row_count = len(checkpoint["addr_arr"])
+            capacity = max(self._row_count, 1024)
+            self._feature_mat = zeros((capacity, MetadataIndex.LEN.value), dtype=int)
+            self._live_arr, self._addr_arr = zeros(capacity, dtype=bool), zeros(capacity, dtype=int)
+            self._feature_mat[:self._row_count] = checkpoint["feature_mat"]
+            self._live_arr[:self._row_count] = checkpoint["live_arr"]
+            self._addr_arr[:self._row_count] = checkpoint["addr_arr"]
+
+            workload_stat = WorkloadStats()
+            workload_stat.load_dict(loads(str(checkpoint["workload_stat"])))
+            sample_block_addr_set = set(checkpoint["sample_block_addr_arr"].tolist())
+            removal_count = int(checkpoint["removal_count"])
+
+        row_arr = self.get_live_row_arr()
+        self._row_dict = dict(zip(self._addr_arr[row_arr].tolist(), row_arr.tolist()))
+        self._block_count = len(row_arr)
+        self._sorted_index = None 
+        return workload_stat, sample_block_addr_set, removal_count
+
+
+    def track_arrays(
+            self, 
+            ts_arr: ndarray, 
+            lba_arr: ndarray, 
+            write_flag_arr: ndarray, 
+            size_arr: ndarray,
+            lba_size_byte: int = 512,
+            cache_block_size_byte: int = 4096
+    ) -> None:
+        """ Track a batch of block requests in the order they arrive. This is equivalent to calling update 
+        with each record from get_request_arr of each block request. 
+
+        Args:
+            ts_arr: Array of timestamps. 
+            lba_arr: Array of logical block addresses. 
+            write_flag_arr: Boolean array that is True for write requests.
+            size_arr: Array of request sizes in bytes. 
+            lba_size_byte: Size of a logical block address in bytes. (Default: 512)
+            cache_block_size_byte: Size of a cache block in bytes. (Default: 4096)
+        """
+        if not len(ts_arr):
+            return 
+
+        ts_arr, lba_arr, size_arr = asarray(ts_arr, dtype=int), asarray(lba_arr, dtype=int), asarray(size_arr, dtype=int)
+        write_flag_arr = asarray(write_flag_arr, dtype=bool)
+        if self._prev_ts is None:
+            # first request, make sure IAT is 0 
+            self._prev_ts = int(ts_arr[0])
+        iat_arr = diff(ts_arr, prepend=self._prev_ts)
+        assert (iat_arr >= 0).all(), "Timestamps of block requests are not in order."
+        self._prev_ts = int(ts_arr[-1])
+
+        allocation_size_byte = self.get_block_size_from_lower_bits_ignored(self._lower_addr_bits_ignored, cache_block_size_byte)
+        start_offset_arr = lba_arr * lba_size_byte
+        end_offset_arr = start_offset_arr + size_arr
+        front_misalign_byte_arr = start_offset_arr % allocation_size_byte
+        rear_misalign_byte_arr = allocation_size_byte - (end_offset_arr % allocation_size_byte)
+        front_misalign_count_arr = (front_misalign_byte_arr % cache_block_size_byte > 0).astype(int)
+        rear_misalign_count_arr = (rear_misalign_byte_arr % cache_block_size_byte > 0).astype(int)
+        start_addr_arr = start_offset_arr//allocation_size_byte
+        region_count_arr = (end_offset_arr - 1)//allocation_size_byte - start_addr_arr + 1
+
+        # a record for each region accessed by each block request in order 
+        req_index_arr = repeat(arange(len(ts_arr)), region_count_arr)
+        offset_arr = arange(len(req_index_arr)) - repeat(cumsum(region_count_arr) - region_count_arr, region_count_arr)
+        row_arr = self.get_row_arr(start_addr_arr[req_index_arr] + offset_arr)
+        solo_flag_arr = region_count_arr[req_index_arr] == 1
+        left_flag_arr = ~solo_flag_arr & (offset_arr == 0)
+        right_flag_arr = ~solo_flag_arr & (offset_arr == region_count_arr[req_index_arr] - 1)
+        mid_flag_arr = ~(solo_flag_arr | left_flag_arr | right_flag_arr)
+
+        # the index of the read features of the record, the index of write features is one more 
+        index_arr = where(solo_flag_arr, MetadataIndex.SOLO_I.value, 
+                            where(left_flag_arr, MetadataIndex.LEFT_I.value, 
+                                    where(right_flag_arr, MetadataIndex.RIGHT_I.value, MetadataIndex.MID_I.value)))
+        index_arr += write_flag_arr[req_index_arr]
+        misalign_count_arr = where(solo_flag_arr | left_flag_arr, front_misalign_count_arr[req_index_arr], 0) \
+                                + where(solo_flag_arr | right_flag_arr, rear_misalign_count_arr[req_index_arr], 0)
+        misalign_byte_arr = where(solo_flag_arr | left_flag_arr, front_misalign_byte_arr[req_index_arr], 0) \
+                                + where(solo_flag_arr | right_flag_arr, rear_misalign_byte_arr[req_index_arr], 0)
+
+        # the middle block of a multi-block request is accessed in its entirety and has no misalignment bytes 
+        byte_flag_arr = ~mid_flag_arr
+        flat_index_arr = row_arr * MetadataIndex.LEN.value
+        add.at(self._feature_mat.reshape(-1), 
+                concatenate((flat_index_arr + write_flag_arr[req_index_arr], 
+                                flat_index_arr + index_arr, 
+                                flat_index_arr + index_arr + 2, 
+                                flat_index_arr[byte_flag_arr] + index_arr[byte_flag_arr] + 4)),
+                concatenate((misalign_count_arr, ones(len(row_arr), dtype=int), iat_arr[req_index_arr], misalign_byte_arr[byte_flag_arr])))
+
+
     def load_cache_trace(
             self, 
-            sample_cache_trace_path: Path
+            sample_cache_trace_path: Path,
+            batch_size: int = 1000000
     ) -> None:
         """ Load cache trace. 
 
         Args:
             sample_cache_trace_path: The Path of cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
         """
         cur_ts = -1 
         start_time = perf_counter_ns()
         reader = CacheTraceReader(sample_cache_trace_path)
-        cache_req_df = reader.get_next_cache_req_group_df()
-        allocation_size_byte = self.get_block_size_from_lower_bits_ignored(self._lower_addr_bits_ignored, reader._config.cache_block_size_byte)
-        while len(cache_req_df):
-            blk_req_arr = reader.get_block_req_arr(cache_req_df, cur_ts, reader._config)
-            if cur_ts == -1:
-                # first request, make sure IAT is 0 
-                cur_ts = blk_req_arr[0].ts
-            
-            for blk_req in blk_req_arr:
-                record_arr = self.get_request_arr(cur_ts, blk_req, allocation_size_byte, reader._config)
-                for record in record_arr:
-                    self.update(record)
-                cur_ts = blk_req.ts
-            cache_req_df = reader.get_next_cache_req_group_df()
+        self._prev_ts = None 
+        for cache_extent_arr in reader.read_group_batches(batch_size):
+            block_req_batch = reader.get_block_req_batch(cache_extent_arr, cur_ts, reader._config)
+            if not len(block_req_batch):
+                continue 
+
+            self.track_arrays(block_req_batch["ts"], 
+                                block_req_batch["lba"], 
+                                block_req_batch["op"] == reader._config.write_str, 
+                                block_req_batch["size"], 
+                                reader._config.lba_size_byte, 
+                                reader._config.cache_block_size_byte)
+            cur_ts = int(block_req_batch["ts"][-1])
         reader.close()
         print("Cache trace {} loaded in {} minutes.".format(sample_cache_trace_path, (perf_counter_ns()-start_time)/(1e9*60)))
+    
+
+    def load_block_trace(
+            self, 
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> None:
+        """ Load the block requests of a block trace. 
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+        """
+        self._prev_ts = None 
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            self.track_arrays(batch_arr["ts"], batch_arr["lba"], batch_arr["op"] == 'w', batch_arr["size"], 
+                                reader._lba_size_byte, block_size_byte)
 
 
     def write_map_to_file(
@@ -295,7 +727,8 @@ class BAFM:
         Args:
             output_file_path: The output path of feature map. 
         """
-        df = DataFrame.from_dict(self._map, orient='index', columns=ACCESS_FILE_HEADER)
+        row_arr = self.get_live_row_arr()
+        df = DataFrame(self._feature_mat[row_arr], index=self._addr_arr[row_arr], columns=ACCESS_FILE_HEADER)
         df.index.name = 'addr'
         df.to_csv(output_file_path)
 
@@ -309,65 +742,98 @@ class BAFM:
             sample_block_addr_set: set, 
             target_sampling_rate: float, 
             output_file_path: Path,
-            print_interval_sec: int = 60
+            print_interval_sec: int = 60,
+            lazy: bool = False,
+            batch_size: int = 1,
+            checkpoint_path: Path = None,
+            checkpoint_interval_sec: int = 600
     ) -> WorkloadStats:
-        """ Remove blocks until we hit a target sampling rate.
+        """ Remove blocks until we hit a target sampling rate. If the output file has blocks removed, the state is
+        first updated with update_state to resume from the checkpoint or from this BAFM before any block was removed.
 
         Args:
             full_workload_stat: Workload stats of the full workload.
             sample_workload_stat: Workload stats of the sample workload.
             metric_name: The metric to use when selecting blocks.
             full_workload_block_count: The number of unique blocks in full trace.
+            sample_block_addr_set: Set of unscaled block addresses in the sample. 
             target_sampling_rate: The target sampling rate.
             output_file_path: Path of the output file.
             print_interval_sec: The interval at which latest error dictionary is printed.
+            lazy: If True, select blocks with find_lazy_best_block_to_remove. (Default: False)
+            batch_size: Number of non-adjacent blocks removed after each evaluation of every block. (Default: 1)
+            checkpoint_path: Path of the checkpoint written at regular intervals and when done, none is written if None. (Default: None)
+            checkpoint_interval_sec: The interval at which a checkpoint is written. (Default: 600)
         
         Returns:
             new_workload_stat: New workload stat after removing blocks.
         """
-        print_interval_tracker = 0 
+        print_interval_tracker, checkpoint_interval_tracker = 0, 0 
         bafm_output = BAFMOutput(output_file_path)
-        new_workload_stat = deepcopy(sample_workload_stat)
+        if bafm_output.num_blocks_removed() or (checkpoint_path is not None and Path(checkpoint_path).exists()):
+            new_workload_stat = self.update_state(output_file_path, sample_workload_stat, checkpoint_path, sample_block_addr_set)
+            print("Resumed after {} blocks removed.".format(bafm_output.num_blocks_removed()))
+        else:
+            new_workload_stat = deepcopy(sample_workload_stat)
+        lazy_heap = [] if lazy else None 
         cur_sampling_rate = len(sample_block_addr_set)/full_workload_block_count
         print("Starting sampling rate is {} and target sampling rate is {}.".format(cur_sampling_rate, target_sampling_rate))
-        while cur_sampling_rate > target_sampling_rate:
-            start_time_ns = perf_counter_ns()
+        try:
+            while cur_sampling_rate > target_sampling_rate:
+                start_time_ns = perf_counter_ns()
 
-            best_dict = self.find_best_block_to_remove(full_workload_stat, new_workload_stat, metric_name)
-            if not best_dict:
-                print("Ran out of blocks to remove.")
-                break 
+                addr_list = self.get_addr_list_to_remove(full_workload_stat, new_workload_stat, metric_name, batch_size, lazy_heap)
+                if not addr_list:
+                    print("Ran out of blocks to remove.")
+                    break 
 
-            feature_arr = self._map[best_dict["addr"]]
-            new_workload_stat = self.get_new_workload_stat(new_workload_stat, feature_arr)
-            err_dict = self.get_error_dict(full_workload_stat.get_workload_feature_dict(),
-                                            new_workload_stat.get_workload_feature_dict())
-            
-            err_dict["addr"] = best_dict["addr"]
-
-            # remove the sclaed address from this BAFM
-            self.delete(best_dict["addr"])
-
-            # remove unscaled block addresses from sample block address set 
-            num_blocks_removed = 0 
-            unscaled_addr_list = CacheTraceReader.get_blk_addr_arr(best_dict["addr"], self._lower_addr_bits_ignored)
-            for cur_addr in unscaled_addr_list:
-                if cur_addr in sample_block_addr_set:
-                    sample_block_addr_set.remove(cur_addr)
-                    num_blocks_removed += 1 
-            assert num_blocks_removed > 0, "There has to be at least 1 block removed."
+                for addr in addr_list:
+                    if cur_sampling_rate <= target_sampling_rate:
+                        break 
+
+                    feature_arr = self.get_feature_arr(addr)
+                    new_workload_stat = self.get_new_workload_stat(new_workload_stat, feature_arr)
+                    err_dict = self.get_error_dict(full_workload_stat.get_workload_feature_dict(),
+                                                    new_workload_stat.get_workload_feature_dict())
                 
-            cur_sampling_rate = len(sample_block_addr_set)/full_workload_block_count
-            err_dict["block_count"] = len(sample_block_addr_set)
-            err_dict["rate"] = cur_sampling_rate
-            err_dict["runtime"] = perf_counter_ns() - start_time_ns
-            bafm_output.add(err_dict)
-
-            # print latest error dictionary at regular intervals 
-            print_interval_tracker += err_dict["runtime"]
-            if (print_interval_tracker/1e9) > print_interval_sec:
-                print(err_dict)
-                print_interval_tracker = 0 
+                    err_dict["addr"] = addr
+
+                    # remove the sclaed address from this BAFM
+                    self.delete(addr)
+
+                    # remove unscaled block addresses from sample block address set 
+                    num_blocks_removed = 0 
+                    unscaled_addr_list = CacheTraceReader.get_blk_addr_arr(addr, self._lower_addr_bits_ignored)
+                    for cur_addr in unscaled_addr_list:
+                        if cur_addr in sample_block_addr_set:
+                            sample_block_addr_set.remove(cur_addr)
+                            num_blocks_removed += 1 
+                    assert num_blocks_removed > 0, "There has to be at least 1 block removed."
+                    
+                    cur_sampling_rate = len(sample_block_addr_set)/full_workload_block_count
+                    err_dict["block_count"] = len(sample_block_addr_set)
+                    err_dict["rate"] = cur_sampling_rate
+                    err_dict["runtime"] = perf_counter_ns() - start_time_ns
+                    bafm_output.add(err_dict)
+                    start_time_ns = perf_counter_ns()
+
+                    # print latest error dictionary at regular intervals 
+                    print_interval_tracker += err_dict["runtime"]
+                    if (print_interval_tracker/1e9) > print_interval_sec:
+                        print(err_dict)
+                        print_interval_tracker = 0 
+                
+                    # write checkpoint at regular intervals 
+                    checkpoint_interval_tracker += err_dict["runtime"]
+                    if checkpoint_path is not None and (checkpoint_interval_tracker/1e9) > checkpoint_interval_sec:
+                        self.write_checkpoint(checkpoint_path, new_workload_stat, sample_block_addr_set, bafm_output.num_blocks_removed())
+                        checkpoint_interval_tracker = 0
+        finally:
+            self.stop_workers()
+        
+        if checkpoint_path is not None:
+            self.write_checkpoint(checkpoint_path, new_workload_stat, sample_block_addr_set, bafm_output.num_blocks_removed())
+        return new_workload_stat
             
 
     def remove_n_blocks(
@@ -376,36 +842,84 @@ class BAFM:
             sample_workload_stat: WorkloadStats,
             metric_name: str,
             num_iter: int,
-            output_file_path: Path 
+            output_file_path: Path,
+            lazy: bool = False,
+            batch_size: int = 1
     ) -> WorkloadStats:
         """ Remove "N" blocks from the workload.
 
         Args:
-            workload_stat: Workload stats when starting to remove blocks.
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats when starting to remove blocks.
             metric_name: The metric to use when selecting blocks.
             num_iter: Number of blocks to remove. 
             output_file_path: Path of the output file.
+            lazy: If True, select blocks with find_lazy_best_block_to_remove. (Default: False)
+            batch_size: Number of non-adjacent blocks removed after each evaluation of every block. (Default: 1)
         
         Returns:
             new_workload_stat: New workload stat after removing blocks.
         """
         bafm_output = BAFMOutput(output_file_path)
         new_workload_stat = deepcopy(sample_workload_stat)
+        lazy_heap = [] if lazy else None 
+
+        num_removed = 0 
+        try:
+            while num_removed < num_iter:
+                addr_list = self.get_addr_list_to_remove(full_workload_stat, new_workload_stat, metric_name, 
+                                                            min(batch_size, num_iter - num_removed), lazy_heap)
+                if not addr_list:
+                    break 
 
-        for _ in range(num_iter):
-            best_dict = self.find_best_block_to_remove(full_workload_stat, new_workload_stat, metric_name)
-            if not best_dict:
-                break 
-
-            feature_arr = self._map[best_dict["addr"]]
-            new_workload_stat = self.get_new_workload_stat(new_workload_stat, feature_arr)
-            err_dict = self.get_error_dict(full_workload_stat.get_workload_feature_dict(),
-                                            new_workload_stat.get_workload_feature_dict())
-            err_dict["addr"] = best_dict["addr"]
-            
-            bafm_output.add(err_dict)
-            self.delete(best_dict["addr"])
+                for addr in addr_list:
+                    feature_arr = self.get_feature_arr(addr)
+                    new_workload_stat = self.get_new_workload_stat(new_workload_stat, feature_arr)
+                    err_dict = self.get_error_dict(full_workload_stat.get_workload_feature_dict(),
+                                                    new_workload_stat.get_workload_feature_dict())
+                    err_dict["addr"] = addr
+                
+                    bafm_output.add(err_dict)
+                    self.delete(addr)
+                    num_removed += 1
+        finally:
+            self.stop_workers()
         return new_workload_stat
+
+
+    def get_addr_list_to_remove(
+            self,
+            full_workload_stat: WorkloadStats,
+            sample_workload_stat: WorkloadStats,
+            metric_name: str,
+            batch_size: int = 1,
+            lazy_heap: list = None
+    ) -> list:
+        """ Get the list of block addresses to remove next. 
+
+        Args:
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
+            metric_name: Name of the metric to optimize.  
+            batch_size: Number of non-adjacent blocks to remove. (Default: 1)
+            lazy_heap: Heap of find_lazy_best_block_to_remove kept between calls, every block is evaluated if None. (Default: None)
+        
+        Returns:
+            addr_list: List of block addresses to remove in order, empty if the map is empty. 
+        
+        Raises:
+            ValueError: If more than one block is to be removed with lazy evaluation. 
+        """
+        if lazy_heap is not None:
+            if batch_size > 1:
+                raise ValueError("Lazy evaluation removes 1 block at a time not {}.".format(batch_size))
+            best_dict = self.find_lazy_best_block_to_remove(full_workload_stat, sample_workload_stat, metric_name, lazy_heap)
+            return [best_dict["addr"]] if best_dict else []
+        elif batch_size > 1:
+            return [err_dict["addr"] for err_dict in self.find_best_block_list_to_remove(full_workload_stat, sample_workload_stat, metric_name, batch_size)]
+        else:
+            best_dict = self.find_best_block_to_remove(full_workload_stat, sample_workload_stat, metric_name)
+            return [best_dict["addr"]] if best_dict else []
     
 
     def find_block_to_remove(
@@ -424,11 +938,11 @@ class BAFM:
 
         num_improving_eval_found = 0 
         for addr in block_eval_priority_list:
-            if addr not in self._map:
+            if addr not in self._row_dict:
                 continue 
 
             # get the new sample workload stats after removing an address 
-            new_sample_workload_stat = self.get_new_workload_stat(sample_workload_stat, self._map[addr])
+            new_sample_workload_stat = self.get_new_workload_stat(sample_workload_stat, self.get_feature_arr(addr))
 
             # compute the error value if we remove this address 
             new_sample_workload_feature_dict = new_sample_workload_stat.get_workload_feature_dict()
@@ -457,37 +971,331 @@ class BAFM:
             sample_workload_stat: WorkloadStats, 
             metric_name: str
     ) -> dict:
-        """ Find the best block to remove. 
+        """ Find the best block to remove. The workload features and error metrics after removing each 
+        block in the map are computed together from the matrix of access features.
 
         Args:
-            start_workload_feature: Feature of workload to remove blocks from.  
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
             metric_name: Name of the metric to optimize.  
         
         Returns:
-            best_dict: Dictionary of error values. 
+            best_dict: Dictionary of error values of the block that minimizes the metric, empty if the map is empty. 
         """
+        if self.worker_count > 1:
+            return self.find_best_block_to_remove_parallel(full_workload_stat, sample_workload_stat, metric_name)
 
-        best_err_dict = {}
-        full_workload_feature_dict = full_workload_stat.get_workload_feature_dict()
+        row_arr = self.get_live_row_arr()
+        if not len(row_arr):
+            return {}
 
-        for addr in self._map:
-            # get the new sample workload stats after removing an address 
-            new_sample_workload_stat = self.get_new_workload_stat(sample_workload_stat, self._map[addr])
+        err_mat = self.get_removal_error_mat(full_workload_stat, sample_workload_stat, row_arr)
+        best_index = self.get_best_index(err_mat, metric_name)
+        best_err_dict = dict(zip(WORKLOAD_FEATURE_LIST + ERROR_METRIC_LIST, err_mat[best_index].tolist()))
+        best_err_dict["addr"] = int(self._addr_arr[row_arr[best_index]])
+        return best_err_dict
 
-            # compute the error value if we remove this address 
-            new_sample_workload_feature_dict = new_sample_workload_stat.get_workload_feature_dict()
-            err_dict = self.get_error_dict(full_workload_feature_dict, new_sample_workload_feature_dict)
-            err_dict["addr"] = addr 
 
-            if not best_err_dict:
-                best_err_dict = err_dict 
-            else:
-                if best_err_dict[metric_name] > err_dict[metric_name]:
-                    best_err_dict = err_dict
+    def find_best_block_to_remove_parallel(
+            self, 
+            full_workload_stat: WorkloadStats,
+            sample_workload_stat: WorkloadStats, 
+            metric_name: str
+    ) -> dict:
+        """ Find the best block to remove with the worker processes. Each worker evaluates a range of rows
+        of the feature matrix in shared memory with about the same number of live rows and returns its best
+        row. The first row with the lowest metric is selected so the block is the same as when the blocks 
+        are evaluated in this process. 
+
+        Args:
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
+            metric_name: Name of the metric to optimize.  
+        
+        Returns:
+            best_dict: Dictionary of error values of the block that minimizes the metric, empty if the map is empty. 
+        """
+        row_arr = self.get_live_row_arr()
+        if not len(row_arr):
+            return {}
 
+        self.start_workers()
+        task_list = self.get_worker_task_list(full_workload_stat, sample_workload_stat, metric_name, row_arr)
+        best_tuple_list = [best_tuple for best_tuple in self._pool.map(find_best_row, task_list, chunksize=1) if best_tuple is not None]
+
+        _, best_row, best_err_list = min(best_tuple_list, key=lambda best_tuple: best_tuple[:2])
+        best_err_dict = dict(zip(WORKLOAD_FEATURE_LIST + ERROR_METRIC_LIST, best_err_list))
+        best_err_dict["addr"] = int(self._addr_arr[best_row])
         return best_err_dict
 
 
+    def get_worker_task_list(
+            self, 
+            full_workload_stat: WorkloadStats,
+            sample_workload_stat: WorkloadStats, 
+            metric_name: str,
+            row_arr: ndarray
+    ) -> list:
+        """ Get the list of tasks of the worker processes to evaluate every live row. Each task is a range 
+        of rows of the feature matrix with about the same number of live rows, in order of row. 
+
+        Args:
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
+            metric_name: Name of the metric to optimize.  
+            row_arr: Array of every live row in order. 
+        
+        Returns:
+            task_list: List of tasks of find_best_row and get_row_metric_arr. 
+        """
+        full_feature_arr = array(list(full_workload_stat.get_workload_feature_dict().values()), dtype=float)
+        split_row_list = [int(row_arr[len(row_arr) * worker_index // self.worker_count]) for worker_index in range(self.worker_count)]
+        return [(row_start, row_end, full_feature_arr, sample_workload_stat, metric_name) 
+                    for row_start, row_end in zip(split_row_list, split_row_list[1:] + [self._row_count]) if row_start < row_end]
+
+
+    def get_removal_metric_arr(
+            self, 
+            full_workload_stat: WorkloadStats,
+            sample_workload_stat: WorkloadStats, 
+            metric_name: str
+    ) -> tuple:
+        """ Get the metric after removing each block in the map, evaluated by the worker processes if 
+        worker_count is greater than 1. 
+
+        Args:
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
+            metric_name: Name of the metric.  
+        
+        Returns:
+            row_arr: Array of every live row in order. 
+            metric_arr: Array of the metric after removing the block of each row. 
+        """
+        row_arr = self.get_live_row_arr()
+        if self.worker_count == 1 or not len(row_arr):
+            err_mat = self.get_removal_error_mat(full_workload_stat, sample_workload_stat, row_arr)
+            return row_arr, err_mat[:, len(WORKLOAD_FEATURE_LIST) + ERROR_METRIC_LIST.index(metric_name)]
+
+        self.start_workers()
+        task_list = self.get_worker_task_list(full_workload_stat, sample_workload_stat, metric_name, row_arr)
+        return row_arr, concatenate(self._pool.map(get_row_metric_arr, task_list, chunksize=1))
+
+
+    def find_best_block_list_to_remove(
+            self, 
+            full_workload_stat: WorkloadStats,
+            sample_workload_stat: WorkloadStats, 
+            metric_name: str,
+            batch_size: int
+    ) -> list:
+        """ Find the best blocks to remove where no two blocks are adjacent. Removing a block changes the 
+        access features of its adjacent blocks only, so the blocks can be removed one after the other with 
+        the access features used to evaluate them. 
+
+        Args:
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
+            metric_name: Name of the metric to optimize.  
+            batch_size: Maximum number of blocks to find. 
+        
+        Returns:
+            best_dict_list: List of dictionary of error values of removing each block alone from the sample in 
+                                order of the metric, the first is the same as find_best_block_to_remove.
+        """
+        row_arr, metric_arr = self.get_removal_metric_arr(full_workload_stat, sample_workload_stat, metric_name)
+
+        best_row_list, best_addr_set = [], set()
+        for best_index in argsort(where(isnan(metric_arr), inf, metric_arr), kind="stable").tolist():
+            addr = int(self._addr_arr[row_arr[best_index]])
+            if addr - 1 in best_addr_set or addr + 1 in best_addr_set:
+                continue 
+
+            best_row_list.append(int(row_arr[best_index]))
+            best_addr_set.add(addr)
+            if len(best_row_list) == batch_size:
+                break 
+        
+        # only the errors of the blocks found are needed 
+        best_dict_list = []
+        err_mat = self.get_removal_error_mat(full_workload_stat, sample_workload_stat, array(best_row_list, dtype=int))
+        for best_row, err_arr in zip(best_row_list, err_mat):
+            best_err_dict = dict(zip(WORKLOAD_FEATURE_LIST + ERROR_METRIC_LIST, err_arr.tolist()))
+            best_err_dict["addr"] = int(self._addr_arr[best_row])
+            best_dict_list.append(best_err_dict)
+        return best_dict_list
+
+
+    def find_lazy_best_block_to_remove(
+            self, 
+            full_workload_stat: WorkloadStats,
+            sample_workload_stat: WorkloadStats, 
+            metric_name: str,
+            lazy_heap: list
+    ) -> dict:
+        """ Find a block to remove by lazy evaluation like CELF. The heap holds the metric of each block from
+        when it was last evaluated. The block at the top is evaluated again with the current sample and it is 
+        selected if it is still no worse than the next block, else it is pushed back with its new metric. A 
+        block whose metric improved since it was last evaluated can be missed, so the block selected is not
+        always the same as find_best_block_to_remove. 
+
+        Args:
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
+            metric_name: Name of the metric to optimize.  
+            lazy_heap: Heap of (metric, row) of blocks in the map kept between calls, every block is evaluated 
+                        when it is empty. 
+        
+        Returns:
+            best_dict: Dictionary of error values of the block selected, empty if the map is empty. 
+        """
+        metric_index = len(WORKLOAD_FEATURE_LIST) + ERROR_METRIC_LIST.index(metric_name)
+        if not lazy_heap:
+            row_arr, metric_arr = self.get_removal_metric_arr(full_workload_stat, sample_workload_stat, metric_name)
+            lazy_heap.extend(zip(where(isnan(metric_arr), inf, metric_arr).tolist(), row_arr.tolist()))
+            heapify(lazy_heap)
+        
+        while lazy_heap:
+            _, row = heappop(lazy_heap)
+            if not self._live_arr[row]:
+                continue 
+
+            err_arr = self.get_removal_error_mat(full_workload_stat, sample_workload_stat, array([row]))[0]
+            metric = inf if isnan(err_arr[metric_index]) else float(err_arr[metric_index])
+            if lazy_heap and (metric, row) > lazy_heap[0]:
+                heappush(lazy_heap, (metric, row))
+                continue 
+
+            best_err_dict = dict(zip(WORKLOAD_FEATURE_LIST + ERROR_METRIC_LIST, err_arr.tolist()))
+            best_err_dict["addr"] = int(self._addr_arr[row])
+            return best_err_dict
+        return {}
+
+
+    def get_removal_error_mat(
+            self,
+            full_workload_stat: WorkloadStats,
+            sample_workload_stat: WorkloadStats,
+            row_arr: ndarray
+    ) -> ndarray:
+        """ Get the error metrics of the sample workload after removing each of the given rows. 
+
+        Args:
+            full_workload_stat: Workload stats of the full workload.
+            sample_workload_stat: Workload stats of the sample workload to remove blocks from. 
+            row_arr: Array of rows of the matrix to evaluate. 
+        
+        Returns:
+            err_mat: Matrix with a row of errors of each workload feature followed by the error metrics 
+                        in the order of WORKLOAD_FEATURE_LIST and ERROR_METRIC_LIST for each row evaluated. 
+        """
+        block_size_byte = self.get_block_size_from_lower_bits_ignored(self._lower_addr_bits_ignored, 4096)
+        full_feature_arr = array(list(full_workload_stat.get_workload_feature_dict().values()), dtype=float)
+        feature_mat = self.get_removal_feature_mat(sample_workload_stat, self._feature_mat[row_arr], block_size_byte)
+        return self.get_error_mat(full_feature_arr, feature_mat)
+
+
+    @staticmethod
+    def get_best_index(
+            err_mat: ndarray, 
+            metric_name: str
+    ) -> int:
+        """ Get the index of the first row with the lowest value of a metric in an error matrix. 
+
+        Args:
+            err_mat: Matrix of errors from get_error_mat.
+            metric_name: Name of the metric to optimize. 
+        
+        Returns:
+            best_index: Index of the first row with the lowest value of the metric, NaN is never lower than a number. 
+        """
+        metric_arr = err_mat[:, len(WORKLOAD_FEATURE_LIST) + ERROR_METRIC_LIST.index(metric_name)]
+        return int(where(isnan(metric_arr), inf, metric_arr).argmin())
+
+
+    @staticmethod
+    def get_removal_feature_mat(
+            workload_stat: WorkloadStats,
+            block_feature_mat: ndarray,
+            block_size_byte: int
+    ) -> ndarray:
+        """ Get the workload features when each block of a matrix of access features is removed from a 
+        workload. This is equivalent to calling get_new_workload_stat and get_workload_feature_dict with 
+        each row of the matrix. 
+
+        Args:
+            workload_stat: WorkloadStats object representing the workload features.
+            block_feature_mat: Matrix with a row of access features of each block. 
+            block_size_byte: Size of a block in bytes. 
+        
+        Returns:
+            feature_mat: Matrix with a row of workload features in the order of WORKLOAD_FEATURE_LIST for each block. 
+        """
+        left_i, right_i, mid_i, solo_i = MetadataIndex.LEFT_I.value, MetadataIndex.RIGHT_I.value, MetadataIndex.MID_I.value, MetadataIndex.SOLO_I.value
+        block_stat, misalign_stat = workload_stat._block_stat, workload_stat._misalign_stat
+        feature_mat = zeros((len(block_feature_mat), len(WORKLOAD_FEATURE_LIST)), dtype=float)
+
+        # the requests of a block that was in the middle of a request become two requests and its solo requests are removed
+        read_count_arr = block_stat.block_read_count - (block_feature_mat[:, solo_i] - block_feature_mat[:, mid_i])
+        write_count_arr = block_stat.block_write_count - (block_feature_mat[:, solo_i + 1] - block_feature_mat[:, mid_i + 1])
+        read_iat_arr = block_stat.block_read_iat_sum - (block_feature_mat[:, solo_i + 2] - block_feature_mat[:, mid_i + 2])
+        write_iat_arr = block_stat.block_write_iat_sum - (block_feature_mat[:, solo_i + 3] - block_feature_mat[:, mid_i + 3])
+
+        # the bytes of a block accessed by a request less its misaligned bytes are removed 
+        read_byte_arr = block_stat.block_read_byte_sum - (block_size_byte * (block_feature_mat[:, left_i] + block_feature_mat[:, right_i] 
+                                                                + block_feature_mat[:, mid_i] + block_feature_mat[:, solo_i])
+                                                            - (block_feature_mat[:, left_i + 4] + block_feature_mat[:, right_i + 4] 
+                                                                + block_feature_mat[:, solo_i + 4]))
+        write_byte_arr = block_stat.block_write_byte_sum - (block_size_byte * (block_feature_mat[:, left_i + 1] + block_feature_mat[:, right_i + 1] 
+                                                                + block_feature_mat[:, mid_i + 1] + block_feature_mat[:, solo_i + 1])
+                                                            - (block_feature_mat[:, left_i + 5] + block_feature_mat[:, right_i + 5] 
+                                                                + block_feature_mat[:, solo_i + 5]))
+        read_misalign_arr = misalign_stat.misaligned_read_count - block_feature_mat[:, MetadataIndex.RMISALIGNMENT_I.value]
+        write_misalign_arr = misalign_stat.misaligned_write_count - block_feature_mat[:, MetadataIndex.WMISALIGNMENT_I.value]
+        total_count_arr = read_count_arr + write_count_arr
+
+        # same as get_workload_feature_dict where a feature is 0 when there are no requests 
+        for feature_index, (numerator_arr, denominator_arr) in enumerate([(read_byte_arr, read_count_arr), 
+                                                                            (write_byte_arr, write_count_arr), 
+                                                                            (read_iat_arr, read_count_arr), 
+                                                                            (write_iat_arr, write_count_arr), 
+                                                                            (read_misalign_arr, read_count_arr), 
+                                                                            (write_misalign_arr, write_count_arr), 
+                                                                            (write_count_arr, total_count_arr)]):
+            divide(numerator_arr, denominator_arr, out=feature_mat[:, feature_index], where=denominator_arr > 0)
+        return feature_mat
+
+
+    @staticmethod
+    def get_error_mat(
+            full_feature_arr: ndarray, 
+            feature_mat: ndarray
+    ) -> ndarray:
+        """ Compute matrix of error metrics. This is equivalent to calling get_error_dict with each row
+        of the matrix of workload features.
+
+        Args:
+            full_feature_arr: Array of workload features of workload 1.
+            feature_mat: Matrix with a row of workload features of each workload to compare with workload 1.
+        
+        Returns:
+            err_mat: Matrix with a row of errors of each workload feature followed by the error metrics 
+                        in the order of WORKLOAD_FEATURE_LIST and ERROR_METRIC_LIST. 
+        """
+        err_mat = zeros((len(feature_mat), len(WORKLOAD_FEATURE_LIST) + len(ERROR_METRIC_LIST)), dtype=float)
+        with errstate(divide="ignore", invalid="ignore"):
+            feature_err_mat = err_mat[:, :len(WORKLOAD_FEATURE_LIST)]
+            feature_err_mat[:] = 100*(full_feature_arr - feature_mat)/full_feature_arr
+            abs_err_mat = abs(feature_err_mat)
+            abs_err_sum_arr = abs_err_mat.sum(axis=1)
+            weight_mat = zeros(abs_err_mat.shape, dtype=float)
+            divide(abs_err_mat, abs_err_sum_arr[:, None], out=weight_mat, where=abs_err_sum_arr[:, None] > 0)
+        err_mat[:, len(WORKLOAD_FEATURE_LIST)] = abs_err_mat.mean(axis=1)
+        err_mat[:, len(WORKLOAD_FEATURE_LIST) + 1] = abs_err_mat.max(axis=1)
+        err_mat[:, len(WORKLOAD_FEATURE_LIST) + 2] = multiply(abs_err_mat, weight_mat).sum(axis=1)
+        return err_mat
+
+
     def get_new_workload_stat(
             self,
             workload_stat: WorkloadStats, 
@@ -672,10 +1480,10 @@ class BAFM:
         if self._block_count != other._block_count:
             return False 
         
-        for other_blk_addr in other._map:
-            if other_blk_addr not in self._map:
+        for other_blk_addr in other._row_dict:
+            if other_blk_addr not in self._row_dict:
                 return False 
 
-            if not all(other._map[other_blk_addr] == self._map[other_blk_addr]):
+            if not all(other.get_feature_arr(other_blk_addr) == self.get_feature_arr(other_blk_addr)):
                 return False 
-        return True 
\ No newline at end of file
+        return True
\ No newline at end of file
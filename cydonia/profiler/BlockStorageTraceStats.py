@@ -3,6 +3,7 @@ import time
 import numpy as np 
 from collections import Counter, defaultdict 
 
+from cydonia.profiler.Reader import Reader
 from cydonia.profiler.PercentileStats import PercentileStats
 
 
@@ -442,4 +443,150 @@ class BlockStorageTraceStats:
         self._track_req_alignment(block_req)
         self._track_iat(block_req)
         self._track_popularity(block_req)
-        self._prev_req = block_req
\ No newline at end of file
+        self._prev_req = block_req
+
+
+    def track_arrays(self, ts_arr, lba_arr, op_arr, size_arr, start_page_arr, end_page_arr, front_misalign_arr, rear_misalign_arr):
+        """ Update the statistics based on a batch of block requests. 
+            The statistics are the same as calling add_request for 
+            each block request in the batch in order. 
+
+            Parameters
+            ----------
+            ts_arr : np.ndarray 
+                array of timestamps 
+            lba_arr : np.ndarray 
+                array of LBAs (Logical Block Address) 
+            op_arr : np.ndarray 
+                array of operations ('r' or 'w') 
+            size_arr : np.ndarray 
+                array of request sizes in bytes 
+            start_page_arr : np.ndarray 
+                array of the first page accessed by each request 
+            end_page_arr : np.ndarray 
+                array of the last page accessed by each request 
+            front_misalign_arr : np.ndarray 
+                array of front misalignment in bytes 
+            rear_misalign_arr : np.ndarray 
+                array of rear misalignment in bytes 
+        """
+        ts_arr, lba_arr, op_arr, size_arr = np.asarray(ts_arr), np.asarray(lba_arr), np.asarray(op_arr), np.asarray(size_arr)
+        start_page_arr, end_page_arr = np.asarray(start_page_arr), np.asarray(end_page_arr)
+        front_misalign_arr, rear_misalign_arr = np.asarray(front_misalign_arr), np.asarray(rear_misalign_arr)
+        if len(ts_arr) == 0:
+            return 
+
+        read_flag_arr, write_flag_arr = op_arr == 'r', op_arr == 'w'
+        invalid_flag_arr = ~(read_flag_arr | write_flag_arr)
+        if invalid_flag_arr.any():
+            raise ValueError("Operation {} not supported. Only 'r' or 'w'".format(op_arr[invalid_flag_arr][0]))
+
+        # op type 
+        page_count_arr = end_page_arr - start_page_arr + 1
+        if read_flag_arr.any():
+            self._read_block_req_count += int(read_flag_arr.sum())
+            self._read_io_request_size_sum += int(size_arr[read_flag_arr].sum())
+            self._read_page_access_count += int(page_count_arr[read_flag_arr].sum())
+            self._min_read_page = max(self._min_read_page, int(start_page_arr[read_flag_arr].max()))
+            self._max_read_page = max(self._max_read_page, int(end_page_arr[read_flag_arr].max()))
+            self._read_size_pstats.add_data_arr(size_arr[read_flag_arr])
+
+        if write_flag_arr.any():
+            self._write_block_req_count += int(write_flag_arr.sum())
+            self._write_io_request_size_sum += int(size_arr[write_flag_arr].sum())
+            self._write_page_access_count += int(page_count_arr[write_flag_arr].sum())
+            self._min_write_page = max(self._min_write_page, int(start_page_arr[write_flag_arr].max()))
+            self._max_write_page = max(self._max_write_page, int(end_page_arr[write_flag_arr].max()))
+            self._write_size_pstats.add_data_arr(size_arr[write_flag_arr])
+
+        # sequential access and interarrival time compared to the previous request 
+        start_offset_arr = lba_arr * self._lba_size
+        end_offset_arr = start_offset_arr + size_arr
+        if self._prev_req is None:
+            self._start_ts = int(ts_arr[0])
+            first_index = 1 
+            prev_end_offset_arr, prev_ts_arr = end_offset_arr[:-1], ts_arr[:-1]
+        else:
+            first_index = 0 
+            prev_end_offset_arr = np.concatenate(([self.req_end_offset(self._prev_req)], end_offset_arr[:-1]))
+            prev_ts_arr = np.concatenate(([self._prev_req["ts"]], ts_arr[:-1]))
+        
+        jump_distance_arr = start_offset_arr[first_index:] - prev_end_offset_arr
+        self._jump_distance_pstats.add_data_arr(jump_distance_arr)
+        seq_flag_arr, cur_read_flag_arr = jump_distance_arr == 0, read_flag_arr[first_index:]
+        self._read_seq_count += int((seq_flag_arr & cur_read_flag_arr).sum())
+        write_seq_count = int((seq_flag_arr & ~cur_read_flag_arr).sum())
+        # every sequential write except the first one adds its jump distance which is 0 
+        write_jd_count = max(0, self._write_seq_count + write_seq_count - max(self._write_seq_count, 1))
+        self._write_jump_distance_pstats.add_data_arr(np.zeros(write_jd_count, dtype=int))
+        self._write_seq_count += write_seq_count
+
+        iat_arr = ts_arr[first_index:] - prev_ts_arr
+        self._iat_pstats.add_data_arr(iat_arr)
+        self._read_iat_pstats.add_data_arr(iat_arr[cur_read_flag_arr])
+        self._write_iat_pstats.add_data_arr(iat_arr[~cur_read_flag_arr])
+
+        # alignment 
+        misalign_arr = front_misalign_arr + rear_misalign_arr
+        self._read_misalignment_sum += int(misalign_arr[read_flag_arr].sum())
+        self._write_misalignment_sum += int(misalign_arr[write_flag_arr].sum())
+        front_flag_arr, rear_flag_arr = front_misalign_arr > 0, rear_misalign_arr > 0
+        misalign_read_page_arr = np.where(front_flag_arr & rear_flag_arr, 
+                                            np.where(start_page_arr == end_page_arr, 1, 2), 
+                                            (front_flag_arr | rear_flag_arr).astype(int))
+        self._read_page_access_count += int(misalign_read_page_arr[write_flag_arr].sum())
+
+        self._track_popularity_arr(read_flag_arr, start_page_arr, end_page_arr)
+        self._prev_req = {
+            "ts": int(ts_arr[-1]), 
+            "lba": int(lba_arr[-1]), 
+            "op": str(op_arr[-1]), 
+            "size": int(size_arr[-1]), 
+            "start_page": int(start_page_arr[-1]), 
+            "end_page": int(end_page_arr[-1]), 
+            "front_misalign": int(front_misalign_arr[-1]), 
+            "rear_misalign": int(rear_misalign_arr[-1])
+        }
+
+
+    def _track_popularity_arr(self, read_flag_arr, start_page_arr, end_page_arr):
+        """ Track the page popularity and scans of a batch of block requests 
+            in the same way as _track_popularity. 
+
+            Parameters
+            ----------
+            read_flag_arr : np.ndarray 
+                boolean array that is True for read requests 
+            start_page_arr : np.ndarray 
+                array of the first page accessed by each request 
+            end_page_arr : np.ndarray 
+                array of the last page accessed by each request 
+        """
+        page_arr = Reader.get_block_addr_arr(start_page_arr, end_page_arr)
+        if len(page_arr) == 0:
+            return 
+        read_page_flag_arr = np.repeat(read_flag_arr, end_page_arr - start_page_arr + 1)
+
+        # a page read is new if it was not read before in this or any previous batch 
+        read_page_arr, write_page_arr = page_arr[read_page_flag_arr], page_arr[~read_page_flag_arr]
+        unique_read_page_arr, first_index_arr, read_count_arr = np.unique(read_page_arr, return_index=True, return_counts=True)
+        new_page_flag_arr = np.fromiter((page not in self._read_page_access_counter for page in unique_read_page_arr.tolist()), 
+                                            dtype=bool, count=len(unique_read_page_arr))
+        new_read_flag_arr = np.zeros(len(read_page_arr), dtype=bool)
+        new_read_flag_arr[first_index_arr[new_page_flag_arr]] = True 
+
+        # the scan length grows with every new page read or page written and resets at every page read again 
+        reset_flag_arr = np.zeros(len(page_arr), dtype=bool)
+        reset_flag_arr[read_page_flag_arr] = ~new_read_flag_arr
+        scan_arr = self._scan_length + np.cumsum(~reset_flag_arr)
+        last_reset_index_arr = np.maximum.accumulate(np.where(reset_flag_arr, np.arange(len(page_arr)), -1))
+        scan_base_arr = np.where(last_reset_index_arr >= 0, scan_arr[last_reset_index_arr], 0)
+        prev_scan_base_arr = np.concatenate(([0], scan_base_arr[:-1]))
+        scan_length_arr = (scan_arr - prev_scan_base_arr)[reset_flag_arr]
+        self._scan_pstats.add_data_arr(scan_length_arr[scan_length_arr > 0])
+        self._scan_write_count += int(((scan_arr - scan_base_arr)[~read_page_flag_arr] > 1).sum())
+        self._scan_length = int(scan_arr[-1] - scan_base_arr[-1])
+
+        self._read_page_access_counter.update(dict(zip(unique_read_page_arr.tolist(), read_count_arr.tolist())))
+        unique_write_page_arr, write_count_arr = np.unique(write_page_arr, return_counts=True)
+        self._write_page_access_counter.update(dict(zip(unique_write_page_arr.tolist(), write_count_arr.tolist())))
@@ -1,10 +1,12 @@
 from pathlib import Path 
-from typing import Union
+from typing import Union, Iterator
 from dataclasses import dataclass
 from time import perf_counter_ns
+from numpy import ndarray
 from pandas import DataFrame, read_csv 
 
-from cydonia.profiler.WorkloadStats import WorkloadStats, BlockRequest 
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.WorkloadStats import WorkloadStats 
 
 
 @dataclass(frozen=True)
@@ -28,6 +30,7 @@ class ReaderConfig:
     cache_addr_header_name: str = "addr"
     front_misalign_header_name: str = "front_misalign"
     rear_misalign_header_name: str = "rear_misalign"
+    cache_block_count_header_name: str = "count"
     scaled_cache_addr_header_name = "scaled_addr"
 
 
@@ -58,6 +61,16 @@ class ReaderConfig:
                     self.rear_misalign_header_name]
     
 
+    def get_cache_extent_trace_header(self):
+        return [self.req_index_header_name, 
+                    self.iat_header_name, 
+                    self.cache_addr_header_name, 
+                    self.cache_block_count_header_name,
+                    self.op_header_name, 
+                    self.front_misalign_header_name, 
+                    self.rear_misalign_header_name]
+    
+
 class BlockTrace:
     """ BlockTrace reads block storage traces. 
 
@@ -91,17 +104,52 @@ class BlockTrace:
         return block_trace_df
         
     
-    def get_block_stat(self) -> WorkloadStats:
+    def read_batches(
+            self, 
+            batch_size: int, 
+            block_size_byte: int = None 
+    ) -> Iterator[ndarray]:
+        """Iterate over the block requests in the trace in batches. 
+
+        Args:
+            batch_size: Maximum number of block requests in a batch. 
+            block_size_byte: Size of a cache block used to compute the derived block features. If None, the
+                                cache block size in the ReaderConfig is used. (Default: None)
+        
+        Yields:
+            batch_arr: Structured array of dtype BATCH_DTYPE. 
+        """
+        if block_size_byte is None:
+            block_size_byte = self._config.cache_block_size_byte
+
+        ts_arr = self._df[self._config.ts_header_name].to_numpy()
+        lba_arr = self._df[self._config.lba_header_name].to_numpy()
+        op_arr = self._df[self._config.op_header_name].to_numpy()
+        size_arr = self._df[self._config.size_header_name].to_numpy()
+        for start_index in range(0, len(self._df), batch_size):
+            end_index = start_index + batch_size
+            yield Reader.get_batch_arr(ts_arr[start_index:end_index], 
+                                        lba_arr[start_index:end_index], 
+                                        op_arr[start_index:end_index], 
+                                        size_arr[start_index:end_index], 
+                                        self._config.lba_size_byte, 
+                                        block_size_byte)
+        
+    
+    def get_block_stat(
+            self, 
+            batch_size: int = 1000000
+    ) -> WorkloadStats:
         assert self._config.iat_header_name in self._df and \
                 self._config.lba_header_name in self._df and \
                     self._config.size_header_name in self._df and \
                         self._config.op_header_name in self._df
         
-        workload_stat = WorkloadStats()
-        for _, row in self._df.iterrows():
-            cur_block_req = BlockRequest(row[self._config.ts_header_name],
-                                            row[self._config.lba_header_name],
-                                            self._config.get_write_flag(row[self._config.op_header_name]),
-                                            row[self._config.size_header_name])
-            workload_stat.track(cur_block_req)
-        return workload_stat
+        workload_stat = WorkloadStats(self._config.lba_size_byte, self._config.cache_block_size_byte)
+        for batch_arr in self.read_batches(batch_size):
+            write_flag_arr = batch_arr["op"] == self._config.write_str
+            if not (write_flag_arr | (batch_arr["op"] == self._config.read_str)).all():
+                raise ValueError("Unrecognized operation string in {}, allowed {} and {}.".format(set(batch_arr["op"]), self._config.read_str, self._config.write_str))
+
+            workload_stat.track_arrays(batch_arr["ts"], batch_arr["lba"], write_flag_arr, batch_arr["size"])
+        return workload_stat
\ No newline at end of file
@@ -9,7 +9,7 @@ Usage:
 
 from typing import Union
 from pathlib import Path 
-from numpy import ndarray, array 
+from numpy import ndarray, array, unique, concatenate 
 from pandas import read_csv 
 
 from cydonia.profiler.CPReader import CPReader
@@ -34,7 +34,8 @@ class TraceProfiler:
 
 def get_unique_block_arr(
         block_trace_path: Union[str, Path],
-        block_size_byte: int
+        block_size_byte: int,
+        batch_size: int = 1000000
 ) -> ndarray:
     """Get a numpy array of all unique block address from a CP block trace.
 
@@ -42,33 +43,36 @@ def get_unique_block_arr(
         block_trace_path: Path object or string pointing to the CP block trace.
         block_size_byte: Size of data block in bytes. Note that it is different from the size of the LBA
                             which is fixed to 512 bytes in CP block traces.
+        batch_size: Number of block requests processed at a time. (Default: 1000000)
     
     Returns:
         unique_block_arr: Numpy array of unique block addresses in the CP block trace.
     """
     reader = CPReader(block_trace_path)
-    unique_block_set = set()
-    cur_block_req = reader.get_next_block_req(block_size=block_size_byte)
-    while cur_block_req:
-        for block_addr in range(cur_block_req["start_block"], cur_block_req["end_block"]+1):
-            unique_block_set.add(block_addr)
-        cur_block_req = reader.get_next_block_req(block_size=block_size_byte)
-    return array(unique_block_set, dtype=int)
+    unique_block_arr_list = [array([], dtype=int)]
+    for batch_arr in reader.read_batches(batch_size, block_size_byte=block_size_byte):
+        batch_block_arr = reader.get_block_addr_arr(batch_arr["start_block"], batch_arr["end_block"])
+        unique_block_arr_list.append(unique(batch_block_arr))
+    reader.close()
+    return unique(concatenate(unique_block_arr_list))
 
 
 class BlockTraceProfiler:
     def __init__(
             self, 
-            reader: CPReader
+            reader: CPReader,
+            batch_size: int = 1000000
     ) -> None:
         """This class profiles block storage traces.
         
         Args:
             reader: Reader class to read the content of block storage trace. 
+            batch_size: Number of block requests read from the trace at a time. (Default: 1000000)
         """
         self._page_size = 4096
         self._reader = reader 
-        self._workload_name = self._reader.trace_file_path.stem 
+        self._batch_size = batch_size
+        self._workload_name = self._reader._trace_file_path.stem 
 
         self._stat = {} 
         self._stat['block'] = BlockStorageTraceStats()
@@ -117,6 +121,21 @@ class BlockTraceProfiler:
     def run(self):
         """ This function computes features from the provided trace. """
         self._reader.reset()
-        self._load_next_cache_req()
-        while (self._cur_req):
-            self._load_next_cache_req()
\ No newline at end of file
+        for batch_arr in self._reader.read_batches(self._batch_size, block_size_byte=self._page_size):
+            self._stat['block'].track_arrays(batch_arr["ts"], batch_arr["lba"], batch_arr["op"], batch_arr["size"], 
+                                                batch_arr["start_block"], batch_arr["end_block"], 
+                                                batch_arr["front_misalign"], batch_arr["rear_misalign"])
+            
+            last_req = batch_arr[-1]
+            self._cur_req = {
+                "ts": int(last_req["ts"]), 
+                "lba": int(last_req["lba"]), 
+                "op": str(last_req["op"]), 
+                "size": int(last_req["size"]), 
+                "start_page": int(last_req["start_block"]), 
+                "end_page": int(last_req["end_block"]), 
+                "front_misalign": int(last_req["front_misalign"]), 
+                "rear_misalign": int(last_req["rear_misalign"]), 
+                "key": int(last_req["start_block"])
+            }
+            self._time_elasped = self._cur_req["ts"]
@@ -0,0 +1,259 @@
+"""The reader class to read block traces stored in a fixed-width binary columnar format.
+
+A binary trace is created once from a CSV block trace with format: ts, lba, op, size and
+is then memory-mapped so that repeated passes over the same trace skip parsing entirely.
+
+Usage:
+    convert_cp_trace(cp_trace_path, bin_trace_path)
+    reader = CPBinReader(bin_trace_path)
+    block_req = reader.get_next_block_req(block_size=4096)
+    ts_arr, lba_arr, op_arr, size_arr = reader.get_columns(0, 1000)
+
+File layout:
+    header: HEADER_SIZE_BYTE bytes described by HEADER_DTYPE.
+    ts: int64 column of timestamps.
+    lba: int64 column of logical block addresses.
+    size: uint32 column of request sizes in bytes.
+    op: uint8 column of operations where 0 is a read and 1 is a write.
+"""
+
+import numpy as np
+from pathlib import Path
+from typing import Union, Iterator
+from pandas import read_csv
+
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.CPReader import KEY_LIST
+
+
+MAGIC = b"CYDBT"
+VERSION = 1
+HEADER_SIZE_BYTE = 64
+HEADER_DTYPE = np.dtype([("magic", "S8"),
+                            ("version", "<u4"),
+                            ("lba_size_byte", "<u4"),
+                            ("req_count", "<u8")])
+# the columns in the order they are laid out in the file
+COLUMN_DTYPE_LIST = [("ts", np.dtype("<i8")),
+                        ("lba", np.dtype("<i8")),
+                        ("size", np.dtype("<u4")),
+                        ("op", np.dtype("u1"))]
+OP_STR_ARR = np.array(['r', 'w'])
+
+
+def get_line_count(trace_path: Path) -> int:
+    """Get the number of lines in a text file without parsing it.
+
+    Args:
+        trace_path: Path to the text file.
+
+    Returns:
+        line_count: Number of lines in the file.
+    """
+    line_count = 0
+    last_byte = b"\n"
+    with open(trace_path, "rb") as handle:
+        buffer = handle.read(1 << 24)
+        while buffer:
+            line_count += buffer.count(b"\n")
+            last_byte = buffer[-1:]
+            buffer = handle.read(1 << 24)
+    # the last line might not end with a newline
+    if last_byte != b"\n":
+        line_count += 1
+    return line_count
+
+
+def convert_cp_trace(
+        cp_trace_path: Union[str, Path],
+        bin_trace_path: Union[str, Path],
+        lba_size_byte: int = 512,
+        chunk_size: int = 1000000
+) -> int:
+    """Convert a CSV block trace with format: ts, lba, op, size to the binary columnar format.
+
+    Args:
+        cp_trace_path: Path to the CSV block trace.
+        bin_trace_path: Path to the binary trace to be created.
+        lba_size_byte: Size of an LBA in the block trace. (Default: 512)
+        chunk_size: Number of block requests parsed at a time. (Default: 1000000)
+
+    Returns:
+        req_count: Number of block requests in the binary trace.
+    """
+    req_count = get_line_count(cp_trace_path)
+    column_offset_arr = get_column_offset_arr(req_count)
+    file_size_byte = column_offset_arr[-1] + req_count * COLUMN_DTYPE_LIST[-1][1].itemsize
+
+    with open(bin_trace_path, "wb") as handle:
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"], header["version"], header["lba_size_byte"], header["req_count"] = MAGIC, VERSION, lba_size_byte, req_count
+        handle.write(header.tobytes().ljust(HEADER_SIZE_BYTE, b"\x00"))
+        handle.truncate(file_size_byte)
+
+    if req_count == 0:
+        return req_count
+
+    column_arr = [np.memmap(bin_trace_path, dtype=dtype, mode="r+", offset=offset, shape=(req_count,))
+                    for (_, dtype), offset in zip(COLUMN_DTYPE_LIST, column_offset_arr)]
+    ts_arr, lba_arr, size_arr, op_arr = column_arr
+
+    start_index = 0
+    for df in read_csv(cp_trace_path, names=KEY_LIST, chunksize=chunk_size):
+        end_index = start_index + len(df)
+        ts_arr[start_index:end_index] = df["ts"].to_numpy()
+        lba_arr[start_index:end_index] = df["lba"].to_numpy()
+        size_arr[start_index:end_index] = df["size"].to_numpy()
+        op_arr[start_index:end_index] = (df["op"].to_numpy() == 'w')
+        start_index = end_index
+    assert start_index == req_count, "Found {} block requests but {} lines in {}.".format(start_index, req_count, cp_trace_path)
+
+    for column in column_arr:
+        column.flush()
+    return req_count
+
+
+def get_column_offset_arr(req_count: int) -> list:
+    """Get the byte offset of each column in a binary trace with the given number of block requests.
+
+    Args:
+        req_count: Number of block requests in the binary trace.
+
+    Returns:
+        column_offset_arr: List of byte offsets of each column in COLUMN_DTYPE_LIST.
+    """
+    column_offset_arr = []
+    cur_offset = HEADER_SIZE_BYTE
+    for _, dtype in COLUMN_DTYPE_LIST:
+        column_offset_arr.append(cur_offset)
+        cur_offset += req_count * dtype.itemsize
+    return column_offset_arr
+
+
+class CPBinReader(Reader):
+    """The reader class to read block traces in the binary columnar format.
+
+    Attributes:
+        req_count: Number of block requests in the trace.
+        cur_index: Index of the next block request returned by get_next_block_req.
+        start_time_ts: The start time timestamp of the block trace.
+        lba_size_byte: The size of a sector or logical block address in bytes.
+        ts_arr: Memory-mapped array of timestamps.
+        lba_arr: Memory-mapped array of logical block addresses.
+        size_arr: Memory-mapped array of request sizes in bytes.
+        op_arr: Memory-mapped array of operations where 0 is a read and 1 is a write.
+        _relative_time_flag: Boolean flag indicating if relative time should be used instead of absolute time.
+    """
+    def __init__(
+            self,
+            trace_path: Path
+    ) -> None:
+        """
+        Args:
+            trace_path: Path to the binary block trace to read.
+
+        Raises:
+            ValueError: If the file is not a binary block trace.
+        """
+        super().__init__(trace_path)
+        header = np.fromfile(self._trace_file_path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC or header["version"][0] != VERSION:
+            raise ValueError("File {} is not a binary block trace of version {}.".format(trace_path, VERSION))
+
+        self.req_count = int(header["req_count"][0])
+        self.lba_size_byte = int(header["lba_size_byte"][0])
+        self.cur_index = 0
+        self._relative_time_flag = True
+
+        if self.req_count > 0:
+            column_offset_arr = get_column_offset_arr(self.req_count)
+            self.ts_arr, self.lba_arr, self.size_arr, self.op_arr = \
+                [np.memmap(self._trace_file_path, dtype=dtype, mode="r", offset=offset, shape=(self.req_count,))
+                    for (_, dtype), offset in zip(COLUMN_DTYPE_LIST, column_offset_arr)]
+            self.start_time_ts = int(self.ts_arr[0])
+        else:
+            self.ts_arr, self.lba_arr, self.size_arr, self.op_arr = [np.zeros(0, dtype=dtype) for _, dtype in COLUMN_DTYPE_LIST]
+            self.start_time_ts = None
+
+
+    def __len__(self) -> int:
+        return self.req_count
+
+
+    def get_columns(
+            self,
+            start_index: int,
+            end_index: int
+    ) -> tuple:
+        """Get array views of block requests in the range [start_index, end_index).
+
+        Args:
+            start_index: Index of the first block request.
+            end_index: Index after the last block request.
+
+        Returns:
+            column_tuple: Tuple of arrays of timestamp, lba, operation and size. Timestamps are relative to
+                            the start of the trace if relative time is used.
+        """
+        ts_arr = self.ts_arr[start_index:end_index]
+        if self._relative_time_flag and self.start_time_ts is not None:
+            ts_arr = ts_arr - self.start_time_ts
+        return ts_arr, self.lba_arr[start_index:end_index], self.op_arr[start_index:end_index], self.size_arr[start_index:end_index]
+
+
+    def read_batches(
+            self, 
+            batch_size: int, 
+            block_size_byte: int = 4096
+    ) -> Iterator[np.ndarray]:
+        """Iterate over the block requests in the trace in batches. 
+
+        Args:
+            batch_size: Maximum number of block requests in a batch. 
+            block_size_byte: Size of a cache block used to compute the derived block features. (Default: 4096)
+        
+        Yields:
+            batch_arr: Structured array of dtype BATCH_DTYPE. 
+        """
+        for start_index in range(0, self.req_count, batch_size):
+            ts_arr, lba_arr, op_arr, size_arr = self.get_columns(start_index, start_index + batch_size)
+            yield self.get_batch_arr(ts_arr, lba_arr, OP_STR_ARR[op_arr], size_arr, self.lba_size_byte, block_size_byte)
+
+
+    def get_next_block_req(
+            self,
+            **kwargs: dict
+    ) -> dict:
+        """Return a dictionary with attributes of the next block request.
+
+        Args:
+            kwargs: Dictionary of keyword arguments.
+
+        Returns:
+            block_req: Dictionary with block request attributes and values
+        """
+        block_req = {}
+        if self.cur_index < self.req_count:
+            if self._relative_time_flag:
+                block_req["ts"] = int(self.ts_arr[self.cur_index]) - self.start_time_ts
+            else:
+                block_req["ts"] = int(self.ts_arr[self.cur_index])
+
+            block_req["lba"] = int(self.lba_arr[self.cur_index])
+            block_req["op"] = str(OP_STR_ARR[self.op_arr[self.cur_index]])
+            block_req["size"] = int(self.size_arr[self.cur_index])
+            block_req["start_offset"] = block_req["lba"] * self.lba_size_byte
+            block_req["end_offset"] = block_req["start_offset"] + block_req["size"]
+
+            if 'block_size' in kwargs:
+                block_size = int(kwargs['block_size'])
+                cache_access_feature_tuple = Reader.get_cache_access_features(block_req["lba"], self.lba_size_byte, block_req["size"], block_size)
+                block_req["start_block"], block_req["end_block"], block_req["front_misalign"], block_req["rear_misalign"] = cache_access_feature_tuple
+
+            self.cur_index += 1
+        return block_req
+
+
+    def reset(self) -> None:
+        """Reset the index of the next block request to the beginning of the trace."""
+        self.cur_index = 0
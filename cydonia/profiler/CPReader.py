@@ -2,10 +2,70 @@
 
 import numpy as np 
 from pathlib import Path 
-from cydonia.profiler.Reader import Reader, get_cache_access_features 
+from typing import Iterator
+from pandas import read_csv 
+from cydonia.profiler.Reader import Reader
 
 
 KEY_LIST = ["ts", "lba", "op", "size"]
+# powers of 10 used to count the digits of 64-bit integers 
+POW10_ARR = 10 ** np.arange(19, dtype=np.int64)
+
+
+def get_csv_bytes(column_list: list) -> bytes:
+    """Get the CSV lines of a set of integer and single character columns. The digits of each 
+    integer are computed with array arithmetic on a matrix of characters so that no Python 
+    string is created per value. 
+
+    Args:
+        column_list: List of arrays of equal length. Each array is either of integer dtype or of dtype 'U1'.
+    
+    Returns:
+        csv_bytes: Bytes of a line for each row where the values are separated by a comma. 
+    """
+    row_count = len(column_list[0])
+    layout_list = []
+    width = 0 
+    for column in column_list:
+        if column.dtype.kind == "U":
+            layout_list.append((column.view(np.uint32).astype(np.uint8), None, None, width))
+            width += 2
+        else:
+            neg_flag_arr = column < 0
+            abs_arr = np.abs(column)
+            digit_count_arr = np.maximum(np.searchsorted(POW10_ARR, abs_arr, side="right"), 1)
+            max_digit_count = int(digit_count_arr.max()) if row_count else 1
+            if max_digit_count < 10:
+                # division is faster on smaller integers 
+                abs_arr = abs_arr.astype(np.uint32)
+            layout_list.append((abs_arr, neg_flag_arr if neg_flag_arr.any() else None, digit_count_arr, width))
+            width += max_digit_count + 2
+
+    # Each field is written to a fixed-width slot of the character matrix. The matrix is stored 
+    # one slot per row so that each write is contiguous. Leading zeros, unused sign characters 
+    # are then dropped by the mask. 
+    char_mat = np.empty((width, row_count), dtype=np.uint8)
+    keep_mat = np.ones((width, row_count), dtype=bool)
+    for column_index, (value_arr, neg_flag_arr, digit_count_arr, start) in enumerate(layout_list):
+        if digit_count_arr is None:
+            end = start + 1 
+            char_mat[start] = value_arr
+        else:
+            max_digit_count = int(digit_count_arr.max()) if row_count else 1
+            end = start + 1 + max_digit_count
+            char_mat[start] = ord('-')
+            keep_mat[start] = False if neg_flag_arr is None else neg_flag_arr
+            cur_arr = value_arr.copy()
+            for char_index in range(end - 1, start, -1):
+                quotient_arr = cur_arr // 10
+                char_mat[char_index] = cur_arr - quotient_arr * 10 + ord('0')
+                cur_arr = quotient_arr
+
+            leading_zero_count_arr = max_digit_count - digit_count_arr
+            for digit_index in range(max_digit_count - 1):
+                keep_mat[start + 1 + digit_index] = leading_zero_count_arr <= digit_index
+        char_mat[end] = ord(',') if column_index < len(layout_list) - 1 else ord('\n')
+    return char_mat.T[keep_mat.T].tobytes()
 
 
 class CPReader(Reader):
@@ -68,7 +128,7 @@ class CPReader(Reader):
 
             if 'block_size' in kwargs:
                 block_size = int(kwargs['block_size'])
-                cache_access_feature_tuple = get_cache_access_features(block_req["lba"], self.lba_size_byte, block_req["size"], block_size)
+                cache_access_feature_tuple = Reader.get_cache_access_features(block_req["lba"], self.lba_size_byte, block_req["size"], block_size)
                 block_req["start_block"], block_req["end_block"], block_req["front_misalign"], block_req["rear_misalign"] = cache_access_feature_tuple
                 assert block_req["front_misalign"] < block_size and block_req["rear_misalign"] < block_size, \
                         "The misalignment cannot be greater than or equal to the cache block size, but found {} and {} with block size {}.".format(block_req["front_misalign"], block_req["rear_misalign"], block_size)
@@ -81,6 +141,36 @@ class CPReader(Reader):
         return block_req
 
     
+    def read_batches(
+            self, 
+            batch_size: int, 
+            block_size_byte: int = 4096
+    ) -> Iterator[np.ndarray]:
+        """Iterate over the block requests in the trace in batches. 
+
+        Args:
+            batch_size: Maximum number of block requests in a batch. 
+            block_size_byte: Size of a cache block used to compute the derived block features. (Default: 4096)
+        
+        Yields:
+            batch_arr: Structured array of dtype BATCH_DTYPE. 
+        """
+        for df in read_csv(self._trace_file_path, names=self.key_list, chunksize=batch_size):
+            ts_arr = df["ts"].to_numpy()
+            if self.start_time_ts == None:
+                self.start_time_ts = int(ts_arr[0])
+
+            if self._relative_time_flag:
+                ts_arr = ts_arr - self.start_time_ts
+
+            yield self.get_batch_arr(ts_arr, 
+                                        df["lba"].to_numpy(), 
+                                        df["op"].to_numpy(), 
+                                        df["size"].to_numpy(), 
+                                        self.lba_size_byte, 
+                                        block_size_byte)
+
+    
     def reset(self):
         """Reset the file handle of the trace to the beginning and class attributes."""
         self._trace_file_handle.seek(0)
@@ -138,20 +228,19 @@ class CPReader(Reader):
     def generate_cache_trace(
             self, 
             cache_trace_path: Path, 
-            block_size_byte: int = 4096
+            block_size_byte: int = 4096,
+            batch_size: int = 100000,
+            extent_flag: bool = False 
     ) -> None:
         """Generate cache trace from a block trace. 
         
         Args:
             cache_trace_path: Path to the new cache trace. 
             block_size_byte: Size of a block in cache. (Default: 4096)
+            batch_size: Number of block requests expanded to cache requests at a time. (Default: 100000)
+            extent_flag: Boolean flag indicating if the cache trace should have a line per extent of contiguous 
+                            blocks accessed instead of a line per block. (Default: False)
         """
-        self.reset()
-        block_req_count = 0 
-        cache_trace_handle = open(cache_trace_path, "w+")
-
-        block_req = self.get_next_block_req(block_size=block_size_byte)
-        prev_ts_us = block_req["ts"]
         """A cache trace has format: block_req_index, iat, block_key, op, front misalign, rear misalign. 
             - "block_req_index" identifies requests to cache that belong to the same block request. 
                 This attribute is useful when converting a cache trace to a sample block trace. 
@@ -161,54 +250,23 @@ class CPReader(Reader):
             - "op" is the operation 
             - "front misalign" represents the misalignment in the first block. 
             - "rear misalign" represents the misalignment in the rear block. 
+        
+        An extent cache trace has format: block_req_index, iat, block_key, block_count, op, front misalign, rear misalign.
+            - "block_key" is the key of the first block of the extent. 
+            - "block_count" is the number of contiguous blocks in the extent. 
+            - "front misalign" and "rear misalign" represent the misalignment in the first and last block of the extent. 
+        Expanding each extent to "block_count" lines, where only the first line has the front misalignment and only
+        the last line has the rear misalignment, generates the cache trace. 
         """ 
-        while block_req:
-            block_req_count += 1
-            block_iat_us = block_req["ts"] - prev_ts_us
-            block_op = block_req["op"]
-            block_count = block_req["end_block"] + 1 - block_req["start_block"]
-
-            if block_count == 1:
-                if block_op == 'w' and (block_req["front_misalign"] > 0 or block_req["rear_misalign"] > 0):
-                    cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, 
-                                                                            block_iat_us, 
-                                                                            block_req["start_block"], 
-                                                                            'r', 
-                                                                            block_req["front_misalign"], 
-                                                                            block_req["rear_misalign"]))
-                        
-                cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, 
-                                                                        block_iat_us, 
-                                                                        block_req["start_block"], 
-                                                                        block_op, 
-                                                                        block_req["front_misalign"], 
-                                                                        block_req["rear_misalign"]))
-            else:
-                if block_op == 'w':
-                    if block_req["front_misalign"] > 0:
-                        cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, 
-                                                                                block_iat_us, 
-                                                                                block_req["start_block"], 
-                                                                                'r', 
-                                                                                block_req["front_misalign"], 
-                                                                                0))
-
-                    if block_req["rear_misalign"] > 0:
-                        cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, 
-                                                                                block_iat_us, 
-                                                                                block_req["end_block"], 
-                                                                                'r', 
-                                                                                0, 
-                                                                                block_req["rear_misalign"]))
-
-                for block_key in range(block_req["start_block"], block_req["end_block"]+1):
-                    if block_key == block_req["start_block"]:
-                        cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_key, block_op, block_req["front_misalign"], 0))
-                    elif block_key == block_req["end_block"]:
-                        cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_key, block_op, 0, block_req["rear_misalign"]))
-                    else:
-                        cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_key, block_op, 0, 0))
-
-            prev_ts_us = block_req["ts"]
-            block_req = self.get_next_block_req(block_size=block_size_byte)
-        cache_trace_handle.close()
\ No newline at end of file
+        self.reset()
+        block_req_count = 0 
+        prev_ts_us = None 
+        with open(cache_trace_path, "wb+") as cache_trace_handle:
+            for batch_arr in self.read_batches(batch_size, block_size_byte=block_size_byte):
+                if extent_flag:
+                    cache_req_arr = self.get_cache_extent_arr(batch_arr, start_req_index=block_req_count+1, prev_ts=prev_ts_us)
+                else:
+                    cache_req_arr = self.get_cache_req_arr(batch_arr, start_req_index=block_req_count+1, prev_ts=prev_ts_us)
+                cache_trace_handle.write(get_csv_bytes([cache_req_arr[field_name] for field_name in cache_req_arr.dtype.names]))
+                block_req_count += len(batch_arr)
+                prev_ts_us = batch_arr["ts"][-1]
\ No newline at end of file
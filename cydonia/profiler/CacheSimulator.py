@@ -0,0 +1,570 @@
+"""CacheSimulator replays cache block accesses through caches of several replacement policies and
+sizes at once and counts the hits of each operation.
+
+Block addresses are mapped to dense block ids starting at 1 so that the state of a cache is stored in
+Python lists indexed by block id instead of dictionaries of objects. Id 0 is reserved for the sentinel
+node of the intrusive doubly linked lists. The policies are:
+  - lru: doubly linked list with the most recently used block next to the sentinel.
+  - fifo: circular buffer of the blocks in order of insertion.
+  - clock: circular buffer and a reference bit per block. A block is inserted with its bit clear.
+  - arc: Adaptive Replacement Cache (Megiddo and Modha, FAST 2003) with four linked lists.
+Every access allocates its block in the cache so a write to a cached block is a hit. A read generated
+by a misaligned write (read-modify-write or RMW read) is counted as a read and also separately.
+
+Usage:
+    cache_simulator = CacheSimulator(["lru", "fifo"], [1024, 4096])
+    stat_df = cache_simulator.track_cache_trace(CacheTraceReader(cache_trace_path))
+"""
+
+import numpy as np
+import pandas as pd
+
+from cydonia.profiler.Reader import Reader
+
+
+class BlockIdMap:
+    def __init__(self) -> None:
+        """ This class maps block addresses to dense block ids starting at 1 in order of first access."""
+        # sorted array of each block address seen and its dense block id
+        self._addr_arr = np.zeros(0, dtype=np.int64)
+        self._id_arr = np.zeros(0, dtype=np.int64)
+
+
+    def __len__(self) -> int:
+        """Number of block addresses mapped."""
+        return len(self._addr_arr)
+
+
+    def get_id_arr(self, addr_arr: np.ndarray) -> np.ndarray:
+        """Get the dense block id of each block address and assign ids to new block addresses.
+
+        Args:
+            addr_arr: Array of block addresses.
+
+        Returns:
+            id_arr: Array of block id of each address.
+        """
+        unique_addr_arr, inverse_arr = np.unique(np.asarray(addr_arr, dtype=np.int64), return_inverse=True)
+        state_index_arr = np.searchsorted(self._addr_arr, unique_addr_arr)
+        found_flag_arr = state_index_arr < len(self._addr_arr)
+        found_flag_arr[found_flag_arr] = self._addr_arr[state_index_arr[found_flag_arr]] == unique_addr_arr[found_flag_arr]
+
+        unique_id_arr = np.zeros(len(unique_addr_arr), dtype=np.int64)
+        unique_id_arr[found_flag_arr] = self._id_arr[state_index_arr[found_flag_arr]]
+        new_id_arr = np.arange(len(self._addr_arr) + 1, len(self._addr_arr) + 1 + (~found_flag_arr).sum(), dtype=np.int64)
+        unique_id_arr[~found_flag_arr] = new_id_arr
+        self._addr_arr = np.insert(self._addr_arr, state_index_arr[~found_flag_arr], unique_addr_arr[~found_flag_arr])
+        self._id_arr = np.insert(self._id_arr, state_index_arr[~found_flag_arr], new_id_arr)
+        return unique_id_arr[inverse_arr.reshape(-1)]
+
+
+class LRUCache:
+    def __init__(self, size: int) -> None:
+        """ This class simulates an LRU cache in a doubly linked list indexed by block id.
+
+        Args:
+            size: Size of the cache in blocks.
+        """
+        self.size = size
+        self._count = 0
+        self._prev_list = [0]
+        self._next_list = [0]
+        self._cache_flag_list = [0]
+
+
+    def __len__(self) -> int:
+        """Number of blocks in the cache."""
+        return self._count
+
+
+    def grow(self, block_count: int) -> None:
+        """Grow the state so that it can store block ids below block_count."""
+        extend_count = block_count - len(self._cache_flag_list)
+        if extend_count > 0:
+            for state_list in [self._prev_list, self._next_list, self._cache_flag_list]:
+                state_list.extend([0] * extend_count)
+
+
+    def access_list(self, id_list: list) -> list:
+        """Access a list of block ids in order.
+
+        Args:
+            id_list: List of block ids accessed.
+
+        Returns:
+            hit_index_list: List of index of each access that hit the cache.
+        """
+        hit_index_list = []
+        if self.size <= 0:
+            return hit_index_list
+        prev_list, next_list, cache_flag_list = self._prev_list, self._next_list, self._cache_flag_list
+        append = hit_index_list.append
+        size, count = self.size, self._count
+        for index, block_id in enumerate(id_list):
+            if cache_flag_list[block_id]:
+                append(index)
+                prev_id = prev_list[block_id]
+                if prev_id == 0:
+                    continue
+                next_id = next_list[block_id]
+                next_list[prev_id] = next_id
+                prev_list[next_id] = prev_id
+            elif count == size:
+                evict_id = prev_list[0]
+                evict_prev_id = prev_list[evict_id]
+                next_list[evict_prev_id] = 0
+                prev_list[0] = evict_prev_id
+                cache_flag_list[evict_id] = 0
+                cache_flag_list[block_id] = 1
+            else:
+                count += 1
+                cache_flag_list[block_id] = 1
+            # the block becomes the most recently used
+            head_id = next_list[0]
+            next_list[block_id] = head_id
+            prev_list[head_id] = block_id
+            prev_list[block_id] = 0
+            next_list[0] = block_id
+        self._count = count
+        return hit_index_list
+
+
+class FIFOCache:
+    def __init__(self, size: int) -> None:
+        """ This class simulates a FIFO cache in a circular buffer of block ids.
+
+        Args:
+            size: Size of the cache in blocks.
+        """
+        self.size = size
+        self._count = 0
+        self._buffer_list = [0] * max(size, 0)
+        self._pointer = 0
+        self._cache_flag_list = [0]
+
+
+    def __len__(self) -> int:
+        """Number of blocks in the cache."""
+        return self._count
+
+
+    def grow(self, block_count: int) -> None:
+        """Grow the state so that it can store block ids below block_count."""
+        extend_count = block_count - len(self._cache_flag_list)
+        if extend_count > 0:
+            self._cache_flag_list.extend([0] * extend_count)
+
+
+    def access_list(self, id_list: list) -> list:
+        """Access a list of block ids in order.
+
+        Args:
+            id_list: List of block ids accessed.
+
+        Returns:
+            hit_index_list: List of index of each access that hit the cache.
+        """
+        hit_index_list = []
+        if self.size <= 0:
+            return hit_index_list
+        buffer_list, cache_flag_list = self._buffer_list, self._cache_flag_list
+        append = hit_index_list.append
+        size, pointer = self.size, self._pointer
+        for index, block_id in enumerate(id_list):
+            if cache_flag_list[block_id]:
+                append(index)
+                continue
+            # the oldest block is replaced, id 0 is an empty slot
+            cache_flag_list[buffer_list[pointer]] = 0
+            buffer_list[pointer] = block_id
+            cache_flag_list[block_id] = 1
+            pointer += 1
+            if pointer == size:
+                pointer = 0
+        cache_flag_list[0] = 0
+        self._pointer = pointer
+        self._count = min(self._count + len(id_list) - len(hit_index_list), size)
+        return hit_index_list
+
+
+class ClockCache:
+    def __init__(self, size: int) -> None:
+        """ This class simulates a CLOCK cache in a circular buffer of block ids and reference bits.
+
+        Args:
+            size: Size of the cache in blocks.
+        """
+        self.size = size
+        self._count = 0
+        self._buffer_list = [0] * max(size, 0)
+        self._hand = 0
+        self._cache_flag_list = [0]
+        self._ref_flag_list = [0]
+
+
+    def __len__(self) -> int:
+        """Number of blocks in the cache."""
+        return self._count
+
+
+    def grow(self, block_count: int) -> None:
+        """Grow the state so that it can store block ids below block_count."""
+        extend_count = block_count - len(self._cache_flag_list)
+        if extend_count > 0:
+            self._cache_flag_list.extend([0] * extend_count)
+            self._ref_flag_list.extend([0] * extend_count)
+
+
+    def access_list(self, id_list: list) -> list:
+        """Access a list of block ids in order.
+
+        Args:
+            id_list: List of block ids accessed.
+
+        Returns:
+            hit_index_list: List of index of each access that hit the cache.
+        """
+        hit_index_list = []
+        if self.size <= 0:
+            return hit_index_list
+        buffer_list, cache_flag_list, ref_flag_list = self._buffer_list, self._cache_flag_list, self._ref_flag_list
+        append = hit_index_list.append
+        size, hand = self.size, self._hand
+        for index, block_id in enumerate(id_list):
+            if cache_flag_list[block_id]:
+                append(index)
+                ref_flag_list[block_id] = 1
+                continue
+            # the hand clears reference bits until it finds a block that was not referenced
+            evict_id = buffer_list[hand]
+            while ref_flag_list[evict_id]:
+                ref_flag_list[evict_id] = 0
+                hand += 1
+                if hand == size:
+                    hand = 0
+                evict_id = buffer_list[hand]
+            cache_flag_list[evict_id] = 0
+            buffer_list[hand] = block_id
+            cache_flag_list[block_id] = 1
+            hand += 1
+            if hand == size:
+                hand = 0
+        cache_flag_list[0] = 0
+        self._hand = hand
+        self._count = min(self._count + len(id_list) - len(hit_index_list), size)
+        return hit_index_list
+
+
+# list of ARCCache where the sentinel node of list L is node L and the node of block id b is b + ARC_LIST_COUNT - 1
+ARC_T1, ARC_T2, ARC_B1, ARC_B2 = 0, 1, 2, 3
+ARC_LIST_COUNT = 4
+
+
+class ARCCache:
+    def __init__(self, size: int) -> None:
+        """ This class simulates an ARC cache with lists T1 and T2 of cached blocks and lists B1 and B2
+        of blocks recently evicted from T1 and T2.
+
+        Args:
+            size: Size of the cache in blocks.
+
+        Attributes:
+            p: Target size of T1.
+        """
+        self.size = size
+        self.p = 0.0
+        self._prev_list = list(range(ARC_LIST_COUNT))
+        self._next_list = list(range(ARC_LIST_COUNT))
+        # list of each node, -1 if the block is in no list
+        self._loc_list = list(range(ARC_LIST_COUNT))
+        self._len_list = [0] * ARC_LIST_COUNT
+
+
+    def __len__(self) -> int:
+        """Number of blocks in the cache."""
+        return self._len_list[ARC_T1] + self._len_list[ARC_T2]
+
+
+    def grow(self, block_count: int) -> None:
+        """Grow the state so that it can store block ids below block_count."""
+        extend_count = block_count + ARC_LIST_COUNT - 1 - len(self._loc_list)
+        if extend_count > 0:
+            self._prev_list.extend([0] * extend_count)
+            self._next_list.extend([0] * extend_count)
+            self._loc_list.extend([-1] * extend_count)
+
+
+    def _remove(self, node: int) -> None:
+        """Remove a node from its list."""
+        prev_node, next_node = self._prev_list[node], self._next_list[node]
+        self._next_list[prev_node] = next_node
+        self._prev_list[next_node] = prev_node
+        self._len_list[self._loc_list[node]] -= 1
+        self._loc_list[node] = -1
+
+
+    def _push(self, node: int, loc: int) -> None:
+        """Add a node as the most recently used node of a list."""
+        head_node = self._next_list[loc]
+        self._next_list[node] = head_node
+        self._prev_list[head_node] = node
+        self._prev_list[node] = loc
+        self._next_list[loc] = node
+        self._loc_list[node] = loc
+        self._len_list[loc] += 1
+
+
+    def _replace(self, in_b2: bool) -> None:
+        """Move the least recently used block of T1 or T2 to B1 or B2."""
+        t1_len = self._len_list[ARC_T1]
+        if t1_len and ((in_b2 and t1_len == self.p) or t1_len > self.p):
+            node = self._prev_list[ARC_T1]
+            self._remove(node)
+            self._push(node, ARC_B1)
+        else:
+            node = self._prev_list[ARC_T2]
+            self._remove(node)
+            self._push(node, ARC_B2)
+
+
+    def access_list(self, id_list: list) -> list:
+        """Access a list of block ids in order.
+
+        Args:
+            id_list: List of block ids accessed.
+
+        Returns:
+            hit_index_list: List of index of each access that hit the cache.
+        """
+        hit_index_list = []
+        if self.size <= 0:
+            return hit_index_list
+        loc_list, len_list, prev_list, next_list = self._loc_list, self._len_list, self._prev_list, self._next_list
+        remove, push, replace = self._remove, self._push, self._replace
+        append = hit_index_list.append
+        size = self.size
+        node_offset = ARC_LIST_COUNT - 1
+        for index, block_id in enumerate(id_list):
+            node = block_id + node_offset
+            loc = loc_list[node]
+            if loc == ARC_T1 or loc == ARC_T2:
+                # a hit moves the block to the head of T2, inlined as it is the most frequent case
+                append(index)
+                prev_node, next_node = prev_list[node], next_list[node]
+                next_list[prev_node] = next_node
+                prev_list[next_node] = prev_node
+                if loc == ARC_T1:
+                    len_list[ARC_T1] -= 1
+                    len_list[ARC_T2] += 1
+                    loc_list[node] = ARC_T2
+                head_node = next_list[ARC_T2]
+                next_list[node] = head_node
+                prev_list[head_node] = node
+                prev_list[node] = ARC_T2
+                next_list[ARC_T2] = node
+            elif loc == ARC_B1:
+                self.p = min(size, self.p + max(len_list[ARC_B2]/len_list[ARC_B1], 1))
+                replace(False)
+                remove(node)
+                push(node, ARC_T2)
+            elif loc == ARC_B2:
+                self.p = max(0, self.p - max(len_list[ARC_B1]/len_list[ARC_B2], 1))
+                replace(True)
+                remove(node)
+                push(node, ARC_T2)
+            else:
+                l1_len = len_list[ARC_T1] + len_list[ARC_B1]
+                if l1_len == size:
+                    if len_list[ARC_T1] < size:
+                        remove(prev_list[ARC_B1])
+                        replace(False)
+                    else:
+                        remove(prev_list[ARC_T1])
+                elif len_list[ARC_T1] + len_list[ARC_T2] + len_list[ARC_B1] + len_list[ARC_B2] >= size:
+                    if len_list[ARC_T1] + len_list[ARC_T2] + len_list[ARC_B1] + len_list[ARC_B2] == 2 * size:
+                        remove(prev_list[ARC_B2])
+                    replace(False)
+                push(node, ARC_T1)
+        return hit_index_list
+
+
+POLICY_CLASS_DICT = {
+    "lru": LRUCache,
+    "fifo": FIFOCache,
+    "clock": ClockCache,
+    "arc": ARCCache
+}
+
+
+class CacheSimulator:
+    def __init__(
+            self,
+            policy_list: list,
+            size_list: list
+    ) -> None:
+        """ This class simulates a cache of each policy and size on the same stream of block accesses.
+
+        Args:
+            policy_list: List of names of policies in POLICY_CLASS_DICT.
+            size_list: List of cache sizes in blocks.
+
+        Attributes:
+            access_count: Number of accesses simulated.
+            read_count: Number of read accesses simulated.
+            rmw_read_count: Number of read accesses generated by misaligned writes.
+
+        Raises:
+            ValueError: If a policy is not in POLICY_CLASS_DICT.
+        """
+        for policy in policy_list:
+            if policy not in POLICY_CLASS_DICT:
+                raise ValueError("Unknown policy {}, should be one of {}.".format(policy, list(POLICY_CLASS_DICT.keys())))
+        self.policy_list = list(policy_list)
+        self.size_list = [int(size) for size in size_list]
+        self.access_count = 0
+        self.read_count = 0
+        self.rmw_read_count = 0
+        self._cache_dict = {(policy, size): POLICY_CLASS_DICT[policy](size) for policy in self.policy_list for size in self.size_list}
+        # count of read, write and RMW read hits of each cache
+        self._hit_count_dict = {cache_key: np.zeros(3, dtype=np.int64) for cache_key in self._cache_dict}
+
+        self._block_id_map = BlockIdMap()
+
+
+    def __len__(self) -> int:
+        """Number of distinct blocks accessed."""
+        return len(self._block_id_map)
+
+
+    def get_id_arr(self, addr_arr: np.ndarray) -> np.ndarray:
+        """Get the dense block id of each block address and assign ids to new block addresses.
+
+        Args:
+            addr_arr: Array of block addresses.
+
+        Returns:
+            id_arr: Array of block id of each address.
+        """
+        return self._block_id_map.get_id_arr(addr_arr)
+
+
+    @staticmethod
+    def get_rmw_flag_arr(cache_req_arr: np.ndarray) -> np.ndarray:
+        """Get the flag of each cache request that is a read generated by a misaligned write. The cache
+        requests of a block request are adjacent and its own operation is that of its last cache request.
+
+        Args:
+            cache_req_arr: Structured array of dtype CACHE_REQ_DTYPE.
+
+        Returns:
+            rmw_flag_arr: Array of flags that are True for reads generated by a misaligned write.
+        """
+        if not len(cache_req_arr):
+            return np.zeros(0, dtype=bool)
+        req_index_arr = cache_req_arr["i"]
+        group_end_flag_arr = np.ones(len(req_index_arr), dtype=bool)
+        group_end_flag_arr[:-1] = req_index_arr[1:] != req_index_arr[:-1]
+        group_arr = np.cumsum(np.concatenate(([False], group_end_flag_arr[:-1])))
+        block_op_arr = cache_req_arr["op"][group_end_flag_arr][group_arr]
+        return (cache_req_arr["op"] == 'r') & (block_op_arr == 'w')
+
+
+    def track_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray,
+            rmw_flag_arr: np.ndarray = None
+    ) -> None:
+        """Simulate an array of block accesses on every cache.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+            rmw_flag_arr: Array of flags that are True for reads generated by a misaligned write. (Default: None)
+        """
+        op_arr = np.asarray(op_arr)
+        read_flag_arr = op_arr == 'r'
+        if not (read_flag_arr | (op_arr == 'w')).all():
+            raise ValueError("Unindentified value for operation: {}".format(op_arr[~(read_flag_arr | (op_arr == 'w'))][0]))
+        rmw_flag_arr = np.zeros(len(op_arr), dtype=bool) if rmw_flag_arr is None else np.asarray(rmw_flag_arr, dtype=bool)
+        self.access_count += len(op_arr)
+        self.read_count += int(read_flag_arr.sum())
+        self.rmw_read_count += int(rmw_flag_arr.sum())
+
+        id_list = self.get_id_arr(addr_arr).tolist()
+        block_count = len(self._block_id_map) + 1
+        for cache_key, cache in self._cache_dict.items():
+            cache.grow(block_count)
+            hit_index_arr = np.array(cache.access_list(id_list), dtype=np.int64)
+            read_hit_count = int(read_flag_arr[hit_index_arr].sum())
+            self._hit_count_dict[cache_key] += [read_hit_count, len(hit_index_arr) - read_hit_count, int(rmw_flag_arr[hit_index_arr].sum())]
+
+
+    def get_stat_df(self) -> pd.DataFrame:
+        """Get a DataFrame of the hit counts and hit ratios of each cache.
+
+        Returns:
+            stat_df: DataFrame with a row per policy and size.
+        """
+        write_count = self.access_count - self.read_count
+        stat_list = []
+        for (policy, size), hit_count_arr in self._hit_count_dict.items():
+            read_hit_count, write_hit_count, rmw_read_hit_count = hit_count_arr.tolist()
+            stat_list.append({
+                "policy": policy,
+                "size": size,
+                "read_count": self.read_count,
+                "write_count": write_count,
+                "rmw_read_count": self.rmw_read_count,
+                "read_hit_count": read_hit_count,
+                "write_hit_count": write_hit_count,
+                "rmw_read_hit_count": rmw_read_hit_count,
+                "read_miss_count": self.read_count - read_hit_count,
+                "write_miss_count": write_count - write_hit_count,
+                "rmw_read_miss_count": self.rmw_read_count - rmw_read_hit_count,
+                "hit_ratio": (read_hit_count + write_hit_count)/self.access_count if self.access_count else 0.0,
+                "read_hit_ratio": read_hit_count/self.read_count if self.read_count else 0.0
+            })
+        return pd.DataFrame(stat_list)
+
+
+    def track_cache_trace(
+            self,
+            cache_trace_reader,
+            batch_size: int = 1000000
+    ) -> pd.DataFrame:
+        """Simulate every cache request of a cache trace.
+
+        Args:
+            cache_trace_reader: CacheTraceReader of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+
+        Returns:
+            stat_df: DataFrame of the hit counts and hit ratios of each cache.
+        """
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"], self.get_rmw_flag_arr(cache_req_arr))
+        return self.get_stat_df()
+
+
+    def track_block_trace(
+            self,
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> pd.DataFrame:
+        """Simulate the cache requests generated by each block request of a block trace.
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+
+        Returns:
+            stat_df: DataFrame of the hit counts and hit ratios of each cache.
+        """
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            cache_req_arr = Reader.get_cache_req_arr(batch_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"], self.get_rmw_flag_arr(cache_req_arr))
+        return self.get_stat_df()
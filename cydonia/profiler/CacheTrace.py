@@ -1,55 +1,142 @@
-""" CacheTrace loads a cache trace generated from a block trace using BlockTraceReader.
+""" CacheTrace loads a cache trace generated from a block trace using BlockTraceReader. Both the cache
+trace with a line per block and the extent cache trace with a line per extent of contiguous blocks 
+are supported. The format is identified from the number of fields in the first line. 
 
 Usage:
     cache_trace = CacheTrace(cache_trace_path)
 """
-from copy import deepcopy
 from enum import Enum
-from typing import List
+from typing import List, Iterator
+from itertools import product 
 from pathlib import Path 
 from pandas import read_csv, DataFrame
-from numpy import ndarray, zeros 
+from numpy import ndarray, zeros, empty, fromiter, fromfile, memmap, int64, lexsort, sort, searchsorted, minimum, arange, asarray, count_nonzero, unique, repeat, bincount, ones, concatenate, cumsum, diff, flatnonzero, where, add, maximum, dtype
 from time import perf_counter_ns
-from queue import PriorityQueue
-import mmh3
+from json import dumps
 
 from cydonia.profiler.BlockTrace import ReaderConfig
+from cydonia.profiler.Hash import MMH3_MODE, NATIVE_MODE, HASH_MODE_LIST, mmh3_hash128_arr, native_hash64_arr, get_hash_order
+from cydonia.profiler.Reader import Reader, CACHE_EXTENT_DTYPE
+from cydonia.profiler.CPReader import get_csv_bytes
 
-from cydonia.profiler.WorkloadStats import WorkloadStats, BlockRequest
+from cydonia.profiler.Shards import FixedSizeRegionSet
+from cydonia.profiler.WorkloadStats import WorkloadStats, BlockRequest, NpEncoder
+
+
+# dtype of the structured arrays of block requests returned by CacheTraceReader.get_block_req_batch
+BLOCK_REQ_DTYPE = dtype([("i", "<i8"),
+                            ("ts", "<i8"),
+                            ("lba", "<i8"),
+                            ("op", "U1"),
+                            ("size", "<i8")])
 
 
 class HASH_FILE_CONFIG(Enum):
     ADDR_HEADER_NAME = "addr"
     HASH_HEADER_NAME = "hash"
     HASH_FILE_HEADER_NAME_ARR = ["hash", "addr"]
+    TEXT_SUFFIX = ".csv"
+    MAGIC = b"CYDHF"
+    VERSION = 1
+    HEADER_SIZE_BYTE = 64
+
+
+# header of a binary hash file that is followed by an array of HASH_RECORD_DTYPE sorted by hash
+HASH_FILE_HEADER_DTYPE = dtype([("magic", "S8"),
+                                ("version", "<u4"),
+                                ("num_lower_addr_bits_ignored", "<u4"),
+                                ("mode", "S8"),
+                                ("seed", "<u8"),
+                                ("addr_count", "<u8")])
+# a native mode hash is stored in hash_hi with hash_lo set to 0
+HASH_RECORD_DTYPE = dtype([("hash_hi", "<u8"),
+                            ("hash_lo", "<u8"),
+                            ("addr", "<i8")])
 
 
 class HashFile:
+    """ A file of addresses sorted by their hash value. A path with suffix TEXT_SUFFIX is a text file
+    with a line per address: hash, addr. Any other path is a binary file with a header recording the 
+    seed, hash mode and number of lower address bits ignored followed by an array of HASH_RECORD_DTYPE. 
+    """
     def __init__(self, file_path: Path):
-        self._path = file_path 
+        self._path = Path(file_path)
         self._df = None 
+        self._record_arr = None 
+        self.seed = None 
+        self.mode = None 
+        self.num_lower_addr_bits_ignored = None 
+
+    def is_text(self) -> bool:
+        return self._path.suffix == HASH_FILE_CONFIG.TEXT_SUFFIX.value
 
-    def get_hash_priority_queue(
-            self,
-            unique_addr_set: set, 
-            random_seed: int 
-    ) -> PriorityQueue:
-        queue = PriorityQueue()
-        for addr in unique_addr_set:
-            queue.put((mmh3.hash128(str(addr), signed=False, seed=random_seed), addr))
-        return queue 
-    
     def load(self):
-        header_name_arr = HASH_FILE_CONFIG.HASH_FILE_HEADER_NAME_ARR.value
-        df = read_csv(self._path, names=header_name_arr)
-        self._df = df.sort_values(by=[HASH_FILE_CONFIG.HASH_HEADER_NAME.value])
+        if self.is_text():
+            header_name_arr = HASH_FILE_CONFIG.HASH_FILE_HEADER_NAME_ARR.value
+            df = read_csv(self._path, names=header_name_arr)
+            self._df = df.sort_values(by=[HASH_FILE_CONFIG.HASH_HEADER_NAME.value])
+            return 
+
+        header = fromfile(self._path, dtype=HASH_FILE_HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != HASH_FILE_CONFIG.MAGIC.value or header["version"][0] != HASH_FILE_CONFIG.VERSION.value:
+            raise ValueError("File {} is not a binary hash file of version {}.".format(self._path, HASH_FILE_CONFIG.VERSION.value))
+        self.seed = int(header["seed"][0])
+        self.mode = header["mode"][0].decode()
+        self.num_lower_addr_bits_ignored = int(header["num_lower_addr_bits_ignored"][0])
+        addr_count = int(header["addr_count"][0])
+        if addr_count > 0:
+            self._record_arr = memmap(self._path, dtype=HASH_RECORD_DTYPE, mode="r", offset=HASH_FILE_CONFIG.HEADER_SIZE_BYTE.value, shape=(addr_count,))
+        else:
+            self._record_arr = empty(0, dtype=HASH_RECORD_DTYPE)
+    
+    def get_addr_arr(self) -> ndarray:
+        """ Get the array of addresses in increasing order of hash value from the loaded hash file. """
+        if self._record_arr is not None:
+            return self._record_arr["addr"]
+        return self._df[HASH_FILE_CONFIG.ADDR_HEADER_NAME.value].to_numpy()
     
-    def create(self, unique_addr_set: set, random_seed: int):
-        hash_queue = self.get_hash_priority_queue(unique_addr_set, random_seed)
-        with self._path.open("w+") as output_file_handle:
-            while not hash_queue.empty():
-                hash, addr = hash_queue.get()
-                output_file_handle.write("{},{}\n".format(hash, addr))
+    @staticmethod
+    def get_hash_record_arr(addr_arr: ndarray, random_seed: int, mode: str = MMH3_MODE) -> ndarray:
+        """ Get the array of hash records of addresses sorted by hash value and then address. 
+
+        Raises:
+            ValueError: If the hash mode is not recognized.
+        """
+        record_arr = empty(len(addr_arr), dtype=HASH_RECORD_DTYPE)
+        record_arr["addr"] = addr_arr
+        if mode == MMH3_MODE:
+            record_arr["hash_hi"], record_arr["hash_lo"] = mmh3_hash128_arr(addr_arr, random_seed)
+        elif mode == NATIVE_MODE:
+            record_arr["hash_hi"], record_arr["hash_lo"] = native_hash64_arr(addr_arr, random_seed), 0 
+        else:
+            raise ValueError("Unrecognized hash mode {}, allowed {}.".format(mode, HASH_MODE_LIST))
+        return record_arr[lexsort((record_arr["addr"], record_arr["hash_lo"], record_arr["hash_hi"]))]
+    
+    def create(
+            self, 
+            unique_addr_set: set, 
+            random_seed: int, 
+            mode: str = MMH3_MODE,
+            num_lower_addr_bits_ignored: int = 0 
+    ):
+        addr_arr = fromiter(unique_addr_set, dtype=int64, count=len(unique_addr_set))
+        record_arr = self.get_hash_record_arr(addr_arr, random_seed, mode)
+        if self.is_text():
+            if mode == MMH3_MODE:
+                hash_list = [(hash_hi << 64) | hash_lo for hash_hi, hash_lo in zip(record_arr["hash_hi"].tolist(), record_arr["hash_lo"].tolist())]
+            else:
+                hash_list = record_arr["hash_hi"].tolist()
+            with self._path.open("w+") as output_file_handle:
+                for hash, addr in zip(hash_list, record_arr["addr"].tolist()):
+                    output_file_handle.write("{},{}\n".format(hash, addr))
+        else:
+            header = zeros(1, dtype=HASH_FILE_HEADER_DTYPE)
+            header["magic"], header["version"] = HASH_FILE_CONFIG.MAGIC.value, HASH_FILE_CONFIG.VERSION.value
+            header["num_lower_addr_bits_ignored"], header["mode"] = num_lower_addr_bits_ignored, mode.encode()
+            header["seed"], header["addr_count"] = random_seed, len(record_arr)
+            with self._path.open("wb") as output_file_handle:
+                output_file_handle.write(header.tobytes().ljust(HASH_FILE_CONFIG.HEADER_SIZE_BYTE.value, b"\x00"))
+                output_file_handle.write(record_arr.tobytes())
 
 
 class CacheTraceReader:
@@ -59,7 +146,9 @@ class CacheTraceReader:
             config: ReaderConfig = ReaderConfig()
     ) -> None:
         self._config = config 
-        self._header = config.get_cache_trace_header()
+        self._path = file_path 
+        self._extent_flag = self.is_extent_trace(file_path, config)
+        self._header = config.get_cache_extent_trace_header() if self._extent_flag else config.get_cache_trace_header()
         self._index_map = {
             self._config.iat_header_name: self._header.index(self._config.iat_header_name),
             self._config.req_index_header_name: self._header.index(self._config.req_index_header_name),
@@ -68,34 +157,132 @@ class CacheTraceReader:
             self._config.front_misalign_header_name: self._header.index(self._config.front_misalign_header_name),
             self._config.rear_misalign_header_name: self._header.index(self._config.rear_misalign_header_name)
         }
-        self._path = file_path 
+        if self._extent_flag:
+            self._index_map[self._config.cache_block_count_header_name] = self._header.index(self._config.cache_block_count_header_name)
         self._handle = file_path.open("r")
-        self._prev_cache_req = {}
         self._first_req = {}
+        # the batch of cache request groups from which get_next_cache_req_group_df returns groups 
+        self._group_batch_iter = None 
+        self._group_batch_arr = empty(0, dtype=CACHE_EXTENT_DTYPE)
+        self._group_start_arr = zeros(1, dtype=int)
+        self._group_index = 0 
+        # the extent being expanded to cache requests when reading an extent cache trace 
+        self._cur_extent = {}
+        self._cur_extent_offset = 0 
     
 
-    def get_stat(self, print_every_n: int = 1e6):
-        self.reset()
+    @staticmethod
+    def is_extent_trace(
+            file_path: Path, 
+            config: ReaderConfig
+    ) -> bool:
+        """ Check if a cache trace is an extent cache trace. 
+
+        Args:
+            file_path: Path of the cache trace.
+            config: Configuration to read the cache trace. 
+        
+        Returns:
+            extent_flag: True if the cache trace has a line per extent of contiguous blocks.
+        """
+        with file_path.open("r") as handle:
+            first_line = handle.readline().rstrip()
+        return len(first_line.split(config.delimiter)) == len(config.get_cache_extent_trace_header())
+    
+
+    def get_stat(
+            self, 
+            print_every_n: int = 1e6,
+            batch_size: int = 1000000
+    ) -> WorkloadStats:
+        """ Get the workload statistics of the block requests in this cache trace. 
+
+        Args:
+            print_every_n: Number of block requests processed between progress messages. (Default: 1e6)
+            batch_size: Number of lines read at a time. (Default: 1000000)
+        
+        Returns:
+            workload_stats: Workload statistics of the block requests. 
+        """
         start_time = perf_counter_ns()
         cur_ts = 0 
         block_req_processed = 0 
-        workload_stats = WorkloadStats()
-        cache_req_group_df = self.get_next_cache_req_group_df()
-        while len(cache_req_group_df):
-            block_req_arr = CacheTraceReader.get_block_req_arr(cache_req_group_df, cur_ts, self._config)
-            for block_req in block_req_arr:
-                workload_stats.track(block_req)
-                cur_ts = block_req.ts
-                block_req_processed += 1 
-                if block_req_processed % print_every_n == 0:
-                    print("{} requests processed in {} minutes.".format(block_req_processed, 
-                                                                            (perf_counter_ns()-start_time)/(1e9*60)))
-            cache_req_group_df = self.get_next_cache_req_group_df()
+        workload_stats = WorkloadStats(self._config.lba_size_byte, self._config.cache_block_size_byte)
+        for cache_extent_arr in self.read_group_batches(batch_size):
+            block_req_batch = self.get_block_req_batch(cache_extent_arr, cur_ts, self._config)
+            workload_stats.track_arrays(block_req_batch["ts"], 
+                                        block_req_batch["lba"], 
+                                        block_req_batch["op"] == self._config.write_str, 
+                                        block_req_batch["size"])
+            cur_ts = int(block_req_batch["ts"][-1])
+            prev_block_req_processed = block_req_processed
+            block_req_processed += len(block_req_batch)
+            if block_req_processed//print_every_n > prev_block_req_processed//print_every_n:
+                print("{} requests processed in {} minutes.".format(block_req_processed, 
+                                                                        (perf_counter_ns()-start_time)/(1e9*60)))
         return workload_stats
     
 
+    def read_group_batches(
+            self, 
+            batch_size: int = 1000000
+    ) -> Iterator[ndarray]:
+        """ Iterate over the cache trace in batches of cache extents where a batch only contains complete groups 
+        of cache extents originating from the same block request. A cache trace with a line per block has an 
+        extent of a single block in each line. 
+
+        Args:
+            batch_size: Number of lines read at a time. A batch can be larger if a group continues past the lines read. (Default: 1000000)
+        
+        Yields:
+            cache_extent_arr: Structured array of dtype CACHE_EXTENT_DTYPE. 
+        """
+        if self._path.stat().st_size == 0:
+            return 
+
+        header_name_arr = self._config.get_cache_extent_trace_header()
+        carry_arr = empty(0, dtype=CACHE_EXTENT_DTYPE)
+        for df in read_csv(self._path, names=self._header, chunksize=batch_size):
+            cache_extent_arr = empty(len(df), dtype=CACHE_EXTENT_DTYPE)
+            for field_name, header_name in zip(CACHE_EXTENT_DTYPE.names, header_name_arr):
+                cache_extent_arr[field_name] = df[header_name].to_numpy() if header_name in df else 1 
+            cache_extent_arr = concatenate((carry_arr, cache_extent_arr))
+
+            # the last group can continue in the next chunk so it is carried over 
+            last_group_start_index = self.get_group_start_arr(cache_extent_arr)[-1]
+            carry_arr = cache_extent_arr[last_group_start_index:]
+            if last_group_start_index > 0:
+                yield cache_extent_arr[:last_group_start_index]
+        
+        if len(carry_arr):
+            yield carry_arr
+    
+
+    def get_next_cache_extent(self):
+        """ Get next cache extent from the cache trace. A cache trace with a line per block has an 
+        extent of a single block in each line. """
+        cache_extent = {}
+        trace_line = self._handle.readline().rstrip()
+        if trace_line:
+            split_trace_line = trace_line.split(self._config.delimiter)
+            cache_extent[self._config.iat_header_name] = int(split_trace_line[self._index_map[self._config.iat_header_name]])
+            cache_extent[self._config.cache_addr_header_name] = int(split_trace_line[self._index_map[self._config.cache_addr_header_name]])
+            cache_extent[self._config.op_header_name] = split_trace_line[self._index_map[self._config.op_header_name]]
+            cache_extent[self._config.req_index_header_name] = int(split_trace_line[self._index_map[self._config.req_index_header_name]])
+            cache_extent[self._config.front_misalign_header_name] = int(split_trace_line[self._index_map[self._config.front_misalign_header_name]])
+            cache_extent[self._config.rear_misalign_header_name] = int(split_trace_line[self._index_map[self._config.rear_misalign_header_name]])
+            if self._extent_flag:
+                cache_extent[self._config.cache_block_count_header_name] = int(split_trace_line[self._index_map[self._config.cache_block_count_header_name]])
+            else:
+                cache_extent[self._config.cache_block_count_header_name] = 1 
+        return cache_extent
+    
+
     def get_next_cache_req(self):
         """ Get next cache request from the cache trace. """
+        if self._extent_flag:
+            return self.get_next_cache_req_from_extent()
+
         cache_req = {}
         trace_line = self._handle.readline().rstrip()
         if trace_line:
@@ -109,28 +296,41 @@ class CacheTraceReader:
         return cache_req 
     
 
-    def get_next_cache_req_group_df(self):
-        """ Get a DataFrame of next cache requests originating from the same block request. """
-        cache_req_arr = []
-
-        next_cache_req = self.get_next_cache_req()
-        if not next_cache_req and not self._prev_cache_req:
-            # if there is no previous or next request then we have run out of requests!
-            return cache_req_arr
-
-        if not self._prev_cache_req:
-            # first cache request 
-            self._prev_cache_req = deepcopy(next_cache_req)
-        else:
-            cache_req_arr.append(self._prev_cache_req)
-            
-        while next_cache_req and \
-                (next_cache_req[self._config.req_index_header_name] == self._prev_cache_req[self._config.req_index_header_name]):
-            cache_req_arr.append(next_cache_req)
-            next_cache_req = self.get_next_cache_req() 
+    def get_next_cache_req_from_extent(self):
+        """ Get next cache request by expanding the extents of an extent cache trace. """
+        block_count_header_name = self._config.cache_block_count_header_name
+        if not self._cur_extent or self._cur_extent_offset == self._cur_extent[block_count_header_name]:
+            self._cur_extent = self.get_next_cache_extent()
+            self._cur_extent_offset = 0 
+        
+        cache_req = {}
+        if self._cur_extent:
+            cache_req = self.get_extent_cache_req(self._cur_extent, self._cur_extent_offset, self._config)
+            self._cur_extent_offset += 1
+        return cache_req
+    
 
-        self._prev_cache_req = deepcopy(next_cache_req)
-        return DataFrame(cache_req_arr)
+    def get_next_cache_req_group_df(self):
+        """ Get a DataFrame of next cache requests originating from the same block request. The 
+        DataFrame of an extent cache trace has a row per extent. """
+        if self._group_batch_iter is None:
+            self._group_batch_iter = self.read_group_batches()
+
+        if self._group_index == len(self._group_start_arr) - 1:
+            self._group_batch_arr = next(self._group_batch_iter, empty(0, dtype=CACHE_EXTENT_DTYPE))
+            if not len(self._group_batch_arr):
+                # no more cache requests 
+                return []
+            self._group_start_arr = concatenate((self.get_group_start_arr(self._group_batch_arr), [len(self._group_batch_arr)]))
+            self._group_index = 0 
+        
+        group_arr = self._group_batch_arr[self._group_start_arr[self._group_index]:self._group_start_arr[self._group_index+1]]
+        self._group_index += 1
+        group_df = DataFrame.from_records(group_arr)
+        group_df.columns = self._config.get_cache_extent_trace_header()
+        if not self._extent_flag:
+            group_df = group_df.drop(columns=[self._config.cache_block_count_header_name])
+        return group_df
     
 
     def get_unique_block_addr_set(self, num_lower_addr_bits_ignored: int) -> set:
@@ -143,15 +343,35 @@ class CacheTraceReader:
             block_addr_set: Set of block addresses in the cache trace. 
         """
         self.reset()
-        cur_cache_req = self.get_next_cache_req()
+        cur_cache_extent = self.get_next_cache_extent()
         unique_block_set = set()
-        while cur_cache_req:
-            cur_addr = cur_cache_req[self._config.cache_addr_header_name] >> num_lower_addr_bits_ignored
-            unique_block_set.add(cur_addr)
-            cur_cache_req = self.get_next_cache_req()
+        while cur_cache_extent:
+            start_addr = cur_cache_extent[self._config.cache_addr_header_name]
+            end_addr = start_addr + cur_cache_extent[self._config.cache_block_count_header_name] - 1
+            unique_block_set.update(range(start_addr >> num_lower_addr_bits_ignored, (end_addr >> num_lower_addr_bits_ignored) + 1))
+            cur_cache_extent = self.get_next_cache_extent()
         return unique_block_set
     
 
+    def get_unique_block_addr_arr(
+            self, 
+            batch_size: int = 1000000
+    ) -> ndarray:
+        """ Get a sorted array of unique block addresses. 
+
+        Args:
+            batch_size: Number of lines read at a time. (Default: 1000000)
+        
+        Returns:
+            unique_block_addr_arr: Sorted array of block addresses in the cache trace. 
+        """
+        unique_block_addr_arr_list = [zeros(0, dtype=int64)]
+        for cache_extent_arr in self.read_group_batches(batch_size):
+            end_addr_arr = cache_extent_arr["addr"] + cache_extent_arr["count"] - 1
+            unique_block_addr_arr_list.append(unique(Reader.get_block_addr_arr(cache_extent_arr["addr"], end_addr_arr)))
+        return unique(concatenate(unique_block_addr_arr_list))
+    
+
     def get_unscaled_unique_block_addr_set(self) -> set:
         """ Get unique block addresses set where no bits are ignored. """
         return self.get_unique_block_addr_set(0)
@@ -161,7 +381,8 @@ class CacheTraceReader:
             self,
             random_seed: int, 
             num_lower_addr_bits_ignored: int,
-            sample_hash_file_path: Path
+            sample_hash_file_path: Path,
+            hash_mode: str = MMH3_MODE
     ) -> None:
         """ Create a new hash file from the cache trace.
         
@@ -169,9 +390,10 @@ class CacheTraceReader:
             random_seed: Random seed. 
             num_lower_addr_bits_ignored: Number of lower order address bits ignored.
             sample_hash_file_path: Path of the hash file to be created. 
+            hash_mode: Hash mode of cydonia.profiler.Hash. (Default: MMH3_MODE)
         """
         unique_block_addr_set = self.get_unique_block_addr_set(num_lower_addr_bits_ignored)
-        CacheTraceReader.create_sample_hash_file_for_addr_set(unique_block_addr_set, random_seed, sample_hash_file_path)
+        CacheTraceReader.create_sample_hash_file_for_addr_set(unique_block_addr_set, random_seed, sample_hash_file_path, hash_mode, num_lower_addr_bits_ignored)
     
 
     def sample_using_hash_file(
@@ -216,30 +438,263 @@ class CacheTraceReader:
         Returns:
             sample_addr_dict: Dictionary with sampled block addresses as keys. 
         """
-        num_unscaled_unique_addr_count = len(unscaled_unique_addr_set)
+        assert hash_file.num_lower_addr_bits_ignored in (None, num_lower_addr_bits_ignored), \
+                "Hash file created with {} lower address bits ignored not {}.".format(hash_file.num_lower_addr_bits_ignored, num_lower_addr_bits_ignored)
+        if not unscaled_unique_addr_set:
+            return {}
+
+        unscaled_unique_addr_arr = sort(fromiter(unscaled_unique_addr_set, dtype=int64, count=len(unscaled_unique_addr_set)))
+        num_unscaled_unique_addr_count = len(unscaled_unique_addr_arr)
+        region_addr_arr = hash_file.get_addr_arr()
+
+        # Regions are sampled in order of hash value while the fraction of sampled blocks is below the rate. Each
+        # region expands to 2**num_lower_addr_bits_ignored blocks so a chunk has a fixed number of regions that 
+        # expands to about a million blocks at most. 
+        chunk_size = max(1, (1 << 20) >> num_lower_addr_bits_ignored)
         sample_count = 0 
-        sample_addr_dict = {}
-        for _, sample_hash_row in hash_file._df.iterrows():
-            if sample_count/num_unscaled_unique_addr_count >= rate:
-                break
-
-            blk_addr_arr = self.get_blk_addr_arr(sample_hash_row[HASH_FILE_CONFIG.ADDR_HEADER_NAME.value], num_lower_addr_bits_ignored)
-            for blk_addr in blk_addr_arr:
-                if blk_addr in unscaled_unique_addr_set:
-                    sample_addr_dict[blk_addr] = True 
-                    sample_count += 1
-        return sample_addr_dict
+        sample_blk_addr_arr_list = []
+        for chunk_start_index in range(0, len(region_addr_arr), chunk_size):
+            blk_addr_arr = self.get_region_blk_addr_arr(region_addr_arr[chunk_start_index:chunk_start_index+chunk_size], num_lower_addr_bits_ignored)
+            blk_index_arr = minimum(searchsorted(unscaled_unique_addr_arr, blk_addr_arr), num_unscaled_unique_addr_count - 1)
+            blk_flag_arr = unscaled_unique_addr_arr[blk_index_arr] == blk_addr_arr
+            region_blk_count_arr = blk_flag_arr.sum(axis=1)
+            prev_sample_count_arr = sample_count + cumsum(region_blk_count_arr) - region_blk_count_arr
+            region_count = int(count_nonzero(prev_sample_count_arr/num_unscaled_unique_addr_count < rate))
+
+            sample_blk_addr_arr_list.append(blk_addr_arr[:region_count][blk_flag_arr[:region_count]])
+            sample_count += int(region_blk_count_arr[:region_count].sum())
+            if region_count < len(blk_addr_arr):
+                break 
+        return dict.fromkeys(concatenate(sample_blk_addr_arr_list).tolist() if sample_blk_addr_arr_list else [], True)
     
 
-    def get_mean_sample_split(self) -> dict:
-        self.reset()
+    def sample_many(
+            self, 
+            rate_list: list, 
+            seed_list: list, 
+            bits_list: list, 
+            output_dir: Path, 
+            hash_mode: str = MMH3_MODE, 
+            batch_size: int = 1000000
+    ) -> dict:
+        """ Create a sample for each combination of rate, seed and number of lower address bits ignored. After 
+        a pass to find the unique blocks, every sample is written in a single pass over the cache trace. The 
+        regions sampled at a rate are a prefix of the regions in order of hash value so samples with the same 
+        seed and bits are nested and each cache request is routed to every sample whose prefix contains its region. 
+
+        The sample "{rate}_{seed}_{bits}.csv" in the output directory is the same as the one created by 
+        sample_using_hash_file with a hash file of the same seed, bits and hash mode. The WorkloadStats of 
+        each sample is written to "{rate}_{seed}_{bits}.json".
+
+        Args:
+            rate_list: List of sampling rates. 
+            seed_list: List of random seeds. 
+            bits_list: List of number of lower order address bits ignored.
+            output_dir: Directory where samples are created. 
+            hash_mode: Hash mode of cydonia.profiler.Hash. (Default: MMH3_MODE)
+            batch_size: Number of lines read at a time. (Default: 1000000)
+        
+        Returns:
+            workload_stats_dict: Dictionary of WorkloadStats of each sample with (rate, seed, bits) as key. 
+        """
+        assert all([rate > 0.0 and rate < 1.0 for rate in rate_list]), "Sampling rates {} not in (0, 1).".format(rate_list)
+        output_dir = Path(output_dir)
+        output_dir.mkdir(exist_ok=True, parents=True)
+
+        unique_block_addr_arr = self.get_unique_block_addr_arr(batch_size)
+        sampler_list = []
+        for seed, bits in product(seed_list, bits_list):
+            region_addr_arr, rank_arr, region_count_list = self.get_region_rank_arr(unique_block_addr_arr, seed, bits, rate_list, hash_mode)
+            sampler_list.append((seed, bits, region_addr_arr, rank_arr, region_count_list))
+
+        sample_handle_dict, workload_stats_dict, cur_ts_dict = {}, {}, {}
+        for rate, seed, bits in product(rate_list, seed_list, bits_list):
+            sample_file_path = output_dir.joinpath("{}_{}_{}.csv".format(rate, seed, bits))
+            sample_handle_dict[(rate, seed, bits)] = sample_file_path.open("wb", buffering=1 << 22)
+            workload_stats_dict[(rate, seed, bits)] = WorkloadStats(self._config.lba_size_byte, self._config.cache_block_size_byte)
+            cur_ts_dict[(rate, seed, bits)] = 0 
+
+        try:
+            for cache_extent_arr in self.read_group_batches(batch_size):
+                extent_index_arr = repeat(arange(len(cache_extent_arr)), cache_extent_arr["count"])
+                cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+                for seed, bits, region_addr_arr, rank_arr, region_count_list in sampler_list:
+                    req_rank_arr = rank_arr[searchsorted(region_addr_arr, cache_req_arr["addr"] >> bits)]
+                    for rate, region_count in zip(rate_list, region_count_list):
+                        sample_key = (rate, seed, bits)
+                        sample_flag_arr = req_rank_arr < region_count
+                        if not sample_flag_arr.any():
+                            continue 
+
+                        sample_extent_arr = self.get_sample_extent_arr(cache_req_arr, extent_index_arr, sample_flag_arr)
+                        if self._extent_flag:
+                            column_list = [sample_extent_arr[field_name] for field_name in CACHE_EXTENT_DTYPE.names]
+                        else:
+                            sample_req_arr = cache_req_arr[sample_flag_arr]
+                            column_list = [sample_req_arr[field_name] for field_name in sample_req_arr.dtype.names]
+                        sample_handle_dict[sample_key].write(get_csv_bytes(column_list))
+
+                        block_req_batch = self.get_block_req_batch(sample_extent_arr, cur_ts_dict[sample_key], self._config)
+                        workload_stats_dict[sample_key].track_arrays(block_req_batch["ts"], 
+                                                                        block_req_batch["lba"], 
+                                                                        block_req_batch["op"] == self._config.write_str, 
+                                                                        block_req_batch["size"])
+                        cur_ts_dict[sample_key] = int(block_req_batch["ts"][-1])
+        finally:
+            for sample_handle in sample_handle_dict.values():
+                sample_handle.close()
+        
+        for (rate, seed, bits), workload_stats in workload_stats_dict.items():
+            workload_stats.write_to_file(output_dir.joinpath("{}_{}_{}.json".format(rate, seed, bits)))
+        return workload_stats_dict
+    
+
+    def sample_fixed_size(
+            self, 
+            max_region_count: int, 
+            random_seed: int, 
+            num_lower_addr_bits_ignored: int, 
+            sample_file_path: Path, 
+            hash_mode: str = MMH3_MODE, 
+            batch_size: int = 1000000
+    ) -> dict:
+        """ Sample this cache trace keeping at most max_region_count regions with the lowest hash values as in 
+        the fixed-size mode of SHARDS. The first pass lowers the hash threshold each time a region is evicted 
+        and the second pass writes the cache requests to regions below the final threshold. Memory does not 
+        grow with the number of unique blocks in the cache trace. The WorkloadStats of the sample along with 
+        the sampling statistics such as the effective rate are written to a JSON file with the same name as the 
+        sample. 
+
+        Args:
+            max_region_count: Maximum number of regions sampled. 
+            random_seed: Random seed. 
+            num_lower_addr_bits_ignored: Number of lower order address bits ignored.
+            sample_file_path: Path of the sample. 
+            hash_mode: Hash mode of cydonia.profiler.Hash. (Default: MMH3_MODE)
+            batch_size: Number of lines read at a time. (Default: 1000000)
+        
+        Returns:
+            sample_stat_dict: Dictionary of WorkloadStats and sampling statistics of the sample. 
+        """
+        region_set = FixedSizeRegionSet(max_region_count, random_seed, hash_mode)
+        for cache_extent_arr in self.read_group_batches(batch_size):
+            end_addr_arr = cache_extent_arr["addr"] + cache_extent_arr["count"] - 1
+            region_set.update(unique(Reader.get_block_addr_arr(cache_extent_arr["addr"], end_addr_arr) >> num_lower_addr_bits_ignored))
+        
+        cur_ts, cache_req_count, sample_cache_req_count = 0, 0, 0 
+        workload_stats = WorkloadStats(self._config.lba_size_byte, self._config.cache_block_size_byte)
+        with Path(sample_file_path).open("wb", buffering=1 << 22) as sample_handle:
+            for cache_extent_arr in self.read_group_batches(batch_size):
+                extent_index_arr = repeat(arange(len(cache_extent_arr)), cache_extent_arr["count"])
+                cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+                sample_flag_arr = region_set.contains(cache_req_arr["addr"] >> num_lower_addr_bits_ignored)
+                cache_req_count += len(cache_req_arr)
+                sample_cache_req_count += int(sample_flag_arr.sum())
+                if not sample_flag_arr.any():
+                    continue 
+                
+                sample_extent_arr = self.get_sample_extent_arr(cache_req_arr, extent_index_arr, sample_flag_arr)
+                if self._extent_flag:
+                    column_list = [sample_extent_arr[field_name] for field_name in CACHE_EXTENT_DTYPE.names]
+                else:
+                    sample_req_arr = cache_req_arr[sample_flag_arr]
+                    column_list = [sample_req_arr[field_name] for field_name in sample_req_arr.dtype.names]
+                sample_handle.write(get_csv_bytes(column_list))
+
+                block_req_batch = self.get_block_req_batch(sample_extent_arr, cur_ts, self._config)
+                workload_stats.track_arrays(block_req_batch["ts"], 
+                                            block_req_batch["lba"], 
+                                            block_req_batch["op"] == self._config.write_str, 
+                                            block_req_batch["size"])
+                cur_ts = int(block_req_batch["ts"][-1])
+        
+        sample_stat_dict = {**workload_stats.get_dict(), **region_set.get_stat_dict()}
+        sample_stat_dict["num_lower_addr_bits_ignored"] = num_lower_addr_bits_ignored
+        sample_stat_dict["cache_req_count"] = cache_req_count 
+        sample_stat_dict["sample_cache_req_count"] = sample_cache_req_count
+        with Path(sample_file_path).with_suffix(".json").open("w+") as stat_handle:
+            stat_handle.write(dumps(sample_stat_dict, indent=2, cls=NpEncoder))
+        return sample_stat_dict
+    
+
+    @staticmethod
+    def get_region_rank_arr(
+            unique_block_addr_arr: ndarray, 
+            random_seed: int, 
+            num_lower_addr_bits_ignored: int, 
+            rate_list: list, 
+            hash_mode: str = MMH3_MODE
+    ) -> tuple:
+        """ Get the rank of each region in order of hash value and the number of regions sampled at each rate. 
+        A region is sampled at a rate if its rank is less than the number of regions sampled at that rate. 
+
+        Args:
+            unique_block_addr_arr: Sorted array of unique block addresses. 
+            random_seed: Random seed. 
+            num_lower_addr_bits_ignored: Number of lower order address bits ignored.
+            rate_list: List of sampling rates. 
+            hash_mode: Hash mode of cydonia.profiler.Hash. (Default: MMH3_MODE)
+        
+        Returns:
+            region_addr_arr: Sorted array of region addresses. 
+            rank_arr: Array of the rank of each region in region_addr_arr. 
+            region_count_list: List of the number of regions sampled at each rate. 
+        """
+        region_index_arr = unique_block_addr_arr >> num_lower_addr_bits_ignored
+        region_addr_arr = unique(region_index_arr)
+        region_blk_count_arr = bincount(searchsorted(region_addr_arr, region_index_arr), minlength=len(region_addr_arr))
+
+        order_arr = get_hash_order(region_addr_arr, random_seed, hash_mode)
+        rank_arr = empty(len(region_addr_arr), dtype=int64)
+        rank_arr[order_arr] = arange(len(region_addr_arr))
+
+        # same as get_sample_addr_dict, regions are sampled while the fraction of sampled blocks is below the rate
+        ordered_blk_count_arr = region_blk_count_arr[order_arr]
+        prev_sample_count_arr = cumsum(ordered_blk_count_arr) - ordered_blk_count_arr
+        region_count_list = [int(count_nonzero(prev_sample_count_arr/len(unique_block_addr_arr) < rate)) for rate in rate_list]
+        return region_addr_arr, rank_arr, region_count_list
+    
+
+    @staticmethod
+    def get_sample_extent_arr(
+            cache_req_arr: ndarray, 
+            extent_index_arr: ndarray, 
+            sample_flag_arr: ndarray
+    ) -> ndarray:
+        """ Get the extents of contiguous sampled cache requests where an extent does not span multiple 
+        extents of the original cache trace. 
+
+        Args:
+            cache_req_arr: Structured array of dtype CACHE_REQ_DTYPE. 
+            extent_index_arr: Array of the index of the extent of each cache request. 
+            sample_flag_arr: Boolean array that is True for sampled cache requests. 
+        
+        Returns:
+            sample_extent_arr: Structured array of dtype CACHE_EXTENT_DTYPE. 
+        """
+        sample_req_arr = cache_req_arr[sample_flag_arr]
+        sample_extent_index_arr = extent_index_arr[sample_flag_arr]
+        run_start_flag_arr = ones(len(sample_req_arr), dtype=bool)
+        run_start_flag_arr[1:] = (sample_extent_index_arr[1:] != sample_extent_index_arr[:-1]) | \
+                                    (sample_req_arr["addr"][1:] != sample_req_arr["addr"][:-1] + 1)
+        run_start_arr = flatnonzero(run_start_flag_arr)
+        run_end_arr = concatenate((run_start_arr[1:], [len(sample_req_arr)])) - 1
+
+        sample_extent_arr = empty(len(run_start_arr), dtype=CACHE_EXTENT_DTYPE)
+        for field_name in ["i", "iat", "addr", "op", "front_misalign"]:
+            sample_extent_arr[field_name] = sample_req_arr[field_name][run_start_arr]
+        sample_extent_arr["count"] = run_end_arr - run_start_arr + 1
+        sample_extent_arr["rear_misalign"] = sample_req_arr["rear_misalign"][run_end_arr]
+        return sample_extent_arr
+    
+
+    def get_mean_sample_split(self) -> float:
+        """ Get the mean number of block requests that a block request is split into in this sample. """
         total_cache_split = 0 
         total_req_sampled = 0 
-        cache_req_df = self.get_next_cache_req_group_df()
-        while (len(cache_req_df)):
-            total_req_sampled += 1 
-            total_cache_split += len(self.get_block_req_arr(cache_req_df, 0, self._config))
-            cache_req_df = self.get_next_cache_req_group_df()
+        for cache_extent_arr in self.read_group_batches():
+            total_req_sampled += len(self.get_group_start_arr(cache_extent_arr))
+            total_cache_split += len(self.get_block_req_batch(cache_extent_arr, 0, self._config))
         return total_cache_split/total_req_sampled
             
 
@@ -256,6 +711,10 @@ class CacheTraceReader:
         """
         self.reset()
         with sample_file_path.open("w+") as sample_handle:
+            if self._extent_flag:
+                self.sample_extents(sample_addr_dict, sample_handle)
+                return 
+
             cache_req = self.get_next_cache_req()
             while cache_req:
                 if cache_req[self._config.cache_addr_header_name] in sample_addr_dict:
@@ -266,27 +725,135 @@ class CacheTraceReader:
                                                                         cache_req[self._config.front_misalign_header_name],
                                                                         cache_req[self._config.rear_misalign_header_name]))
                 cache_req = self.get_next_cache_req()
+    
+
+    def sample_extents(
+            self, 
+            sample_addr_dict: dict, 
+            sample_handle
+    ) -> None:
+        """ Sample this extent cache trace. Each extent is split into extents of contiguous sampled blocks
+        so that the sample is also an extent cache trace. 
+
+        Args:
+            sample_addr_dict: Dictionary of sampled addresses.
+            sample_handle: Handle of the sample file. 
+        """
+        block_count_header_name = self._config.cache_block_count_header_name
+        cache_extent = self.get_next_cache_extent()
+        while cache_extent:
+            start_addr = cache_extent[self._config.cache_addr_header_name]
+            block_count = cache_extent[block_count_header_name]
+            run_start_offset = -1 
+            for offset in range(block_count + 1):
+                if offset < block_count and (start_addr + offset) in sample_addr_dict:
+                    if run_start_offset == -1:
+                        run_start_offset = offset 
+                elif run_start_offset >= 0:
+                    sample_handle.write("{},{},{},{},{},{},{}\n".format(cache_extent[self._config.req_index_header_name],
+                                                                        cache_extent[self._config.iat_header_name],
+                                                                        start_addr + run_start_offset,
+                                                                        offset - run_start_offset,
+                                                                        cache_extent[self._config.op_header_name],
+                                                                        cache_extent[self._config.front_misalign_header_name] if run_start_offset == 0 else 0,
+                                                                        cache_extent[self._config.rear_misalign_header_name] if offset == block_count else 0))
+                    run_start_offset = -1 
+            cache_extent = self.get_next_cache_extent()
 
 
     @staticmethod
     def create_sample_hash_file_for_addr_set(
             unique_block_addr_set: set, 
             random_seed: int, 
-            sample_hash_file_path: Path
+            sample_hash_file_path: Path,
+            hash_mode: str = MMH3_MODE,
+            num_lower_addr_bits_ignored: int = 0 
     ) -> None:
         """ Create a sample hash file.
 
         Args:
             random_seed: Random seed.
             sample_hash_file_path: Path of the hash file. 
+            hash_mode: Hash mode of cydonia.profiler.Hash. (Default: MMH3_MODE)
+            num_lower_addr_bits_ignored: Number of lower order address bits ignored to get the addresses. (Default: 0)
         """
         hash_file = HashFile(sample_hash_file_path)
-        hash_file.create(unique_block_addr_set, random_seed)
+        hash_file.create(unique_block_addr_set, random_seed, hash_mode, num_lower_addr_bits_ignored)
+
+
+    @staticmethod
+    def get_group_start_arr(cache_extent_arr: ndarray) -> ndarray:
+        """ Get the index of the first cache extent of each group of cache extents originating from the same 
+        block request. 
+
+        Args:
+            cache_extent_arr: Structured array of dtype CACHE_EXTENT_DTYPE. 
+        
+        Returns:
+            group_start_arr: Array of indexes where a new group starts. 
+        """
+        if not len(cache_extent_arr):
+            return zeros(0, dtype=int)
+        return concatenate(([0], flatnonzero(diff(cache_extent_arr["i"])) + 1))
+
+
+    @staticmethod
+    def get_block_req_batch(
+            cache_extent_arr: ndarray, 
+            start_time_ts: int, 
+            reader_config: ReaderConfig
+    ) -> ndarray:
+        """ Get block requests from a batch of complete groups of cache extents where each group originates 
+        from the same source block request. A group generates a block request for each run of contiguous 
+        blocks and the timestamp advances by the interarrival time of the group for each block request.
+
+        Args:
+            cache_extent_arr: Structured array of dtype CACHE_EXTENT_DTYPE. 
+            start_time_ts: Timestamp of the block request before the batch. 
+            reader_config: Configuration to extract information from cache requests.
+        
+        Returns:
+            block_req_batch: Structured array of dtype BLOCK_REQ_DTYPE. 
+        """
+        block_size_byte = reader_config.cache_block_size_byte
+        group_start_flag_arr = zeros(len(cache_extent_arr), dtype=bool)
+        group_start_flag_arr[CacheTraceReader.get_group_start_arr(cache_extent_arr)] = True 
+        group_id_arr = cumsum(group_start_flag_arr) - 1
+
+        # Write requests contain misaligned read request as well if any, when generating array of block
+        # request from a set of cache requests, we do not need this information so we discard the read requests.
+        write_flag_arr = cache_extent_arr["op"] == reader_config.write_str
+        group_write_flag_arr = maximum.reduceat(write_flag_arr, flatnonzero(group_start_flag_arr)) if len(cache_extent_arr) else write_flag_arr
+        keep_flag_arr = write_flag_arr | ~group_write_flag_arr[group_id_arr]
+        extent_arr = cache_extent_arr[keep_flag_arr]
+        group_id_arr = group_id_arr[keep_flag_arr]
+        
+        # a new block request starts at the first extent of each group and after every gap in the blocks 
+        run_start_flag_arr = diff(group_id_arr, prepend=-1) != 0
+        run_start_flag_arr[1:] |= extent_arr["addr"][1:] != (extent_arr["addr"][:-1] + extent_arr["count"][:-1])
+        run_start_arr = flatnonzero(run_start_flag_arr)
+        run_end_arr = concatenate((run_start_arr[1:], [len(extent_arr)])) - 1
+        first_run_flag_arr = diff(group_id_arr[run_start_arr], prepend=-1) != 0
+        last_run_flag_arr = concatenate((first_run_flag_arr[1:], [True]))
+
+        # the front misalignment can only be in the first block of the group and the rear misalignment in the last
+        front_misalign_arr = where(first_run_flag_arr, extent_arr["front_misalign"][run_start_arr], 0)
+        rear_misalign_arr = where(last_run_flag_arr, extent_arr["rear_misalign"][run_end_arr], 0)
+        run_block_count_arr = add.reduceat(extent_arr["count"], run_start_arr) if len(run_start_arr) else run_start_arr
+
+        block_req_batch = empty(len(run_start_arr), dtype=BLOCK_REQ_DTYPE)
+        block_req_batch["i"] = extent_arr["i"][run_start_arr]
+        block_req_batch["ts"] = start_time_ts + cumsum(extent_arr["iat"][run_start_arr])
+        block_req_batch["lba"] = ((extent_arr["addr"][run_start_arr] * block_size_byte) + front_misalign_arr)//reader_config.lba_size_byte
+        block_req_batch["op"] = where(group_write_flag_arr[group_id_arr[run_start_arr]], reader_config.write_str, reader_config.read_str)
+        block_req_batch["size"] = (run_block_count_arr * block_size_byte) - front_misalign_arr - rear_misalign_arr
+        assert (block_req_batch["size"] > 0).all(), "All sizes not greater than 0, found {}.".format(block_req_batch)
+        return block_req_batch
 
 
     @staticmethod
     def get_block_req_arr(
-            cache_req_df: list, 
+            cache_req_df: DataFrame, 
             start_time_ts: int, 
             reader_config: ReaderConfig
     ) -> List[BlockRequest]:
@@ -294,61 +861,54 @@ class CacheTraceReader:
         same source block request.
 
         Args:
-            cache_req_df: DataFrame containing a set of cache requests.
+            cache_req_df: DataFrame containing a set of cache requests or cache extents.
+            start_time_ts: Timestamp of the previous block request. 
             reader_config: Configuration to extract information from cache requests.
         
         Returns:
             block_req_arr: List of dictionary with attributes of each block request.
         """
         assert len(cache_req_df) > 0, "DataFrame of cache requests cannot be empty."
-        block_req_arr = []
-        if not cache_req_df[reader_config.op_header_name].str.contains(reader_config.write_str).any():
-            cur_cache_req_df = cache_req_df
-            cur_op = reader_config.read_str
-        else:
-            # Write requests contain misaligned read request as well if any, when generating array of block
-            # request from a set of cache requests, we do not need this information so we discard the read requests.
-            cur_cache_req_df = cache_req_df[cache_req_df[reader_config.op_header_name] == reader_config.write_str]
-            cur_op = reader_config.write_str
-
-        # handle the misalignment possible in the first block accessed
-        cur_time_ts = start_time_ts
-        first_cache_req = cur_cache_req_df.iloc[0]
-        front_misalign_byte = first_cache_req[reader_config.front_misalign_header_name]
-        req_start_byte = (first_cache_req[reader_config.cache_addr_header_name] * reader_config.cache_block_size_byte) + front_misalign_byte
-        req_size_byte = reader_config.cache_block_size_byte - front_misalign_byte
-
-        iat_us = first_cache_req[reader_config.iat_header_name]
-        prev_key = first_cache_req[reader_config.cache_addr_header_name]
-        for _, row in cur_cache_req_df.iloc[1:].iterrows():
-            cur_key = row[reader_config.cache_addr_header_name]
-            if cur_key - 1 == prev_key:
-                # contiguous cache requests
-                req_size_byte += reader_config.cache_block_size_byte
-            else:
-                # not contiguous cache request, meaning some block of the block request that generated
-                # this set of cache requests was not sampled.
-                block_req_arr.append(BlockRequest(int(cur_time_ts + iat_us),
-                                                    int(req_start_byte/reader_config.lba_size_byte),
-                                                    reader_config.get_write_flag(cur_op),
-                                                    req_size_byte))
-                req_start_byte = cur_key * reader_config.cache_block_size_byte
-                req_size_byte = reader_config.cache_block_size_byte
-                cur_time_ts += iat_us 
-            prev_key = cur_key
-
-        """ Include rear misalignment in the last block request generated from the set of cache requests.
-        Since all cache requests in the DataFrame originate from the same block request, the rear
-        misalignment can only happen in the last block which belongs to the last block request
-        added to the array. """
-        rear_misalign_byte = cur_cache_req_df.iloc[-1][reader_config.rear_misalign_header_name]
-        block_req_arr.append(BlockRequest(int(cur_time_ts + iat_us),
-                                            int(req_start_byte/reader_config.lba_size_byte),
-                                            reader_config.get_write_flag(cur_op),
-                                            int(req_size_byte - rear_misalign_byte)))
+        cache_extent_arr = empty(len(cache_req_df), dtype=CACHE_EXTENT_DTYPE)
+        for field_name, header_name in zip(CACHE_EXTENT_DTYPE.names, reader_config.get_cache_extent_trace_header()):
+            cache_extent_arr[field_name] = cache_req_df[header_name].to_numpy() if header_name in cache_req_df else 1 
+        # all cache requests belong to the same group 
+        cache_extent_arr["i"] = cache_extent_arr["i"][0]
+
+        block_req_batch = CacheTraceReader.get_block_req_batch(cache_extent_arr, start_time_ts, reader_config)
+        return [BlockRequest(ts, lba, op == reader_config.write_str, size) 
+                    for ts, lba, op, size in zip(block_req_batch["ts"].tolist(), 
+                                                    block_req_batch["lba"].tolist(), 
+                                                    block_req_batch["op"].tolist(), 
+                                                    block_req_batch["size"].tolist())]
+
+
+    @staticmethod
+    def get_extent_cache_req(
+            cache_extent: dict, 
+            offset: int, 
+            reader_config: ReaderConfig
+    ) -> dict:
+        """ Get the cache request to a block of an extent. 
+
+        Args:
+            cache_extent: Dictionary with attributes of the cache extent. 
+            offset: Offset of the block in the extent. 
+            reader_config: Configuration to extract information from cache extents.
         
-        assert all([req.size_byte>0 for req in block_req_arr]), "All sizes not greater than 0, found {}.".format(block_req_arr)
-        return block_req_arr
+        Returns:
+            cache_req: Dictionary with attributes of the cache request. 
+        """
+        block_count = cache_extent[reader_config.cache_block_count_header_name]
+        assert 0 <= offset < block_count, "Offset {} not in extent of {} blocks.".format(offset, block_count)
+        return {
+            reader_config.iat_header_name: cache_extent[reader_config.iat_header_name],
+            reader_config.cache_addr_header_name: cache_extent[reader_config.cache_addr_header_name] + offset,
+            reader_config.op_header_name: cache_extent[reader_config.op_header_name],
+            reader_config.req_index_header_name: cache_extent[reader_config.req_index_header_name],
+            reader_config.front_misalign_header_name: cache_extent[reader_config.front_misalign_header_name] if offset == 0 else 0,
+            reader_config.rear_misalign_header_name: cache_extent[reader_config.rear_misalign_header_name] if offset == block_count - 1 else 0
+        }
 
 
     @staticmethod
@@ -365,12 +925,26 @@ class CacheTraceReader:
         Returns:
             block_addr_arr: Array of block addresses in the region. 
         """
-        num_block_in_region = 2**num_lower_addr_bits_ignored
-        block_addr_arr = zeros(num_block_in_region, dtype=int)
-        start_block = (addr << num_lower_addr_bits_ignored)
-        for block_index in range(num_block_in_region):
-            block_addr_arr[block_index] = start_block + block_index
-        return block_addr_arr
+        return arange(2**num_lower_addr_bits_ignored) + (int(addr) << num_lower_addr_bits_ignored)
+    
+
+    @staticmethod
+    def get_region_blk_addr_arr(
+            addr_arr: ndarray, 
+            num_lower_addr_bits_ignored: int
+    ) -> ndarray:
+        """ Get array of blocks of each region given an array of region addresses and number of lower 
+        address bits ignored to get to the region addresses.
+
+        Args:
+            addr_arr: Array of region addresses. 
+            num_lower_addr_bits_ignored: Number of lower order address bits ignored.
+        
+        Returns:
+            block_addr_arr: Array of shape (len(addr_arr), 2**num_lower_addr_bits_ignored) of block addresses in each region. 
+        """
+        region_addr_arr = asarray(addr_arr, dtype=int64)
+        return (region_addr_arr[:, None] << num_lower_addr_bits_ignored) + arange(2**num_lower_addr_bits_ignored)
     
 
     def close(self) -> None:
@@ -379,4 +953,9 @@ class CacheTraceReader:
     
     def reset(self) -> None:
         self._handle.seek(0)
-        self._prev_cache_req = {}
\ No newline at end of file
+        self._group_batch_iter = None 
+        self._group_batch_arr = empty(0, dtype=CACHE_EXTENT_DTYPE)
+        self._group_start_arr = zeros(1, dtype=int)
+        self._group_index = 0 
+        self._cur_extent = {}
+        self._cur_extent_offset = 0 
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""Hash arrays of block addresses in a single call for hash-based sampling.
+
+Two modes are supported. The mmh3 mode reproduces mmh3.hash128(str(addr), signed=False, seed=seed)
+bit for bit so that existing hash files and samples can be recreated. The native mode mixes the
+64-bit integer address directly and is used for new samples where compatibility is not needed.
+
+Usage:
+    hash_hi_arr, hash_lo_arr = mmh3_hash128_arr(addr_arr, seed)
+    hash_arr = native_hash64_arr(addr_arr, seed)
+    sorted_addr_arr = addr_arr[get_hash_order(addr_arr, seed)]
+    hash_arr = get_hash64_arr(addr_arr, seed, NATIVE_MODE)
+"""
+
+import numpy as np
+
+
+MMH3_MODE = "mmh3"
+NATIVE_MODE = "native"
+HASH_MODE_LIST = [MMH3_MODE, NATIVE_MODE]
+
+# the largest uint64 has 20 decimal digits, the string bytes are padded to 3 words
+MAX_DIGIT_COUNT = 20
+DIGIT_WORD_COUNT = 3
+POW10_ARR = np.array([10**power for power in range(MAX_DIGIT_COUNT)], dtype=np.uint64)
+
+C1 = np.uint64(0x87c37b91114253d5)
+C2 = np.uint64(0x4cf5ad432745937f)
+FMIX_C1 = np.uint64(0xff51afd7ed558ccd)
+FMIX_C2 = np.uint64(0xc4ceb9fe1a85ec53)
+GOLDEN_GAMMA = np.uint64(0x9e3779b97f4a7c15)
+
+
+def rotl64(
+        x_arr: np.ndarray,
+        r: int
+) -> np.ndarray:
+    """Rotate each uint64 in an array left by r bits."""
+    return (x_arr << np.uint64(r)) | (x_arr >> np.uint64(64 - r))
+
+
+def fmix64(k_arr: np.ndarray) -> np.ndarray:
+    """The 64-bit finalization mix of MurmurHash3 applied to each uint64 in an array."""
+    k_arr = k_arr ^ (k_arr >> np.uint64(33))
+    k_arr = k_arr * FMIX_C1
+    k_arr = k_arr ^ (k_arr >> np.uint64(33))
+    k_arr = k_arr * FMIX_C2
+    return k_arr ^ (k_arr >> np.uint64(33))
+
+
+def get_digit_word_arr(addr_arr: np.ndarray) -> tuple:
+    """Get the bytes of the decimal string of each address as little-endian 64-bit words.
+
+    Args:
+        addr_arr: Array of non-negative integer addresses.
+
+    Returns:
+        digit_word_arr: Array of shape (len(addr_arr), DIGIT_WORD_COUNT) of the ASCII digits padded with zeros.
+        digit_count_arr: Array of the number of digits in each address.
+    """
+    addr_arr = np.asarray(addr_arr).astype(np.uint64)
+    digit_count_arr = np.searchsorted(POW10_ARR[1:], addr_arr, side="right").astype(np.uint64) + np.uint64(1)
+
+    # Addresses with the same number of digits are converted together from the least significant digit. The
+    # digits are split into chunks of 9 so that the digits and the 4 byte halves of each word fit in 32 bits.
+    digit_word_arr = np.zeros((len(addr_arr), DIGIT_WORD_COUNT), dtype=np.uint64)
+    for digit_count in np.flatnonzero(np.bincount(digit_count_arr.astype(np.int64))).tolist():
+        row_arr = np.flatnonzero(digit_count_arr == digit_count)
+        remainder_arr = addr_arr[row_arr]
+        half_word_arr = [np.zeros(len(row_arr), dtype=np.uint32) for _ in range(2 * DIGIT_WORD_COUNT)]
+        for chunk_end_index in range(digit_count, 0, -9):
+            chunk_arr = (remainder_arr % np.uint64(10**9)).astype(np.uint32)
+            remainder_arr = remainder_arr // np.uint64(10**9)
+            for digit_index in range(chunk_end_index - 1, max(chunk_end_index - 9, 0) - 1, -1):
+                quotient_arr = chunk_arr // np.uint32(10)
+                digit_byte_arr = chunk_arr - (quotient_arr * np.uint32(10)) + np.uint32(ord('0'))
+                half_word_arr[digit_index // 4] |= digit_byte_arr << np.uint32(8 * (digit_index % 4))
+                chunk_arr = quotient_arr
+        for word_index in range(DIGIT_WORD_COUNT):
+            digit_word_arr[row_arr, word_index] = half_word_arr[2 * word_index].astype(np.uint64) | \
+                                                    (half_word_arr[2 * word_index + 1].astype(np.uint64) << np.uint64(32))
+    return digit_word_arr, digit_count_arr
+
+
+def mmh3_hash128_arr(
+        addr_arr: np.ndarray,
+        seed: int
+) -> tuple:
+    """Compute MurmurHash3 x64_128 of the decimal string of each address. The 128-bit hash
+    (hi << 64) | lo is equal to mmh3.hash128(str(addr), signed=False, seed=seed).
+
+    Args:
+        addr_arr: Array of non-negative integer addresses.
+        seed: Random seed.
+
+    Returns:
+        hash_hi_arr: Array of the upper 64 bits of the hash of each address.
+        hash_lo_arr: Array of the lower 64 bits of the hash of each address.
+    """
+    word_arr, digit_count_arr = get_digit_word_arr(addr_arr)
+    # the seed is a 32-bit unsigned integer in mmh3
+    seed_arr = np.full(len(digit_count_arr), seed & 0xFFFFFFFF, dtype=np.uint64)
+    block_flag_arr = digit_count_arr >= np.uint64(16)
+
+    # strings of 16 or more digits have a single 16 byte block
+    k1_arr = rotl64(word_arr[:, 0] * C1, 31) * C2
+    h1_arr = seed_arr ^ k1_arr
+    h1_arr = rotl64(h1_arr, 27) + seed_arr
+    h1_arr = h1_arr * np.uint64(5) + np.uint64(0x52dce729)
+    k2_arr = rotl64(word_arr[:, 1] * C2, 33) * C1
+    h2_arr = seed_arr ^ k2_arr
+    h2_arr = rotl64(h2_arr, 31) + h1_arr
+    h2_arr = h2_arr * np.uint64(5) + np.uint64(0x38495ab5)
+    h1_arr = np.where(block_flag_arr, h1_arr, seed_arr)
+    h2_arr = np.where(block_flag_arr, h2_arr, seed_arr)
+
+    # the tail is zero padded and a zero word does not change the hash
+    tail_k1_arr = np.where(block_flag_arr, word_arr[:, 2], word_arr[:, 0])
+    tail_k2_arr = np.where(block_flag_arr, np.uint64(0), word_arr[:, 1])
+    h2_arr = h2_arr ^ (rotl64(tail_k2_arr * C2, 33) * C1)
+    h1_arr = h1_arr ^ (rotl64(tail_k1_arr * C1, 31) * C2)
+
+    h1_arr = h1_arr ^ digit_count_arr
+    h2_arr = h2_arr ^ digit_count_arr
+    h1_arr = h1_arr + h2_arr
+    h2_arr = h2_arr + h1_arr
+    h1_arr = fmix64(h1_arr)
+    h2_arr = fmix64(h2_arr)
+    h1_arr = h1_arr + h2_arr
+    h2_arr = h2_arr + h1_arr
+    return h2_arr, h1_arr
+
+
+def native_hash64_arr(
+        addr_arr: np.ndarray,
+        seed: int
+) -> np.ndarray:
+    """Compute a 64-bit hash of each address by mixing the integer address with the seed.
+
+    Args:
+        addr_arr: Array of non-negative integer addresses.
+        seed: Random seed.
+
+    Returns:
+        hash_arr: Array of the 64-bit hash of each address.
+    """
+    seed_mix = fmix64(np.array([seed & 0xFFFFFFFFFFFFFFFF], dtype=np.uint64) + GOLDEN_GAMMA)[0]
+    return fmix64((np.asarray(addr_arr).astype(np.uint64) ^ seed_mix) + GOLDEN_GAMMA)
+
+
+def get_hash_order(
+        addr_arr: np.ndarray,
+        seed: int,
+        mode: str = MMH3_MODE
+) -> np.ndarray:
+    """Get the indexes that sort addresses by hash value and then by address.
+
+    Args:
+        addr_arr: Array of non-negative integer addresses.
+        seed: Random seed.
+        mode: Hash mode, MMH3_MODE or NATIVE_MODE. (Default: MMH3_MODE)
+
+    Returns:
+        order_arr: Array of indexes of the addresses in increasing order of hash value.
+
+    Raises:
+        ValueError: If the hash mode is not recognized.
+    """
+    addr_arr = np.asarray(addr_arr)
+    if mode == MMH3_MODE:
+        hash_hi_arr, hash_lo_arr = mmh3_hash128_arr(addr_arr, seed)
+        return np.lexsort((addr_arr, hash_lo_arr, hash_hi_arr))
+    elif mode == NATIVE_MODE:
+        return np.lexsort((addr_arr, native_hash64_arr(addr_arr, seed)))
+    else:
+        raise ValueError("Unrecognized hash mode {}, allowed {}.".format(mode, HASH_MODE_LIST))
+
+
+def get_hash64_arr(
+        addr_arr: np.ndarray,
+        seed: int,
+        mode: str = MMH3_MODE
+) -> np.ndarray:
+    """Get a 64-bit hash of each address. The upper 64 bits of the 128-bit hash are used in the mmh3 mode.
+
+    Args:
+        addr_arr: Array of non-negative integer addresses.
+        seed: Random seed.
+        mode: Hash mode, MMH3_MODE or NATIVE_MODE. (Default: MMH3_MODE)
+
+    Returns:
+        hash_arr: Array of the 64-bit hash of each address.
+
+    Raises:
+        ValueError: If the hash mode is not recognized.
+    """
+    if mode == MMH3_MODE:
+        return mmh3_hash128_arr(addr_arr, seed)[0]
+    elif mode == NATIVE_MODE:
+        return native_hash64_arr(addr_arr, seed)
+    else:
+        raise ValueError("Unrecognized hash mode {}, allowed {}.".format(mode, HASH_MODE_LIST))
@@ -0,0 +1,200 @@
+"""MiniSim approximates the miss ratio curve of any replacement policy by simulating miniature caches
+on a spatially sampled cache trace (Waldspurger et al., USENIX ATC 2017).
+
+A cache trace sampled at rate R by the hash of block regions, such as one created by
+CacheTraceReader.sample_using_hash_file, contains about R of the blocks of the full trace and every access
+to them. A cache of size s on the full trace is emulated by a cache of size R*s on the sample so the hit
+ratio of the miniature cache approximates that of the full cache for policies without a stack property
+like FIFO, CLOCK and ARC. The sample is loaded once and the miniature cache of each size is simulated
+by CacheSimulator in a pool of worker processes.
+
+A few hot blocks in or out of the sample make the number of sampled accesses differ from R times the
+accesses of the full trace. If the number of accesses of the full trace is given, the hit ratio of
+every size with the difference added to its hits as in SHARDS_adj is reported as the adjusted hit
+ratio while the hit ratio and the counts are those of the miniature cache.
+
+Usage:
+    mini_sim = MiniSim(["lru", "arc"], size_list, rate=0.01)
+    mrc_df = mini_sim.run(sample_cache_trace_path)
+"""
+
+import numpy as np
+import pandas as pd
+from multiprocessing import get_context
+
+from cydonia.profiler.CacheSimulator import CacheSimulator, POLICY_CLASS_DICT
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.Reader import Reader
+
+
+# accesses of the sample shared by the worker processes of a pool
+_worker_access_tuple = None
+
+
+def init_worker(
+        addr_arr: np.ndarray,
+        op_arr: np.ndarray,
+        rmw_flag_arr: np.ndarray
+) -> None:
+    """Store the accesses of the sample in a worker process.
+
+    Args:
+        addr_arr: Array of addresses of blocks accessed in order.
+        op_arr: Array of operation 'r' or 'w' of each access.
+        rmw_flag_arr: Array of flags that are True for reads generated by a misaligned write.
+    """
+    global _worker_access_tuple
+    _worker_access_tuple = (addr_arr, op_arr, rmw_flag_arr)
+
+
+def simulate_size(task: tuple) -> list:
+    """Simulate the caches of each policy of a size on the accesses of the worker.
+
+    Args:
+        task: Tuple of the list of policies, the cache size in blocks and the batch size.
+
+    Returns:
+        stat_list: List of dictionaries of statistics of each policy.
+    """
+    policy_list, size, batch_size = task
+    addr_arr, op_arr, rmw_flag_arr = _worker_access_tuple
+    cache_simulator = CacheSimulator(policy_list, [size])
+    for batch_start in range(0, len(addr_arr), batch_size):
+        batch_end = batch_start + batch_size
+        cache_simulator.track_arr(addr_arr[batch_start:batch_end], op_arr[batch_start:batch_end], rmw_flag_arr[batch_start:batch_end])
+    return cache_simulator.get_stat_df().to_dict("records")
+
+
+class MiniSim:
+    def __init__(
+            self,
+            policy_list: list,
+            size_list: list,
+            rate: float,
+            worker_count: int = None
+    ) -> None:
+        """ This class simulates miniature caches of each policy and size on a sampled cache trace.
+
+        Args:
+            policy_list: List of names of policies in POLICY_CLASS_DICT.
+            size_list: List of cache sizes in blocks of the full trace.
+            rate: Rate at which the cache trace was sampled.
+            worker_count: Number of worker processes. If None, the number of CPUs is used. (Default: None)
+
+        Raises:
+            ValueError: If a policy is not in POLICY_CLASS_DICT.
+        """
+        assert 0.0 < rate <= 1.0, "Rate {} not in (0, 1].".format(rate)
+        for policy in policy_list:
+            if policy not in POLICY_CLASS_DICT:
+                raise ValueError("Unknown policy {}, should be one of {}.".format(policy, list(POLICY_CLASS_DICT.keys())))
+        self.policy_list = list(policy_list)
+        self.size_list = [int(size) for size in size_list]
+        self.rate = rate
+        self.worker_count = worker_count
+
+
+    def get_scaled_size_arr(self) -> np.ndarray:
+        """Get the size of the miniature cache of each cache size, at least 1 block.
+
+        Returns:
+            scaled_size_arr: Array of miniature cache sizes in blocks.
+        """
+        return np.maximum(np.rint(np.array(self.size_list, dtype=float) * self.rate), 1).astype(np.int64)
+
+
+    @staticmethod
+    def load_cache_trace(
+            cache_trace_path,
+            batch_size: int = 1000000
+    ) -> tuple:
+        """Load the accesses of a cache trace.
+
+        Args:
+            cache_trace_path: Path of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+
+        Returns:
+            addr_arr, op_arr, rmw_flag_arr: Arrays of address, operation and RMW flag of each access.
+        """
+        cache_trace_reader = CacheTraceReader(cache_trace_path)
+        addr_arr_list, op_arr_list, rmw_flag_arr_list = [], [], []
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            addr_arr_list.append(cache_req_arr["addr"])
+            op_arr_list.append(cache_req_arr["op"])
+            rmw_flag_arr_list.append(CacheSimulator.get_rmw_flag_arr(cache_req_arr))
+        cache_trace_reader.close()
+        if not addr_arr_list:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype="U1"), np.zeros(0, dtype=bool)
+        return np.concatenate(addr_arr_list), np.concatenate(op_arr_list), np.concatenate(rmw_flag_arr_list)
+
+
+    def run_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray,
+            rmw_flag_arr: np.ndarray = None,
+            batch_size: int = 1000000,
+            access_count: int = None
+    ) -> pd.DataFrame:
+        """Simulate the miniature caches on an array of sampled block accesses.
+
+        Args:
+            addr_arr: Array of addresses of sampled blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+            rmw_flag_arr: Array of flags that are True for reads generated by a misaligned write. (Default: None)
+            batch_size: Number of accesses simulated at a time. (Default: 1000000)
+            access_count: Number of accesses of the full trace used to compute the adjusted hit ratio. If None,
+                            the hit ratio is not adjusted. (Default: None)
+
+        Returns:
+            mrc_df: DataFrame of the statistics of each policy and size where "size" is the size of the
+                        full cache and "scaled_size" the size of the miniature cache. If access_count is
+                        given, it also has the columns "adjusted_hit_ratio" and "adjusted_miss_ratio".
+        """
+        addr_arr, op_arr = np.asarray(addr_arr, dtype=np.int64), np.asarray(op_arr)
+        rmw_flag_arr = np.zeros(len(op_arr), dtype=bool) if rmw_flag_arr is None else np.asarray(rmw_flag_arr, dtype=bool)
+        scaled_size_arr = self.get_scaled_size_arr()
+        # sizes that scale to the same miniature cache are simulated once
+        unique_scaled_size_list = np.unique(scaled_size_arr).tolist()
+        task_list = [(self.policy_list, scaled_size, batch_size) for scaled_size in unique_scaled_size_list]
+
+        context = get_context()
+        with context.Pool(self.worker_count, initializer=init_worker, initargs=(addr_arr, op_arr, rmw_flag_arr)) as pool:
+            stat_list_list = pool.map(simulate_size, task_list, chunksize=1)
+
+        scaled_stat_df = pd.DataFrame([stat for stat_list in stat_list_list for stat in stat_list]).rename(columns={"size": "scaled_size"})
+        size_df = pd.DataFrame({"size": self.size_list, "scaled_size": scaled_size_arr})
+        mrc_df = size_df.merge(scaled_stat_df, on="scaled_size")
+        mrc_df["miss_ratio"] = 1.0 - mrc_df["hit_ratio"]
+        if access_count is not None and len(addr_arr):
+            expected_access_count = self.rate * access_count
+            hit_count_arr = mrc_df["hit_ratio"] * len(addr_arr)
+            mrc_df["adjusted_hit_ratio"] = np.clip((hit_count_arr + expected_access_count - len(addr_arr))/expected_access_count, 0.0, 1.0)
+            mrc_df["adjusted_miss_ratio"] = 1.0 - mrc_df["adjusted_hit_ratio"]
+        column_list = ["policy", "size", "scaled_size"] + [column for column in mrc_df.columns if column not in ("policy", "size", "scaled_size")]
+        return mrc_df[column_list].sort_values(["policy", "size"], kind="stable").reset_index(drop=True)
+
+
+    def run(
+            self,
+            sample_cache_trace_path,
+            batch_size: int = 1000000,
+            access_count: int = None
+    ) -> pd.DataFrame:
+        """Simulate the miniature caches on a sampled cache trace.
+
+        Args:
+            sample_cache_trace_path: Path of the cache trace sampled at the rate of this MiniSim.
+            batch_size: Number of accesses read and simulated at a time. (Default: 1000000)
+            access_count: Number of accesses of the full trace used to compute the adjusted hit ratio. If None,
+                            the hit ratio is not adjusted. (Default: None)
+
+        Returns:
+            mrc_df: DataFrame of the statistics of each policy and size where "size" is the size of the
+                        full cache and "scaled_size" the size of the miniature cache. If access_count is
+                        given, it also has the columns "adjusted_hit_ratio" and "adjusted_miss_ratio".
+        """
+        addr_arr, op_arr, rmw_flag_arr = self.load_cache_trace(sample_cache_trace_path, batch_size)
+        return self.run_arr(addr_arr, op_arr, rmw_flag_arr, batch_size, access_count)
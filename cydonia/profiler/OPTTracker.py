@@ -0,0 +1,212 @@
+"""OPTTracker computes the hit rate of Belady's optimal replacement policy (MIN) at each cache size to
+give an upper bound of the hit rate of any policy.
+
+OPT needs the future of the trace, so the accesses are kept in memory until hit rates are requested.
+The index of the next access to the same block of every access is computed in one vectorized pass by
+sorting the accesses by block with a stable sort. A cache of each size is then simulated in a pass over
+the accesses where a max-heap of the next use of cached blocks gives the block to evict. Heap entries
+are not removed when a block is accessed again; an entry is stale if the next use of its block changed.
+
+Every access allocates its block like the caches of RDHistogram unless bypass is enabled, in which case
+a block is not cached when its next use is after that of every cached block.
+
+Usage:
+    opt_tracker = OPTTracker()
+    opt_tracker.track_cache_trace(CacheTraceReader(cache_trace_path))
+    hit_rate_arr = opt_tracker.get_hit_rate_arr(size_arr)
+"""
+
+import heapq
+import numpy as np
+
+from cydonia.profiler.Reader import Reader
+
+
+class OPTTracker:
+    def __init__(self, bypass: bool = False) -> None:
+        """ This class tracks block accesses to compute the hit rate of the optimal policy.
+
+        Args:
+            bypass: If True, a block whose next use is after that of every cached block is not cached. (Default: False)
+
+        Attributes:
+            access_count: Number of accesses tracked.
+        """
+        self.bypass = bypass
+        self.access_count = 0
+        self._addr_arr_list = []
+        self._op_arr_list = []
+        # the accesses, block ids and next uses are computed when the first hit rate is requested
+        self._access_tuple = None
+
+
+    def track_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray
+    ) -> None:
+        """Track an array of block accesses.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+        """
+        op_arr = np.asarray(op_arr)
+        if not ((op_arr == 'r') | (op_arr == 'w')).all():
+            raise ValueError("Unindentified value for operation: {}".format(op_arr[~((op_arr == 'r') | (op_arr == 'w'))][0]))
+        self._addr_arr_list.append(np.asarray(addr_arr, dtype=np.int64))
+        self._op_arr_list.append(op_arr)
+        self.access_count += len(op_arr)
+        self._access_tuple = None
+
+
+    @staticmethod
+    def get_next_use_arr(id_arr: np.ndarray) -> np.ndarray:
+        """Get the index of the next access to the same block of each access.
+
+        Args:
+            id_arr: Array of block ids accessed in order.
+
+        Returns:
+            next_use_arr: Array of index of the next access to the block, the number of accesses if there is none.
+        """
+        id_arr = np.asarray(id_arr)
+        next_use_arr = np.full(len(id_arr), len(id_arr), dtype=np.int64)
+        if len(id_arr) < 2:
+            return next_use_arr
+        # accesses to the same block are adjacent and in order of time after a stable sort
+        order_arr = np.argsort(id_arr, kind="stable")
+        same_block_flag_arr = id_arr[order_arr[1:]] == id_arr[order_arr[:-1]]
+        next_use_arr[order_arr[:-1][same_block_flag_arr]] = order_arr[1:][same_block_flag_arr]
+        return next_use_arr
+
+
+    def _get_access_tuple(self) -> tuple:
+        """Get the list of block ids, the list of next uses, the read flag array and the number of blocks."""
+        if self._access_tuple is None:
+            addr_arr = np.concatenate(self._addr_arr_list) if self._addr_arr_list else np.zeros(0, dtype=np.int64)
+            op_arr = np.concatenate(self._op_arr_list) if self._op_arr_list else np.zeros(0, dtype="U1")
+            unique_addr_arr, id_arr = np.unique(addr_arr, return_inverse=True)
+            id_arr = id_arr.reshape(-1)
+            self._addr_arr_list, self._op_arr_list = [addr_arr], [op_arr]
+            self._access_tuple = (id_arr.tolist(), self.get_next_use_arr(id_arr).tolist(), op_arr == 'r', len(unique_addr_arr))
+        return self._access_tuple
+
+
+    def __len__(self) -> int:
+        """Number of distinct blocks accessed."""
+        return self._get_access_tuple()[3]
+
+
+    def get_hit_index_arr(self, size: int) -> np.ndarray:
+        """Get the index of each access that hits a cache of a given size with the optimal policy.
+
+        Args:
+            size: Size of the cache in blocks.
+
+        Returns:
+            hit_index_arr: Array of index of each access that hits the cache.
+        """
+        id_list, next_use_list, _, block_count = self._get_access_tuple()
+        hit_index_list = []
+        if size <= 0:
+            return np.zeros(0, dtype=np.int64)
+        append, heappush, heappop = hit_index_list.append, heapq.heappush, heapq.heappop
+        cache_flag_list = [0] * block_count
+        cur_next_use_list = [-1] * block_count
+        heap = []
+        count, bypass = 0, self.bypass
+        for index, (block_id, next_use) in enumerate(zip(id_list, next_use_list)):
+            if cache_flag_list[block_id]:
+                append(index)
+            elif count < size:
+                count += 1
+                cache_flag_list[block_id] = 1
+            else:
+                # drop stale entries until the top is the cached block used farthest in the future
+                neg_evict_next_use, evict_id = heap[0]
+                while cur_next_use_list[evict_id] != -neg_evict_next_use or not cache_flag_list[evict_id]:
+                    heappop(heap)
+                    neg_evict_next_use, evict_id = heap[0]
+                if bypass and next_use >= -neg_evict_next_use:
+                    continue
+                heappop(heap)
+                cache_flag_list[evict_id] = 0
+                cache_flag_list[block_id] = 1
+
+            cur_next_use_list[block_id] = next_use
+            heappush(heap, (-next_use, block_id))
+            # the heap is rebuilt from the cached blocks when most of its entries are stale
+            if len(heap) > 4 * size + 1024:
+                heap = [(neg_next_use, cache_id) for neg_next_use, cache_id in heap
+                            if cache_flag_list[cache_id] and cur_next_use_list[cache_id] == -neg_next_use]
+                heapq.heapify(heap)
+        return np.array(hit_index_list, dtype=np.int64)
+
+
+    def get_hit_rate_arr(self, size_arr: np.ndarray) -> np.ndarray:
+        """Get the hit rate of the optimal policy at each cache size.
+
+        Args:
+            size_arr: Array of cache sizes in blocks.
+
+        Returns:
+            hit_rate_arr: Array of hit rates (overall, read, write) at each cache size as fractions of all
+                            accesses like RDHistogram.get_hit_rate_arr.
+        """
+        _, _, read_flag_arr, _ = self._get_access_tuple()
+        hit_rate_arr = np.zeros((len(size_arr), 3), dtype=float)
+        if self.access_count == 0:
+            return hit_rate_arr
+        for size_index, size in enumerate(np.asarray(size_arr).astype(int).tolist()):
+            hit_index_arr = self.get_hit_index_arr(size)
+            read_hit_count = int(read_flag_arr[hit_index_arr].sum())
+            hit_rate_arr[size_index] = [len(hit_index_arr), read_hit_count, len(hit_index_arr) - read_hit_count]
+        return hit_rate_arr/self.access_count
+
+
+    def get_read_hit_rate_arr(self, size_arr: np.ndarray) -> np.ndarray:
+        """Get the read hit rate of the optimal policy at each cache size.
+
+        Args:
+            size_arr: Array of cache sizes in blocks.
+
+        Returns:
+            hit_rate_arr: Array of read hit rate at each cache size as a fraction of all accesses like
+                            RDHistogram.get_read_hit_rate_arr.
+        """
+        return self.get_hit_rate_arr(size_arr)[:, 1]
+
+
+    def track_cache_trace(
+            self,
+            cache_trace_reader,
+            batch_size: int = 1000000
+    ) -> None:
+        """Track every cache request of a cache trace.
+
+        Args:
+            cache_trace_reader: CacheTraceReader of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+        """
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+
+
+    def track_block_trace(
+            self,
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> None:
+        """Track the cache requests generated by each block request of a block trace.
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+        """
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            cache_req_arr = Reader.get_cache_req_arr(batch_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
@@ -0,0 +1,256 @@
+"""ParallelRDTracker builds the reuse distance histogram of a trace with multiple processes by
+partitioning the address space.
+
+Reuse distances cannot be computed on separate time ranges of a trace but they can be computed on
+separate sets of addresses. Each access is routed to one of P worker processes by the hash of its
+region, so each worker tracks a SHARDS sample of rate 1/P of the trace with an RDTracker. The
+reuse distances of a worker are scaled by P and the histograms of the workers are merged by the
+driver. The memory and the time of tracking are divided among the workers.
+
+Usage:
+    parallel_tracker = ParallelRDTracker(worker_count=8)
+    rd_hist = parallel_tracker.track_cache_trace(CacheTraceReader(cache_trace_path))
+"""
+
+import numpy as np
+from queue import Empty
+from multiprocessing import get_context
+
+from cydonia.profiler.Hash import NATIVE_MODE, get_hash64_arr
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.RDHistogram import RDHistogram
+from cydonia.profiler.RDTracker import RDTracker
+
+
+def track_partition(
+        task_queue,
+        result_queue,
+        worker_count: int,
+        infinite_rd_val: int
+) -> None:
+    """Track the accesses of a partition received from a queue until None is received and put
+    the RDHistogram of the partition in the result queue. If tracking raises an exception, the 
+    remaining tasks are received but not tracked so the driver does not block on a full task 
+    queue and the exception is put in the result queue instead.
+
+    Args:
+        task_queue: Queue of tuples of an array of block addresses and an array of operations.
+        result_queue: Queue where the RDHistogram of the partition or the exception raised is put.
+        worker_count: Number of partitions, the reuse distances are scaled by it.
+        infinite_rd_val: The value used to represent infinite reuse distance.
+    """
+    rd_tracker = RDTracker(infinite_rd_val)
+    rd_hist = RDHistogram(infinite_rd_val)
+    error = None
+    task = task_queue.get()
+    while task is not None:
+        if error is None:
+            try:
+                addr_arr, op_arr = task
+                rd_arr = np.array(rd_tracker.get_rd_arr(addr_arr), dtype=np.int64)
+                scaled_rd_arr = np.where(rd_arr == infinite_rd_val, infinite_rd_val, rd_arr * worker_count)
+                rd_hist.update_rd_arr(scaled_rd_arr, op_arr)
+            except Exception as err:
+                error = err
+        task = task_queue.get()
+    result_queue.put(rd_hist if error is None else error)
+
+
+class ParallelRDTracker:
+    def __init__(
+            self,
+            worker_count: int,
+            seed: int = 42,
+            num_lower_addr_bits_ignored: int = 0,
+            hash_mode: str = NATIVE_MODE,
+            infinite_rd_val: int = -1,
+            queue_size: int = 4
+    ) -> None:
+        """ This class routes block accesses to worker processes by region hash and merges their RDHistograms.
+
+        Args:
+            worker_count: Number of worker processes.
+            seed: Random seed of the hash. (Default: 42)
+            num_lower_addr_bits_ignored: Number of lower order address bits ignored to get the region of a block. (Default: 0)
+            hash_mode: Hash mode of cydonia.profiler.Hash. The native mode is the default because partitions are
+                        not compared with samples created by other tools. (Default: NATIVE_MODE)
+            infinite_rd_val: The value used to represent infinite reuse distance. (Default: -1)
+            queue_size: Maximum number of batches waiting to be tracked by a worker. (Default: 4)
+
+        Attributes:
+            access_count: Number of accesses routed to workers.
+            partition_access_count_arr: Array of number of accesses routed to each worker.
+        """
+        assert worker_count > 0, "Worker count {} not greater than 0.".format(worker_count)
+        self.worker_count = worker_count
+        self.seed = seed
+        self.num_lower_addr_bits_ignored = num_lower_addr_bits_ignored
+        self.hash_mode = hash_mode
+        self.access_count = 0
+        self.partition_access_count_arr = np.zeros(worker_count, dtype=np.int64)
+        self._infinite_rd_val = infinite_rd_val
+        self._queue_size = queue_size
+        self._task_queue_list = []
+        self._result_queue = None
+        self._process_list = []
+
+
+    def start(self) -> None:
+        """Start the worker processes if they are not running."""
+        if self._process_list:
+            return
+        context = get_context()
+        self._result_queue = context.Queue()
+        self._task_queue_list = [context.Queue(self._queue_size) for _ in range(self.worker_count)]
+        self._process_list = [context.Process(target=track_partition,
+                                                args=(task_queue, self._result_queue, self.worker_count, self._infinite_rd_val),
+                                                daemon=True)
+                                for task_queue in self._task_queue_list]
+        for process in self._process_list:
+            process.start()
+
+
+    def get_partition_arr(self, addr_arr: np.ndarray) -> np.ndarray:
+        """Get the partition of each block address.
+
+        Args:
+            addr_arr: Array of block addresses.
+
+        Returns:
+            partition_arr: Array of the index of the worker of each block address.
+        """
+        region_addr_arr = np.asarray(addr_arr, dtype=np.int64) >> self.num_lower_addr_bits_ignored
+        return (get_hash64_arr(region_addr_arr, self.seed, self.hash_mode) % np.uint64(self.worker_count)).astype(np.int64)
+
+
+    def track_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray
+    ) -> None:
+        """Route an array of block accesses to the workers of their partitions.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+
+        Raises:
+            ValueError: If an operation is not 'r' or 'w'.
+        """
+        addr_arr, op_arr = np.asarray(addr_arr, dtype=np.int64), np.asarray(op_arr)
+        read_flag_arr, write_flag_arr = op_arr == 'r', op_arr == 'w'
+        if not (read_flag_arr | write_flag_arr).all():
+            raise ValueError("Unindentified value for operation: {}".format(op_arr[~(read_flag_arr | write_flag_arr)][0]))
+
+        self.start()
+        partition_arr = self.get_partition_arr(addr_arr)
+        # a stable sort keeps the accesses of each partition in order
+        order_arr = np.argsort(partition_arr, kind="stable")
+        partition_count_arr = np.bincount(partition_arr, minlength=self.worker_count)
+        self.partition_access_count_arr += partition_count_arr
+        self.access_count += len(addr_arr)
+        split_index_arr = np.cumsum(partition_count_arr)[:-1]
+        for task_queue, partition_addr_arr, partition_op_arr in zip(self._task_queue_list,
+                                                                    np.split(addr_arr[order_arr], split_index_arr),
+                                                                    np.split(op_arr[order_arr], split_index_arr)):
+            if len(partition_addr_arr):
+                task_queue.put((partition_addr_arr, partition_op_arr))
+
+
+    def stop(self) -> None:
+        """Terminate the worker processes if they are running."""
+        for process in self._process_list:
+            process.terminate()
+        for process in self._process_list:
+            process.join()
+        self._process_list, self._task_queue_list, self._result_queue = [], [], None
+
+
+    def get_result(self) -> RDHistogram:
+        """Get the next result of a worker, checking that every worker is still alive while waiting.
+
+        Returns:
+            rd_hist: RDHistogram of a partition.
+
+        Raises:
+            RuntimeError: If a worker exited without a result.
+            Exception: The exception raised by a worker while tracking its partition.
+        """
+        while True:
+            try:
+                result = self._result_queue.get(timeout=1.0)
+                break
+            except Empty:
+                # a worker that put its result exits with 0 so the result is still in the queue
+                exitcode_list = [process.exitcode for process in self._process_list if process.exitcode]
+                if exitcode_list:
+                    self.stop()
+                    raise RuntimeError("Worker exited with code {} without a result.".format(exitcode_list[0]))
+        if isinstance(result, Exception):
+            self.stop()
+            raise result
+        return result
+
+
+    def get_rd_hist(self) -> RDHistogram:
+        """Stop the workers and merge the RDHistogram of each partition. If a worker fails, the 
+        remaining workers are terminated and its exception is raised.
+
+        Returns:
+            rd_hist: RDHistogram of every access tracked.
+        """
+        rd_hist = RDHistogram(self._infinite_rd_val)
+        if not self._process_list:
+            return rd_hist
+
+        for task_queue in self._task_queue_list:
+            task_queue.put(None)
+        # the results are read before joining so that no worker blocks on a full result queue
+        for _ in range(len(self._process_list)):
+            rd_hist.merge(self.get_result())
+        for process in self._process_list:
+            process.join()
+        self._process_list, self._task_queue_list, self._result_queue = [], [], None
+        return rd_hist
+
+
+    def track_cache_trace(
+            self,
+            cache_trace_reader,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track every cache request of a cache trace.
+
+        Args:
+            cache_trace_reader: CacheTraceReader of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: RDHistogram of the cache trace.
+        """
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.get_rd_hist()
+
+
+    def track_block_trace(
+            self,
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track the cache requests generated by each block request of a block trace.
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: RDHistogram of the block trace.
+        """
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            cache_req_arr = Reader.get_cache_req_arr(batch_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.get_rd_hist()
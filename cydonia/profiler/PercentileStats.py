@@ -41,6 +41,28 @@ class PercentileStats:
                 raise ValueError("Not space left in array of size {}".format(len(self.data)))
             self.data[self.cur_index] = data_entry 
             self.cur_index += 1
+
+
+    def add_data_arr(self, data_arr):
+        """ This function adds an array of entries to our data 
+            whose percentiles we will evaluate. 
+
+            Parameters
+            ----------
+            data_arr : np.ndarray 
+                the array of int or float to be added 
+        """
+        if self.cur_index == -1:
+            if type(self.data) is list:
+                self.data.extend(np.asarray(data_arr).tolist())
+                self.size += len(data_arr)
+            else:
+                raise TypeError("Wrong data type not a list.")
+        else:
+            if self.cur_index + len(data_arr) > self.size:
+                raise ValueError("Not space left in array of size {}".format(len(self.data)))
+            self.data[self.cur_index:self.cur_index+len(data_arr)] = data_arr 
+            self.cur_index += len(data_arr)
     
 
     def get_row(self):
@@ -1,18 +1,32 @@
 """RDHistogram stores the counts of read and write reuse distances.
 
+The counts are stored in a dense array indexed by reuse distance with a column for reads and a
+column for writes. The cumulative counts are cached so that the hit rate of any cache size is a
+single lookup until the histogram is updated again.
+
 Usage:
     rd_hist = RDHistogram()
     rd_hist.update_rd(rd_hist.infinite_rd_val, 'r')
     rd_hist.update_rd(0, 'r')
     rd_hist.update_rd(0, 'w)
     read_hit_rate = rd_hist.get_read_hit_rate(1)
+    read_hit_rate_arr = rd_hist.get_read_hit_rate_arr(size_arr)
     rd_hist.write_to_file(rd_hist_file_path)
+    rd_hist.write_to_npz_file(rd_hist_npz_file_path)
+    mae = get_mrc_mae(rd_hist, exact_rd_hist)
 """
-from numpy import linspace 
-from numpy import array, cumsum 
+from numpy import linspace
+from numpy import array, cumsum
 from numpy import ndarray, zeros
-from pathlib import Path 
-from collections import Counter 
+from numpy import add, asarray, clip, concatenate, flatnonzero, load, loadtxt, ones, savetxt, savez, unique
+from pathlib import Path
+from collections import Counter
+
+
+# column of read and write counts in the count array
+READ_COL = 0
+WRITE_COL = 1
+INITIAL_RD_CAPACITY = 1024
 
 
 class RDHistogram:
@@ -20,262 +34,470 @@ class RDHistogram:
             self,
             infinite_rd_val: int
     ) -> None:
-        """ This class tracks the count of read/write reuse distance values. 
+        """ This class tracks the count of read/write reuse distance values.
 
         Args:
             infinite_rd_val: The value used to represent infinite reuse distance. The first
                                 time a block is accessed its reuse distance is infinite. It is
-                                represented by a large integer or a negative value. 
+                                represented by a large integer or a negative value.
 
         Attributes:
-            read_count: Read block request count. 
-            write_count: Write block request count. 
-            read_counter: Counter of read reuse distances. 
-            write_counter: Counter of write reuse distances. 
-            max_read_rd: Maximum read reuse distance. 
+            read_count: Read block request count.
+            write_count: Write block request count.
+            read_counter: Counter of read reuse distances.
+            write_counter: Counter of write reuse distances.
+            max_read_rd: Maximum read reuse distance.
             max_read_hit_count: Maximum possible read hits.
-            max_rd: Maximum value of reuse distance. 
-            infinite_rd_val: Value used to represent infinite reuse distance. 
+            max_rd: Maximum value of reuse distance.
+            infinite_rd_val: Value used to represent infinite reuse distance.
         """
-        self.read_count = 0 
-        self.write_count = 0 
-        self.read_counter = Counter()
-        self.write_counter = Counter()
+        self.read_count = 0
+        self.write_count = 0
         self.max_read_rd = 0
-        self.max_read_hit_count = 0 
+        self.max_read_hit_count = 0
         self.max_rd = -1
         self._infinite_rd_val = infinite_rd_val
-    
+
+        # count of each finite reuse distance and of the infinite reuse distance of reads and writes
+        self._rd_count_arr = zeros((INITIAL_RD_CAPACITY, 2), dtype=int)
+        self._infinite_count_arr = zeros(2, dtype=int)
+        # cumulative count array where row s is the count of reuse distances below s, None if stale
+        self._cum_count_arr = None
+
+
+    def _ensure_capacity(self, rd: int) -> None:
+        """Grow the count array so that it can store the count of a reuse distance."""
+        if rd >= len(self._rd_count_arr):
+            capacity = max(rd + 1, 2 * len(self._rd_count_arr))
+            self._rd_count_arr = concatenate((self._rd_count_arr, zeros((capacity - len(self._rd_count_arr), 2), dtype=int)))
+
+
+    def _get_cum_count_arr(self) -> ndarray:
+        """Get the cached array of cumulative counts where row s is the count of reuse distances below s."""
+        if self._cum_count_arr is None:
+            self._cum_count_arr = concatenate((zeros((1, 2), dtype=int), cumsum(self._rd_count_arr[:self.max_rd+1], axis=0)))
+        return self._cum_count_arr
+
+
+    def get_rd_count_arr(self) -> ndarray:
+        """Get the array of read/write counts of each finite reuse distance.
+
+        Returns:
+            rd_count_arr: Array of read/write count where index represents the reuse distance.
+        """
+        return self._rd_count_arr[:self.max_rd+1].copy()
+
 
     def get_cum_hit_count_arr(self) -> ndarray:
         """Get the array of cumulative hit rate counts at each reuse distance.
-        
+
         Returns:
             cum_hit_count_arr: Array of cumulative read/write hit count where index represents the reuse distance.
         """
-        hit_count_arr = zeros((self.max_rd+1, 2), dtype=int)
-        for reuse_distance in range(self.max_rd + 1):
-            hit_count_arr[reuse_distance][0] = self.read_counter[reuse_distance]
-            hit_count_arr[reuse_distance][1] = self.write_counter[reuse_distance]
-        return cumsum(hit_count_arr, axis=0)
-    
+        return self._get_cum_count_arr()[1:].copy()
+
 
     def get_hit_rate_arr(self) -> ndarray:
         """Get the array of hit rate at each reuse distance.
-        
+
         Returns:
             hit_rate_arr: Array of hit rates (overall, read, write) at each reuse distance.
         """
         hit_rate_arr = zeros((self.max_rd+1, 3), dtype=float)
         total_req = self.read_count + self.write_count
-        cum_hit_count_arr = self.get_cum_hit_count_arr()
-        for index, (cum_read_hit_count, cum_write_hit_count) in enumerate(cum_hit_count_arr):
-            hit_rate_arr[index][0] = (cum_read_hit_count+cum_write_hit_count)/total_req
-            hit_rate_arr[index][1] = cum_read_hit_count/total_req
-            hit_rate_arr[index][2] = cum_write_hit_count/total_req
+        if total_req > 0:
+            cum_hit_count_arr = self._get_cum_count_arr()[1:]
+            hit_rate_arr[:, 0] = cum_hit_count_arr.sum(axis=1)/total_req
+            hit_rate_arr[:, 1:] = cum_hit_count_arr/total_req
         return hit_rate_arr
 
-    
+
     def get_max_hit_rate(self) -> float:
         """Get the maximum possible hit rate for this RD histogram.
-        
+
         Returns:
-            max_hit_rate: Maximum hit rate achievable from this RD histogram. 
+            max_hit_rate: Maximum hit rate achievable from this RD histogram.
         """
         return self.max_read_hit_count/(self.read_count + self.write_count) \
-                if (self.read_count + self.write_count) > 0 else 0.0 
-    
+                if (self.read_count + self.write_count) > 0 else 0.0
+
 
     def update_rd(
             self,
             rd: int,
-            op: str  
+            op: str
     ) -> None:
-        """Update reuse distance counter. 
+        """Update reuse distance counter.
 
         Args:
-            rd: Reuse distance value to update. 
-            op: Operation of the reuse distance. 
-        
+            rd: Reuse distance value to update.
+            op: Operation of the reuse distance.
+
         Raises:
-            ValueError: Raised if the 'op' parameter if not 'r' or 'w'. 
+            ValueError: Raised if the 'op' parameter if not 'r' or 'w'.
         """
-  
-        if self._infinite_rd_val > 0:
-            print("Infinite rd val is {} and it is greater than 0: {}.".format(self._infinite_rd_val, self._infinite_rd_val > 0))
-            assert rd <= self.infinite_rd_val, "RD value {} greater than value for infinite RD {}.".format(rd, self._infinite_rd_val)
-        else:
-            assert rd >= 0 or rd == self._infinite_rd_val, "RD value can be equal to {} or > 0 but found {}.".format(self._infinite_rd_val, rd)
+        self.multi_update(rd, 1, op)
 
-        if rd != self._infinite_rd_val and rd > self.max_rd:
-            self.max_rd = rd 
-        
-        if op == 'r':
-            self.read_counter[rd] += 1 
-            if rd != self.infinite_rd_val:
-                self.max_read_rd = max(rd, self.max_read_rd)
-                self.max_read_hit_count += 1
-            self.read_count += 1
-        elif op == 'w':
-            self.write_counter[rd] += 1 
-            self.write_count += 1
-        else:
-            raise ValueError("Unindentified value for operation: {}".format(op))
-    
 
     def get_read_hit_rate(
-            self, 
-            size_blocks: int 
+            self,
+            size_blocks: int
     ) -> float:
-        """Get the read hit rate for the given cache size. 
+        """Get the read hit rate for the given cache size.
 
         Args:
-            size_blocks: Size of cache in blocks for which to compute the hit rate. 
-        
+            size_blocks: Size of cache in blocks for which to compute the hit rate.
+
         Returns:
-            hit_rate: Read hit rate for the specified size. 
+            hit_rate: Read hit rate for the specified size.
         """
-        return sum([self.read_counter[rd] for rd in range(size_blocks)])/(self.read_count + self.write_count) \
-                if (self.read_count + self.write_count) > 0 else 0.0 
+        return float(self.get_read_hit_rate_arr([size_blocks])[0])
 
 
     def get_write_hit_rate(
-        self, 
-        size_blocks: int 
+        self,
+        size_blocks: int
     ) -> float:
-        """Get the write hit rate for the given cache size. 
+        """Get the write hit rate for the given cache size.
+
+        Args:
+            size_blocks: Size of cache in blocks for which to compute the hit rate.
+
+        Returns:
+            hit_rate: Read hit rate for the specified size.
+        """
+        return float(self.get_write_hit_rate_arr([size_blocks])[0])
+
+
+    def _get_hit_rate_arr(
+            self,
+            size_arr: ndarray,
+            col: int
+    ) -> ndarray:
+        """Get the read or write hit rate at each cache size in an array.
+
+        Args:
+            size_arr: Array of cache sizes in blocks.
+            col: READ_COL or WRITE_COL.
+
+        Returns:
+            hit_rate_arr: Array of hit rate at each cache size.
+        """
+        size_arr = asarray(size_arr).astype(int)
+        total_req = self.read_count + self.write_count
+        if total_req == 0:
+            return zeros(len(size_arr), dtype=float)
+        # the hits of a cache of size s are the reuse distances below s
+        return self._get_cum_count_arr()[clip(size_arr, 0, self.max_rd + 1), col]/total_req
+
+
+    def get_read_hit_rate_arr(self, size_arr: ndarray) -> ndarray:
+        """Get the read hit rate at each cache size in an array.
 
         Args:
-            size_blocks: Size of cache in blocks for which to compute the hit rate. 
-        
+            size_arr: Array of cache sizes in blocks.
+
         Returns:
-            hit_rate: Read hit rate for the specified size. 
+            hit_rate_arr: Array of read hit rate at each cache size.
         """
-        return sum([self.write_counter[rd] for rd in range(size_blocks)])/(self.read_count + self.write_count) \
-                if (self.read_count + self.write_count) > 0 else 0.0 
+        return self._get_hit_rate_arr(size_arr, READ_COL)
+
+
+    def get_write_hit_rate_arr(self, size_arr: ndarray) -> ndarray:
+        """Get the write hit rate at each cache size in an array.
+
+        Args:
+            size_arr: Array of cache sizes in blocks.
+
+        Returns:
+            hit_rate_arr: Array of write hit rate at each cache size.
+        """
+        return self._get_hit_rate_arr(size_arr, WRITE_COL)
 
 
     def get_equal_spaced_read_hrc(
             self,
             num_points = 20
     ) -> ndarray:
-        """Get the hit rate curve (HRC) as a numpy array. 
+        """Get the hit rate curve (HRC) as a numpy array.
 
         Args:
-            num_points: The number of equally spaced points in numpy array. 
-        
+            num_points: The number of equally spaced points in numpy array.
+
         Returns:
-            hrc: A 2-d numpy array where the rows correspond to hit rate and size respectively. 
+            hrc: A 2-d numpy array where the rows correspond to size and hit rate respectively.
         """
         """We want to guarentee that the maximum reuse distance is included in the hit rate curve.
             Using self.max_rd + num_points as the end point ensures there is a multiple of num_points
-            that is larger than max_rd so max_rd will always be part of the HRC. 
+            that is larger than max_rd so max_rd will always be part of the HRC.
         """
         size_arr = linspace(0, self.max_rd+num_points, num_points)
-        hrc_arr = array(size_arr.size)
-        for arr_index, cache_size in enumerate(size_arr):
-            hrc_arr[arr_index] = self.get_read_hit_rate(cache_size)
-        return array([size_arr, hrc_arr])
+        return array([size_arr, self.get_read_hit_rate_arr(size_arr)])
+
 
-        
     def write_to_file(
             self,
-            file_path: Path 
+            file_path: Path
     ) -> None:
-        """Write the reuse distance histogram to file. 
-        
+        """Write the reuse distance histogram to file.
+
         Args:
-            file_path: Path to file where reuse distance histogram is written. 
+            file_path: Path to file where reuse distance histogram is written.
         """
-        with file_path.open("w+") as rd_file_path_handle:
-            infinite_read_rd, infinite_write_rd = self.read_counter[self.infinite_rd_val], self.write_counter[self.infinite_rd_val]
-            rd_file_path_handle.write("{},{}\n".format(infinite_read_rd, infinite_write_rd))
-            for size_block in range(self.max_rd+1):
-                rd_file_path_handle.write("{},{}\n".format(self.read_counter[size_block], self.write_counter[size_block]))
+        with Path(file_path).open("w+") as rd_file_path_handle:
+            # first line of rd histogram file is count of infinite reuse distance
+            savetxt(rd_file_path_handle, concatenate((self._infinite_count_arr.reshape(1, 2), self._rd_count_arr[:self.max_rd+1])),
+                    fmt="%d", delimiter=",")
+
+
+    def write_to_npz_file(
+            self,
+            file_path: Path
+    ) -> None:
+        """Write the reuse distance histogram to a binary numpy .npz file.
+
+        Args:
+            file_path: Path to .npz file where reuse distance histogram is written.
+        """
+        with Path(file_path).open("wb") as rd_file_handle:
+            savez(rd_file_handle,
+                    rd_count_arr=self._rd_count_arr[:self.max_rd+1],
+                    infinite_count_arr=self._infinite_count_arr,
+                    infinite_rd_val=array(self._infinite_rd_val))
+
 
-    
     def multi_update(
-            self, 
-            rd: int, 
+            self,
+            rd: int,
             count: int,
-            op: str 
+            op: str
     ) -> None:
-        """Update the counter of a reuse distance value multiple times. 
-        
+        """Update the counter of a reuse distance value multiple times.
+
         Args:
-            rd: Reuse distance value counter to update. 
-            count: The number of times to update. 
-            op: Operation of reuse distance. 
+            rd: Reuse distance value counter to update.
+            count: The number of times to update.
+            op: Operation of reuse distance.
 
         Raises:
-            ValueError: Raised if the 'op' parameter if not 'r' or 'w'. 
+            ValueError: Raised if the 'op' parameter if not 'r' or 'w'.
         """
-        for _ in range(count):
-            self.update_rd(rd, op)
+        if op not in ('r', 'w'):
+            raise ValueError("Unindentified value for operation: {}".format(op))
+        if self._infinite_rd_val > 0:
+            assert rd <= self.infinite_rd_val, "RD value {} greater than value for infinite RD {}.".format(rd, self._infinite_rd_val)
+        else:
+            assert rd >= 0 or rd == self._infinite_rd_val, "RD value can be equal to {} or > 0 but found {}.".format(self._infinite_rd_val, rd)
+        if count <= 0:
+            return
+
+        col = READ_COL if op == 'r' else WRITE_COL
+        if rd == self._infinite_rd_val:
+            self._infinite_count_arr[col] += count
+        else:
+            self._ensure_capacity(rd)
+            self._rd_count_arr[rd, col] += count
+            self.max_rd = max(rd, self.max_rd)
+            if op == 'r':
+                self.max_read_rd = max(rd, self.max_read_rd)
+                self.max_read_hit_count += count
+            self._cum_count_arr = None
+
+        if op == 'r':
+            self.read_count += count
+        else:
+            self.write_count += count
+
+
+    def update_rd_arr(
+            self,
+            rd_arr: ndarray,
+            op_arr: ndarray,
+            count_arr: ndarray = None
+    ) -> None:
+        """Update the reuse distance counters with an array of reuse distances. It is equivalent to
+        calling multi_update for each reuse distance, count and operation.
+
+        Args:
+            rd_arr: Array of reuse distance values.
+            op_arr: Array of operation 'r' or 'w' of each reuse distance.
+            count_arr: Array of the number of times to count each reuse distance. If None, each
+                        reuse distance is counted once. (Default: None)
+
+        Raises:
+            ValueError: Raised if an operation is not 'r' or 'w'.
+        """
+        rd_arr, op_arr = asarray(rd_arr, dtype=int), asarray(op_arr)
+        count_arr = ones(len(rd_arr), dtype=int) if count_arr is None else asarray(count_arr, dtype=int)
+        assert (count_arr >= 0).all(), "Count of a reuse distance cannot be negative."
+        read_flag_arr, write_flag_arr = op_arr == 'r', op_arr == 'w'
+        if not (read_flag_arr | write_flag_arr).all():
+            raise ValueError("Unindentified value for operation: {}".format(op_arr[~(read_flag_arr | write_flag_arr)][0]))
+
+        infinite_flag_arr = rd_arr == self._infinite_rd_val
+        if self._infinite_rd_val > 0:
+            assert (rd_arr <= self._infinite_rd_val).all(), "RD value greater than value for infinite RD {}.".format(self._infinite_rd_val)
+        else:
+            assert ((rd_arr >= 0) | infinite_flag_arr).all(), "RD value can be equal to {} or > 0.".format(self._infinite_rd_val)
+
+        col_arr = write_flag_arr.astype(int)
+        add.at(self._infinite_count_arr, col_arr[infinite_flag_arr], count_arr[infinite_flag_arr])
+
+        finite_flag_arr = ~infinite_flag_arr & (count_arr > 0)
+        if finite_flag_arr.any():
+            finite_rd_arr = rd_arr[finite_flag_arr]
+            self._ensure_capacity(int(finite_rd_arr.max()))
+            add.at(self._rd_count_arr, (finite_rd_arr, col_arr[finite_flag_arr]), count_arr[finite_flag_arr])
+            self.max_rd = max(self.max_rd, int(finite_rd_arr.max()))
+            self._cum_count_arr = None
+
+        read_hit_flag_arr = finite_flag_arr & read_flag_arr
+        if read_hit_flag_arr.any():
+            self.max_read_rd = max(self.max_read_rd, int(rd_arr[read_hit_flag_arr].max()))
+        self.max_read_hit_count += int(count_arr[read_hit_flag_arr].sum())
+        self.read_count += int(count_arr[read_flag_arr].sum())
+        self.write_count += int(count_arr[write_flag_arr].sum())
+
+
+    def update_count_arr(
+            self,
+            rd_count_arr: ndarray,
+            infinite_count_arr: ndarray
+    ) -> None:
+        """Add the read/write counts of each reuse distance to this histogram.
+
+        Args:
+            rd_count_arr: Array of shape (N, 2) of read/write count where index represents the reuse distance.
+            infinite_count_arr: Array of read/write count of infinite reuse distance.
+        """
+        rd_count_arr = asarray(rd_count_arr, dtype=int).reshape(-1, 2)
+        infinite_count_arr = asarray(infinite_count_arr, dtype=int).reshape(2)
+        assert (rd_count_arr >= 0).all() and (infinite_count_arr >= 0).all(), "Count of a reuse distance cannot be negative."
+
+        self._infinite_count_arr += infinite_count_arr
+        nonzero_rd_arr = flatnonzero(rd_count_arr.any(axis=1))
+        if len(nonzero_rd_arr):
+            rd_count_arr = rd_count_arr[:nonzero_rd_arr[-1]+1]
+            self._ensure_capacity(len(rd_count_arr) - 1)
+            self._rd_count_arr[:len(rd_count_arr)] += rd_count_arr
+            self.max_rd = max(self.max_rd, len(rd_count_arr) - 1)
+            self._cum_count_arr = None
+
+        read_rd_arr = flatnonzero(rd_count_arr[:, READ_COL])
+        if len(read_rd_arr):
+            self.max_read_rd = max(self.max_read_rd, int(read_rd_arr[-1]))
+        self.max_read_hit_count += int(rd_count_arr[:, READ_COL].sum())
+        self.read_count += int(rd_count_arr[:, READ_COL].sum() + infinite_count_arr[READ_COL])
+        self.write_count += int(rd_count_arr[:, WRITE_COL].sum() + infinite_count_arr[WRITE_COL])
+
+
+    def merge(self, other: 'RDHistogram') -> 'RDHistogram':
+        """Add the counts of another histogram to this histogram.
+
+        Args:
+            other: Other RDHistogram with the same value of infinite reuse distance.
+
+        Returns:
+            rd_hist: This RDHistogram.
+        """
+        assert self.infinite_rd_val == other.infinite_rd_val, \
+                    "Infinite RD values {} and {} not equal.".format(self.infinite_rd_val, other.infinite_rd_val)
+        self.update_count_arr(other._rd_count_arr[:other.max_rd+1], other._infinite_count_arr)
+        return self
 
 
     def load_rd_hist_file(
-            self, 
-            file_path: Path 
+            self,
+            file_path: Path
     ) -> None:
         """Load a reuse distance histogram file to this class.
-        
+
         Args:
-            file_path: Path to file containing reuse distance histogram. 
+            file_path: Path to file containing reuse distance histogram.
         """
-        with file_path.open("r") as rd_file_handle:
-            # first line of rd histogram file is count of infinite reuse distance
-            line = rd_file_handle.readline()
-            read_rd_count, write_rd_count = line.rstrip().split(",")
-            self.multi_update(self.infinite_rd_val, int(read_rd_count), 'r')
-            self.multi_update(self.infinite_rd_val, int(write_rd_count), 'w')
-
-            cur_rd = 0 
-            line = rd_file_handle.readline()
-            while line:
-                read_rd_count, write_rd_count = line.rstrip().split(",")
-                self.multi_update(cur_rd, int(read_rd_count), 'r')
-                self.multi_update(cur_rd, int(write_rd_count), 'w')
-                cur_rd += 1
-                line = rd_file_handle.readline()
-    
+        # first line of rd histogram file is count of infinite reuse distance
+        count_arr = loadtxt(file_path, delimiter=",", dtype=int, ndmin=2)
+        self.update_count_arr(count_arr[1:], count_arr[0])
+
+
+    def load_npz_file(
+            self,
+            file_path: Path
+    ) -> None:
+        """Load a reuse distance histogram .npz file to this class.
+
+        Args:
+            file_path: Path to .npz file containing reuse distance histogram.
+        """
+        with load(file_path) as rd_hist_npz:
+            assert int(rd_hist_npz["infinite_rd_val"]) == self.infinite_rd_val, \
+                    "Infinite RD value {} of file not equal to {}.".format(int(rd_hist_npz["infinite_rd_val"]), self.infinite_rd_val)
+            self.update_count_arr(rd_hist_npz["rd_count_arr"], rd_hist_npz["infinite_count_arr"])
+
 
     def __eq__(
-            self, 
+            self,
             other: 'RDHistogram'
     ) -> bool:
         """Overrride the equal operator.
-        
+
         Args:
-            other: Other RDHistogram object we are comparing to. 
+            other: Other RDHistogram object we are comparing to.
         """
-        equal_bool = True 
-        if self.read_count != other.read_count or \
-                self.write_count != other.write_count or \
-                self.max_read_rd != other.max_read_rd or \
-                self.max_read_hit_count != other.max_read_hit_count or \
-                self.infinite_rd_val != other.infinite_rd_val:
-            equal_bool = False 
-        
-        if equal_bool:
-            infinite_read_rd = self.read_counter[self.infinite_rd_val]
-            infinite_write_rd = self.write_counter[self.infinite_rd_val]
-
-            other_infinite_read_rd = other.read_counter[self.infinite_rd_val]
-            other_infinite_write_rd = other.write_counter[self.infinite_rd_val]
-
-            if infinite_read_rd != other_infinite_read_rd or infinite_write_rd != other_infinite_write_rd:
-                equal_bool = False 
-            
-            if equal_bool:
-                for cur_rd in range(self.max_rd + 1):
-                    if self.read_counter[cur_rd] != other.read_counter[cur_rd] or self.write_counter[cur_rd] != other.write_counter[cur_rd]:
-                        equal_bool = False 
-                        break 
-        
-        return equal_bool
-    
+        return self.read_count == other.read_count and \
+                self.write_count == other.write_count and \
+                self.max_read_rd == other.max_read_rd and \
+                self.max_read_hit_count == other.max_read_hit_count and \
+                self.infinite_rd_val == other.infinite_rd_val and \
+                self.max_rd == other.max_rd and \
+                (self._infinite_count_arr == other._infinite_count_arr).all() and \
+                (self._rd_count_arr[:self.max_rd+1] == other._rd_count_arr[:other.max_rd+1]).all()
+
+
+    def _get_counter(self, col: int) -> Counter:
+        """Get a Counter of the read or write count of each reuse distance including the infinite reuse distance."""
+        rd_arr = flatnonzero(self._rd_count_arr[:self.max_rd+1, col])
+        counter = Counter(dict(zip(rd_arr.tolist(), self._rd_count_arr[rd_arr, col].tolist())))
+        if self._infinite_count_arr[col]:
+            counter[self._infinite_rd_val] = int(self._infinite_count_arr[col])
+        return counter
+
+
+    @property
+    def read_counter(self) -> Counter:
+        """Counter of read reuse distances. It is a copy and updating it does not update the histogram."""
+        return self._get_counter(READ_COL)
+
+
+    @property
+    def write_counter(self) -> Counter:
+        """Counter of write reuse distances. It is a copy and updating it does not update the histogram."""
+        return self._get_counter(WRITE_COL)
+
 
     @property
     def infinite_rd_val(self):
-        return self._infinite_rd_val
\ No newline at end of file
+        return self._infinite_rd_val
+
+
+def get_mrc_mae(
+        rd_hist: RDHistogram,
+        exact_rd_hist: RDHistogram,
+        size_arr: ndarray = None,
+        num_points: int = 100
+) -> float:
+    """Get the mean absolute error of the read miss ratio curve of a histogram compared to an exact histogram.
+
+    Args:
+        rd_hist: Approximate RDHistogram.
+        exact_rd_hist: Exact RDHistogram.
+        size_arr: Array of cache sizes in blocks where the miss ratio is compared. If None, num_points
+                    equally spaced sizes up to the maximum reuse distance of the exact histogram are used. (Default: None)
+        num_points: Number of cache sizes compared if size_arr is None. (Default: 100)
+
+    Returns:
+        mae: Mean absolute difference of read hit rate, which is equal to that of read miss ratio.
+    """
+    if size_arr is None:
+        size_arr = unique(linspace(1, exact_rd_hist.max_rd + 1, num_points).astype(int))
+    return float(abs(rd_hist.get_read_hit_rate_arr(size_arr) - exact_rd_hist.get_read_hit_rate_arr(size_arr)).mean())
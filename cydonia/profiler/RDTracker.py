@@ -0,0 +1,205 @@
+"""RDTracker computes the exact LRU reuse distance of each cache block access.
+
+The reuse distance of an access is the number of distinct blocks accessed since the previous access
+to the same block. Every access gets the next time and a block is live at the time of its last access.
+The reuse distance is the number of live times after the previous access to the block, which is the
+number of times after it minus the number of dead times after it. Dead times are counted in a Fenwick
+tree over time, so an access takes O(log M) time where M is the number of distinct blocks and a trace
+of N accesses takes O(N log M) time instead of the O(N*M) of walking an LRU stack. The live times are
+compacted to 1..M whenever the tree is full.
+
+Usage:
+    rd_tracker = RDTracker()
+    rd_tracker.track_cache_trace(CacheTraceReader(cache_trace_path))
+    rd_hist = rd_tracker.rd_hist
+"""
+
+import numpy as np
+
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.RDHistogram import RDHistogram
+
+
+class RDTracker:
+    def __init__(
+            self,
+            infinite_rd_val: int = -1,
+            initial_capacity: int = 1 << 16
+    ) -> None:
+        """ This class tracks the reuse distance of cache block accesses and counts them in an RDHistogram.
+
+        Args:
+            infinite_rd_val: The value used to represent infinite reuse distance. (Default: -1)
+            initial_capacity: The initial number of access times in the Fenwick tree. (Default: 65536)
+
+        Attributes:
+            rd_hist: RDHistogram of the reuse distances tracked.
+            access_count: Number of accesses tracked.
+        """
+        self.rd_hist = RDHistogram(infinite_rd_val)
+        self.access_count = 0
+        self._infinite_rd_val = infinite_rd_val
+        self._capacity = initial_capacity
+        self._tree = [0] * (self._capacity + 1)
+        self._cur_time = 0
+        self._dead_count = 0
+        self._last_access_time_dict = {}
+
+
+    def __len__(self) -> int:
+        """Number of distinct blocks accessed."""
+        return len(self._last_access_time_dict)
+
+
+    def compact(self) -> None:
+        """Renumber the last access time of each block to 1..M in order of time and clear the tree
+        with enough capacity for at least as many new accesses as there are blocks."""
+        block_count = len(self._last_access_time_dict)
+        self._capacity = max(self._capacity, 2 * block_count)
+        sorted_item_list = sorted(self._last_access_time_dict.items(), key=lambda item: item[1])
+        self._last_access_time_dict = {addr: time for time, (addr, _) in enumerate(sorted_item_list, start=1)}
+        self._tree = [0] * (self._capacity + 1)
+        self._dead_count = 0
+        self._cur_time = block_count
+
+
+    def remove(self, addr: int) -> bool:
+        """Remove a block so that it does not count towards the reuse distance of later accesses and
+        its next access has an infinite reuse distance.
+
+        Args:
+            addr: Address of the block to remove.
+
+        Returns:
+            removed: True if the block was tracked.
+        """
+        last_time = self._last_access_time_dict.pop(addr, None)
+        if last_time is None:
+            return False
+        self._dead_count += 1
+        index = last_time
+        while index <= self._capacity:
+            self._tree[index] += 1
+            index += index & -index
+        return True
+
+
+    def get_rd(self, addr: int) -> int:
+        """Get the reuse distance of an access to a block and track the access.
+
+        Args:
+            addr: Address of the block accessed.
+
+        Returns:
+            rd: Reuse distance of the access.
+        """
+        return self.get_rd_arr([addr])[0]
+
+
+    def get_rd_arr(self, addr_arr) -> list:
+        """Get the reuse distance of each access in an array of block accesses and track the accesses.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+
+        Returns:
+            rd_list: List of reuse distance of each access.
+        """
+        rd_list = []
+        append = rd_list.append
+        infinite_rd_val = self._infinite_rd_val
+        last_access_time_dict, tree = self._last_access_time_dict, self._tree
+        cur_time, capacity, dead_count = self._cur_time, self._capacity, self._dead_count
+        for addr in np.asarray(addr_arr).tolist():
+            if cur_time == capacity:
+                self._cur_time = cur_time
+                self.compact()
+                last_access_time_dict, tree = self._last_access_time_dict, self._tree
+                cur_time, capacity, dead_count = self._cur_time, self._capacity, self._dead_count
+
+            last_time = last_access_time_dict.get(addr)
+            if last_time is None:
+                append(infinite_rd_val)
+            else:
+                index, dead_prefix_count = last_time, 0
+                while index:
+                    dead_prefix_count += tree[index]
+                    index &= index - 1
+                append(cur_time - last_time - dead_count + dead_prefix_count)
+
+                # the previous access of the block is now dead
+                dead_count += 1
+                index = last_time
+                while index <= capacity:
+                    tree[index] += 1
+                    index += index & -index
+
+            cur_time += 1
+            last_access_time_dict[addr] = cur_time
+
+        self._cur_time, self._dead_count = cur_time, dead_count
+        self.access_count += len(rd_list)
+        return rd_list
+
+
+    def track_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray
+    ) -> np.ndarray:
+        """Track an array of block accesses and count their reuse distances in the histogram.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+
+        Returns:
+            rd_arr: Array of reuse distance of each access.
+        """
+        rd_arr = np.array(self.get_rd_arr(addr_arr), dtype=np.int64)
+        op_arr = np.asarray(op_arr)
+        self.rd_hist.update_rd_arr(rd_arr, op_arr)
+        return rd_arr
+
+
+    def track_cache_trace(
+            self,
+            cache_trace_reader,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track every cache request of a cache trace.
+
+        Args:
+            cache_trace_reader: CacheTraceReader of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: RDHistogram of the reuse distances tracked.
+        """
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.rd_hist
+
+
+    def track_block_trace(
+            self,
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track the cache requests generated by each block request of a block trace. A misaligned
+        write generates a read of each misaligned block before the write as in the cache trace.
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: RDHistogram of the reuse distances tracked.
+        """
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            cache_req_arr = Reader.get_cache_req_arr(batch_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.rd_hist
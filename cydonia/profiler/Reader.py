@@ -3,11 +3,40 @@
 from enum import Enum
 from dataclasses import dataclass
 
+import numpy as np 
 from pathlib import Path 
-from typing import Union
+from typing import Union, Iterator
 from abc import ABC, abstractmethod
 
 
+# dtype of the structured arrays yielded by Reader.read_batches
+BATCH_DTYPE = np.dtype([("ts", "<i8"),
+                        ("lba", "<i8"),
+                        ("op", "U1"),
+                        ("size", "<i8"),
+                        ("start_block", "<i8"),
+                        ("end_block", "<i8"),
+                        ("front_misalign", "<i8"),
+                        ("rear_misalign", "<i8")])
+
+# dtype of the structured arrays of cache requests returned by Reader.get_cache_req_arr
+CACHE_REQ_DTYPE = np.dtype([("i", "<i8"),
+                            ("iat", "<i8"),
+                            ("addr", "<i8"),
+                            ("op", "U1"),
+                            ("front_misalign", "<i8"),
+                            ("rear_misalign", "<i8")])
+
+# dtype of the structured arrays of cache extents returned by Reader.get_cache_extent_arr
+CACHE_EXTENT_DTYPE = np.dtype([("i", "<i8"),
+                                ("iat", "<i8"),
+                                ("addr", "<i8"),
+                                ("count", "<i8"),
+                                ("op", "U1"),
+                                ("front_misalign", "<i8"),
+                                ("rear_misalign", "<i8")])
+
+
 class OPTYPE(Enum):
     READ='r'
     WRITE='w'
@@ -33,8 +62,7 @@ class BlockRequest:
     lba: int
     size_byte: int 
     op: OPTYPE
-    iat: int 
-    trace_string: str 
+    trace_string: str = ""
     prev_ts: int = -1
     iat: int = -1 
 
@@ -102,6 +130,193 @@ class Reader(ABC):
         pass
 
 
+    @abstractmethod
+    def read_batches(
+            self, 
+            batch_size: int, 
+            block_size_byte: int = 4096
+    ) -> Iterator[np.ndarray]:
+        """Iterate over the block requests in the trace in batches. 
+
+        Args:
+            batch_size: Maximum number of block requests in a batch. 
+            block_size_byte: Size of a cache block used to compute the derived block features. (Default: 4096)
+        
+        Yields:
+            batch_arr: Structured array of dtype BATCH_DTYPE. 
+        """
+        pass 
+
+
+    @staticmethod
+    def get_batch_arr(
+            ts_arr: np.ndarray, 
+            lba_arr: np.ndarray, 
+            op_arr: np.ndarray, 
+            size_arr: np.ndarray, 
+            lba_size_byte: int, 
+            cache_block_size_byte: int 
+    ) -> np.ndarray:
+        """Get a structured array of block requests and the cache blocks they access. It is the 
+        array equivalent of calling get_cache_access_features for each block request. 
+
+        Args:
+            ts_arr: Array of timestamps. 
+            lba_arr: Array of LBAs (Logical Block Address). 
+            op_arr: Array of operations ('r' or 'w'). 
+            size_arr: Array of request sizes in bytes. 
+            lba_size_byte: Size of an LBA. 
+            cache_block_size_byte: Size of a cache block.
+        
+        Returns:
+            batch_arr: Structured array of dtype BATCH_DTYPE. 
+        """
+        batch_arr = np.empty(len(ts_arr), dtype=BATCH_DTYPE)
+        batch_arr["ts"] = ts_arr
+        batch_arr["lba"] = lba_arr
+        batch_arr["op"] = op_arr
+        batch_arr["size"] = size_arr
+
+        start_offset_arr = batch_arr["lba"] * lba_size_byte
+        batch_arr["start_block"] = start_offset_arr//cache_block_size_byte
+        batch_arr["end_block"] = (start_offset_arr + batch_arr["size"] - 1)//cache_block_size_byte
+        batch_arr["front_misalign"] = start_offset_arr - (batch_arr["start_block"] * cache_block_size_byte)
+        batch_arr["rear_misalign"] = ((batch_arr["end_block"] + 1) * cache_block_size_byte) - (start_offset_arr + batch_arr["size"])
+        return batch_arr
+    
+
+    @staticmethod
+    def get_cache_extent_arr(
+            batch_arr: np.ndarray, 
+            start_req_index: int = 1, 
+            prev_ts: int = None
+    ) -> np.ndarray:
+        """Get the array of cache extents generated by a batch of block requests. An extent represents
+        the cache requests to a range of contiguous cache blocks by a block request. Each block request
+        generates an extent of the cache blocks it accesses. A misaligned write request also generates 
+        a single block read extent for each misaligned block before the write extent. 
+
+        Args:
+            batch_arr: Structured array of dtype BATCH_DTYPE. 
+            start_req_index: Index of the first block request in the batch. (Default: 1)
+            prev_ts: Timestamp of the block request before the batch. If None, the interarrival time of the 
+                        first block request in the batch is 0. (Default: None)
+        
+        Returns:
+            cache_extent_arr: Structured array of dtype CACHE_EXTENT_DTYPE. 
+        """
+        if prev_ts is None:
+            prev_ts = batch_arr["ts"][0] if len(batch_arr) else 0 
+
+        write_flag_arr = batch_arr["op"] == 'w'
+        front_misalign_arr, rear_misalign_arr = batch_arr["front_misalign"], batch_arr["rear_misalign"]
+        block_count_arr = batch_arr["end_block"] + 1 - batch_arr["start_block"]
+        single_block_flag_arr = block_count_arr == 1
+
+        # A misaligned write to a single block generates one read of that block, while a multi-block 
+        # write can generate a read of the first block and another read of the last block.
+        front_read_flag_arr = write_flag_arr & ((front_misalign_arr > 0) | (single_block_flag_arr & (rear_misalign_arr > 0)))
+        rear_read_flag_arr = write_flag_arr & ~single_block_flag_arr & (rear_misalign_arr > 0)
+        read_count_arr = front_read_flag_arr.astype(int) + rear_read_flag_arr
+        row_count_arr = read_count_arr + 1
+        req_row_start_arr = np.cumsum(row_count_arr) - row_count_arr
+
+        cache_extent_arr = np.empty(row_count_arr.sum(), dtype=CACHE_EXTENT_DTYPE)
+        cache_extent_arr["i"] = np.repeat(np.arange(start_req_index, start_req_index + len(batch_arr)), row_count_arr)
+        cache_extent_arr["iat"] = np.repeat(np.diff(batch_arr["ts"], prepend=prev_ts), row_count_arr)
+
+        # the extent of blocks accessed follows the read extents due to misalignment
+        block_row_arr = req_row_start_arr + read_count_arr
+        cache_extent_arr["addr"][block_row_arr] = batch_arr["start_block"]
+        cache_extent_arr["count"][block_row_arr] = block_count_arr
+        cache_extent_arr["op"][block_row_arr] = batch_arr["op"]
+        cache_extent_arr["front_misalign"][block_row_arr] = front_misalign_arr
+        cache_extent_arr["rear_misalign"][block_row_arr] = rear_misalign_arr
+
+        front_read_row_arr = req_row_start_arr[front_read_flag_arr]
+        cache_extent_arr["addr"][front_read_row_arr] = batch_arr["start_block"][front_read_flag_arr]
+        cache_extent_arr["count"][front_read_row_arr] = 1 
+        cache_extent_arr["op"][front_read_row_arr] = 'r'
+        cache_extent_arr["front_misalign"][front_read_row_arr] = front_misalign_arr[front_read_flag_arr]
+        cache_extent_arr["rear_misalign"][front_read_row_arr] = np.where(single_block_flag_arr, rear_misalign_arr, 0)[front_read_flag_arr]
+
+        rear_read_row_arr = req_row_start_arr[rear_read_flag_arr] + front_read_flag_arr[rear_read_flag_arr]
+        cache_extent_arr["addr"][rear_read_row_arr] = batch_arr["end_block"][rear_read_flag_arr]
+        cache_extent_arr["count"][rear_read_row_arr] = 1 
+        cache_extent_arr["op"][rear_read_row_arr] = 'r'
+        cache_extent_arr["front_misalign"][rear_read_row_arr] = 0 
+        cache_extent_arr["rear_misalign"][rear_read_row_arr] = rear_misalign_arr[rear_read_flag_arr]
+        return cache_extent_arr
+
+
+    @staticmethod
+    def expand_cache_extent_arr(cache_extent_arr: np.ndarray) -> np.ndarray:
+        """Get the array of cache requests to each block of an array of cache extents. The front 
+        misalignment of an extent belongs to its first block and the rear misalignment to its last block.
+
+        Args:
+            cache_extent_arr: Structured array of dtype CACHE_EXTENT_DTYPE. 
+        
+        Returns:
+            cache_req_arr: Structured array of dtype CACHE_REQ_DTYPE. 
+        """
+        count_arr = cache_extent_arr["count"]
+        extent_row_start_arr = np.cumsum(count_arr) - count_arr
+
+        cache_req_arr = np.empty(count_arr.sum(), dtype=CACHE_REQ_DTYPE)
+        cache_req_arr["i"] = np.repeat(cache_extent_arr["i"], count_arr)
+        cache_req_arr["iat"] = np.repeat(cache_extent_arr["iat"], count_arr)
+        cache_req_arr["addr"] = Reader.get_block_addr_arr(cache_extent_arr["addr"], cache_extent_arr["addr"] + count_arr - 1)
+        cache_req_arr["op"] = np.repeat(cache_extent_arr["op"], count_arr)
+        cache_req_arr["front_misalign"] = 0 
+        cache_req_arr["rear_misalign"] = 0 
+        cache_req_arr["front_misalign"][extent_row_start_arr] = cache_extent_arr["front_misalign"]
+        cache_req_arr["rear_misalign"][extent_row_start_arr + count_arr - 1] = cache_extent_arr["rear_misalign"]
+        return cache_req_arr
+
+
+    @staticmethod
+    def get_cache_req_arr(
+            batch_arr: np.ndarray, 
+            start_req_index: int = 1, 
+            prev_ts: int = None
+    ) -> np.ndarray:
+        """Get the array of cache requests generated by a batch of block requests. A cache request
+        is generated for each cache block accessed by a block request. A misaligned write request also 
+        generates a read cache request for each misaligned block before the write cache requests. 
+
+        Args:
+            batch_arr: Structured array of dtype BATCH_DTYPE. 
+            start_req_index: Index of the first block request in the batch. (Default: 1)
+            prev_ts: Timestamp of the block request before the batch. If None, the interarrival time of the 
+                        first block request in the batch is 0. (Default: None)
+        
+        Returns:
+            cache_req_arr: Structured array of dtype CACHE_REQ_DTYPE. 
+        """
+        return Reader.expand_cache_extent_arr(Reader.get_cache_extent_arr(batch_arr, start_req_index, prev_ts))
+
+
+    @staticmethod
+    def get_block_addr_arr(
+            start_block_arr: np.ndarray, 
+            end_block_arr: np.ndarray
+    ) -> np.ndarray:
+        """Get the array of every cache block accessed by a set of block requests.
+
+        Args:
+            start_block_arr: Array of start cache block address of each block request. 
+            end_block_arr: Array of end cache block address of each block request. 
+        
+        Returns:
+            block_addr_arr: Array of cache block addresses in the order they are accessed. 
+        """
+        block_count_arr = end_block_arr + 1 - start_block_arr
+        req_start_index_arr = np.cumsum(block_count_arr) - block_count_arr
+        block_offset_arr = np.arange(block_count_arr.sum()) - np.repeat(req_start_index_arr, block_count_arr)
+        return np.repeat(start_block_arr, block_count_arr) + block_offset_arr
+
+
     @staticmethod
     def get_cache_access_features(
             lba, 
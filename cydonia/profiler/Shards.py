@@ -0,0 +1,147 @@
+"""Spatially hashed sampling of regions as in SHARDS (Waldspurger et al., FAST 2015).
+
+A region is sampled if the 64-bit hash of its address is below a threshold. In the fixed-rate mode
+the threshold is rate * 2**64. In the fixed-size mode at most a given number of regions are kept and
+the threshold is lowered to the hash of the region evicted each time the limit is exceeded, so the
+memory used does not grow with the footprint of the trace.
+
+Usage:
+    region_set = FixedSizeRegionSet(max_region_count, seed)
+    region_set.update(region_addr_arr)
+    sample_flag_arr = region_set.contains(region_addr_arr)
+    effective_rate = region_set.effective_rate
+"""
+
+import numpy as np
+
+from cydonia.profiler.Hash import MMH3_MODE, get_hash64_arr
+
+
+# number of distinct 64-bit hash values
+HASH_SPACE_SIZE = 1 << 64
+
+
+def get_rate_threshold(rate: float) -> int:
+    """Get the hash threshold of a fixed-rate sample.
+
+    Args:
+        rate: Rate of sampling.
+
+    Returns:
+        threshold: Regions with a hash value below the threshold are sampled.
+    """
+    assert rate > 0.0 and rate <= 1.0, "Sampling rate {} not in (0, 1].".format(rate)
+    return min(int(rate * HASH_SPACE_SIZE), HASH_SPACE_SIZE - 1)
+
+
+def get_rate_sample_flag_arr(
+        region_addr_arr: np.ndarray,
+        rate: float,
+        seed: int,
+        mode: str = MMH3_MODE
+) -> np.ndarray:
+    """Get a boolean array that is True for regions sampled at a fixed rate.
+
+    Args:
+        region_addr_arr: Array of region addresses.
+        rate: Rate of sampling.
+        seed: Random seed.
+        mode: Hash mode of cydonia.profiler.Hash. (Default: MMH3_MODE)
+
+    Returns:
+        sample_flag_arr: Boolean array that is True for sampled regions.
+    """
+    return get_hash64_arr(region_addr_arr, seed, mode) < np.uint64(get_rate_threshold(rate))
+
+
+class FixedSizeRegionSet:
+    """The set of at most max_region_count regions with the lowest hash values seen so far.
+
+    Attributes:
+        max_region_count: Maximum number of regions kept.
+        seed: Random seed.
+        mode: Hash mode of cydonia.profiler.Hash.
+        threshold: Regions with a hash value at or above the threshold are not sampled. None if no region was evicted.
+        evict_count: Number of regions evicted.
+        addr_arr: Sorted array of addresses of kept regions.
+        hash_arr: Array of hash values of kept regions.
+    """
+    def __init__(
+            self,
+            max_region_count: int,
+            seed: int,
+            mode: str = MMH3_MODE
+    ) -> None:
+        assert max_region_count > 0, "Maximum region count {} not greater than 0.".format(max_region_count)
+        self.max_region_count = max_region_count
+        self.seed = seed
+        self.mode = mode
+        self.threshold = None
+        self.evict_count = 0
+        self.addr_arr = np.zeros(0, dtype=np.int64)
+        self.hash_arr = np.zeros(0, dtype=np.uint64)
+
+
+    def __len__(self) -> int:
+        return len(self.addr_arr)
+
+
+    def update(self, region_addr_arr: np.ndarray) -> None:
+        """Add the regions in an array and evict regions with the highest hash values if more than
+        max_region_count regions are kept.
+
+        Args:
+            region_addr_arr: Array of region addresses.
+        """
+        region_addr_arr = np.setdiff1d(np.asarray(region_addr_arr, dtype=np.int64), self.addr_arr)
+        hash_arr = get_hash64_arr(region_addr_arr, self.seed, self.mode)
+        if self.threshold is not None:
+            below_threshold_flag_arr = hash_arr < np.uint64(self.threshold)
+            region_addr_arr, hash_arr = region_addr_arr[below_threshold_flag_arr], hash_arr[below_threshold_flag_arr]
+
+        addr_arr = np.concatenate((self.addr_arr, region_addr_arr))
+        hash_arr = np.concatenate((self.hash_arr, hash_arr))
+        if len(addr_arr) > self.max_region_count:
+            # the threshold drops to the lowest hash value evicted
+            order_arr = np.lexsort((addr_arr, hash_arr))
+            self.threshold = int(hash_arr[order_arr[self.max_region_count]])
+            self.evict_count += len(addr_arr) - self.max_region_count
+            keep_index_arr = order_arr[:self.max_region_count]
+            addr_arr, hash_arr = addr_arr[keep_index_arr], hash_arr[keep_index_arr]
+
+        order_arr = np.argsort(addr_arr)
+        self.addr_arr, self.hash_arr = addr_arr[order_arr], hash_arr[order_arr]
+
+
+    def contains(self, region_addr_arr: np.ndarray) -> np.ndarray:
+        """Get a boolean array that is True for regions that are kept.
+
+        Args:
+            region_addr_arr: Array of region addresses.
+
+        Returns:
+            contain_flag_arr: Boolean array that is True for regions in this set.
+        """
+        if not len(self.addr_arr):
+            return np.zeros(len(region_addr_arr), dtype=bool)
+        index_arr = np.minimum(np.searchsorted(self.addr_arr, region_addr_arr), len(self.addr_arr) - 1)
+        return self.addr_arr[index_arr] == region_addr_arr
+
+
+    @property
+    def effective_rate(self) -> float:
+        """The rate at which regions are sampled with the current threshold."""
+        return self.threshold/HASH_SPACE_SIZE if self.threshold is not None else 1.0
+
+
+    def get_stat_dict(self) -> dict:
+        """Get a dictionary of sampling statistics."""
+        return {
+            "max_region_count": self.max_region_count,
+            "region_count": len(self.addr_arr),
+            "evict_count": self.evict_count,
+            "threshold": self.threshold,
+            "effective_rate": self.effective_rate,
+            "seed": self.seed,
+            "hash_mode": self.mode
+        }
@@ -0,0 +1,286 @@
+"""ShardsRDTracker approximates the reuse distance histogram of a trace with SHARDS (Waldspurger et al., FAST 2015).
+
+Only accesses to regions whose address hash is below a threshold are tracked so the memory used is
+proportional to the number of sampled blocks. The reuse distance of a sampled access is computed
+on the sampled stream by RDTracker and scaled by 1/R where R is the sampling rate when the access
+was tracked. Each sampled access also represents 1/R accesses of the trace so that the counts of the
+histogram approximate those of the full trace. As in SHARDS_adj, the difference between the count of
+accesses of the trace and the count represented by the sample is added to the smallest reuse distance
+which corrects the error due to a few hot regions being in or out of the sample.
+
+In the fixed-rate mode the rate does not change. In the fixed-size mode at most max_region_count regions
+are tracked. When a new region exceeds the limit, the region with the highest hash value is evicted, its
+blocks are removed from the RDTracker and the threshold drops to its hash value.
+
+Usage:
+    shards_tracker = ShardsRDTracker(rate=0.01, seed=42)
+    shards_tracker.track_cache_trace(CacheTraceReader(cache_trace_path))
+    rd_hist = shards_tracker.get_rd_hist()
+"""
+
+import heapq
+import numpy as np
+from collections import Counter
+
+from cydonia.profiler.Hash import MMH3_MODE, get_hash64_arr
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.RDHistogram import RDHistogram
+from cydonia.profiler.RDTracker import RDTracker
+from cydonia.profiler.Shards import HASH_SPACE_SIZE, get_rate_threshold
+
+
+class ShardsRDTracker:
+    def __init__(
+            self,
+            rate: float = None,
+            max_region_count: int = None,
+            seed: int = 42,
+            num_lower_addr_bits_ignored: int = 0,
+            hash_mode: str = MMH3_MODE,
+            infinite_rd_val: int = -1
+    ) -> None:
+        """ This class tracks the approximate reuse distance of cache block accesses sampled by region hash.
+
+        Args:
+            rate: Rate of sampling in the fixed-rate mode. (Default: None)
+            max_region_count: Maximum number of regions tracked in the fixed-size mode. (Default: None)
+            seed: Random seed. (Default: 42)
+            num_lower_addr_bits_ignored: Number of lower order address bits ignored to get the region of a block. (Default: 0)
+            hash_mode: Hash mode of cydonia.profiler.Hash. (Default: MMH3_MODE)
+            infinite_rd_val: The value used to represent infinite reuse distance. (Default: -1)
+
+        Attributes:
+            rd_tracker: RDTracker of the sampled accesses.
+            access_count: Number of accesses seen.
+            read_access_count: Number of read accesses seen.
+            sample_access_count: Number of accesses sampled.
+            threshold: Regions with a hash value at or above the threshold are not sampled. None if every region is sampled.
+            evict_count: Number of regions evicted in the fixed-size mode.
+
+        Raises:
+            ValueError: If not exactly one of rate and max_region_count is specified.
+        """
+        if (rate is None) == (max_region_count is None):
+            raise ValueError("Exactly one of rate {} and max region count {} should be specified.".format(rate, max_region_count))
+        if max_region_count is not None:
+            assert max_region_count > 0, "Maximum region count {} not greater than 0.".format(max_region_count)
+
+        self.rate = rate
+        self.max_region_count = max_region_count
+        self.seed = seed
+        self.num_lower_addr_bits_ignored = num_lower_addr_bits_ignored
+        self.hash_mode = hash_mode
+        self.rd_tracker = RDTracker(infinite_rd_val)
+        self.access_count = 0
+        self.read_access_count = 0
+        self.sample_access_count = 0
+        self.threshold = get_rate_threshold(rate) if rate is not None else None
+        self.evict_count = 0
+
+        # max-heap of (-hash, -addr) of regions tracked in the fixed-size mode
+        self._region_heap = []
+        self._region_set = set()
+
+        # sum of the weight 1/R of sampled accesses at each scaled reuse distance
+        self._read_weight_counter = Counter()
+        self._write_weight_counter = Counter()
+
+
+    @property
+    def effective_rate(self) -> float:
+        """The rate at which regions are sampled with the current threshold."""
+        return self.threshold/HASH_SPACE_SIZE if self.threshold is not None else 1.0
+
+
+    def track_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray
+    ) -> None:
+        """Track the sampled accesses in an array of block accesses.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+
+        Raises:
+            ValueError: If an operation is not 'r' or 'w'.
+        """
+        addr_arr, op_arr = np.asarray(addr_arr, dtype=np.int64), np.asarray(op_arr)
+        read_flag_arr, write_flag_arr = op_arr == 'r', op_arr == 'w'
+        if not (read_flag_arr | write_flag_arr).all():
+            raise ValueError("Unindentified value for operation: {}".format(op_arr[~(read_flag_arr | write_flag_arr)][0]))
+
+        self.access_count += len(addr_arr)
+        self.read_access_count += int(read_flag_arr.sum())
+        region_addr_arr = addr_arr >> self.num_lower_addr_bits_ignored
+        hash_arr = get_hash64_arr(region_addr_arr, self.seed, self.hash_mode)
+
+        # the threshold only drops so accesses at or above it now are never sampled
+        if self.threshold is not None:
+            candidate_flag_arr = hash_arr < np.uint64(self.threshold)
+            addr_arr, op_arr = addr_arr[candidate_flag_arr], op_arr[candidate_flag_arr]
+            region_addr_arr, hash_arr = region_addr_arr[candidate_flag_arr], hash_arr[candidate_flag_arr]
+
+        if self.max_region_count is None:
+            self._track_sample_arr(addr_arr, op_arr)
+        else:
+            self._track_fixed_size_arr(addr_arr, op_arr, region_addr_arr, hash_arr)
+
+
+    def _track_fixed_size_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray,
+            region_addr_arr: np.ndarray,
+            hash_arr: np.ndarray
+    ) -> None:
+        """Track the sampled accesses in the fixed-size mode. The accesses between two evictions are
+        sampled at the same rate and tracked together.
+
+        Args:
+            addr_arr: Array of addresses of blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+            region_addr_arr: Array of region address of each access.
+            hash_arr: Array of hash value of each region.
+        """
+        sample_index_list = []
+        for index, (region_addr, region_hash) in enumerate(zip(region_addr_arr.tolist(), hash_arr.tolist())):
+            if region_addr in self._region_set:
+                sample_index_list.append(index)
+                continue
+            if self.threshold is not None and region_hash >= self.threshold:
+                continue
+
+            heapq.heappush(self._region_heap, (-region_hash, -region_addr))
+            self._region_set.add(region_addr)
+            if len(self._region_set) <= self.max_region_count:
+                sample_index_list.append(index)
+                continue
+
+            # the accesses before the eviction are tracked at the rate before it
+            self._track_sample_arr(addr_arr[sample_index_list], op_arr[sample_index_list])
+            sample_index_list = []
+
+            evict_hash, evict_region_addr = heapq.heappop(self._region_heap)
+            evict_hash, evict_region_addr = -evict_hash, -evict_region_addr
+            self._region_set.remove(evict_region_addr)
+            self.threshold = evict_hash
+            self.evict_count += 1
+            start_addr = evict_region_addr << self.num_lower_addr_bits_ignored
+            for evict_addr in range(start_addr, start_addr + (1 << self.num_lower_addr_bits_ignored)):
+                self.rd_tracker.remove(evict_addr)
+
+            if evict_region_addr != region_addr:
+                sample_index_list.append(index)
+
+        self._track_sample_arr(addr_arr[sample_index_list], op_arr[sample_index_list])
+
+
+    def _track_sample_arr(
+            self,
+            addr_arr: np.ndarray,
+            op_arr: np.ndarray
+    ) -> None:
+        """Track sampled accesses at the current rate.
+
+        Args:
+            addr_arr: Array of addresses of sampled blocks accessed in order.
+            op_arr: Array of operation 'r' or 'w' of each access.
+        """
+        if not len(addr_arr):
+            return
+        rate = self.effective_rate
+        infinite_rd_val = self.rd_tracker.rd_hist.infinite_rd_val
+        rd_arr = np.array(self.rd_tracker.get_rd_arr(addr_arr), dtype=np.int64)
+        scaled_rd_arr = np.where(rd_arr == infinite_rd_val, infinite_rd_val, (rd_arr/rate).astype(np.int64))
+        self.sample_access_count += len(addr_arr)
+
+        for weight_counter, op in [(self._read_weight_counter, 'r'), (self._write_weight_counter, 'w')]:
+            rd_val_arr, count_arr = np.unique(scaled_rd_arr[op_arr == op], return_counts=True)
+            weight_counter.update(dict(zip(rd_val_arr.tolist(), (count_arr/rate).tolist())))
+
+
+    def get_rd_hist(self, adjust: bool = True) -> RDHistogram:
+        """Get the approximate RDHistogram of the accesses tracked. The weighted count of each
+        reuse distance is rounded to the nearest integer.
+
+        Args:
+            adjust: If True, the difference between the count of accesses and the weighted count of
+                        samples of each operation is added to reuse distance 0 as in SHARDS_adj. A
+                        negative difference removes at most the count at reuse distance 0. (Default: True)
+
+        Returns:
+            rd_hist: Approximate RDHistogram.
+        """
+        rd_hist = RDHistogram(self.rd_tracker.rd_hist.infinite_rd_val)
+        write_access_count = self.access_count - self.read_access_count
+        for weight_counter, op, access_count in [(self._read_weight_counter, 'r', self.read_access_count),
+                                                    (self._write_weight_counter, 'w', write_access_count)]:
+            weight_counter = weight_counter.copy()
+            if adjust and weight_counter:
+                weight_counter[0] = max(0.0, weight_counter[0] + access_count - sum(weight_counter.values()))
+            if weight_counter:
+                rd_arr = np.fromiter(weight_counter.keys(), dtype=np.int64, count=len(weight_counter))
+                count_arr = np.rint(np.fromiter(weight_counter.values(), dtype=float, count=len(weight_counter))).astype(int)
+                rd_hist.update_rd_arr(rd_arr, np.full(len(rd_arr), op), count_arr)
+        return rd_hist
+
+
+    def get_stat_dict(self) -> dict:
+        """Get a dictionary of sampling statistics."""
+        return {
+            "rate": self.rate,
+            "max_region_count": self.max_region_count,
+            "effective_rate": self.effective_rate,
+            "threshold": self.threshold,
+            "evict_count": self.evict_count,
+            "access_count": self.access_count,
+            "sample_access_count": self.sample_access_count,
+            "sample_block_count": len(self.rd_tracker),
+            "seed": self.seed,
+            "num_lower_addr_bits_ignored": self.num_lower_addr_bits_ignored,
+            "hash_mode": self.hash_mode
+        }
+
+
+    def track_cache_trace(
+            self,
+            cache_trace_reader,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track the sampled cache requests of a cache trace.
+
+        Args:
+            cache_trace_reader: CacheTraceReader of the cache trace.
+            batch_size: Number of lines read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: Approximate RDHistogram of the cache trace.
+        """
+        for cache_extent_arr in cache_trace_reader.read_group_batches(batch_size):
+            cache_req_arr = Reader.expand_cache_extent_arr(cache_extent_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.get_rd_hist()
+
+
+    def track_block_trace(
+            self,
+            reader: Reader,
+            block_size_byte: int = 4096,
+            batch_size: int = 1000000
+    ) -> RDHistogram:
+        """Track the sampled cache requests generated by each block request of a block trace.
+
+        Args:
+            reader: Reader of the block trace.
+            block_size_byte: Size of a cache block in bytes. (Default: 4096)
+            batch_size: Number of block requests read at a time. (Default: 1000000)
+
+        Returns:
+            rd_hist: Approximate RDHistogram of the block trace.
+        """
+        for batch_arr in reader.read_batches(batch_size, block_size_byte):
+            cache_req_arr = Reader.get_cache_req_arr(batch_arr)
+            self.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        return self.get_rd_hist()
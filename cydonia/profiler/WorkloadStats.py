@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path 
-from numpy import integer, floating, ndarray
+from numpy import integer, floating, ndarray, asarray, diff, where
 from json import dumps, JSONEncoder, load
 from dataclasses import dataclass, asdict
 
@@ -63,6 +63,28 @@ class BlockStats:
             self.block_read_count += 1
             self.block_read_byte_sum += req.size_byte
             self.block_read_iat_sum += (req.ts - prev_ts)
+    
+
+    def track_arrays(
+            self, 
+            write_flag_arr: ndarray, 
+            size_arr: ndarray, 
+            iat_arr: ndarray
+    ) -> None:
+        """ Track a batch of block requests. 
+
+        Args:
+            write_flag_arr: Boolean array that is True for write requests.
+            size_arr: Array of request sizes in bytes. 
+            iat_arr: Array of interarrival times. 
+        """
+        read_flag_arr = ~write_flag_arr
+        self.block_write_count += int(write_flag_arr.sum())
+        self.block_write_byte_sum += int(size_arr[write_flag_arr].sum())
+        self.block_write_iat_sum += int(iat_arr[write_flag_arr].sum())
+        self.block_read_count += int(read_flag_arr.sum())
+        self.block_read_byte_sum += int(size_arr[read_flag_arr].sum())
+        self.block_read_iat_sum += int(iat_arr[read_flag_arr].sum())
 
 
 @dataclass 
@@ -115,6 +137,40 @@ class MisalignStats:
                     self.misaligned_read_cache_req_count += 1 
                 if rear_misalign_byte > 0:
                     self.misaligned_read_cache_req_count += 1
+    
+
+    def track_arrays(
+            self, 
+            start_offset_arr: ndarray, 
+            end_offset_arr: ndarray, 
+            write_flag_arr: ndarray, 
+            cache_block_size_byte: int 
+    ) -> None:
+        """ Track a batch of block requests. 
+
+        Args:
+            start_offset_arr: Array of start offsets of requests in bytes. 
+            end_offset_arr: Array of end offsets of requests in bytes. 
+            write_flag_arr: Boolean array that is True for write requests.
+            cache_block_size_byte: Size of a cache block in bytes. 
+        """
+        # same as BlockRequest where the rear misalignment of a request ending at a block boundary is a full block
+        front_misalign_byte_arr = start_offset_arr % cache_block_size_byte
+        rear_misalign_byte_arr = cache_block_size_byte - (end_offset_arr % cache_block_size_byte)
+        front_flag_arr, rear_flag_arr = front_misalign_byte_arr > 0, rear_misalign_byte_arr > 0
+        single_block_flag_arr = (start_offset_arr//cache_block_size_byte) == ((end_offset_arr-1)//cache_block_size_byte)
+
+        misalign_count_arr = front_flag_arr.astype(int) + rear_flag_arr
+        misalign_byte_arr = front_misalign_byte_arr + rear_misalign_byte_arr
+        cache_req_count_arr = where(single_block_flag_arr, front_flag_arr | rear_flag_arr, misalign_count_arr)
+
+        read_flag_arr = ~write_flag_arr
+        self.misaligned_write_count += int(misalign_count_arr[write_flag_arr].sum())
+        self.misaligned_write_byte += int(misalign_byte_arr[write_flag_arr].sum())
+        self.misaligned_write_cache_req_count += int(cache_req_count_arr[write_flag_arr].sum())
+        self.misaligned_read_count += int(misalign_count_arr[read_flag_arr].sum())
+        self.misaligned_read_byte += int(misalign_byte_arr[read_flag_arr].sum())
+        self.misaligned_read_cache_req_count += int(cache_req_count_arr[read_flag_arr].sum())
 
 
 class WorkloadStats:
@@ -166,6 +222,64 @@ class WorkloadStats:
             self._prev_ts = req.ts
         self._block_stat.track(req, self._prev_ts)
         self._prev_ts = req.ts
+    
+
+    def track_arrays(
+            self, 
+            ts_arr: ndarray, 
+            lba_arr: ndarray, 
+            write_flag_arr: ndarray, 
+            size_arr: ndarray
+    ) -> None:
+        """ Track a batch of block requests in the order they arrive. This is equivalent to calling
+        track with each block request but the LBA and cache block sizes of this object are used. 
+
+        Args:
+            ts_arr: Array of timestamps. 
+            lba_arr: Array of logical block addresses. 
+            write_flag_arr: Boolean array that is True for write requests.
+            size_arr: Array of request sizes in bytes. 
+        """
+        if not len(ts_arr):
+            return 
+
+        ts_arr, lba_arr, size_arr = asarray(ts_arr, dtype=int), asarray(lba_arr, dtype=int), asarray(size_arr, dtype=int)
+        write_flag_arr = asarray(write_flag_arr, dtype=bool)
+        if self._prev_ts is None:
+            self._prev_ts = int(ts_arr[0])
+        
+        start_offset_arr = lba_arr * self._lba_size_byte
+        self._misalign_stat.track_arrays(start_offset_arr, start_offset_arr + size_arr, write_flag_arr, self._cache_block_size_byte)
+        self._block_stat.track_arrays(write_flag_arr, size_arr, diff(ts_arr, prepend=self._prev_ts))
+        self._prev_ts = int(ts_arr[-1])
+    
+
+    @classmethod
+    def from_arrays(
+            cls, 
+            ts_arr: ndarray, 
+            lba_arr: ndarray, 
+            write_flag_arr: ndarray, 
+            size_arr: ndarray, 
+            lba_size_byte: int = 512, 
+            cache_block_size_byte: int = 4096
+    ) -> WorkloadStats:
+        """ Create WorkloadStats from arrays of block requests. 
+
+        Args:
+            ts_arr: Array of timestamps. 
+            lba_arr: Array of logical block addresses. 
+            write_flag_arr: Boolean array that is True for write requests.
+            size_arr: Array of request sizes in bytes. 
+            lba_size_byte: Size of a logical block address in bytes. (Default: 512)
+            cache_block_size_byte: Size of a cache block in bytes. (Default: 4096)
+        
+        Returns:
+            workload_stats: WorkloadStats of the block requests. 
+        """
+        workload_stats = cls(lba_size_byte, cache_block_size_byte)
+        workload_stats.track_arrays(ts_arr, lba_arr, write_flag_arr, size_arr)
+        return workload_stats
 
 
     def load_file(self, workload_stat_file: Path):
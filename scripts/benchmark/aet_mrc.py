@@ -0,0 +1,51 @@
+""" Compare the MRC of the AET model with the exact MRC.
+
+The exact RD histogram of a trace is computed with RDTracker and the approximate RD histogram with
+AETTracker. The mean absolute error of the read miss ratio curve and the time taken by each are
+reported. A synthetic stream of accesses is used when no trace is given.
+
+Usage:
+    python3 aet_mrc.py --cache_trace_path ../../data/test_cp_cache.csv
+    python3 aet_mrc.py --access_count 5000000 --block_count 1000000
+"""
+
+import argparse
+from pathlib import Path
+from time import perf_counter_ns
+
+from cydonia.profiler.AETTracker import AETTracker
+from cydonia.profiler.RDTracker import RDTracker
+from cydonia.profiler.RDHistogram import get_mrc_mae
+
+from shards_mrc import track
+from reuse_distance import generate_access_arr
+
+
+def main(args):
+    access_arr = None if args.cache_trace_path else generate_access_arr(args.access_count, args.block_count)
+
+    rd_tracker = RDTracker()
+    start_time_ns = perf_counter_ns()
+    track(rd_tracker, args, access_arr)
+    exact_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+    print("exact: {} accesses to {} blocks in {:.2f} seconds ({:.0f} accesses/second).".format(
+            rd_tracker.access_count, len(rd_tracker), exact_time_sec, rd_tracker.access_count/exact_time_sec))
+
+    aet_tracker = AETTracker()
+    start_time_ns = perf_counter_ns()
+    track(aet_tracker, args, access_arr)
+    rd_hist = aet_tracker.get_rd_hist()
+    aet_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+    print("AET: {} accesses in {:.2f} seconds ({:.0f} accesses/second, {:.1f}x faster), MAE {:.4f}.".format(
+            aet_tracker.access_count, aet_time_sec, aet_tracker.access_count/aet_time_sec, exact_time_sec/aet_time_sec,
+            get_mrc_mae(rd_hist, rd_tracker.rd_hist)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the MRC of the AET model with the exact MRC.")
+    parser.add_argument("--cache_trace_path", type=Path, default=None, help="Path of a cache trace, a synthetic stream is used if not given.")
+    parser.add_argument("--access_count", type=int, default=5000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of distinct blocks in the synthetic stream.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses tracked at a time.")
+    args = parser.parse_args()
+    main(args)
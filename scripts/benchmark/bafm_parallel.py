@@ -0,0 +1,70 @@
+""" Measure how finding the best block to remove in BAFM scales with the number of worker processes.
+
+A BAFM of random access features is created and the best block to remove is found a number of times
+with the blocks evaluated in the main process and with each number of worker processes evaluating
+the feature matrix in shared memory. The mean time of finding a block and the speedup compared to the
+main process are reported, and the block found by every worker count is checked to be the same.
+
+Usage:
+    python3 bafm_parallel.py --block_count 1000000 --worker_count 2 4 8
+"""
+
+import argparse
+import numpy as np
+from time import perf_counter_ns
+
+from cydonia.profiler.BAFM import BAFM
+from cydonia.profiler.WorkloadStats import WorkloadStats
+
+
+def get_random_bafm(block_count: int, worker_count: int, seed: int) -> BAFM:
+    rng = np.random.default_rng(seed)
+    bafm = BAFM(0, worker_count=worker_count)
+    row_arr = bafm.get_row_arr(np.arange(block_count))
+    bafm._feature_mat[row_arr] = rng.integers(0, 8, (block_count, 24))
+    return bafm
+
+
+def get_workload_stat(scale: int) -> WorkloadStats:
+    workload_stat = WorkloadStats()
+    workload_stat.load_dict({
+        "block_read_count": 20 * scale, "block_write_count": 10 * scale,
+        "block_read_byte_sum": 20 * scale * 16384, "block_write_byte_sum": 10 * scale * 8192,
+        "block_read_iat_sum": 20 * scale * 100, "block_write_iat_sum": 10 * scale * 150,
+        "misaligned_read_count": 4 * scale, "misaligned_write_count": 3 * scale,
+        "misaligned_read_byte": 4 * scale * 512, "misaligned_write_byte": 3 * scale * 512,
+        "misaligned_read_cache_req_count": 0, "misaligned_write_cache_req_count": 0
+    })
+    return workload_stat
+
+
+def main(args):
+    full_workload_stat, sample_workload_stat = get_workload_stat(args.block_count), get_workload_stat(args.block_count//2)
+
+    base_time_sec, base_best_dict = None, None
+    for worker_count in [1] + args.worker_count:
+        bafm = get_random_bafm(args.block_count, worker_count, args.seed)
+        # the first call starts the workers
+        best_dict = bafm.find_best_block_to_remove(full_workload_stat, sample_workload_stat, args.metric)
+        start_time_ns = perf_counter_ns()
+        for _ in range(args.iter_count):
+            assert bafm.find_best_block_to_remove(full_workload_stat, sample_workload_stat, args.metric) == best_dict
+        time_sec = (perf_counter_ns() - start_time_ns)/(1e9 * args.iter_count)
+        bafm.stop_workers()
+
+        if base_time_sec is None:
+            base_time_sec, base_best_dict = time_sec, best_dict
+        assert best_dict == base_best_dict, "Block {} found by {} workers not {}.".format(best_dict["addr"], worker_count, base_best_dict["addr"])
+        print("workers={}: {:.4f} seconds per block ({:.0f} blocks evaluated/second), speedup {:.2f}.".format(
+                worker_count, time_sec, args.block_count/time_sec, base_time_sec/time_sec))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure how finding the best block to remove in BAFM scales with worker processes.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of blocks in the BAFM.")
+    parser.add_argument("--worker_count", type=int, nargs="+", default=[2, 4], help="Numbers of worker processes.")
+    parser.add_argument("--metric", type=str, default="mean", choices=["mean", "max", "wmean"], help="The metric to use when selecting blocks.")
+    parser.add_argument("--iter_count", type=int, default=5, help="Number of times the best block is found.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the random access features.")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,62 @@
+""" Compare the strategies of BAFM to remove blocks from a sample until a target sampling rate.
+
+The exhaustive greedy strategy evaluates every block before each removal, the lazy strategy evaluates
+again only the blocks at the top of a heap of stale metrics and the batch strategy removes the best
+non-adjacent blocks after each evaluation of every block. The time taken, the number of blocks removed
+and the error of the final sample compared to the full trace are reported for each strategy.
+
+Usage:
+    python3 bafm_removal.py --target_rate 0.3
+    python3 bafm_removal.py --lower_addr_bits_ignored 1 --metric max --batch_size 2 8 32
+"""
+
+import argparse
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter_ns
+
+from cydonia.profiler.BAFM import BAFM
+from cydonia.profiler.CacheTrace import CacheTraceReader
+
+
+def get_trace_stat(cache_trace_path: Path) -> tuple:
+    reader = CacheTraceReader(cache_trace_path)
+    workload_stat = reader.get_stat()
+    block_addr_set = reader.get_unscaled_unique_block_addr_set()
+    reader.close()
+    return workload_stat, block_addr_set
+
+
+def main(args):
+    full_workload_stat, full_block_addr_set = get_trace_stat(args.full_cache_trace_path)
+    sample_workload_stat, sample_block_addr_set = get_trace_stat(args.sample_cache_trace_path)
+    print("Full trace has {} blocks and sample has {} blocks.".format(len(full_block_addr_set), len(sample_block_addr_set)))
+
+    strategy_list = [("greedy", False, 1), ("lazy", True, 1)] + [("batch{}".format(batch_size), False, batch_size) for batch_size in args.batch_size]
+    with TemporaryDirectory() as output_dir:
+        for strategy_name, lazy, batch_size in strategy_list:
+            bafm = BAFM(args.lower_addr_bits_ignored)
+            bafm.load_cache_trace(args.sample_cache_trace_path)
+            block_addr_set = set(sample_block_addr_set)
+
+            start_time_ns = perf_counter_ns()
+            new_workload_stat = bafm.target_sampling_rate(full_workload_stat, sample_workload_stat, args.metric,
+                                                            len(full_block_addr_set), block_addr_set, args.target_rate,
+                                                            Path(output_dir).joinpath("{}.bin".format(strategy_name)),
+                                                            lazy=lazy, batch_size=batch_size)
+            time_sec = (perf_counter_ns() - start_time_ns)/1e9
+            err_dict = BAFM.get_error_dict(full_workload_stat.get_workload_feature_dict(), new_workload_stat.get_workload_feature_dict())
+            print("{}: removed {} blocks in {:.2f} seconds, final mean {:.4f} max {:.4f} wmean {:.4f}.".format(
+                    strategy_name, len(sample_block_addr_set) - len(block_addr_set), time_sec, err_dict["mean"], err_dict["max"], err_dict["wmean"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the strategies of BAFM to remove blocks from a sample.")
+    parser.add_argument("--full_cache_trace_path", type=Path, default=Path("../../data/test_cp_cache.csv"), help="Path of the full cache trace.")
+    parser.add_argument("--sample_cache_trace_path", type=Path, default=Path("../../data/test_sample_cp_cache.csv"), help="Path of the sample cache trace.")
+    parser.add_argument("--lower_addr_bits_ignored", type=int, default=0, help="Number of lower order address bits ignored.")
+    parser.add_argument("--metric", type=str, default="mean", choices=["mean", "max", "wmean"], help="The metric to use when selecting blocks.")
+    parser.add_argument("--target_rate", type=float, default=0.3, help="The target sampling rate.")
+    parser.add_argument("--batch_size", type=int, nargs="+", default=[4, 16], help="Numbers of blocks removed per round of batch removal.")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,48 @@
+""" Measure the throughput of CacheSimulator for each replacement policy.
+
+The caches of each policy are simulated separately for a list of cache sizes so that the time of each
+policy is reported. The throughput is the number of accesses simulated per second per cache, which is
+the rate of a single cache simulated on one core. A synthetic stream of accesses is used when no trace is given.
+
+Usage:
+    python3 cache_sim.py --cache_trace_path ../../data/test_cp_cache.csv
+    python3 cache_sim.py --access_count 5000000 --block_count 1000000 --size 1000 10000 100000
+"""
+
+import argparse
+from pathlib import Path
+from time import perf_counter_ns
+
+from cydonia.profiler.CacheSimulator import CacheSimulator, POLICY_CLASS_DICT
+
+from shards_mrc import track
+from reuse_distance import generate_access_arr
+
+
+def main(args):
+    access_arr = None if args.cache_trace_path else generate_access_arr(args.access_count, args.block_count)
+
+    for policy in args.policy:
+        cache_simulator = CacheSimulator([policy], args.size)
+        start_time_ns = perf_counter_ns()
+        track(cache_simulator, args, access_arr)
+        stat_df = cache_simulator.get_stat_df()
+        time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        print("{}: {} accesses to {} blocks, {} caches in {:.2f} seconds ({:.0f} accesses/second/cache).".format(
+                policy, cache_simulator.access_count, len(cache_simulator), len(args.size), time_sec,
+                cache_simulator.access_count * len(args.size)/time_sec))
+        for _, stat_row in stat_df.iterrows():
+            print("    size={} hit ratio {:.4f} read hit ratio {:.4f} RMW read hits {}/{}".format(
+                    stat_row["size"], stat_row["hit_ratio"], stat_row["read_hit_ratio"], stat_row["rmw_read_hit_count"], stat_row["rmw_read_count"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the throughput of CacheSimulator for each replacement policy.")
+    parser.add_argument("--cache_trace_path", type=Path, default=None, help="Path of a cache trace, a synthetic stream is used if not given.")
+    parser.add_argument("--access_count", type=int, default=5000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of distinct blocks in the synthetic stream.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses simulated at a time.")
+    parser.add_argument("--policy", nargs="+", default=list(POLICY_CLASS_DICT.keys()), help="Policies to simulate.")
+    parser.add_argument("--size", type=int, nargs="+", default=[1000, 10000, 100000], help="Cache sizes in blocks.")
+    args = parser.parse_args()
+    main(args)
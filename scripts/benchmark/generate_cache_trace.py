@@ -0,0 +1,118 @@
+""" Benchmark cache trace generation from a block trace.
+
+The batch engine in CPReader.generate_cache_trace is compared against the per-request
+loop it replaced on a synthetic block trace and the two cache traces are checked to be
+byte-identical.
+
+Usage:
+    python3 generate_cache_trace.py --req_count 2000000 --output_dir /dev/shm/cydonia-bench
+"""
+
+import argparse
+import numpy as np
+from pathlib import Path
+from filecmp import cmp
+from time import perf_counter_ns
+
+from cydonia.profiler.CPReader import CPReader
+
+
+def generate_block_trace(
+        block_trace_path: Path,
+        req_count: int,
+        seed: int = 42
+) -> None:
+    """Generate a synthetic CP block trace with a mix of aligned and misaligned requests.
+
+    Args:
+        block_trace_path: Path of the block trace to create.
+        req_count: Number of block requests in the trace.
+        seed: Random seed. (Default: 42)
+    """
+    rng = np.random.default_rng(seed)
+    ts_arr = np.cumsum(rng.integers(0, 2000, size=req_count))
+    lba_arr = rng.integers(0, 1 << 28, size=req_count)
+    # align most requests to 4KB and leave the rest at a random sector
+    aligned_flag_arr = rng.random(req_count) < 0.8
+    lba_arr[aligned_flag_arr] -= lba_arr[aligned_flag_arr] % 8
+    op_arr = np.where(rng.random(req_count) < 0.6, 'w', 'r')
+    size_arr = 512 * rng.choice([1, 8, 16, 32, 64, 256], size=req_count, p=[0.1, 0.4, 0.2, 0.15, 0.1, 0.05])
+    with block_trace_path.open("w+") as block_trace_handle:
+        for ts, lba, op, size in zip(ts_arr.tolist(), lba_arr.tolist(), op_arr.tolist(), size_arr.tolist()):
+            block_trace_handle.write("{},{},{},{}\n".format(ts, lba, op, size))
+
+
+def generate_cache_trace_per_req(
+        reader: CPReader,
+        cache_trace_path: Path,
+        block_size_byte: int = 4096
+) -> None:
+    """ The per-request implementation of CPReader.generate_cache_trace used as the baseline. """
+    reader.reset()
+    block_req_count = 0
+    cache_trace_handle = open(cache_trace_path, "w+")
+    block_req = reader.get_next_block_req(block_size=block_size_byte)
+    prev_ts_us = block_req["ts"]
+    while block_req:
+        block_req_count += 1
+        block_iat_us = block_req["ts"] - prev_ts_us
+        block_op = block_req["op"]
+        block_count = block_req["end_block"] + 1 - block_req["start_block"]
+        if block_count == 1:
+            if block_op == 'w' and (block_req["front_misalign"] > 0 or block_req["rear_misalign"] > 0):
+                cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_req["start_block"], 'r',
+                                                                        block_req["front_misalign"], block_req["rear_misalign"]))
+            cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_req["start_block"], block_op,
+                                                                    block_req["front_misalign"], block_req["rear_misalign"]))
+        else:
+            if block_op == 'w':
+                if block_req["front_misalign"] > 0:
+                    cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_req["start_block"], 'r',
+                                                                            block_req["front_misalign"], 0))
+                if block_req["rear_misalign"] > 0:
+                    cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_req["end_block"], 'r',
+                                                                            0, block_req["rear_misalign"]))
+            for block_key in range(block_req["start_block"], block_req["end_block"]+1):
+                if block_key == block_req["start_block"]:
+                    cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_key, block_op, block_req["front_misalign"], 0))
+                elif block_key == block_req["end_block"]:
+                    cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_key, block_op, 0, block_req["rear_misalign"]))
+                else:
+                    cache_trace_handle.write("{},{},{},{},{},{}\n".format(block_req_count, block_iat_us, block_key, block_op, 0, 0))
+        prev_ts_us = block_req["ts"]
+        block_req = reader.get_next_block_req(block_size=block_size_byte)
+    cache_trace_handle.close()
+
+
+def main(args):
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(exist_ok=True, parents=True)
+    block_trace_path = output_dir.joinpath("block.csv")
+    batch_cache_trace_path = output_dir.joinpath("cache_batch.csv")
+    per_req_cache_trace_path = output_dir.joinpath("cache_per_req.csv")
+
+    generate_block_trace(block_trace_path, args.req_count)
+    reader = CPReader(block_trace_path)
+
+    start_time_ns = perf_counter_ns()
+    reader.generate_cache_trace(batch_cache_trace_path, batch_size=args.batch_size)
+    batch_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+    print("Batch engine: {} block requests in {:.2f} seconds ({:.0f} requests/second).".format(args.req_count, batch_time_sec, args.req_count/batch_time_sec))
+
+    if not args.skip_baseline:
+        start_time_ns = perf_counter_ns()
+        generate_cache_trace_per_req(reader, per_req_cache_trace_path)
+        per_req_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        print("Per-request baseline: {} block requests in {:.2f} seconds ({:.0f} requests/second).".format(args.req_count, per_req_time_sec, args.req_count/per_req_time_sec))
+        print("Speedup: {:.2f}x, identical output: {}.".format(per_req_time_sec/batch_time_sec, cmp(batch_cache_trace_path, per_req_cache_trace_path, shallow=False)))
+    reader.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache trace generation from a block trace.")
+    parser.add_argument("--req_count", type=int, default=2000000, help="Number of block requests in the synthetic trace.")
+    parser.add_argument("--batch_size", type=int, default=100000, help="Number of block requests expanded at a time.")
+    parser.add_argument("--output_dir", default="/dev/shm/cydonia-bench", help="Directory where traces are created.")
+    parser.add_argument("--skip_baseline", action="store_true", help="Do not run the per-request baseline.")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,72 @@
+""" Compare the MRC of miniature cache simulations on a sampled stream with that of full simulations.
+
+Every cache size is simulated with CacheSimulator on the full stream. The stream is sampled at each
+rate by region hash and MiniSim simulates the miniature caches on the sample with a pool of worker
+processes. The adjusted hit ratio with the number of accesses of the full stream is compared unless
+--no-adjust is given. The time taken and the mean absolute error of the hit ratio of each policy are reported. A
+synthetic stream of accesses is used when no trace is given.
+
+Usage:
+    python3 mini_sim.py --cache_trace_path ../../data/test_cp_cache.csv --size 10 50 100 200
+    python3 mini_sim.py --access_count 2000000 --block_count 1000000 --rate 0.1 0.01
+"""
+
+import argparse
+import numpy as np
+from pathlib import Path
+from time import perf_counter_ns
+
+from cydonia.profiler.CacheSimulator import CacheSimulator, POLICY_CLASS_DICT
+from cydonia.profiler.MiniSim import MiniSim
+from cydonia.profiler.Shards import get_rate_sample_flag_arr
+
+from reuse_distance import generate_access_arr
+
+
+def main(args):
+    if args.cache_trace_path:
+        addr_arr, op_arr, rmw_flag_arr = MiniSim.load_cache_trace(args.cache_trace_path, args.batch_size)
+    else:
+        addr_arr, op_arr = generate_access_arr(args.access_count, args.block_count)
+        rmw_flag_arr = np.zeros(len(addr_arr), dtype=bool)
+
+    cache_simulator = CacheSimulator(args.policy, args.size)
+    start_time_ns = perf_counter_ns()
+    for batch_start in range(0, len(addr_arr), args.batch_size):
+        batch_end = batch_start + args.batch_size
+        cache_simulator.track_arr(addr_arr[batch_start:batch_end], op_arr[batch_start:batch_end], rmw_flag_arr[batch_start:batch_end])
+    stat_df = cache_simulator.get_stat_df().sort_values(["policy", "size"], kind="stable").reset_index(drop=True)
+    full_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+    print("full: {} accesses, {} caches in {:.2f} seconds.".format(len(addr_arr), len(stat_df), full_time_sec))
+
+    for rate in args.rate:
+        start_time_ns = perf_counter_ns()
+        sample_flag_arr = get_rate_sample_flag_arr(addr_arr >> args.num_lower_addr_bits_ignored, rate, args.seed)
+        mini_sim = MiniSim(args.policy, args.size, rate, worker_count=args.worker_count)
+        mrc_df = mini_sim.run_arr(addr_arr[sample_flag_arr], op_arr[sample_flag_arr], rmw_flag_arr[sample_flag_arr], args.batch_size,
+                                access_count=len(addr_arr) if args.adjust else None)
+        mini_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        print("rate={}: {} sampled accesses in {:.2f} seconds ({:.1f}x faster).".format(
+                rate, int(sample_flag_arr.sum()), mini_time_sec, full_time_sec/mini_time_sec))
+        hit_ratio_column = "adjusted_hit_ratio" if args.adjust else "hit_ratio"
+        for policy in args.policy:
+            policy_flag_arr = (mrc_df["policy"] == policy).to_numpy()
+            mae = np.abs(mrc_df[hit_ratio_column].to_numpy()[policy_flag_arr] - stat_df["hit_ratio"].to_numpy()[policy_flag_arr]).mean()
+            print("    {}: MAE {:.4f}".format(policy, mae))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the MRC of miniature cache simulations with that of full simulations.")
+    parser.add_argument("--cache_trace_path", type=Path, default=None, help="Path of a cache trace, a synthetic stream is used if not given.")
+    parser.add_argument("--access_count", type=int, default=2000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of distinct blocks in the synthetic stream.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses simulated at a time.")
+    parser.add_argument("--policy", nargs="+", default=list(POLICY_CLASS_DICT.keys()), help="Policies to simulate.")
+    parser.add_argument("--size", type=int, nargs="+", default=[1000, 5000, 10000, 50000, 100000], help="Cache sizes in blocks.")
+    parser.add_argument("--rate", type=float, nargs="+", default=[0.1, 0.01], help="Sampling rates.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the hash.")
+    parser.add_argument("--num_lower_addr_bits_ignored", type=int, default=0, help="Number of lower order address bits ignored.")
+    parser.add_argument("--adjust", action=argparse.BooleanOptionalAction, default=True, help="Compare the hit ratio adjusted with the access count of the stream.")
+    parser.add_argument("--worker_count", type=int, default=None, help="Number of worker processes, the number of CPUs if not given.")
+    args = parser.parse_args()
+    main(args)
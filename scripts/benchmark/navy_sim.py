@@ -0,0 +1,66 @@
+""" Sweep the NVM admission probability of NavySimulator.
+
+A DRAM LRU cache in front of a region-based FIFO NVM cache is simulated for each admission probability.
+The T1 and T2 hit ratio, the bytes written to the device, the mean and maximum device write rate and
+the time taken are reported. A synthetic stream of accesses with a fixed interarrival time is used when
+no trace is given.
+
+Usage:
+    python3 navy_sim.py --cache_trace_path ../../data/test_cp_cache.csv --t1_size_mb 1 --t2_size_mb 4 --region_size_mb 1
+    python3 navy_sim.py --access_count 5000000 --block_count 1000000 --t1_size_mb 100 --t2_size_mb 1000
+"""
+
+import argparse
+import numpy as np
+from pathlib import Path
+from time import perf_counter_ns
+
+from cydonia.cachelib.NavySimulator import NavySimulator
+from cydonia.profiler.CacheTrace import CacheTraceReader
+
+from reuse_distance import generate_access_arr
+
+
+def main(args):
+    if not args.cache_trace_path:
+        addr_arr, op_arr = generate_access_arr(args.access_count, args.block_count)
+        ts_arr = np.arange(len(addr_arr), dtype=np.int64) * args.iat_us
+
+    for admission_probability in args.admission_probability:
+        navy_simulator = NavySimulator(args.t1_size_mb, args.t2_size_mb,
+                                        region_size_mb=args.region_size_mb,
+                                        clean_region_count=args.clean_region_count,
+                                        admission_probability=admission_probability,
+                                        max_device_write_rate_mb=args.max_device_write_rate_mb,
+                                        replay_rate=args.replay_rate)
+        start_time_ns = perf_counter_ns()
+        if args.cache_trace_path:
+            navy_simulator.track_cache_trace(CacheTraceReader(args.cache_trace_path), batch_size=args.batch_size)
+        else:
+            for batch_start in range(0, len(addr_arr), args.batch_size):
+                batch_end = batch_start + args.batch_size
+                navy_simulator.track_arr(addr_arr[batch_start:batch_end], op_arr[batch_start:batch_end], ts_arr[batch_start:batch_end])
+        stat_dict = navy_simulator.get_stat_dict()
+        time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        print("p={}: T1 {:.4f} T2 {:.4f} device writes {:.1f}MB mean {:.1f}MB/s max {:.1f}MB/s, {:.2f} seconds ({:.0f} accesses/second).".format(
+                admission_probability, stat_dict["t1_hit_ratio"], stat_dict["t2_hit_ratio"], stat_dict["device_write_byte"]/1024**2,
+                stat_dict["mean_device_write_rate_mb"], stat_dict["max_device_write_rate_mb"], time_sec, stat_dict["access_count"]/time_sec))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep the NVM admission probability of NavySimulator.")
+    parser.add_argument("--cache_trace_path", type=Path, default=None, help="Path of a cache trace, a synthetic stream is used if not given.")
+    parser.add_argument("--access_count", type=int, default=5000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of distinct blocks in the synthetic stream.")
+    parser.add_argument("--iat_us", type=int, default=10, help="Interarrival time of accesses of the synthetic stream in microseconds.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses simulated at a time.")
+    parser.add_argument("--t1_size_mb", type=int, default=100, help="Size of DRAM in MB.")
+    parser.add_argument("--t2_size_mb", type=int, default=1000, help="Size of NVM in MB.")
+    parser.add_argument("--region_size_mb", type=int, default=16, help="Size of a NVM region in MB.")
+    parser.add_argument("--clean_region_count", type=int, default=1, help="Number of free NVM regions.")
+    parser.add_argument("--max_device_write_rate_mb", type=float, default=None, help="Maximum device write rate in MB per second.")
+    parser.add_argument("--replay_rate", type=float, default=1.0, help="Rate at which the trace is replayed.")
+    parser.add_argument("--admission_probability", type=float, nargs="+", default=[0.1, 0.25, 0.5, 0.75, 1.0],
+                        help="Admission probabilities to simulate.")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,57 @@
+""" Compare the hit rate of LRU with the optimal hit rate of Belady's MIN at each cache size.
+
+The LRU hit rate curve comes from the RD histogram of RDTracker and the optimal hit rate from OPTTracker.
+The hit rates and the time taken by each cache size of OPT are reported. A synthetic stream of
+accesses is used when no trace is given.
+
+Usage:
+    python3 opt_mrc.py --cache_trace_path ../../data/test_cp_cache.csv --size 10 50 100 200
+    python3 opt_mrc.py --access_count 2000000 --block_count 1000000 --bypass
+"""
+
+import argparse
+import numpy as np
+from pathlib import Path
+from time import perf_counter_ns
+
+from cydonia.profiler.OPTTracker import OPTTracker
+from cydonia.profiler.RDTracker import RDTracker
+
+from shards_mrc import track
+from reuse_distance import generate_access_arr
+
+
+def main(args):
+    access_arr = None if args.cache_trace_path else generate_access_arr(args.access_count, args.block_count)
+    size_arr = np.array(args.size)
+
+    rd_tracker = RDTracker()
+    track(rd_tracker, args, access_arr)
+    rd_hist = rd_tracker.rd_hist
+    lru_hit_rate_arr = rd_hist.get_read_hit_rate_arr(size_arr) + rd_hist.get_write_hit_rate_arr(size_arr)
+
+    opt_tracker = OPTTracker(bypass=args.bypass)
+    start_time_ns = perf_counter_ns()
+    track(opt_tracker, args, access_arr)
+    opt_tracker.get_hit_rate_arr([])
+    prepare_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+    print("OPT: {} accesses to {} blocks prepared in {:.2f} seconds.".format(opt_tracker.access_count, len(opt_tracker), prepare_time_sec))
+
+    for size, lru_hit_rate in zip(size_arr.tolist(), lru_hit_rate_arr.tolist()):
+        start_time_ns = perf_counter_ns()
+        opt_hit_rate = opt_tracker.get_hit_rate_arr([size])[0, 0]
+        time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        print("size={}: LRU {:.4f} OPT {:.4f} gap {:.4f}, {:.2f} seconds ({:.0f} accesses/second).".format(
+                size, lru_hit_rate, opt_hit_rate, opt_hit_rate - lru_hit_rate, time_sec, opt_tracker.access_count/time_sec))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the hit rate of LRU with the optimal hit rate at each cache size.")
+    parser.add_argument("--cache_trace_path", type=Path, default=None, help="Path of a cache trace, a synthetic stream is used if not given.")
+    parser.add_argument("--access_count", type=int, default=2000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of distinct blocks in the synthetic stream.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses tracked at a time.")
+    parser.add_argument("--size", type=int, nargs="+", default=[1000, 10000, 100000], help="Cache sizes in blocks.")
+    parser.add_argument("--bypass", action="store_true", help="Do not cache a block used after every cached block.")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,54 @@
+""" Benchmark the scaling of parallel MRC construction with the number of worker processes.
+
+The RD histogram of a trace is built by ParallelRDTracker with each number of workers. A single
+worker tracks every access so its histogram is exact and is used to report the mean absolute error
+of the read miss ratio curve with more workers. A synthetic stream of accesses is used when no
+trace is given.
+
+Usage:
+    python3 parallel_mrc.py --access_count 20000000 --worker_count 1 2 4 8 16
+    python3 parallel_mrc.py --cache_trace_path cache_trace.csv
+"""
+
+import argparse
+from os import cpu_count
+from pathlib import Path
+from time import perf_counter_ns
+
+from cydonia.profiler.ParallelRDTracker import ParallelRDTracker
+from cydonia.profiler.RDHistogram import get_mrc_mae
+
+from shards_mrc import track
+from reuse_distance import generate_access_arr
+
+
+def main(args):
+    access_arr = None if args.cache_trace_path else generate_access_arr(args.access_count, args.block_count)
+    print("{} CPUs available.".format(cpu_count()))
+
+    base_time_sec, exact_rd_hist = None, None
+    for worker_count in args.worker_count:
+        parallel_tracker = ParallelRDTracker(worker_count, num_lower_addr_bits_ignored=args.num_lower_addr_bits_ignored)
+        start_time_ns = perf_counter_ns()
+        track(parallel_tracker, args, access_arr)
+        rd_hist = parallel_tracker.get_rd_hist()
+        time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        if base_time_sec is None:
+            base_time_sec = time_sec
+        if worker_count == 1:
+            exact_rd_hist = rd_hist
+        mae = get_mrc_mae(rd_hist, exact_rd_hist) if exact_rd_hist is not None else float("nan")
+        print("{} workers: {} accesses in {:.2f} seconds ({:.0f} accesses/second, {:.2f}x), MAE {:.4f}.".format(
+                worker_count, parallel_tracker.access_count, time_sec, parallel_tracker.access_count/time_sec, base_time_sec/time_sec, mae))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scaling of parallel MRC construction.")
+    parser.add_argument("--cache_trace_path", type=Path, default=None, help="Path of a cache trace, a synthetic stream is used if not given.")
+    parser.add_argument("--access_count", type=int, default=20000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=4000000, help="Number of distinct blocks in the synthetic stream.")
+    parser.add_argument("--worker_count", type=int, nargs="*", default=[1, 2, 4, 8, 16], help="Numbers of worker processes.")
+    parser.add_argument("--num_lower_addr_bits_ignored", type=int, default=0, help="Number of lower order address bits ignored.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses routed at a time.")
+    args = parser.parse_args()
+    main(args)
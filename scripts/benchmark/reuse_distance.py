@@ -0,0 +1,86 @@
+""" Benchmark exact reuse distance computation with RDTracker.
+
+A synthetic stream of cache block accesses with a skewed popularity is tracked with the Fenwick
+tree engine and its throughput is reported. The reuse distances of a prefix of the stream are
+compared with those of a naive LRU stack walk.
+
+Usage:
+    python3 reuse_distance.py --access_count 5000000 --block_count 1000000
+"""
+
+import argparse
+import numpy as np
+from time import perf_counter_ns
+
+from cydonia.profiler.RDTracker import RDTracker
+
+
+def generate_access_arr(
+        access_count: int,
+        block_count: int,
+        seed: int = 42
+) -> tuple:
+    """Generate a synthetic stream of block accesses where block popularity follows a Zipf distribution.
+
+    Args:
+        access_count: Number of accesses.
+        block_count: Number of distinct blocks that can be accessed.
+        seed: Random seed. (Default: 42)
+
+    Returns:
+        addr_arr: Array of block addresses.
+        op_arr: Array of operation 'r' or 'w' of each access.
+    """
+    rng = np.random.default_rng(seed)
+    rank_arr = (rng.zipf(1.2, size=access_count) - 1) % block_count
+    # scatter popular blocks across the address space
+    addr_arr = rng.permutation(block_count)[rank_arr]
+    op_arr = np.where(rng.random(access_count) < 0.7, 'r', 'w')
+    return addr_arr, op_arr
+
+
+def get_stack_rd_list(addr_list: list) -> list:
+    """ The naive LRU stack walk used as the baseline. """
+    rd_list, lru_stack = [], []
+    for addr in addr_list:
+        if addr in lru_stack:
+            rd = len(lru_stack) - 1 - lru_stack.index(addr)
+            lru_stack.remove(addr)
+        else:
+            rd = -1
+        rd_list.append(rd)
+        lru_stack.append(addr)
+    return rd_list
+
+
+def main(args):
+    addr_arr, op_arr = generate_access_arr(args.access_count, args.block_count)
+
+    rd_tracker = RDTracker()
+    start_time_ns = perf_counter_ns()
+    for batch_start in range(0, args.access_count, args.batch_size):
+        rd_tracker.track_arr(addr_arr[batch_start:batch_start+args.batch_size], op_arr[batch_start:batch_start+args.batch_size])
+    tracker_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+    print("RDTracker: {} accesses to {} blocks in {:.2f} seconds ({:.0f} accesses/second).".format(
+            args.access_count, len(rd_tracker), tracker_time_sec, args.access_count/tracker_time_sec))
+    print("Read hit rate at {} blocks: {:.4f}, max hit rate: {:.4f}.".format(
+            args.block_count//10, rd_tracker.rd_hist.get_read_hit_rate(args.block_count//10), rd_tracker.rd_hist.get_max_hit_rate()))
+
+    if args.baseline_count:
+        baseline_addr_list = addr_arr[:args.baseline_count].tolist()
+        start_time_ns = perf_counter_ns()
+        stack_rd_list = get_stack_rd_list(baseline_addr_list)
+        stack_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        print("LRU stack baseline: {} accesses in {:.2f} seconds ({:.0f} accesses/second).".format(
+                args.baseline_count, stack_time_sec, args.baseline_count/stack_time_sec))
+        print("Identical reuse distances: {}.".format(RDTracker().get_rd_arr(baseline_addr_list) == stack_rd_list))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark exact reuse distance computation.")
+    parser.add_argument("--access_count", type=int, default=5000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of distinct blocks that can be accessed.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses tracked at a time.")
+    parser.add_argument("--baseline_count", type=int, default=50000, help="Number of accesses tracked by the LRU stack baseline, 0 to skip.")
+    args = parser.parse_args()
+    main(args)
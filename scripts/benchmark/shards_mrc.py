@@ -0,0 +1,75 @@
+""" Report the error and cost of approximate MRCs built with SHARDS.
+
+The exact RD histogram of each trace is computed with RDTracker and compared with the approximate
+histograms of ShardsRDTracker at each fixed rate and fixed size. The mean absolute error of the
+read miss ratio curve, the time taken and the number of blocks tracked are reported. A synthetic
+stream of accesses is used when no trace is given.
+
+Usage:
+    python3 shards_mrc.py --cache_trace_path ../../data/test_cp_cache.csv
+    python3 shards_mrc.py --access_count 5000000 --rate 0.1 0.01 0.001 --max_region_count 8192
+"""
+
+import argparse
+from pathlib import Path
+from time import perf_counter_ns
+
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.RDTracker import RDTracker
+from cydonia.profiler.RDHistogram import get_mrc_mae
+from cydonia.profiler.ShardsRDTracker import ShardsRDTracker
+
+from reuse_distance import generate_access_arr
+
+
+def track(
+        tracker,
+        args,
+        access_arr: tuple = None
+) -> None:
+    """Track the cache trace or the synthetic accesses with a tracker."""
+    if access_arr is None:
+        tracker.track_cache_trace(CacheTraceReader(args.cache_trace_path), batch_size=args.batch_size)
+    else:
+        addr_arr, op_arr = access_arr
+        for batch_start in range(0, len(addr_arr), args.batch_size):
+            tracker.track_arr(addr_arr[batch_start:batch_start+args.batch_size], op_arr[batch_start:batch_start+args.batch_size])
+
+
+def main(args):
+    access_arr = None if args.cache_trace_path else generate_access_arr(args.access_count, args.block_count)
+
+    rd_tracker = RDTracker()
+    start_time_ns = perf_counter_ns()
+    track(rd_tracker, args, access_arr)
+    exact_time_sec = (perf_counter_ns() - start_time_ns)/1e9
+    exact_rd_hist = rd_tracker.rd_hist
+    print("exact: {} accesses, {} blocks tracked, {:.2f} seconds.".format(rd_tracker.access_count, len(rd_tracker), exact_time_sec))
+
+    shards_tracker_list = [("rate={}".format(rate), ShardsRDTracker(rate=rate, seed=args.seed, num_lower_addr_bits_ignored=args.num_lower_addr_bits_ignored))
+                            for rate in args.rate]
+    shards_tracker_list += [("size={}".format(max_region_count), ShardsRDTracker(max_region_count=max_region_count, seed=args.seed,
+                                                                                    num_lower_addr_bits_ignored=args.num_lower_addr_bits_ignored))
+                            for max_region_count in args.max_region_count]
+    for name, shards_tracker in shards_tracker_list:
+        start_time_ns = perf_counter_ns()
+        track(shards_tracker, args, access_arr)
+        rd_hist = shards_tracker.get_rd_hist()
+        time_sec = (perf_counter_ns() - start_time_ns)/1e9
+        print("{}: MAE {:.4f}, effective rate {:.5f}, {} blocks tracked, {:.2f} seconds ({:.1f}x faster).".format(
+                name, get_mrc_mae(rd_hist, exact_rd_hist), shards_tracker.effective_rate, len(shards_tracker.rd_tracker),
+                time_sec, exact_time_sec/time_sec))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the error and cost of approximate MRCs built with SHARDS.")
+    parser.add_argument("--cache_trace_path", type=Path, default=None, help="Path of a cache trace, a synthetic stream is used if not given.")
+    parser.add_argument("--access_count", type=int, default=5000000, help="Number of accesses in the synthetic stream.")
+    parser.add_argument("--block_count", type=int, default=1000000, help="Number of distinct blocks in the synthetic stream.")
+    parser.add_argument("--rate", type=float, nargs="*", default=[0.1, 0.01, 0.001], help="Fixed sampling rates.")
+    parser.add_argument("--max_region_count", type=int, nargs="*", default=[8192], help="Maximum region counts of the fixed-size mode.")
+    parser.add_argument("--num_lower_addr_bits_ignored", type=int, default=0, help="Number of lower order address bits ignored.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--batch_size", type=int, default=1000000, help="Number of accesses tracked at a time.")
+    args = parser.parse_args()
+    main(args)
@@ -177,7 +177,11 @@ class RunExperiment:
                 
                 if "replayRate" in experiment_entry["kwargs"]:
                     kwargs["replayRate"] = experiment_entry["kwargs"]["replayRate"]
-                
+
+                for cache_kwarg in ["allocSizes", "lruUpdateOnWrite"]:
+                    if cache_kwarg in experiment_entry["kwargs"]:
+                        kwargs[cache_kwarg] = experiment_entry["kwargs"][cache_kwarg]
+
                 workload = pathlib.Path(experiment_entry["trace_s3_key"]).stem 
                 local_trace_path = self.output_dir.joinpath("{}.csv".format(workload))
                 config = ReplayConfig([str(local_trace_path.resolve())], 
@@ -5,14 +5,30 @@ from pathlib import Path
 
 from pyJoules.energy_meter import measure_energy
 from pyJoules.handler.csv_handler import CSVHandler
+
+from cydonia.cachelib.TierPredictor import TierPredictor
+from cydonia.profiler.RDHistogram import RDHistogram
 csv_handler = CSVHandler("mt_energy.csv")
 
 class MTExperiments:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        rd_hist_dir: str = None,
+        min_hit_ratio_diff: float = 0.01
+    ) -> None:
+        """Generate the T1 x T2 grid of experiments of each workload.
+
+        Args:
+            rd_hist_dir: Directory of RD histogram files named {workload}.csv. If the file of a workload exists,
+                            configurations with predicted hit ratios close to those of another are not replayed. (Default: None)
+            min_hit_ratio_diff: Minimum difference in predicted T1 or T2 hit ratio of configurations replayed. (Default: 0.01)
+        """
         self.workloads = ["w09", "w18", "w64", "w66", "w92"]
         self.wss_to_size_percent = [0.1, 0.2, 0.4, 0.6]
         self.block_df = pd.read_csv("~/disk/blocks.csv")
         self.output_file_path = Path("files/MTExperiments.json")
+        self.rd_hist_dir = Path(rd_hist_dir) if rd_hist_dir is not None else None
+        self.min_hit_ratio_diff = min_hit_ratio_diff
 
     
     def generate_experiments_for_workload(
@@ -49,7 +65,13 @@ class MTExperiments:
                     }
                     config_list.append(mt_config)
 
-        return config_list 
+        if self.rd_hist_dir is not None and self.rd_hist_dir.joinpath("{}.csv".format(workload)).exists():
+            rd_hist = RDHistogram(-1)
+            rd_hist.load_rd_hist_file(self.rd_hist_dir.joinpath("{}.csv".format(workload)))
+            config_list, pruned_config_list = TierPredictor(rd_hist=rd_hist).prune_config_list(config_list, self.min_hit_ratio_diff)
+            print("Workload {} pruned {} configurations.".format(workload, len(pruned_config_list)))
+
+        return config_list
 
 
     @measure_energy(handler=csv_handler)
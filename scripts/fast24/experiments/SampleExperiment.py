@@ -8,6 +8,9 @@ from copy import deepcopy
 from itertools import product 
 from numpy import ceil 
 
+from cydonia.cachelib.TierPredictor import TierPredictor
+from cydonia.profiler.RDHistogram import RDHistogram
+
 
 class SampleExperiment:
     def __init__(self) -> None:
@@ -77,22 +80,36 @@ class SampleExperiment:
         cache_stat_file_path: str,
         workload_type: str, 
         sample_type: str, 
-        workload: str
+        workload: str,
+        rd_hist_file_path: str = None,
+        min_hit_ratio_diff: float = 0.01
     ) -> None:
         with open(cache_stat_file_path) as f:
             cache_stat = json.load(f)
 
         max_cache_size_mb = (cache_stat['size_100']//256) + 1
+
+        cache_size_mb_list = []
+        for wss_percent in range(10,101,10):
+            cache_size = cache_stat['size_{}'.format(wss_percent)]
+            cache_size_mb = cache_size//256
+
+            if cache_size_mb < 100:
+                continue 
+            cache_size_mb_list.append(cache_size_mb)
+
+        # cache sizes whose T1 and T2 hit ratios are predicted to be close to those of a smaller size are not replayed
+        if rd_hist_file_path is not None:
+            rd_hist = RDHistogram(-1)
+            rd_hist.load_rd_hist_file(Path(rd_hist_file_path))
+            tier_config_list = [{"t1_size_mb": cache_size_mb, "kwargs": {"nvmCacheSizeMB": max_cache_size_mb - cache_size_mb}} 
+                                    for cache_size_mb in cache_size_mb_list]
+            kept_config_list, _ = TierPredictor(rd_hist=rd_hist).prune_config_list(tier_config_list, min_hit_ratio_diff)
+            cache_size_mb_list = [config["t1_size_mb"] for config in kept_config_list]
         
         final_list = []
         for replay_rate in self.replay_rate_arr:
-            for wss_percent in range(10,101,10):
-                cache_size = cache_stat['size_{}'.format(wss_percent)]
-                cache_size_mb = cache_size//256
-
-                if cache_size_mb < 100:
-                    continue 
-
+            for cache_size_mb in cache_size_mb_list:
                 experiment_list = self.get_experiment_list(cache_size_mb, max_cache_size_mb, workload_type, sample_type, workload, replay_rate)
                 final_list += experiment_list 
         
@@ -103,7 +120,8 @@ class SampleExperiment:
 
 def main(args):
     sample_experiment_generator = SampleExperiment()
-    sample_experiment_generator.generate(args.cache_stat_file_path, args.workload_type, args.sample_technique, args.workload_name)
+    sample_experiment_generator.generate(args.cache_stat_file_path, args.workload_type, args.sample_technique, args.workload_name,
+                                            rd_hist_file_path=args.rd_hist_file_path, min_hit_ratio_diff=args.min_hit_ratio_diff)
 
 
 if __name__ == "__main__":
@@ -117,5 +135,12 @@ if __name__ == "__main__":
         help="Sampling technique used.")
     parser.add_argument("workload_name",
         help="Name used to generate sample file names.")
+    parser.add_argument("--rd_hist_file_path",
+        default=None,
+        help="Path to RD histogram file of the trace used to prune cache sizes with similar predicted hit ratios.")
+    parser.add_argument("--min_hit_ratio_diff",
+        default=0.01,
+        type=float,
+        help="Minimum difference in predicted T1 or T2 hit ratio of cache sizes replayed.")
     args = parser.parse_args()
     main(args)
\ No newline at end of file
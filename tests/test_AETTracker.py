@@ -0,0 +1,71 @@
+from pathlib import Path
+from unittest import main, TestCase
+from numpy import concatenate, cumsum, floor, bincount, zeros
+
+from cydonia.profiler.CPReader import CPReader
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.AETTracker import AETTracker
+from cydonia.profiler.RDTracker import RDTracker
+from cydonia.profiler.RDHistogram import RDHistogram, get_mrc_mae
+
+
+class TestAETTracker(TestCase):
+    def test_cache_trace(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        cache_trace_reader = CacheTraceReader(test_cache_trace_path)
+        cache_req_arr = Reader.expand_cache_extent_arr(concatenate(list(cache_trace_reader.read_group_batches(100))))
+
+        last_access_time_dict, rt_list = {}, []
+        for time, addr in enumerate(cache_req_arr["addr"].tolist()):
+            rt_list.append(time - last_access_time_dict[addr] if addr in last_access_time_dict else 0)
+            last_access_time_dict[addr] = time
+
+        aet_tracker = AETTracker()
+        rt_arr = concatenate([aet_tracker.track_arr(cache_req_arr["addr"][index:index+37], cache_req_arr["op"][index:index+37])
+                                for index in range(0, len(cache_req_arr), 37)])
+        assert rt_arr.tolist() == rt_list, "Reuse times not equal to those computed per access."
+        assert len(aet_tracker) == len(last_access_time_dict), "Block count not equal to unique block count."
+
+        # the counts of hits and cold misses are exact, only the reuse distance of a hit is approximate
+        rd_hist = aet_tracker.get_rd_hist()
+        exact_rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        assert rd_hist.read_count == exact_rd_hist.read_count and rd_hist.write_count == exact_rd_hist.write_count
+        assert rd_hist.max_read_hit_count == exact_rd_hist.max_read_hit_count
+        assert rd_hist.read_counter[-1] == exact_rd_hist.read_counter[-1] and rd_hist.write_counter[-1] == exact_rd_hist.write_counter[-1]
+        assert rd_hist.get_rd_count_arr()[0].tolist() == exact_rd_hist.get_rd_count_arr()[0].tolist(), "Count of reuse distance 0 not exact."
+        mae = get_mrc_mae(rd_hist, exact_rd_hist)
+        assert mae < 0.02, "MAE {} of AET too high.".format(mae)
+
+        # every reuse time has its own bin when the precision is high enough so the histogram is the same as 
+        # the AET model computed from the count of each reuse time 
+        rt_count_arr = zeros((max(rt_list) + 1, 2), dtype=int)
+        for rt, op in zip(rt_list, cache_req_arr["op"].tolist()):
+            rt_count_arr[rt, 0 if op == 'r' else 1] += 1
+        greater_count_arr = len(rt_list) - cumsum(rt_count_arr[1:].sum(axis=1))
+        fp_arr = concatenate(([0.0], cumsum(concatenate(([len(rt_list)], greater_count_arr))/len(rt_list))))
+        rd_arr = floor(fp_arr[:len(rt_count_arr)-1]).astype(int)
+        rd_count_arr = zeros((rd_arr[-1] + 1, 2), dtype=int)
+        for col in range(2):
+            rd_count_arr[:, col] = bincount(rd_arr, weights=rt_count_arr[1:, col], minlength=len(rd_count_arr))
+        expected_rd_hist = RDHistogram(-1)
+        expected_rd_hist.update_count_arr(rd_count_arr, rt_count_arr[0])
+
+        precise_aet_tracker = AETTracker(precision_bits=max(rt_list).bit_length())
+        precise_aet_tracker.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+        assert len(precise_aet_tracker.get_rt_count_arr()) == max(rt_list) + 1
+        assert precise_aet_tracker.get_rd_hist() == expected_rd_hist, "Histogram not equal to the AET model without bins."
+
+
+    def test_block_trace(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        reader = CPReader(test_block_trace_path)
+        block_rd_hist = AETTracker().track_block_trace(reader, block_size_byte=4096, batch_size=300)
+        cache_rd_hist = AETTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        assert block_rd_hist == cache_rd_hist, "RD histogram of block trace not equal to that of its cache trace."
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
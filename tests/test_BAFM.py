@@ -1,9 +1,14 @@
 from pathlib import Path 
 from unittest import main, TestCase
 from itertools import product
+from shutil import copyfile
 
-from cydonia.profiler.BAFM import BAFM
+import numpy as np
+
+from cydonia.profiler.BAFM import BAFM, BAFMOutput, WORKLOAD_FEATURE_LIST, ERROR_METRIC_LIST, REMOVAL_RECORD_DTYPE
 from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.CPReader import CPReader
+from cydonia.profiler.WorkloadStats import BlockRequest
 
 
 def eval_bafm(lower_addr_bits_ignored: int, num_iter: int) -> None:
@@ -14,7 +19,7 @@ def eval_bafm(lower_addr_bits_ignored: int, num_iter: int) -> None:
     cache_trace_path = Path("../data/test_cp_cache.csv")
     
     # files created
-    output_file_path = Path("../data/bafm_output.csv")
+    output_file_path = Path("../data/bafm_output.bin")
     block_access_file_path = test_data_dir.joinpath("access_{}.csv".format(lower_addr_bits_ignored))
 
     if output_file_path.exists():
@@ -56,5 +61,217 @@ class TestBAFM(TestCase):
              eval_bafm(num_lower_addr_bits, num_iter)
 
 
+    def test_find_best_block(self):
+        cache_trace_path = Path("../data/test_cp_cache.csv")
+        cache_trace = CacheTraceReader(cache_trace_path)
+        workload_stats = cache_trace.get_stat()
+        cache_trace.close()
+        full_workload_feature_dict = workload_stats.get_workload_feature_dict()
+
+        for lower_addr_bits_ignored, metric_name in product([0, 2], ERROR_METRIC_LIST):
+            bafm = BAFM(lower_addr_bits_ignored)
+            bafm.load_cache_trace(cache_trace_path)
+            cur_workload_stats = workload_stats
+            for _ in range(20):
+                # evaluate one block at a time like the vectorized evaluation of every block 
+                best_err_dict = {}
+                for addr in list(bafm._row_dict):
+                    new_workload_stats = bafm.get_new_workload_stat(cur_workload_stats, bafm.get_feature_arr(addr))
+                    err_dict = bafm.get_error_dict(full_workload_feature_dict, new_workload_stats.get_workload_feature_dict())
+                    err_dict["addr"] = addr 
+                    if not best_err_dict or best_err_dict[metric_name] > err_dict[metric_name]:
+                        best_err_dict = err_dict
+
+                vectorized_err_dict = bafm.find_best_block_to_remove(workload_stats, cur_workload_stats, metric_name)
+                assert vectorized_err_dict["addr"] == best_err_dict["addr"]
+                for key in WORKLOAD_FEATURE_LIST + ERROR_METRIC_LIST:
+                    assert vectorized_err_dict[key] == best_err_dict[key], "{} is {} not {}.".format(key, vectorized_err_dict[key], best_err_dict[key])
+                cur_workload_stats = bafm.get_new_workload_stat(cur_workload_stats, bafm.get_feature_arr(best_err_dict["addr"]))
+                bafm.delete(best_err_dict["addr"])
+
+
+
+    def test_lazy_and_batch_removal(self):
+        cache_trace_path = Path("../data/test_cp_cache.csv")
+        output_file_path = Path("../data/bafm_output.bin")
+        cache_trace = CacheTraceReader(cache_trace_path)
+        workload_stats = cache_trace.get_stat()
+        cache_trace.close()
+
+        bafm = BAFM(0)
+        bafm.load_cache_trace(cache_trace_path)
+        best_dict = bafm.find_best_block_to_remove(workload_stats, workload_stats, "mean")
+        best_dict_list = bafm.find_best_block_list_to_remove(workload_stats, workload_stats, "mean", 8)
+        assert len(best_dict_list) == 8 and best_dict_list[0] == best_dict
+        addr_list = [err_dict["addr"] for err_dict in best_dict_list]
+        assert all(abs(addr1 - addr2) > 1 for addr1, addr2 in product(addr_list, addr_list) if addr1 != addr2)
+
+        # blocks that are not adjacent can be removed with the access features from before removing any of them
+        feature_arr_list = [bafm.get_feature_arr(addr).copy() for addr in addr_list]
+        batch_workload_stats = bafm.remove_n_blocks(workload_stats, workload_stats, "mean", 8, output_file_path, batch_size=8)
+        output_file_path.unlink()
+        new_workload_stats = workload_stats
+        for feature_arr in feature_arr_list:
+            new_workload_stats = bafm.get_new_workload_stat(new_workload_stats, feature_arr)
+        assert new_workload_stats == batch_workload_stats
+        assert all(addr not in bafm._row_dict for addr in addr_list)
+
+        lazy_bafm = BAFM(0)
+        lazy_bafm.load_cache_trace(cache_trace_path)
+        with self.assertRaises(ValueError):
+            lazy_bafm.get_addr_list_to_remove(workload_stats, workload_stats, "mean", 2, [])
+        lazy_heap = []
+        assert lazy_bafm.find_lazy_best_block_to_remove(workload_stats, workload_stats, "mean", lazy_heap) == best_dict
+        assert len(lazy_heap) == lazy_bafm._block_count - 1
+        lazy_workload_stats = lazy_bafm.remove_n_blocks(workload_stats, workload_stats, "mean", 100, output_file_path, lazy=True)
+        output_file_path.unlink()
+        assert lazy_bafm._block_count == 198
+        err_dict = BAFM.get_error_dict(workload_stats.get_workload_feature_dict(), lazy_workload_stats.get_workload_feature_dict())
+        assert 0 <= err_dict["mean"] < 100
+
+
+
+    def test_parallel_find_best_block(self):
+        cache_trace_path = Path("../data/test_cp_cache.csv")
+        cache_trace = CacheTraceReader(cache_trace_path)
+        workload_stats = cache_trace.get_stat()
+        cache_trace.close()
+
+        bafm, parallel_bafm = BAFM(1), BAFM(1, worker_count=3)
+        bafm.load_cache_trace(cache_trace_path)
+        parallel_bafm.load_cache_trace(cache_trace_path)
+        cur_workload_stats = workload_stats
+        for metric_name in ["mean", "max", "wmean"] * 10:
+            best_dict = bafm.find_best_block_to_remove(workload_stats, cur_workload_stats, metric_name)
+            assert parallel_bafm.find_best_block_to_remove(workload_stats, cur_workload_stats, metric_name) == best_dict
+            cur_workload_stats = bafm.get_new_workload_stat(cur_workload_stats, bafm.get_feature_arr(best_dict["addr"]))
+            bafm.delete(best_dict["addr"])
+            parallel_bafm.delete(best_dict["addr"])
+        
+        # the workers are started again when the feature matrix grows 
+        rng = np.random.default_rng(42)
+        for addr in rng.choice(np.arange(100000, 200000), 2000, replace=False).tolist():
+            bafm.add_row(addr)
+            bafm.get_feature_arr(addr)[:] = rng.integers(0, 3, 24)
+            parallel_bafm.add_row(addr)
+            parallel_bafm.get_feature_arr(addr)[:] = bafm.get_feature_arr(addr)
+        best_dict = bafm.find_best_block_to_remove(workload_stats, cur_workload_stats, "mean")
+        assert parallel_bafm.find_best_block_to_remove(workload_stats, cur_workload_stats, "mean") == best_dict
+
+        # batch and lazy removal evaluate every block with the workers too 
+        best_dict_list = bafm.find_best_block_list_to_remove(workload_stats, cur_workload_stats, "max", 8)
+        assert parallel_bafm.find_best_block_list_to_remove(workload_stats, cur_workload_stats, "max", 8) == best_dict_list
+        best_dict = bafm.find_lazy_best_block_to_remove(workload_stats, cur_workload_stats, "wmean", [])
+        assert parallel_bafm.find_lazy_best_block_to_remove(workload_stats, cur_workload_stats, "wmean", []) == best_dict
+        parallel_bafm.stop_workers()
+        assert parallel_bafm == bafm
+
+        # the workers are stopped when the blocks are removed 
+        output_file_path = Path("../data/bafm_parallel_output.bin")
+        for file_path in [output_file_path, output_file_path.with_name("bafm_serial_output.bin")]:
+            if file_path.exists():
+                file_path.unlink()
+        new_workload_stats = parallel_bafm.remove_n_blocks(workload_stats, cur_workload_stats, "mean", 5, output_file_path, batch_size=2)
+        assert parallel_bafm._pool is None and not parallel_bafm._shm_list
+        assert new_workload_stats == bafm.remove_n_blocks(workload_stats, cur_workload_stats, "mean", 5, 
+                                                            output_file_path.with_name("bafm_serial_output.bin"), batch_size=2)
+        assert parallel_bafm == bafm
+        output_file_path.unlink()
+        output_file_path.with_name("bafm_serial_output.bin").unlink()
+
+
+
+    def test_checkpoint_and_resume(self):
+        full_cache_trace_path = Path("../data/test_cp_cache.csv")
+        sample_cache_trace_path = Path("../data/test_sample_cp_cache.csv")
+        output_file_path = Path("../data/bafm_output.bin")
+        checkpoint_path = Path("../data/bafm_checkpoint.npz")
+        old_checkpoint_path = Path("../data/bafm_old_checkpoint.npz")
+        for file_path in [output_file_path, checkpoint_path, old_checkpoint_path]:
+            if file_path.exists():
+                file_path.unlink()
+
+        cache_trace = CacheTraceReader(full_cache_trace_path)
+        full_workload_stats = cache_trace.get_stat()
+        full_block_count = len(cache_trace.get_unscaled_unique_block_addr_set())
+        cache_trace.close()
+        cache_trace = CacheTraceReader(sample_cache_trace_path)
+        sample_workload_stats = cache_trace.get_stat()
+        sample_block_addr_set = cache_trace.get_unscaled_unique_block_addr_set()
+        cache_trace.close()
+
+        bafm = BAFM(1)
+        bafm.load_cache_trace(sample_cache_trace_path)
+        block_addr_set = set(sample_block_addr_set)
+        bafm.target_sampling_rate(full_workload_stats, sample_workload_stats, "mean", full_block_count, 
+                                    block_addr_set, 0.8, output_file_path, checkpoint_path=checkpoint_path)
+        copyfile(checkpoint_path, old_checkpoint_path)
+        removal_count = BAFMOutput(output_file_path).num_blocks_removed()
+        assert removal_count > 0 and len(block_addr_set)/full_block_count <= 0.8
+
+        # removing more blocks continues from the state of the BAFM in the checkpoint 
+        new_workload_stats = bafm.target_sampling_rate(full_workload_stats, sample_workload_stats, "mean", full_block_count, 
+                                                        block_addr_set, 0.6, output_file_path, checkpoint_path=checkpoint_path)
+        bafm_output = BAFMOutput(output_file_path)
+        assert bafm_output.num_blocks_removed() > removal_count
+        assert bafm_output.get_df()["rate"].is_monotonic_decreasing
+
+        # a new BAFM resumes from the older checkpoint and the blocks removed after it without loading the trace 
+        resumed_bafm = BAFM(1)
+        resumed_block_addr_set = set(sample_block_addr_set)
+        resumed_workload_stats = resumed_bafm.update_state(output_file_path, sample_workload_stats, old_checkpoint_path, resumed_block_addr_set)
+        assert resumed_bafm == bafm and resumed_workload_stats == new_workload_stats
+        assert resumed_block_addr_set == block_addr_set
+
+        # a partial record at the end of the log is removed 
+        with output_file_path.open("ab") as handle:
+            handle.write(bytes(REMOVAL_RECORD_DTYPE.itemsize//2))
+        assert BAFMOutput(output_file_path).num_blocks_removed() == bafm_output.num_blocks_removed()
+        assert output_file_path.stat().st_size == bafm_output.num_blocks_removed() * REMOVAL_RECORD_DTYPE.itemsize
+
+        # a new BAFM loaded from the trace resumes by removing every block in the log 
+        replayed_bafm = BAFM(1)
+        replayed_bafm.load_cache_trace(sample_cache_trace_path)
+        assert replayed_bafm.update_state(output_file_path, sample_workload_stats) == new_workload_stats
+        assert replayed_bafm == bafm
+        output_file_path.unlink()
+        checkpoint_path.unlink()
+        old_checkpoint_path.unlink()
+
+
+
+    def test_load_block_requests(self):
+        for cache_trace_path, lower_addr_bits_ignored in product([Path("../data/test_cp_cache.csv"), Path("../data/test_sample_cp_cache.csv")], [0, 1, 3]):
+            bafm = BAFM(lower_addr_bits_ignored)
+            bafm.load_cache_trace(cache_trace_path, batch_size=97)
+
+            # update the map with a record of each region accessed by each block request 
+            record_bafm = BAFM(lower_addr_bits_ignored)
+            reader = CacheTraceReader(cache_trace_path)
+            allocation_size_byte = BAFM.get_block_size_from_lower_bits_ignored(lower_addr_bits_ignored, reader._config.cache_block_size_byte)
+            prev_ts = None 
+            for cache_extent_arr in reader.read_group_batches():
+                block_req_batch = reader.get_block_req_batch(cache_extent_arr, -1 if prev_ts is None else prev_ts, reader._config)
+                for ts, lba, op, size in zip(block_req_batch["ts"].tolist(), block_req_batch["lba"].tolist(), 
+                                                block_req_batch["op"].tolist(), block_req_batch["size"].tolist()):
+                    blk_req = BlockRequest(ts, lba, op == reader._config.write_str, size)
+                    for record in BAFM.get_request_arr(ts if prev_ts is None else prev_ts, blk_req, allocation_size_byte, reader._config):
+                        record_bafm.update(record)
+                    prev_ts = ts 
+            reader.close()
+            assert bafm == record_bafm
+            assert list(bafm._row_dict) == list(record_bafm._row_dict), "Rows not added in the order addresses were accessed."
+
+        # a block trace generates the same map as its cache trace 
+        for lower_addr_bits_ignored in [0, 2]:
+            bafm = BAFM(lower_addr_bits_ignored)
+            bafm.load_cache_trace(Path("../data/test_cp_cache.csv"))
+            reader = CPReader(Path("../data/test_cp.csv"))
+            block_bafm = BAFM(lower_addr_bits_ignored)
+            block_bafm.load_block_trace(reader, batch_size=300)
+            reader.close()
+            assert block_bafm == bafm
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
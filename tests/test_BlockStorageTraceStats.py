@@ -0,0 +1,42 @@
+from unittest import main, TestCase
+from numpy.random import default_rng
+from numpy import cumsum, isclose 
+
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.BlockStorageTraceStats import BlockStorageTraceStats
+
+
+class TestBlockStorageTraceStats(TestCase):
+    def test_track_arrays(self):
+        rng = default_rng(42)
+        req_count = 5000
+        ts_arr = cumsum(rng.integers(0, 100, size=req_count))
+        lba_arr = rng.integers(0, 1 << 12, size=req_count)
+        op_arr = rng.choice(['r', 'w'], size=req_count)
+        size_arr = 512 * rng.integers(1, 64, size=req_count)
+        # make some of the requests sequential 
+        seq_flag_arr = rng.random(req_count) < 0.3 
+        for req_index in range(1, req_count):
+            if seq_flag_arr[req_index]:
+                lba_arr[req_index] = lba_arr[req_index-1] + size_arr[req_index-1]//512
+        batch_arr = Reader.get_batch_arr(ts_arr, lba_arr, op_arr, size_arr, 512, 4096)
+
+        stats = BlockStorageTraceStats()
+        key_list = ["ts", "lba", "op", "size", "start_page", "end_page", "front_misalign", "rear_misalign"]
+        for block_req in batch_arr.tolist():
+            stats.add_request(dict(zip(key_list, block_req)))
+
+        batch_stats = BlockStorageTraceStats()
+        for start_index in range(0, req_count, 777):
+            arr = batch_arr[start_index:start_index+777]
+            batch_stats.track_arrays(arr["ts"], arr["lba"], arr["op"], arr["size"], arr["start_block"], 
+                                        arr["end_block"], arr["front_misalign"], arr["rear_misalign"])
+
+        stat, batch_stat = stats.get_stat(), batch_stats.get_stat()
+        for key in stat:
+            assert isclose(stat[key], batch_stat[key], equal_nan=True), \
+                "{} is {} not {}.".format(key, batch_stat[key], stat[key])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+from pathlib import Path
+from unittest import main, TestCase
+from numpy import concatenate
+
+from cydonia.profiler.CPReader import CPReader
+from cydonia.profiler.CPBinReader import CPBinReader, convert_cp_trace
+
+
+class TestCPBinReader(TestCase):
+    def test_convert(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_bin_trace_path = Path("../data/test_cp.bin")
+
+        req_count = convert_cp_trace(test_block_trace_path, test_bin_trace_path, chunk_size=100)
+        assert req_count == 1000, "Block request count is not 1000 but {}.".format(req_count)
+
+        cp_reader = CPReader(test_block_trace_path)
+        bin_reader = CPBinReader(test_bin_trace_path)
+        assert len(bin_reader) == req_count, "Reader length {} not equal to {}.".format(len(bin_reader), req_count)
+
+        cp_block_req = cp_reader.get_next_block_req(block_size=4096)
+        bin_block_req = bin_reader.get_next_block_req(block_size=4096)
+        while cp_block_req:
+            assert cp_block_req == bin_block_req, "Block requests {} and {} not equal.".format(cp_block_req, bin_block_req)
+            cp_block_req = cp_reader.get_next_block_req(block_size=4096)
+            bin_block_req = bin_reader.get_next_block_req(block_size=4096)
+        assert not bin_block_req, "Binary trace has more block requests than CSV trace."
+
+        ts_arr, lba_arr, op_arr, size_arr = bin_reader.get_columns(10, 20)
+        bin_reader.reset()
+        for _ in range(10):
+            bin_reader.get_next_block_req()
+        for index in range(10):
+            block_req = bin_reader.get_next_block_req()
+            assert block_req["ts"] == ts_arr[index] and block_req["lba"] == lba_arr[index] and block_req["size"] == size_arr[index]
+            assert block_req["op"] == ('w' if op_arr[index] else 'r')
+
+        cp_reader.close()
+        bin_reader.close()
+        test_bin_trace_path.unlink()
+
+
+    def test_read_batches(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_bin_trace_path = Path("../data/test_cp_batch.bin")
+        convert_cp_trace(test_block_trace_path, test_bin_trace_path)
+
+        cp_reader = CPReader(test_block_trace_path)
+        bin_reader = CPBinReader(test_bin_trace_path)
+        cp_batch_arr = concatenate(list(cp_reader.read_batches(300)))
+        bin_batch_arr = concatenate(list(bin_reader.read_batches(77)))
+        assert len(cp_batch_arr) == 1000, "Batch array length is not 1000 but {}.".format(len(cp_batch_arr))
+        assert (cp_batch_arr == bin_batch_arr).all(), "Batches from CSV and binary trace not equal."
+
+        cp_reader.reset()
+        for batch_row in cp_batch_arr:
+            block_req = cp_reader.get_next_block_req(block_size=4096)
+            for field_name in batch_row.dtype.names:
+                assert block_req[field_name] == batch_row[field_name], \
+                        "Field {} not equal in {} and {}.".format(field_name, block_req, batch_row)
+
+        cp_reader.close()
+        bin_reader.close()
+        test_bin_trace_path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+from pathlib import Path 
+from unittest import main, TestCase
+from filecmp import cmp 
+
+from cydonia.profiler.CPReader import CPReader
+
+
+class TestCPReader(TestCase):
+    def test_generate_cache_trace(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        output_cache_trace_path = Path("../data/test_generate_cp_cache.csv")
+
+        reader = CPReader(test_block_trace_path)
+        for batch_size in [1, 7, 1000, 100000]:
+            reader.generate_cache_trace(output_cache_trace_path, batch_size=batch_size)
+            assert cmp(output_cache_trace_path, test_cache_trace_path, shallow=False), \
+                    "Cache trace generated with batch size {} not identical to {}.".format(batch_size, test_cache_trace_path)
+        reader.close()
+        output_cache_trace_path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from pathlib import Path
+from unittest import main, TestCase
+
+import numpy as np
+
+from cydonia.profiler.CacheSimulator import CacheSimulator
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.CPReader import CPReader
+from cydonia.profiler.RDTracker import RDTracker
+
+
+def get_fifo_hit_count(addr_list: list, size: int) -> int:
+    cache, hit_count = OrderedDict(), 0
+    for addr in addr_list:
+        if addr in cache:
+            hit_count += 1
+            continue
+        if len(cache) == size:
+            cache.popitem(last=False)
+        cache[addr] = True
+    return hit_count
+
+
+def get_clock_hit_count(addr_list: list, size: int) -> int:
+    slot_list, ref_dict, hand, hit_count = [None] * size, {}, 0, 0
+    for addr in addr_list:
+        if addr in ref_dict:
+            hit_count += 1
+            ref_dict[addr] = True
+            continue
+        while slot_list[hand] is not None and ref_dict[slot_list[hand]]:
+            ref_dict[slot_list[hand]] = False
+            hand = (hand + 1) % size
+        if slot_list[hand] is not None:
+            del ref_dict[slot_list[hand]]
+        slot_list[hand], ref_dict[addr] = addr, False
+        hand = (hand + 1) % size
+    return hit_count
+
+
+def get_arc_hit_count(addr_list: list, size: int) -> int:
+    t1, t2, b1, b2, p, hit_count = OrderedDict(), OrderedDict(), OrderedDict(), OrderedDict(), 0.0, 0
+
+    def replace(in_b2):
+        if t1 and ((in_b2 and len(t1) == p) or len(t1) > p):
+            b1[t1.popitem(last=False)[0]] = True
+        else:
+            b2[t2.popitem(last=False)[0]] = True
+
+    for addr in addr_list:
+        if addr in t1 or addr in t2:
+            hit_count += 1
+            t1.pop(addr, None)
+            t2.pop(addr, None)
+        elif addr in b1:
+            p = min(size, p + max(len(b2)/len(b1), 1))
+            replace(False)
+            del b1[addr]
+        elif addr in b2:
+            p = max(0, p - max(len(b1)/len(b2), 1))
+            replace(True)
+            del b2[addr]
+        else:
+            if len(t1) + len(b1) == size:
+                if len(t1) < size:
+                    b1.popitem(last=False)
+                    replace(False)
+                else:
+                    t1.popitem(last=False)
+            elif len(t1) + len(t2) + len(b1) + len(b2) >= size:
+                if len(t1) + len(t2) + len(b1) + len(b2) == 2 * size:
+                    b2.popitem(last=False)
+                replace(False)
+            t1[addr] = True
+            continue
+        t2[addr] = True
+    return hit_count
+
+
+class TestCacheSimulator(TestCase):
+    def test_policy(self):
+        rng = np.random.default_rng(42)
+        addr_arr = rng.zipf(1.3, 20000) % 500
+        op_arr = np.where(rng.random(len(addr_arr)) < 0.7, 'r', 'w')
+        size_list = [1, 7, 50, 200, 600]
+        cache_simulator = CacheSimulator(["lru", "fifo", "clock", "arc"], size_list)
+        for batch_index in range(0, len(addr_arr), 3000):
+            cache_simulator.track_arr(addr_arr[batch_index:batch_index+3000], op_arr[batch_index:batch_index+3000])
+        stat_df = cache_simulator.get_stat_df().set_index(["policy", "size"])
+        hit_count_series = stat_df["read_hit_count"] + stat_df["write_hit_count"]
+
+        rd_tracker = RDTracker()
+        rd_arr = np.array(rd_tracker.get_rd_arr(addr_arr))
+        addr_list = addr_arr.tolist()
+        for size in size_list:
+            assert hit_count_series["lru", size] == ((rd_arr >= 0) & (rd_arr < size)).sum(), "LRU hits of size {} not equal to RD.".format(size)
+            assert stat_df.loc[("lru", size), "read_hit_count"] == ((rd_arr >= 0) & (rd_arr < size) & (op_arr == 'r')).sum()
+            assert hit_count_series["fifo", size] == get_fifo_hit_count(addr_list, size), "FIFO hits of size {} wrong.".format(size)
+            assert hit_count_series["clock", size] == get_clock_hit_count(addr_list, size), "CLOCK hits of size {} wrong.".format(size)
+            assert hit_count_series["arc", size] == get_arc_hit_count(addr_list, size), "ARC hits of size {} wrong.".format(size)
+
+        assert (stat_df["read_count"] == (op_arr == 'r').sum()).all()
+        assert (stat_df["read_hit_count"] + stat_df["read_miss_count"] == stat_df["read_count"]).all()
+        assert len(cache_simulator) == len(np.unique(addr_arr))
+        with self.assertRaises(ValueError):
+            CacheSimulator(["lfu"], [10])
+
+
+    def test_trace(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        test_block_trace_path = Path("../data/test_cp.csv")
+        size_list = [10, 100]
+        stat_df = CacheSimulator(["lru", "arc"], size_list).track_cache_trace(CacheTraceReader(test_cache_trace_path), batch_size=100)
+        rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        lru_stat_df = stat_df[stat_df["policy"] == "lru"]
+        assert np.allclose(lru_stat_df["read_hit_count"]/(rd_hist.read_count + rd_hist.write_count), rd_hist.get_read_hit_rate_arr(size_list))
+        assert (stat_df["rmw_read_count"] > 0).all(), "No RMW read in a trace with misaligned writes."
+        assert (stat_df["rmw_read_hit_count"] <= stat_df["read_hit_count"]).all()
+
+        # a block trace and its cache trace are simulated the same way
+        reader = CPReader(test_block_trace_path)
+        block_stat_df = CacheSimulator(["lru", "arc"], size_list).track_block_trace(reader, batch_size=300)
+        reader.close()
+        assert block_stat_df.equals(stat_df)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 from unittest import main, TestCase
 from pathlib import Path 
+from filecmp import cmp
+from shutil import rmtree
+from numpy import concatenate
 
 from cydonia.profiler.BlockTrace import BlockTrace
-from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.CacheTrace import CacheTraceReader, HashFile
+from cydonia.profiler.CPReader import CPReader
 
 
 class TestCacheTrace(TestCase):
@@ -29,5 +33,170 @@ class TestCacheTrace(TestCase):
         cache_reader.close()
 
 
+    def test_extent_cache_trace(self):
+        test_data_dir = Path("../data")
+        test_cache_trace_path = test_data_dir.joinpath("test_cp_cache.csv")
+        test_block_trace_path = test_data_dir.joinpath("test_cp.csv")
+        test_extent_trace_path = test_data_dir.joinpath("test_cp_extent.csv")
+        test_sample_path = test_data_dir.joinpath("test_sample_block.csv")
+        test_extent_sample_path = test_data_dir.joinpath("test_sample_extent.csv")
+
+        cp_reader = CPReader(test_block_trace_path)
+        cp_reader.generate_cache_trace(test_extent_trace_path, extent_flag=True)
+        cp_reader.close()
+
+        cache_reader = CacheTraceReader(test_cache_trace_path)
+        extent_reader = CacheTraceReader(test_extent_trace_path)
+        assert extent_reader._extent_flag and not cache_reader._extent_flag
+
+        cache_req = cache_reader.get_next_cache_req()
+        while cache_req:
+            extent_cache_req = extent_reader.get_next_cache_req()
+            assert cache_req == extent_cache_req, "Cache requests {} and {} not equal.".format(cache_req, extent_cache_req)
+            cache_req = cache_reader.get_next_cache_req()
+        assert not extent_reader.get_next_cache_req(), "Extent cache trace has more cache requests."
+
+        assert cache_reader.get_stat() == extent_reader.get_stat()
+        assert cache_reader.get_unique_block_addr_set(0) == extent_reader.get_unique_block_addr_set(0)
+
+        sample_addr_dict = {addr: 1 for addr in cache_reader.get_unique_block_addr_set(0) if addr % 3 == 0}
+        cache_reader.sample(sample_addr_dict, test_sample_path)
+        extent_reader.sample(sample_addr_dict, test_extent_sample_path)
+        sample_reader = CacheTraceReader(test_sample_path)
+        extent_sample_reader = CacheTraceReader(test_extent_sample_path)
+        assert extent_sample_reader._extent_flag
+        assert sample_reader.get_stat() == extent_sample_reader.get_stat()
+        sample_reader.close()
+        extent_sample_reader.close()
+
+        cache_reader.close()
+        extent_reader.close()
+        test_extent_trace_path.unlink()
+        test_sample_path.unlink()
+        test_extent_sample_path.unlink()
+
+
+    def test_read_group_batches(self):
+        test_data_dir = Path("../data")
+        test_cache_trace_path = test_data_dir.joinpath("test_cp_cache.csv")
+        test_sample_path = test_data_dir.joinpath("test_sample_gap.csv")
+
+        cache_reader = CacheTraceReader(test_cache_trace_path)
+        sample_addr_dict = {addr: 1 for addr in cache_reader.get_unique_block_addr_set(0) if addr % 3 > 0}
+        cache_reader.sample(sample_addr_dict, test_sample_path)
+        cache_reader.close()
+
+        sample_reader = CacheTraceReader(test_sample_path)
+        cache_extent_arr = concatenate(list(sample_reader.read_group_batches()))
+        small_batch_arr = list(sample_reader.read_group_batches(7))
+        assert (concatenate(small_batch_arr) == cache_extent_arr).all(), "Batches of different sizes not equal."
+        for prev_batch, next_batch in zip(small_batch_arr[:-1], small_batch_arr[1:]):
+            assert prev_batch["i"][-1] != next_batch["i"][0], "Group split across batches."
+
+        block_req_batch = sample_reader.get_block_req_batch(cache_extent_arr, 0, sample_reader._config)
+        block_req_arr, cur_ts = [], 0 
+        cache_req_df = sample_reader.get_next_cache_req_group_df()
+        while len(cache_req_df):
+            block_req_arr += sample_reader.get_block_req_arr(cache_req_df, cur_ts, sample_reader._config)
+            cur_ts = block_req_arr[-1].ts
+            cache_req_df = sample_reader.get_next_cache_req_group_df()
+        assert len(block_req_arr) == len(block_req_batch) and len(block_req_arr) > len(sample_reader.get_group_start_arr(cache_extent_arr))
+        for block_req, batch_row in zip(block_req_arr, block_req_batch):
+            assert block_req.ts == batch_row["ts"] and block_req.lba == batch_row["lba"] and block_req.size_byte == batch_row["size"]
+            assert block_req.write_flag == (batch_row["op"] == 'w')
+
+        sample_reader.close()
+        test_sample_path.unlink()
+
+
+    def test_binary_hash_file(self):
+        test_data_dir = Path("../data")
+        test_cache_trace_path = test_data_dir.joinpath("test_cp_cache.csv")
+        test_text_hash_file_path = test_data_dir.joinpath("hash_test.csv")
+        test_bin_hash_file_path = test_data_dir.joinpath("hash_test.bin")
+
+        cache_reader = CacheTraceReader(test_cache_trace_path)
+        unscaled_unique_addr_set = cache_reader.get_unique_block_addr_set(0)
+        for num_lower_addr_bits_ignored in [0, 2]:
+            cache_reader.create_sample_hash_file(42, num_lower_addr_bits_ignored, test_text_hash_file_path)
+            cache_reader.create_sample_hash_file(42, num_lower_addr_bits_ignored, test_bin_hash_file_path)
+            text_hash_file, bin_hash_file = HashFile(test_text_hash_file_path), HashFile(test_bin_hash_file_path)
+            text_hash_file.load()
+            bin_hash_file.load()
+            assert bin_hash_file.seed == 42 and bin_hash_file.num_lower_addr_bits_ignored == num_lower_addr_bits_ignored
+            assert (text_hash_file.get_addr_arr() == bin_hash_file.get_addr_arr()).all()
+
+            for rate in [0.01, 0.1, 0.5, 0.99]:
+                # sample addresses the same way as iterating over the text hash file one region at a time 
+                expected_sample_addr_dict, sample_count = {}, 0 
+                for region_addr in text_hash_file.get_addr_arr().tolist():
+                    if sample_count/len(unscaled_unique_addr_set) >= rate:
+                        break 
+                    for blk_addr in range(region_addr << num_lower_addr_bits_ignored, (region_addr + 1) << num_lower_addr_bits_ignored):
+                        if blk_addr in unscaled_unique_addr_set:
+                            expected_sample_addr_dict[blk_addr] = True 
+                            sample_count += 1
+
+                for hash_file in [text_hash_file, bin_hash_file]:
+                    sample_addr_dict = cache_reader.get_sample_addr_dict(hash_file, unscaled_unique_addr_set, num_lower_addr_bits_ignored, rate)
+                    assert list(sample_addr_dict.keys()) == list(expected_sample_addr_dict.keys())
+            assert cache_reader.get_sample_addr_dict(bin_hash_file, {}, num_lower_addr_bits_ignored, 0.5) == {}
+
+        cache_reader.close()
+        test_text_hash_file_path.unlink()
+        test_bin_hash_file_path.unlink()
+
+
+    def test_sample_many(self):
+        test_data_dir = Path("../data")
+        test_cache_trace_path = test_data_dir.joinpath("test_cp_cache.csv")
+        test_block_trace_path = test_data_dir.joinpath("test_cp.csv")
+        test_extent_trace_path = test_data_dir.joinpath("test_cp_sample_many_extent.csv")
+        test_hash_file_path = test_data_dir.joinpath("hash_sample_many.bin")
+        test_sample_path = test_data_dir.joinpath("test_sample_many.csv")
+        test_sample_dir = test_data_dir.joinpath("sample_many")
+        test_extent_sample_dir = test_data_dir.joinpath("sample_many_extent")
+        rate_list, seed_list, bits_list = [0.05, 0.2, 0.6], [42, 7], [0, 2]
+
+        cache_reader = CacheTraceReader(test_cache_trace_path)
+        workload_stats_dict = cache_reader.sample_many(rate_list, seed_list, bits_list, test_sample_dir, batch_size=500)
+        for rate, seed, bits in workload_stats_dict:
+            cache_reader.create_sample_hash_file(seed, bits, test_hash_file_path)
+            cache_reader.sample_using_hash_file(test_hash_file_path, rate, bits, test_sample_path)
+            sample_many_path = test_sample_dir.joinpath("{}_{}_{}.csv".format(rate, seed, bits))
+            assert cmp(test_sample_path, sample_many_path, shallow=False), "Sample {} not equal to {}.".format(sample_many_path, test_sample_path)
+
+            sample_reader = CacheTraceReader(sample_many_path)
+            assert sample_reader.get_stat() == workload_stats_dict[(rate, seed, bits)]
+            sample_reader.close()
+        
+        cp_reader = CPReader(test_block_trace_path)
+        cp_reader.generate_cache_trace(test_extent_trace_path, extent_flag=True)
+        cp_reader.close()
+        extent_reader = CacheTraceReader(test_extent_trace_path)
+        extent_workload_stats_dict = extent_reader.sample_many(rate_list, seed_list, bits_list, test_extent_sample_dir, batch_size=500)
+        for sample_key, workload_stats in extent_workload_stats_dict.items():
+            assert workload_stats == workload_stats_dict[sample_key]
+            sample_file_name = "{}_{}_{}.csv".format(*sample_key)
+            sample_reader = CacheTraceReader(test_sample_dir.joinpath(sample_file_name))
+            extent_sample_reader = CacheTraceReader(test_extent_sample_dir.joinpath(sample_file_name))
+            assert extent_sample_reader._extent_flag
+            cache_req = sample_reader.get_next_cache_req()
+            while cache_req:
+                assert cache_req == extent_sample_reader.get_next_cache_req()
+                cache_req = sample_reader.get_next_cache_req()
+            assert not extent_sample_reader.get_next_cache_req()
+            sample_reader.close()
+            extent_sample_reader.close()
+
+        cache_reader.close()
+        extent_reader.close()
+        rmtree(test_sample_dir)
+        rmtree(test_extent_sample_dir)
+        test_extent_trace_path.unlink()
+        test_hash_file_path.unlink()
+        test_sample_path.unlink()
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
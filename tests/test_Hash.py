@@ -0,0 +1,40 @@
+from unittest import main, TestCase
+from numpy import arange, concatenate, array, uint64
+from numpy.random import default_rng
+import mmh3
+
+from cydonia.profiler.Hash import mmh3_hash128_arr, native_hash64_arr, get_hash_order, NATIVE_MODE
+
+
+class TestHash(TestCase):
+    def test_mmh3_hash128_arr(self):
+        rng = default_rng(42)
+        addr_arr = concatenate((arange(1000), 
+                                rng.integers(0, 1 << 62, size=1000), 
+                                array([10**15 - 1, 10**15, 10**16 - 1, 10**16, (1 << 63) - 1]))).astype(uint64)
+        addr_arr = concatenate((addr_arr, array([10**19, (1 << 64) - 1], dtype=uint64)))
+        for seed in [0, 42, (1 << 32) - 1]:
+            hash_hi_arr, hash_lo_arr = mmh3_hash128_arr(addr_arr, seed)
+            for hash_hi, hash_lo, addr in zip(hash_hi_arr.tolist(), hash_lo_arr.tolist(), addr_arr.tolist()):
+                assert (hash_hi << 64) | hash_lo == mmh3.hash128(str(addr), signed=False, seed=seed), \
+                        "Hash of {} with seed {} not equal to mmh3.".format(addr, seed)
+
+            order_arr = get_hash_order(addr_arr, seed)
+            mmh3_order_arr = sorted(addr_arr.tolist(), key=lambda addr: mmh3.hash128(str(addr), signed=False, seed=seed))
+            assert addr_arr[order_arr].tolist() == mmh3_order_arr
+
+
+    def test_native_hash64_arr(self):
+        addr_arr = arange(100000)
+        hash_arr = native_hash64_arr(addr_arr, 42)
+        assert len(set(hash_arr.tolist())) == len(addr_arr), "Native hash has collisions."
+        assert (native_hash64_arr(addr_arr, 42) == hash_arr).all() and not (native_hash64_arr(addr_arr, 43) == hash_arr).all()
+
+        # the lowest 10% of hash values should sample close to 10% of any range of addresses
+        order_arr = get_hash_order(addr_arr, 42, NATIVE_MODE)
+        sample_addr_arr = addr_arr[order_arr[:len(addr_arr)//10]]
+        assert abs((sample_addr_arr < 50000).sum() - 5000) < 300
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+from pathlib import Path
+from unittest import main, TestCase
+
+import numpy as np
+
+from cydonia.profiler.CacheSimulator import CacheSimulator
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.MiniSim import MiniSim
+
+
+class TestMiniSim(TestCase):
+    def test_full_trace(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        size_list = [5, 20, 80, 160]
+        mrc_df = MiniSim(["lru", "fifo", "arc"], size_list, rate=1.0, worker_count=2).run(test_cache_trace_path, batch_size=500)
+        stat_df = CacheSimulator(["lru", "fifo", "arc"], size_list).track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        stat_df = stat_df.sort_values(["policy", "size"], kind="stable").reset_index(drop=True)
+
+        # a miniature cache of a trace that is not sampled is the full cache
+        assert (mrc_df["scaled_size"] == mrc_df["size"]).all()
+        assert mrc_df[stat_df.columns].equals(stat_df), "MiniSim of rate 1.0 not equal to simulation."
+        assert np.allclose(mrc_df["miss_ratio"], 1 - stat_df["hit_ratio"])
+
+
+    def test_sample(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        test_hash_file_path = Path("../data/test_mini_sim_hash.csv")
+        test_sample_path = Path("../data/test_mini_sim_sample.csv")
+        rate, size_list = 0.5, [10, 40, 80, 120, 160]
+
+        cache_reader = CacheTraceReader(test_cache_trace_path)
+        cache_reader.create_sample_hash_file(42, 0, test_hash_file_path)
+        cache_reader.sample_using_hash_file(test_hash_file_path, rate, 0, test_sample_path)
+        cache_reader.close()
+
+        mini_sim = MiniSim(["lru", "clock"], size_list, rate, worker_count=2)
+        assert mini_sim.get_scaled_size_arr().tolist() == [5, 20, 40, 60, 80]
+        mrc_df = mini_sim.run(test_sample_path)
+        stat_df = CacheSimulator(["lru", "clock"], size_list).track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        stat_df = stat_df.sort_values(["policy", "size"], kind="stable").reset_index(drop=True)
+        mae = float(np.abs(mrc_df["hit_ratio"] - stat_df["hit_ratio"]).mean())
+        assert mae < 0.1, "MAE {} of MiniSim of rate {} too high.".format(mae, rate)
+
+        # the adjusted hit ratio counts the difference from the expected number of sampled accesses as hits
+        # and the statistics of the miniature cache are not changed 
+        access_count = int(stat_df["read_count"][0] + stat_df["write_count"][0])
+        sample_access_count = int(mrc_df["read_count"][0] + mrc_df["write_count"][0])
+        adjusted_mrc_df = mini_sim.run(test_sample_path, access_count=access_count)
+        assert adjusted_mrc_df[mrc_df.columns].equals(mrc_df)
+        expected_hit_ratio_arr = (mrc_df["hit_ratio"] * sample_access_count + rate * access_count - sample_access_count)/(rate * access_count)
+        assert np.allclose(adjusted_mrc_df["adjusted_hit_ratio"], np.clip(expected_hit_ratio_arr, 0.0, 1.0))
+        assert np.allclose(adjusted_mrc_df["adjusted_miss_ratio"], 1.0 - adjusted_mrc_df["adjusted_hit_ratio"])
+
+        test_hash_file_path.unlink()
+        test_sample_path.unlink()
+
+
+if __name__ == '__main__':
+    main()
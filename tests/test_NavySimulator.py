@@ -0,0 +1,98 @@
+from pathlib import Path
+from unittest import main, TestCase
+
+import numpy as np
+
+from cydonia.cachelib.NavySimulator import NavySimulator, get_navy_simulator
+from cydonia.cachelib.ReplayConfig import ReplayConfig
+from cydonia.profiler.CacheSimulator import CacheSimulator
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.CPReader import CPReader
+
+
+def get_test_access_arr(access_count: int = 100000, block_count: int = 5000) -> tuple:
+    rng = np.random.default_rng(42)
+    addr_arr = rng.zipf(1.1, access_count) % block_count
+    op_arr = np.where(rng.random(access_count) < 0.8, 'r', 'w')
+    # an access every 100 microseconds
+    ts_arr = np.arange(access_count, dtype=np.int64) * 100
+    return addr_arr, op_arr, ts_arr
+
+
+class TestNavySimulator(TestCase):
+    def test_dram_only(self):
+        addr_arr, op_arr, ts_arr = get_test_access_arr()
+        navy_simulator = NavySimulator(t1_size_mb=1, t2_size_mb=0)
+        navy_simulator.track_arr(addr_arr, op_arr, ts_arr)
+        stat_dict = navy_simulator.get_stat_dict()
+
+        # without NVM, DRAM is an LRU cache of 1MB of 4136 byte items
+        assert navy_simulator.t1_block_count == 253
+        cache_simulator = CacheSimulator(["lru"], [253])
+        cache_simulator.track_arr(addr_arr, op_arr)
+        lru_stat = cache_simulator.get_stat_df().iloc[0]
+        assert np.isclose(stat_dict["t1_hit_ratio"], lru_stat["hit_ratio"])
+        assert np.isclose(stat_dict["t1_read_hit_ratio"], lru_stat["read_hit_ratio"])
+        assert stat_dict["t2_hit_ratio"] == 0.0 and stat_dict["device_write_byte"] == 0
+
+        # a block and its item header do not fit in any alloc size 
+        with self.assertRaises(ValueError):
+            NavySimulator(t1_size_mb=1, t2_size_mb=0, alloc_size_list=[4096])
+
+
+    def test_nvm(self):
+        addr_arr, op_arr, ts_arr = get_test_access_arr()
+        stat_dict_list = []
+        for admission_probability in [0.0, 0.5, 1.0]:
+            navy_simulator = NavySimulator(t1_size_mb=1, t2_size_mb=8, region_size_mb=1, admission_probability=admission_probability)
+            for batch_start in range(0, len(addr_arr), 30000):
+                batch_end = batch_start + 30000
+                navy_simulator.track_arr(addr_arr[batch_start:batch_end], op_arr[batch_start:batch_end], ts_arr[batch_start:batch_end])
+            stat_dict_list.append(navy_simulator.get_stat_dict())
+
+        # every written region is a full region
+        assert navy_simulator.region_block_count == 253 and navy_simulator.region_count == 7
+        for stat_dict in stat_dict_list:
+            assert stat_dict["device_write_byte"] == (stat_dict["admit_count"]//253) * 1024**2
+        assert stat_dict_list[0]["t2_hit_ratio"] == 0.0 and stat_dict_list[0]["admit_count"] == 0
+        # T1 does not depend on NVM and more admissions give more T2 hits and device writes
+        assert len(set(stat_dict["t1_hit_ratio"] for stat_dict in stat_dict_list)) == 1
+        assert stat_dict_list[0]["t2_hit_ratio"] < stat_dict_list[1]["t2_hit_ratio"] < stat_dict_list[2]["t2_hit_ratio"]
+        assert stat_dict_list[0]["device_write_byte"] < stat_dict_list[1]["device_write_byte"] < stat_dict_list[2]["device_write_byte"]
+        assert stat_dict_list[2]["reject_count"] == 0 and stat_dict_list[2]["region_evict_count"] > 0
+
+
+    def test_write_rate_limit(self):
+        addr_arr, op_arr, ts_arr = get_test_access_arr()
+        navy_simulator = NavySimulator(t1_size_mb=1, t2_size_mb=8, region_size_mb=1, max_device_write_rate_mb=2)
+        navy_simulator.track_arr(addr_arr, op_arr, ts_arr)
+        stat_dict = navy_simulator.get_stat_dict()
+        write_rate_df = navy_simulator.get_write_rate_df()
+
+        # the trace lasts 10 seconds
+        assert len(write_rate_df) == 10 and write_rate_df["device_write_byte"].sum() == stat_dict["device_write_byte"]
+        assert stat_dict["reject_count"] > 0
+        # a region admitted in one window can be written in the next one
+        assert (write_rate_df["device_write_rate_mb"] <= 3).all(), "Write rate {} above limit.".format(write_rate_df["device_write_rate_mb"].max())
+
+        # a faster replay of the same trace has the same writes in fewer windows
+        fast_navy_simulator = NavySimulator(t1_size_mb=1, t2_size_mb=8, region_size_mb=1, replay_rate=2)
+        fast_navy_simulator.track_arr(addr_arr, op_arr, ts_arr)
+        assert len(fast_navy_simulator.get_write_rate_df()) == 5
+
+
+    def test_trace(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        config = ReplayConfig(["trace.csv"], ["backing"], 1, nvmCacheSizeMB=4, nvmCachePaths=["nvm"], navyRegionSizeMB=1,
+                                navyAdmissionProbability=0.5)
+        stat_dict = get_navy_simulator(config.cache_config).track_cache_trace(CacheTraceReader(test_cache_trace_path), batch_size=100)
+        reader = CPReader(test_block_trace_path)
+        block_stat_dict = get_navy_simulator(config.cache_config).track_block_trace(reader, batch_size=300)
+        reader.close()
+        assert stat_dict == block_stat_dict, "Block trace simulated as {} not {}.".format(block_stat_dict, stat_dict)
+        assert stat_dict["access_count"] == 4318
+
+
+if __name__ == '__main__':
+    main()
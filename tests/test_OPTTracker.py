@@ -0,0 +1,84 @@
+from pathlib import Path
+from unittest import main, TestCase
+
+import numpy as np
+
+from cydonia.profiler.CacheSimulator import CacheSimulator
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.CPReader import CPReader
+from cydonia.profiler.OPTTracker import OPTTracker
+from cydonia.profiler.RDTracker import RDTracker
+
+
+def get_opt_hit_count(addr_list: list, size: int, bypass: bool) -> int:
+    cache_set, hit_count = set(), 0
+    for index, addr in enumerate(addr_list):
+        if addr in cache_set:
+            hit_count += 1
+            continue
+        if len(cache_set) < size:
+            cache_set.add(addr)
+            continue
+
+        def get_next_use(block_addr):
+            return addr_list.index(block_addr, index + 1) if block_addr in addr_list[index+1:] else len(addr_list)
+        evict_addr = max(cache_set, key=get_next_use)
+        if bypass and get_next_use(addr) >= get_next_use(evict_addr):
+            continue
+        cache_set.remove(evict_addr)
+        cache_set.add(addr)
+    return hit_count
+
+
+class TestOPTTracker(TestCase):
+    def test_next_use(self):
+        assert OPTTracker.get_next_use_arr([3, 1, 3, 3, 2, 1]).tolist() == [2, 5, 3, 6, 6, 6]
+        assert OPTTracker.get_next_use_arr([]).tolist() == []
+
+
+    def test_opt(self):
+        rng = np.random.default_rng(42)
+        addr_arr = rng.zipf(1.3, 2000) % 60
+        op_arr = np.where(rng.random(len(addr_arr)) < 0.7, 'r', 'w')
+        size_list = [1, 3, 10, 30, 60]
+        for bypass in [False, True]:
+            opt_tracker = OPTTracker(bypass=bypass)
+            for batch_start in range(0, len(addr_arr), 700):
+                opt_tracker.track_arr(addr_arr[batch_start:batch_start+700], op_arr[batch_start:batch_start+700])
+            hit_rate_arr = opt_tracker.get_hit_rate_arr(size_list)
+            for size, hit_rate in zip(size_list, hit_rate_arr[:, 0]):
+                hit_count = get_opt_hit_count(addr_arr.tolist(), size, bypass)
+                assert round(hit_rate * len(addr_arr)) == hit_count, "OPT hits {} of size {} not {}.".format(hit_rate * len(addr_arr), size, hit_count)
+            assert np.allclose(hit_rate_arr[:, 0], hit_rate_arr[:, 1] + hit_rate_arr[:, 2])
+            assert np.array_equal(opt_tracker.get_read_hit_rate_arr(size_list), hit_rate_arr[:, 1])
+
+        # every block fits in the largest cache so OPT has every possible hit
+        assert np.isclose(hit_rate_arr[-1, 0], 1 - len(opt_tracker)/len(addr_arr))
+
+
+    def test_trace(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        size_arr = np.array([1, 5, 20, 50, 100, 200])
+        opt_tracker = OPTTracker()
+        opt_tracker.track_cache_trace(CacheTraceReader(test_cache_trace_path), batch_size=100)
+        hit_rate_arr = opt_tracker.get_hit_rate_arr(size_arr)
+
+        # OPT is an upper bound of the hit rate of LRU and of every other policy
+        rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        lru_hit_rate_arr = rd_hist.get_read_hit_rate_arr(size_arr) + rd_hist.get_write_hit_rate_arr(size_arr)
+        assert (hit_rate_arr[:, 0] >= lru_hit_rate_arr - 1e-12).all()
+        stat_df = CacheSimulator(["fifo", "clock", "arc"], size_arr).track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        for policy in ["fifo", "clock", "arc"]:
+            assert (hit_rate_arr[:, 0] >= stat_df[stat_df["policy"] == policy]["hit_ratio"].to_numpy() - 1e-12).all()
+        assert (np.diff(hit_rate_arr[:, 0]) >= 0).all(), "OPT hit rate not monotonic in cache size."
+
+        reader = CPReader(test_block_trace_path)
+        block_opt_tracker = OPTTracker()
+        block_opt_tracker.track_block_trace(reader, batch_size=300)
+        reader.close()
+        assert np.array_equal(block_opt_tracker.get_hit_rate_arr(size_arr), hit_rate_arr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+from pathlib import Path
+from unittest import main, TestCase
+from numpy import concatenate, where, arange
+
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.ParallelRDTracker import ParallelRDTracker
+from cydonia.profiler.RDHistogram import RDHistogram, get_mrc_mae
+from cydonia.profiler.RDTracker import RDTracker
+
+
+class TestParallelRDTracker(TestCase):
+    def test_partition(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        exact_rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+
+        rd_hist = ParallelRDTracker(1).track_cache_trace(CacheTraceReader(test_cache_trace_path), batch_size=100)
+        assert rd_hist == exact_rd_hist, "RD histogram of a single worker not equal to exact."
+
+        cache_req_arr = Reader.expand_cache_extent_arr(concatenate(list(CacheTraceReader(test_cache_trace_path).read_group_batches(100))))
+        for worker_count, num_lower_addr_bits_ignored in [(4, 0), (3, 2)]:
+            parallel_tracker = ParallelRDTracker(worker_count, num_lower_addr_bits_ignored=num_lower_addr_bits_ignored)
+            rd_hist = parallel_tracker.track_cache_trace(CacheTraceReader(test_cache_trace_path), batch_size=100)
+            assert parallel_tracker.partition_access_count_arr.sum() == len(cache_req_arr)
+            assert rd_hist.read_count == exact_rd_hist.read_count and rd_hist.write_count == exact_rd_hist.write_count
+            assert get_mrc_mae(rd_hist, exact_rd_hist) < 0.1, "MAE {} too high.".format(get_mrc_mae(rd_hist, exact_rd_hist))
+
+            # the merged histogram is the sum of the scaled histogram of each partition tracked serially
+            partition_arr = parallel_tracker.get_partition_arr(cache_req_arr["addr"])
+            serial_rd_hist = RDHistogram(-1)
+            for partition in range(worker_count):
+                partition_req_arr = cache_req_arr[partition_arr == partition]
+                rd_arr = RDTracker().track_arr(partition_req_arr["addr"], partition_req_arr["op"])
+                serial_rd_hist.update_rd_arr(where(rd_arr == -1, -1, rd_arr * worker_count), partition_req_arr["op"])
+            assert rd_hist == serial_rd_hist, "RD histogram of {} workers not equal to serial partitions.".format(worker_count)
+
+
+    def test_worker_error(self):
+        # an invalid operation is rejected before it is routed to a worker 
+        parallel_tracker = ParallelRDTracker(2)
+        with self.assertRaises(ValueError):
+            parallel_tracker.track_arr(arange(10), ['r'] * 9 + ['x'])
+        assert parallel_tracker.access_count == 0 
+
+        # an exception raised in a worker is raised by get_rd_hist and the workers are stopped 
+        parallel_tracker.track_arr(arange(10), ['r'] * 10)
+        parallel_tracker._task_queue_list[0].put((arange(3), ['r', 'x', 'r']))
+        with self.assertRaises(ValueError):
+            parallel_tracker.get_rd_hist()
+        assert not parallel_tracker._process_list
+        assert parallel_tracker.get_rd_hist().read_count == 0
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,8 @@ from pathlib import Path
 from unittest import main, TestCase
 from pathlib import Path 
 
+from numpy import arange, array
+
 from cydonia.profiler.RDHistogram import RDHistogram 
 
 
@@ -35,7 +37,51 @@ class TestRDHistogram(TestCase):
         assert rd_hist.get_max_hit_rate() == 0.5, "Max hit rate is not 0.5 but {}.".format(rd_hist.get_max_hit_rate())
 
         test_rd_hist_file_path.unlink()
-        
+
+
+    def test_array(self):
+        rd_arr = array([-1, 0, 3, 3, -1, 7, 2, 0, 3])
+        op_arr = array(['r', 'r', 'w', 'r', 'w', 'r', 'r', 'w', 'r'])
+        rd_hist = RDHistogram(-1)
+        rd_hist.update_rd_arr(rd_arr, op_arr)
+        other_rd_hist = RDHistogram(-1)
+        for rd, op in zip(rd_arr.tolist(), op_arr.tolist()):
+            other_rd_hist.update_rd(rd, op)
+        assert rd_hist == other_rd_hist, "RD histogram updated with arrays not equal to that updated per reuse distance."
+        assert rd_hist.read_counter == other_rd_hist.read_counter and rd_hist.write_counter == other_rd_hist.write_counter
+
+        size_arr = arange(-1, 12)
+        read_hit_rate_arr = rd_hist.get_read_hit_rate_arr(size_arr)
+        write_hit_rate_arr = rd_hist.get_write_hit_rate_arr(size_arr)
+        for size, read_hit_rate, write_hit_rate in zip(size_arr.tolist(), read_hit_rate_arr.tolist(), write_hit_rate_arr.tolist()):
+            assert read_hit_rate == sum([rd_hist.read_counter[rd] for rd in range(size)])/len(rd_arr), \
+                        "Read hit rate {} at size {} not correct.".format(read_hit_rate, size)
+            assert write_hit_rate == sum([rd_hist.write_counter[rd] for rd in range(size)])/len(rd_arr), \
+                        "Write hit rate {} at size {} not correct.".format(write_hit_rate, size)
+            assert read_hit_rate == rd_hist.get_read_hit_rate(size)
+        hrc_arr = rd_hist.get_equal_spaced_read_hrc(num_points=5)
+        assert hrc_arr[1][-1] == rd_hist.get_max_hit_rate(), "HRC does not end at the maximum hit rate."
+
+        # the counts of a merged histogram are the sums of the counts
+        rd_hist.update_rd_arr([1500, 0], ['w', 'r'], [3, 0])
+        merged_rd_hist = RDHistogram(-1).merge(rd_hist).merge(other_rd_hist)
+        assert merged_rd_hist.max_rd == 1500 and merged_rd_hist.max_read_rd == 7
+        assert merged_rd_hist.read_count == 2 * other_rd_hist.read_count
+        assert merged_rd_hist.write_count == 2 * other_rd_hist.write_count + 3
+        assert merged_rd_hist.read_counter[3] == 4 and merged_rd_hist.write_counter[1500] == 3
+
+        test_rd_hist_file_path = Path("../data/test_rd_hist.csv")
+        test_rd_hist_npz_file_path = Path("../data/test_rd_hist.npz")
+        merged_rd_hist.write_to_file(test_rd_hist_file_path)
+        merged_rd_hist.write_to_npz_file(test_rd_hist_npz_file_path)
+        csv_rd_hist, npz_rd_hist = RDHistogram(-1), RDHistogram(-1)
+        csv_rd_hist.load_rd_hist_file(test_rd_hist_file_path)
+        npz_rd_hist.load_npz_file(test_rd_hist_npz_file_path)
+        assert csv_rd_hist == merged_rd_hist, "RD histogram loaded from CSV file not equal to the one saved."
+        assert npz_rd_hist == merged_rd_hist, "RD histogram loaded from npz file not equal to the one saved."
+        test_rd_hist_file_path.unlink()
+        test_rd_hist_npz_file_path.unlink()
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+from pathlib import Path
+from unittest import main, TestCase
+from numpy import concatenate
+
+from cydonia.profiler.CPReader import CPReader
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.Reader import Reader
+from cydonia.profiler.RDHistogram import RDHistogram
+from cydonia.profiler.RDTracker import RDTracker
+
+
+def get_stack_rd_list(addr_list: list) -> list:
+    """Get the reuse distance of each access by walking an LRU stack."""
+    rd_list, lru_stack = [], []
+    for addr in addr_list:
+        if addr in lru_stack:
+            rd = len(lru_stack) - 1 - lru_stack.index(addr)
+            lru_stack.remove(addr)
+        else:
+            rd = -1
+        rd_list.append(rd)
+        lru_stack.append(addr)
+    return rd_list
+
+
+class TestRDTracker(TestCase):
+    def test_cache_trace(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        cache_trace_reader = CacheTraceReader(test_cache_trace_path)
+        cache_req_arr = Reader.expand_cache_extent_arr(concatenate(list(cache_trace_reader.read_group_batches(100))))
+        stack_rd_list = get_stack_rd_list(cache_req_arr["addr"].tolist())
+
+        stack_rd_hist = RDHistogram(-1)
+        for rd, op in zip(stack_rd_list, cache_req_arr["op"].tolist()):
+            stack_rd_hist.update_rd(rd, op)
+
+        # a small tree is compacted many times while tracking
+        for initial_capacity in [4, 1 << 16]:
+            rd_tracker = RDTracker(initial_capacity=initial_capacity)
+            rd_arr = rd_tracker.track_arr(cache_req_arr["addr"], cache_req_arr["op"])
+            assert rd_arr.tolist() == stack_rd_list, "Reuse distances with capacity {} not equal to LRU stack.".format(initial_capacity)
+            assert rd_tracker.rd_hist == stack_rd_hist, "RD histogram with capacity {} not equal to LRU stack.".format(initial_capacity)
+            assert len(rd_tracker) == len(set(cache_req_arr["addr"].tolist())), "Block count not equal to unique block count."
+
+        cache_trace_reader.reset()
+        rd_tracker = RDTracker()
+        rd_hist = rd_tracker.track_cache_trace(cache_trace_reader, batch_size=77)
+        assert rd_hist == stack_rd_hist, "RD histogram of cache trace not equal to LRU stack."
+        assert rd_tracker.access_count == len(cache_req_arr)
+
+
+    def test_block_trace(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        reader = CPReader(test_block_trace_path)
+        block_rd_hist = RDTracker().track_block_trace(reader, block_size_byte=4096, batch_size=300)
+        cache_rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        assert block_rd_hist == cache_rd_hist, "RD histogram of block trace not equal to that of its cache trace."
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
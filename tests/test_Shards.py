@@ -0,0 +1,67 @@
+from unittest import main, TestCase
+from pathlib import Path 
+from filecmp import cmp
+from json import load
+from numpy import lexsort, unique, array
+from numpy.random import default_rng
+
+from cydonia.profiler.Hash import get_hash64_arr, NATIVE_MODE
+from cydonia.profiler.Shards import FixedSizeRegionSet, get_rate_sample_flag_arr
+from cydonia.profiler.CacheTrace import CacheTraceReader
+
+
+class TestShards(TestCase):
+    def test_fixed_size_region_set(self):
+        rng = default_rng(42)
+        region_addr_arr = rng.integers(0, 50000, size=200000)
+        for hash_mode in ["mmh3", NATIVE_MODE]:
+            region_set = FixedSizeRegionSet(1000, 42, hash_mode)
+            for start_index in range(0, len(region_addr_arr), 1234):
+                region_set.update(region_addr_arr[start_index:start_index+1234])
+            
+            # the kept regions are the ones with the lowest hash values
+            unique_region_arr = unique(region_addr_arr)
+            hash_arr = get_hash64_arr(unique_region_arr, 42, hash_mode)
+            order_arr = lexsort((unique_region_arr, hash_arr))
+            assert sorted(unique_region_arr[order_arr[:1000]].tolist()) == region_set.addr_arr.tolist()
+            assert region_set.threshold == int(hash_arr[order_arr[1000]])
+            assert region_set.contains(unique_region_arr[order_arr[:10]]).all() and not region_set.contains(unique_region_arr[order_arr[1000:1010]]).any()
+            assert abs(region_set.effective_rate - 1000/len(unique_region_arr)) < 0.005
+
+            rate_flag_arr = get_rate_sample_flag_arr(unique_region_arr, region_set.effective_rate, 42, hash_mode)
+            assert abs(int(rate_flag_arr.sum()) - 1000) <= 1
+
+
+    def test_sample_fixed_size(self):
+        test_data_dir = Path("../data")
+        test_cache_trace_path = test_data_dir.joinpath("test_cp_cache.csv")
+        test_sample_path = test_data_dir.joinpath("test_fixed_size_sample.csv")
+        test_expected_sample_path = test_data_dir.joinpath("test_fixed_size_expected_sample.csv")
+
+        cache_reader = CacheTraceReader(test_cache_trace_path)
+        unique_block_addr_arr = array(sorted(cache_reader.get_unique_block_addr_set(0)))
+        for num_lower_addr_bits_ignored, max_region_count in [(0, 100), (2, 40)]:
+            sample_stat_dict = cache_reader.sample_fixed_size(max_region_count, 42, num_lower_addr_bits_ignored, test_sample_path, batch_size=333)
+
+            region_addr_arr = unique(unique_block_addr_arr >> num_lower_addr_bits_ignored)
+            hash_arr = get_hash64_arr(region_addr_arr, 42)
+            sample_region_set = set(region_addr_arr[lexsort((region_addr_arr, hash_arr))[:max_region_count]].tolist())
+            sample_addr_dict = {addr: True for addr in unique_block_addr_arr.tolist() if (addr >> num_lower_addr_bits_ignored) in sample_region_set}
+            cache_reader.sample(sample_addr_dict, test_expected_sample_path)
+            assert cmp(test_sample_path, test_expected_sample_path, shallow=False)
+
+            with test_sample_path.with_suffix(".json").open("r") as stat_handle:
+                assert load(stat_handle) == sample_stat_dict
+            assert sample_stat_dict["region_count"] == max_region_count and 0.0 < sample_stat_dict["effective_rate"] < 1.0 
+            sample_reader = CacheTraceReader(test_sample_path)
+            assert sample_reader.get_stat().get_dict().items() <= sample_stat_dict.items()
+            sample_reader.close()
+
+        cache_reader.close()
+        test_sample_path.unlink()
+        test_sample_path.with_suffix(".json").unlink()
+        test_expected_sample_path.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+from pathlib import Path
+from unittest import main, TestCase
+
+from cydonia.profiler.CPReader import CPReader
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.RDTracker import RDTracker
+from cydonia.profiler.RDHistogram import get_mrc_mae
+from cydonia.profiler.ShardsRDTracker import ShardsRDTracker
+
+
+class TestShardsRDTracker(TestCase):
+    def test_full_sample(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        exact_rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+
+        # sampling every region gives the exact histogram in both modes
+        for shards_tracker in [ShardsRDTracker(rate=1.0), ShardsRDTracker(max_region_count=1000)]:
+            rd_hist = shards_tracker.track_cache_trace(CacheTraceReader(test_cache_trace_path), batch_size=100)
+            assert rd_hist == exact_rd_hist, "RD histogram with every region sampled not equal to exact."
+            assert get_mrc_mae(rd_hist, exact_rd_hist) == 0.0
+            assert shards_tracker.sample_access_count == shards_tracker.access_count == exact_rd_hist.read_count + exact_rd_hist.write_count
+
+        # an invalid operation is rejected before any access is counted 
+        for shards_tracker in [ShardsRDTracker(rate=1.0), ShardsRDTracker(max_region_count=1000)]:
+            with self.assertRaises(ValueError):
+                shards_tracker.track_arr([1, 2, 3, 4], ['r', 'x', 'x', 'w'])
+            assert shards_tracker.access_count == shards_tracker.read_access_count == shards_tracker.sample_access_count == 0
+
+
+    def test_fixed_rate(self):
+        test_block_trace_path = Path("../data/test_cp.csv")
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        exact_rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+
+        shards_tracker = ShardsRDTracker(rate=0.5, seed=42)
+        rd_hist = shards_tracker.track_cache_trace(CacheTraceReader(test_cache_trace_path))
+        assert shards_tracker.sample_access_count < shards_tracker.access_count, "Every access was sampled at rate 0.5."
+        assert len(shards_tracker.rd_tracker) < exact_rd_hist.read_counter[-1] + exact_rd_hist.write_counter[-1], \
+                    "Every block was tracked at rate 0.5."
+        assert get_mrc_mae(rd_hist, exact_rd_hist) < 0.1, "MAE {} of rate 0.5 too high.".format(get_mrc_mae(rd_hist, exact_rd_hist))
+
+        # the adjustment makes the counts of each operation match those of the trace
+        assert abs(rd_hist.read_count - exact_rd_hist.read_count) <= 1, "Adjusted read count {} not {}.".format(rd_hist.read_count, exact_rd_hist.read_count)
+        assert abs(rd_hist.write_count - exact_rd_hist.write_count) <= 1, "Adjusted write count {} not {}.".format(rd_hist.write_count, exact_rd_hist.write_count)
+        unadjusted_rd_hist = shards_tracker.get_rd_hist(adjust=False)
+        assert unadjusted_rd_hist.read_count + unadjusted_rd_hist.write_count == round(shards_tracker.sample_access_count/0.5)
+
+        # a block trace and its cache trace give the same sample
+        reader = CPReader(test_block_trace_path)
+        block_rd_hist = ShardsRDTracker(rate=0.5, seed=42).track_block_trace(reader, block_size_byte=4096, batch_size=300)
+        assert block_rd_hist == rd_hist, "RD histogram of block trace not equal to that of its cache trace."
+        reader.close()
+
+
+    def test_fixed_size(self):
+        test_cache_trace_path = Path("../data/test_cp_cache.csv")
+        exact_rd_hist = RDTracker().track_cache_trace(CacheTraceReader(test_cache_trace_path))
+
+        for max_region_count, num_lower_addr_bits_ignored in [(100, 0), (30, 2)]:
+            shards_tracker = ShardsRDTracker(max_region_count=max_region_count, num_lower_addr_bits_ignored=num_lower_addr_bits_ignored)
+            rd_hist = shards_tracker.track_cache_trace(CacheTraceReader(test_cache_trace_path), batch_size=100)
+            stat_dict = shards_tracker.get_stat_dict()
+            assert stat_dict["evict_count"] > 0, "No region evicted with maximum region count {}.".format(max_region_count)
+            assert stat_dict["effective_rate"] < 1.0
+            assert stat_dict["sample_block_count"] <= max_region_count << num_lower_addr_bits_ignored, \
+                        "Blocks tracked {} more than region limit {}.".format(stat_dict["sample_block_count"], max_region_count)
+            assert get_mrc_mae(rd_hist, exact_rd_hist) < 0.1, "MAE {} too high.".format(get_mrc_mae(rd_hist, exact_rd_hist))
+
+
+if __name__ == '__main__':
+    main()
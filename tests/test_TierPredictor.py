@@ -0,0 +1,90 @@
+from pathlib import Path
+from unittest import main, TestCase
+
+import numpy as np
+
+from cydonia.cachelib.TierPredictor import TierPredictor, get_alloc_size, get_item_count_arr, T1_COL
+from cydonia.profiler.CacheTrace import CacheTraceReader
+from cydonia.profiler.RDHistogram import RDHistogram
+from cydonia.profiler.RDTracker import RDTracker
+
+
+def get_test_rd_hist() -> RDHistogram:
+    # a tier of 1MB stores 253 blocks of alloc size 4136
+    rd_hist = RDHistogram(-1)
+    for rd, op in [(0, 'r'), (100, 'r'), (300, 'r'), (1000, 'r'), (-1, 'r'), (100, 'w'), (300, 'w')]:
+        rd_hist.update_rd(rd, op)
+    return rd_hist
+
+
+class TestTierPredictor(TestCase):
+    def test_item_count(self):
+        assert get_alloc_size([4136]) == 4136
+        assert get_alloc_size([8192, 4136, 4200]) == 4136
+        assert get_alloc_size([4096]) == 0, "Alloc size without room for the item header used."
+        assert get_item_count_arr([1, 2], 4136).tolist() == [253, 507]
+        assert get_item_count_arr([1, 2], 0).tolist() == [0, 0]
+
+
+    def test_stacking(self):
+        rd_hist = get_test_rd_hist()
+        exclusive_predictor = TierPredictor(rd_hist=rd_hist)
+        assert np.allclose(exclusive_predictor.predict(1, 1), (3/7, 2/7))
+        assert np.allclose(exclusive_predictor.predict(1), (3/7, 0.0))
+        assert np.allclose(exclusive_predictor.predict(1, 1, lru_update_on_write=False), (2/7, 1/7))
+        with self.assertRaises(ValueError):
+            exclusive_predictor.predict(1, 1, alloc_size_list=[4096])
+
+        inclusive_predictor = TierPredictor(rd_hist=rd_hist, inclusive=True)
+        assert np.allclose(inclusive_predictor.predict(1, 1), (3/7, 0.0)), "Inclusive T2 no larger than T1 has hits."
+        assert np.allclose(inclusive_predictor.predict(1, 2), (3/7, 2/7))
+
+        # a hit rate curve gives the same prediction as its histogram
+        hrc_predictor = TierPredictor(hit_rate_arr=rd_hist.get_hit_rate_arr())
+        t1_size_mb_arr, t2_size_mb_arr = np.repeat(np.arange(4), 4), np.tile(np.arange(4), 4)
+        hit_ratio_arr = exclusive_predictor.predict_arr(t1_size_mb_arr, t2_size_mb_arr)
+        assert np.array_equal(hrc_predictor.predict_arr(t1_size_mb_arr, t2_size_mb_arr), hit_ratio_arr)
+        assert (hit_ratio_arr >= 0).all() and (hit_ratio_arr.sum(axis=1) <= 6/7 + 1e-9).all()
+
+        with self.assertRaises(ValueError):
+            TierPredictor()
+
+
+    def test_trace(self):
+        rd_hist = RDTracker().track_cache_trace(CacheTraceReader(Path("../data/test_cp_cache.csv")))
+        tier_predictor = TierPredictor(rd_hist=rd_hist)
+        t1_block_arr, t2_block_arr = np.arange(0, 200, 10), np.arange(200, 0, -10)
+        hit_ratio_arr = tier_predictor.get_hit_ratio_arr(t1_block_arr, t2_block_arr)
+        hit_rate_arr = rd_hist.get_read_hit_rate_arr(t1_block_arr) + rd_hist.get_write_hit_rate_arr(t1_block_arr)
+        assert np.allclose(hit_ratio_arr[:, T1_COL], hit_rate_arr)
+        total_hit_rate_arr = rd_hist.get_read_hit_rate_arr(t1_block_arr + t2_block_arr) + rd_hist.get_write_hit_rate_arr(t1_block_arr + t2_block_arr)
+        assert np.allclose(hit_ratio_arr.sum(axis=1), total_hit_rate_arr)
+
+
+    def test_prune(self):
+        tier_predictor = TierPredictor(rd_hist=get_test_rd_hist())
+        config_list = [
+            {"t1_size_mb": 1, "block_trace_path": "w1.csv", "kwargs": {"replayRate": 1}},
+            {"t1_size_mb": 1, "block_trace_path": "w1.csv", "kwargs": {"nvmCacheSizeMB": 1, "replayRate": 1}},
+            {"t1_size_mb": 1, "block_trace_path": "w1.csv", "kwargs": {"nvmCacheSizeMB": 2, "replayRate": 1}},
+            {"t1_size_mb": 2, "block_trace_path": "w1.csv", "kwargs": {"replayRate": 1}},
+            {"t1_size_mb": 1, "block_trace_path": "w1.csv", "kwargs": {"replayRate": 2}},
+            {"t1_size_mb": 1, "block_trace_path": "w1.csv", "kwargs": {"replayRate": 1, "lruUpdateOnWrite": False}}
+        ]
+        hit_ratio_arr = tier_predictor.predict_config_list(config_list)
+        assert np.allclose(hit_ratio_arr[5], (2/7, 0.0))
+
+        kept_config_list, pruned_config_list = tier_predictor.prune_config_list(config_list, min_hit_ratio_diff=0.01)
+        # no access has a reuse distance between the total size with a 1MB and a 2MB T2
+        assert pruned_config_list == [config_list[2]], "Pruned {}.".format(pruned_config_list)
+        assert kept_config_list == [config_list[index] for index in [0, 1, 3, 4, 5]]
+        kept_config_list, pruned_config_list = tier_predictor.prune_config_list(config_list, min_hit_ratio_diff=0.0)
+        assert kept_config_list == config_list and not pruned_config_list
+
+        # a configuration whose alloc sizes cannot store a block is not pruned on a 0 T1 hit ratio 
+        with self.assertRaises(ValueError):
+            tier_predictor.prune_config_list(config_list + [{"t1_size_mb": 1, "kwargs": {"allocSizes": [4096]}}])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+from unittest import main, TestCase
+from numpy.random import default_rng
+from numpy import cumsum 
+
+from cydonia.profiler.WorkloadStats import WorkloadStats, BlockRequest
+
+
+class TestWorkloadStats(TestCase):
+    def test_from_arrays(self):
+        rng = default_rng(42)
+        req_count = 10000
+        ts_arr = cumsum(rng.integers(0, 100, size=req_count))
+        lba_arr = rng.integers(0, 1 << 20, size=req_count)
+        write_flag_arr = rng.random(req_count) < 0.5 
+        size_arr = 512 * rng.integers(1, 64, size=req_count)
+
+        workload_stats = WorkloadStats()
+        for ts, lba, write_flag, size_byte in zip(ts_arr.tolist(), lba_arr.tolist(), write_flag_arr.tolist(), size_arr.tolist()):
+            workload_stats.track(BlockRequest(ts, lba, write_flag, size_byte))
+
+        assert workload_stats == WorkloadStats.from_arrays(ts_arr, lba_arr, write_flag_arr, size_arr)
+
+        batch_workload_stats = WorkloadStats()
+        for start_index in range(0, req_count, 777):
+            end_index = start_index + 777
+            batch_workload_stats.track_arrays(ts_arr[start_index:end_index], 
+                                                lba_arr[start_index:end_index], 
+                                                write_flag_arr[start_index:end_index], 
+                                                size_arr[start_index:end_index])
+        assert workload_stats == batch_workload_stats
+        assert all([type(value) == int for value in batch_workload_stats.get_dict().values()])
+
+
+if __name__ == '__main__':
+    main()